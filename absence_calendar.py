@@ -0,0 +1,230 @@
+"""
+Absence calendar: an interval index over employee absences.
+
+Answers the three questions the planner, the validation, the replacement
+search, the notifications and the exports keep asking:
+
+- "is employee X absent on d?"            -> is_absent() / absence_on()
+- "is X absent anywhere in [a, b]?"       -> absent_between()
+- "who is absent on d?"                   -> absent_employees_on()
+
+Per employee the absences are kept sorted by start date together with a
+running maximum of the end dates, so every query is a binary search
+(O(log n)) instead of a scan over the full absence list.  Days inside an
+optional horizon (window_start/window_end, e.g. the planning weeks) are
+additionally expanded into dicts for O(1) lookups in the model's hot loops;
+only that window is expanded so open-ended absences stay cheap.
+"""
+
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class _EmployeeIntervals:
+    """Absences of one employee, sorted by start date."""
+
+    __slots__ = ("starts", "ends", "max_ends", "seqs", "items")
+
+    def __init__(self, entries: List[Tuple[date, int, date, Any]]):
+        entries.sort(key=lambda e: (e[0], e[1]))
+        self.starts = [e[0] for e in entries]
+        self.seqs = [e[1] for e in entries]
+        self.ends = [e[2] for e in entries]
+        self.items = [e[3] for e in entries]
+        # max_ends[i] = latest end date among entries[0..i]
+        self.max_ends = []
+        latest = None
+        for end in self.ends:
+            latest = end if latest is None or end > latest else latest
+            self.max_ends.append(latest)
+
+
+class AbsenceCalendar:
+    """
+    Interval index over absences.
+
+    Built from objects with ``employee_id``, ``start_date`` and ``end_date``
+    (entities.Absence); use from_intervals() for other sources such as
+    database rows.  When several absences cover the same day, the one listed
+    first in the input is returned, like the linear scans this replaces.
+    """
+
+    def __init__(
+        self,
+        absences: Iterable[Any] = (),
+        window_start: Optional[date] = None,
+        window_end: Optional[date] = None,
+    ):
+        """
+        Args:
+            absences: Absence objects
+            window_start: First day expanded for O(1) lookups (optional)
+            window_end: Last day expanded for O(1) lookups (optional)
+        """
+        self._init(
+            ((a.employee_id, a.start_date, a.end_date, a) for a in absences),
+            window_start,
+            window_end,
+        )
+
+    @classmethod
+    def from_intervals(
+        cls,
+        intervals: Iterable[Tuple[int, date, date, Any]],
+        window_start: Optional[date] = None,
+        window_end: Optional[date] = None,
+    ) -> "AbsenceCalendar":
+        """Build a calendar from ``(employee_id, start_date, end_date, item)`` tuples."""
+        calendar = cls.__new__(cls)
+        calendar._init(intervals, window_start, window_end)
+        return calendar
+
+    def _init(self, intervals, window_start, window_end) -> None:
+        if (window_start is None) != (window_end is None):
+            raise ValueError("window_start and window_end must be given together")
+        self.window_start = window_start
+        self.window_end = window_end
+
+        by_employee: Dict[int, List[Tuple[date, int, date, Any]]] = {}
+        self._by_emp_date: Dict[Tuple[int, date], Any] = {}
+        self._absent_by_date: Dict[date, Set[int]] = {}
+        for seq, (emp_id, start, end, item) in enumerate(intervals):
+            by_employee.setdefault(emp_id, []).append((start, seq, end, item))
+            if window_start is None:
+                continue
+            first = max(start, window_start)
+            last = min(end, window_end)
+            for day_offset in range((last - first).days + 1):
+                d = first + timedelta(days=day_offset)
+                self._by_emp_date.setdefault((emp_id, d), item)
+                self._absent_by_date.setdefault(d, set()).add(emp_id)
+
+        self._by_employee: Dict[int, _EmployeeIntervals] = {
+            emp_id: _EmployeeIntervals(entries) for emp_id, entries in by_employee.items()
+        }
+
+    def _in_window(self, d: date) -> bool:
+        return self.window_start is not None and self.window_start <= d <= self.window_end
+
+    def absence_on(self, emp_id: int, d: date) -> Optional[Any]:
+        """Return the absence of an employee on a date, or None if the employee is present."""
+        if self._in_window(d):
+            return self._by_emp_date.get((emp_id, d))
+        intervals = self._by_employee.get(emp_id)
+        if intervals is None:
+            return None
+        best = None
+        i = bisect_right(intervals.starts, d) - 1
+        # Walk back while an earlier absence can still reach d.
+        while i >= 0 and intervals.max_ends[i] >= d:
+            if intervals.ends[i] >= d and (best is None or intervals.seqs[i] < intervals.seqs[best]):
+                best = i
+            i -= 1
+        return intervals.items[best] if best is not None else None
+
+    def is_absent(self, emp_id: int, d: date) -> bool:
+        """Check if an employee has an absence on a specific date."""
+        if self._in_window(d):
+            return (emp_id, d) in self._by_emp_date
+        intervals = self._by_employee.get(emp_id)
+        if intervals is None:
+            return False
+        i = bisect_right(intervals.starts, d) - 1
+        return i >= 0 and intervals.max_ends[i] >= d
+
+    def absent_between(self, emp_id: int, start: date, end: date) -> bool:
+        """Check if an employee has an absence on any day of [start, end]."""
+        intervals = self._by_employee.get(emp_id)
+        if intervals is None or start > end:
+            return False
+        i = bisect_right(intervals.starts, end) - 1
+        return i >= 0 and intervals.max_ends[i] >= start
+
+    def absent_employees_on(self, d: date) -> FrozenSet[int]:
+        """Return the ids of all employees absent on a date."""
+        if self._in_window(d):
+            return frozenset(self._absent_by_date.get(d, ()))
+        return frozenset(emp_id for emp_id in self._by_employee if self.is_absent(emp_id, d))
+
+    def intervals(self, emp_id: int) -> List[Tuple[date, date]]:
+        """Return the (start_date, end_date) pairs of an employee, sorted by start."""
+        intervals = self._by_employee.get(emp_id)
+        if intervals is None:
+            return []
+        return list(zip(intervals.starts, intervals.ends))
+
+    def absent_days(self, emp_id: int, dates: Iterable[date]) -> Set[date]:
+        """Return the subset of dates on which an employee is absent."""
+        if emp_id not in self._by_employee:
+            return set()
+        return {d for d in dates if self.is_absent(emp_id, d)}
+
+    def __contains__(self, emp_id: int) -> bool:
+        """True if the employee has at least one absence."""
+        return emp_id in self._by_employee
+
+
+def load_absence_calendar(conn, start_date: date, end_date: date) -> AbsenceCalendar:
+    """
+    Load the Absences rows overlapping [start_date, end_date] into a calendar.
+
+    For callers working on a raw database connection (replacement search,
+    notifications).  Items are the absence ids.
+
+    Args:
+        conn: sqlite3 connection
+        start_date: First day of the range
+        end_date: Last day of the range
+
+    Returns:
+        AbsenceCalendar expanded over [start_date, end_date]
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT Id, EmployeeId, StartDate, EndDate
+        FROM Absences
+        WHERE StartDate <= ? AND EndDate >= ?
+        """,
+        (end_date.isoformat(), start_date.isoformat()),
+    )
+    return AbsenceCalendar.from_intervals(
+        (
+            (row[1], date.fromisoformat(row[2]), date.fromisoformat(row[3]), row[0])
+            for row in cursor.fetchall()
+        ),
+        window_start=start_date,
+        window_end=end_date,
+    )
+
+
+def deduplicate_absences(absences: Iterable[Any]) -> List[Any]:
+    """
+    Drop absences whose days are all covered by earlier absences of the same employee.
+
+    Keeps the input order.  Works on the merged covered intervals per
+    employee instead of expanding every absence into single days.
+    """
+    # emp_id -> (starts, ends) of disjoint, non-adjacent covered intervals
+    covered: Dict[int, Tuple[List[date], List[date]]] = {}
+    result = []
+    one_day = timedelta(days=1)
+    for absence in absences:
+        start, end = absence.start_date, absence.end_date
+        if end < start:
+            continue  # covers no day at all
+        starts, ends = covered.setdefault(absence.employee_id, ([], []))
+        i = bisect_right(starts, start) - 1
+        if i >= 0 and ends[i] >= end:
+            continue  # fully inside an already covered interval
+        result.append(absence)
+        # Merge [start, end] with every covered interval it touches.
+        lo = i if i >= 0 and ends[i] >= start - one_day else i + 1
+        hi = bisect_right(starts, end + one_day)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+    return result
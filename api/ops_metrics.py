@@ -7,6 +7,7 @@ from typing import Dict
 _lock = threading.Lock()
 _started_at = time.time()
 _counters = {
+    'planning_jobs_queued': 0,
     'planning_jobs_started': 0,
     'planning_jobs_success': 0,
     'planning_jobs_error': 0,
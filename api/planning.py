@@ -25,9 +25,11 @@ def _build_stage_metrics_summary(stage_metrics: list) -> dict:
         return {
             "has_metrics": False,
             "total_build_seconds": 0.0,
+            "total_build_seconds_saved": 0.0,
             "total_solve_seconds": 0.0,
             "slowest_stage": None,
             "successful_stage": None,
+            "build_profile": None,
             "health": {
                 "color": "unknown",
                 "reason": "Keine Stage-Metriken vorhanden",
@@ -37,6 +39,8 @@ def _build_stage_metrics_summary(stage_metrics: list) -> dict:
     executed = [m for m in stage_metrics if not m.get("skipped")]
     total_build = sum(float(m.get("build_seconds") or 0.0) for m in executed)
     total_solve = sum(float(m.get("solve_seconds") or 0.0) for m in executed)
+    # Fallback stages reuse the Stage-1 model; this is the construction time they did not pay again.
+    total_build_saved = sum(float(m.get("build_seconds_saved") or 0.0) for m in executed)
 
     slowest_stage = None
     if executed:
@@ -47,6 +51,23 @@ def _build_stage_metrics_summary(stage_metrics: list) -> dict:
             "solve_seconds": float(slowest.get("solve_seconds") or 0.0),
         }
 
+    # Only the stage that constructed the shared model carries a build profile
+    # (and only when profiling was enabled for the run).
+    build_profile = None
+    for metric in stage_metrics:
+        sections = metric.get("build_profile")
+        if sections:
+            ranked = sorted(sections, key=lambda s: float(s.get("seconds") or 0.0), reverse=True)
+            build_profile = {
+                "stage": metric.get("stage"),
+                "total_seconds": round(sum(float(s.get("seconds") or 0.0) for s in sections), 3),
+                "total_variables": sum(int(s.get("variables_added") or 0) for s in sections),
+                "total_constraints": sum(int(s.get("constraints_added") or 0) for s in sections),
+                "slowest_section": ranked[0].get("label"),
+                "sections": ranked,
+            }
+            break
+
     successful_stage = None
     for metric in stage_metrics:
         if metric.get("solved"):
@@ -100,9 +121,11 @@ def _build_stage_metrics_summary(stage_metrics: list) -> dict:
         "stage_count": len(stage_metrics),
         "executed_stage_count": len(executed),
         "total_build_seconds": round(total_build, 3),
+        "total_build_seconds_saved": round(total_build_saved, 3),
         "total_solve_seconds": round(total_solve, 3),
         "slowest_stage": slowest_stage,
         "successful_stage": successful_stage,
+        "build_profile": build_profile,
         "health": health,
     }
 
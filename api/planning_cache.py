@@ -0,0 +1,312 @@
+"""
+Planning result cache keyed by a fingerprint of the solver input.
+
+Planning the same month again without changing anything costs a full solve.
+planning_fingerprint() hashes everything _plan_month() feeds the solver
+(period, employees, teams, absences, shift types, global settings, team
+locks, previous shifts, rotation patterns and solver parameters) into a
+SHA-256 over canonical JSON.  A successful result is stored under that
+fingerprint in PlanningResultCache and reused instead of solving again.
+
+Employee locks are not part of the fingerprint: a re-plan without force
+locks the month's own saved plan, so the fingerprint would never match.
+A cached result is used only if it keeps every lock of the new run
+(cached_plan_matches_locks()), i.e. it is a valid plan for the new input.
+
+Only Stage 1 results (OPTIMAL/FEASIBLE) are cached.  Fallback and emergency
+plans depend on how far the solver got within its time limit, so an identical
+request solves again instead of inheriting a degraded plan.
+
+A row without a result marks a fingerprint that a job is solving right now.
+acquire_planning_result() lets a second job with the same input wait for
+that result instead of solving the same model in parallel:
+
+    acquire_planning_result() -> 'hit'       use the cached plan
+                              -> 'miss'      solve, then store_planning_result()
+                              -> 'cancelled' the waiting job was cancelled
+
+release_planning_result() drops the marker of a run that produced no
+result, so waiting jobs solve themselves.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Part of every fingerprint: bump when the solver output for the same input changes.
+CACHE_FORMAT_VERSION = 1
+# Results kept per month; older fingerprints are pruned when a new one is stored.
+MAX_CACHED_RESULTS_PER_MONTH = 3
+# How often a job waiting for an identical running job checks for its result.
+CACHE_WAIT_POLL_SECONDS = 2.0
+
+# PlanningReport statuses worth reusing: Stage 1 results without relaxed rules.
+CACHEABLE_REPORT_STATUSES = ('OPTIMAL', 'FEASIBLE')
+
+# Bookkeeping fields of the entities that do not change the plan.
+_IGNORED_FIELDS = ('created_at', 'modified_at', 'created_by', 'modified_by')
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-compatible form of ``value`` that does not depend on dict or set order."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            f.name: _canonical(getattr(value, f.name))
+            for f in fields(value) if f.name not in _IGNORED_FIELDS
+        }
+    if isinstance(value, Enum):
+        return _canonical(value.value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        items = [[_canonical(k), _canonical(v)] for k, v in value.items()]
+        return sorted(items, key=lambda item: json.dumps(item[0], sort_keys=True, default=str))
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def _sorted_entities(entities) -> list:
+    """Canonical entity list; the order the database returns them in does not matter."""
+    canonical = [_canonical(e) for e in entities or []]
+    return sorted(canonical, key=lambda e: json.dumps(e, sort_keys=True, default=str))
+
+
+def planning_fingerprint(
+    period: Dict[str, date],
+    employees,
+    teams,
+    absences,
+    shift_types,
+    global_settings: Optional[Dict[str, Any]],
+    locked_team_shift: Optional[Dict[Tuple[int, int], str]],
+    previous_employee_shifts: Optional[Dict[Tuple[int, date], str]],
+    rotation_patterns: Optional[Dict[int, list]],
+    solver_params: Dict[str, Any],
+) -> str:
+    """
+    SHA-256 hex digest of one month's solver input.
+
+    Args:
+        period: Dates of the model (start, end, extended start/end, horizon end)
+        employees, teams, absences, shift_types: Entities loaded for the period
+        global_settings: load_global_settings() of the database
+        locked_team_shift: (team_id, week_idx) -> code locks of the model
+        previous_employee_shifts: (employee_id, date) -> code before the period
+        rotation_patterns: rotation_group_id -> codes (None: F → N → S)
+        solver_params: Time limit, workers and the solver modes of the run
+    """
+    payload = {
+        'version': CACHE_FORMAT_VERSION,
+        'period': _canonical(period),
+        'employees': _sorted_entities(employees),
+        'teams': _sorted_entities(teams),
+        'absences': _sorted_entities(absences),
+        'shiftTypes': _sorted_entities(shift_types),
+        'globalSettings': _canonical(global_settings or {}),
+        'lockedTeamShift': _canonical(locked_team_shift or {}),
+        'previousEmployeeShifts': _canonical(previous_employee_shifts or {}),
+        'rotationPatterns': _canonical(rotation_patterns or {}),
+        'solverParams': _canonical(solver_params),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _encode_schedule(schedule: Dict[Tuple[int, date], str]) -> str:
+    rows = sorted([emp_id, d.isoformat(), code] for (emp_id, d), code in schedule.items())
+    return json.dumps(rows, separators=(',', ':'))
+
+
+def _decode_schedule(schedule_json: str) -> Dict[Tuple[int, date], str]:
+    return {(emp_id, date.fromisoformat(d)): code for emp_id, d, code in json.loads(schedule_json)}
+
+
+def cached_plan_matches_locks(
+    schedule: Dict[Tuple[int, date], str],
+    locked_employee_shift: Optional[Dict[Tuple[int, date], str]],
+) -> bool:
+    """True if ``schedule`` assigns every locked employee day its locked shift."""
+    return all(schedule.get(key) == code for key, code in (locked_employee_shift or {}).items())
+
+
+def assignments_from_schedule(schedule: Dict[Tuple[int, date], str], shift_types) -> list:
+    """ShiftAssignments of the working days of a cached schedule (absences and OFF are skipped)."""
+    from entities import ShiftAssignment
+
+    shift_type_ids = {st.code: st.id for st in shift_types}
+    assignments = []
+    for (emp_id, d), code in sorted(schedule.items()):
+        if code in shift_type_ids:
+            assignments.append(ShiftAssignment(
+                id=len(assignments) + 1,
+                employee_id=emp_id,
+                shift_type_id=shift_type_ids[code],
+                date=d,
+            ))
+    return assignments
+
+
+def _decode_entry(row) -> Dict[str, Any]:
+    return {
+        'schedule': _decode_schedule(row['schedule_json']),
+        'report_status': row['report_status'],
+        'report_json': row['report_json'],
+        'warm_start_state': json.loads(row['warm_start_json']) if row['warm_start_json'] else None,
+        'job_id': row['job_id'],
+    }
+
+
+def acquire_planning_result(
+    db,
+    fingerprint: str,
+    job_id: str,
+    year: int,
+    month: int,
+    locked_employee_shift: Optional[Dict[Tuple[int, date], str]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_wait: Optional[Callable[[str], None]] = None,
+    poll_interval: float = CACHE_WAIT_POLL_SECONDS,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Look up ``fingerprint`` for ``job_id``, waiting while another job solves it.
+
+    ``on_wait`` is called once with the id of that other job before waiting.
+
+    Returns:
+        ('hit', entry) with the cached schedule, report and warm-start state;
+        ('miss', None) when the caller has to solve (it then owns the marker);
+        ('cancelled', None) when ``should_stop`` returned True while waiting.
+    """
+    announced = False
+    while True:
+        with db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM PlanningResultCache WHERE fingerprint=?", (fingerprint,)
+                ).fetchone()
+                if (row is not None and row['schedule_json'] is not None
+                        and row['report_status'] not in CACHEABLE_REPORT_STATUSES):
+                    row = None  # degraded result stored before it was excluded: solve again
+                owner_active = False
+                if row is not None and row['schedule_json'] is None and row['job_id'] != job_id:
+                    owner = conn.execute(
+                        "SELECT status FROM PlanningJobs WHERE id=?", (row['job_id'],)
+                    ).fetchone()
+                    owner_active = owner is not None and owner['status'] == 'running'
+                if row is None or (row['schedule_json'] is None and not owner_active):
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO PlanningResultCache
+                            (fingerprint, year, month, job_id, created_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (fingerprint, year, month, job_id, datetime.utcnow().isoformat()),
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        if row is not None and row['schedule_json'] is not None:
+            entry = _decode_entry(row)
+            if cached_plan_matches_locks(entry['schedule'], locked_employee_shift):
+                return 'hit', entry
+            logger.info("Cached plan %s does not keep the current locks, solving again", fingerprint[:12])
+            return 'miss', None
+        if not owner_active:
+            return 'miss', None
+
+        if not announced:
+            logger.info(
+                "Planning job %s waits for job %s solving the same input", job_id, row['job_id']
+            )
+            if on_wait is not None:
+                on_wait(row['job_id'])
+            announced = True
+        if should_stop is not None and should_stop():
+            return 'cancelled', None
+        time.sleep(poll_interval)
+
+
+def store_planning_result(
+    db,
+    fingerprint: str,
+    job_id: str,
+    year: int,
+    month: int,
+    schedule: Dict[Tuple[int, date], str],
+    report_status: str,
+    report_json: str,
+    warm_start_state: Optional[Dict[str, Any]],
+) -> None:
+    """
+    Store a successful result under ``fingerprint`` and prune old results of the month.
+
+    Results whose ``report_status`` is not in CACHEABLE_REPORT_STATUSES only
+    drop the marker.  Failures are only logged: the cache saves time on the
+    next run, it never fails this one.
+    """
+    if report_status not in CACHEABLE_REPORT_STATUSES:
+        release_planning_result(db, fingerprint, job_id)
+        return
+    try:
+        with db.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO PlanningResultCache
+                    (fingerprint, year, month, job_id, created_at,
+                     schedule_json, report_status, report_json, warm_start_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                    year            = excluded.year,
+                    month           = excluded.month,
+                    job_id          = excluded.job_id,
+                    created_at      = excluded.created_at,
+                    schedule_json   = excluded.schedule_json,
+                    report_status   = excluded.report_status,
+                    report_json     = excluded.report_json,
+                    warm_start_json = excluded.warm_start_json
+                """,
+                (fingerprint, year, month, job_id, datetime.utcnow().isoformat(),
+                 _encode_schedule(schedule), report_status, report_json,
+                 json.dumps(warm_start_state, separators=(',', ':')) if warm_start_state else None),
+            )
+            conn.execute(
+                """
+                DELETE FROM PlanningResultCache
+                WHERE year=? AND month=? AND schedule_json IS NOT NULL AND fingerprint NOT IN (
+                    SELECT fingerprint FROM PlanningResultCache
+                    WHERE year=? AND month=? AND schedule_json IS NOT NULL
+                    ORDER BY created_at DESC, rowid DESC LIMIT ?
+                )
+                """,
+                (year, month, year, month, MAX_CACHED_RESULTS_PER_MONTH),
+            )
+            conn.commit()
+    except Exception as exc:
+        logger.warning(f"Failed to cache planning result for {year}/{month}: {exc}")
+
+
+def release_planning_result(db, fingerprint: str, job_id: str) -> None:
+    """Drop the in-progress marker of ``job_id`` (no-op once a result is stored)."""
+    try:
+        with db.connection() as conn:
+            conn.execute(
+                "DELETE FROM PlanningResultCache WHERE fingerprint=? AND job_id=? AND schedule_json IS NULL",
+                (fingerprint, job_id),
+            )
+            conn.commit()
+    except Exception as exc:
+        logger.warning(f"Failed to release planning cache marker {fingerprint[:12]}: {exc}")
+
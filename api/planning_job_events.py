@@ -0,0 +1,169 @@
+"""
+Server-Sent Events for the progress of a planning job.
+
+Planning jobs run in solver processes (see planning_worker.py) and report
+progress only through their PlanningJobs row.  stream_job_events() is an
+async generator: it reads that row in the threadpool with a short-lived
+pooled connection per poll and waits between polls on the event loop, so an
+open stream holds neither a threadpool thread nor a connection.  It decodes
+result_json only when the row changed and turns the changes into events:
+
+    progress  status payload (same fields as GET /api/shifts/plan/status/{job_id})
+    stage     a solver stage started (optimizationPhaseIndex/-TotalPhases/-Label)
+    solution  an improving solution: seq, stage, solutionCount, objective,
+              bestBound, elapsedSeconds (points for a convergence curve)
+    done      final status payload; the stream ends afterwards
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from .planning_job_store import PROGRESS_WRITE_INTERVAL_SECONDS, get_queue_position
+
+# The row cannot change faster than the progress writer stores it.
+STREAM_POLL_INTERVAL_SECONDS = PROGRESS_WRITE_INTERVAL_SECONDS
+# Comment line sent when nothing happened, keeps proxies from closing the stream.
+STREAM_KEEPALIVE_SECONDS = 15
+# Reconnect delay the browser's EventSource uses after a dropped connection.
+STREAM_RETRY_MILLISECONDS = 2000
+
+_ACTIVE_STATES = ('queued', 'running')
+# Payload fields that change without news for the client.
+_VOLATILE_FIELDS = ('elapsedSeconds', 'optimizationConvergence')
+
+
+def job_status_payload(db, job_id: str, job) -> Dict[str, Any]:
+    """Status payload of a PlanningJobs row (status, message, progress fields, queue position)."""
+    result = {
+        'status': job['status'],
+        'message': job['message'],
+    }
+    if job['result_json']:
+        try:
+            result.update(json.loads(job['result_json']))
+        except Exception:
+            pass
+
+    if job['status'] == 'queued':
+        position = get_queue_position(db, job_id)
+        result['queuePosition'] = position
+        result['message'] = f'Wartet auf freien Planungsplatz (Position {position}).'
+
+    if job['started_at']:
+        try:
+            started = datetime.fromisoformat(job['started_at'])
+            result['elapsedSeconds'] = int((datetime.utcnow() - started).total_seconds())
+        except Exception:
+            result['elapsedSeconds'] = 0
+    return result
+
+
+def _stable_fields(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in payload.items() if k not in _VOLATILE_FIELDS}
+
+
+def job_events(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Events leading from status payload ``previous`` (None: nothing sent yet) to ``current``.
+    """
+    previous = previous or {}
+    events: List[Tuple[str, Dict[str, Any]]] = []
+
+    phase_index = current.get('optimizationPhaseIndex')
+    if phase_index is not None and phase_index != previous.get('optimizationPhaseIndex'):
+        events.append(('stage', {
+            'index': phase_index,
+            'total': current.get('optimizationTotalPhases'),
+            'label': current.get('optimizationPhaseLabel'),
+            'details': current.get('optimizationPhaseDetails'),
+        }))
+
+    # Each month of a batch job starts a new convergence curve (seq from 1).
+    if current.get('batchMonthIndex') != previous.get('batchMonthIndex'):
+        last_seq = 0
+    else:
+        last_seq = max((p.get('seq', 0) for p in previous.get('optimizationConvergence') or []), default=0)
+    for point in current.get('optimizationConvergence') or []:
+        if point.get('seq', 0) > last_seq:
+            events.append(('solution', point))
+
+    finished = current.get('status') not in _ACTIVE_STATES
+    stable = _stable_fields(current)
+    if finished or stable != _stable_fields(previous):
+        payload = dict(stable)
+        if 'elapsedSeconds' in current:
+            payload['elapsedSeconds'] = current['elapsedSeconds']
+        events.append(('done' if finished else 'progress', payload))
+    return events
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _poll_job(db, job_id: str, last_raw: Optional[tuple]):
+    """
+    One poll of the job row (runs in the threadpool).
+
+    Returns None for an unknown job, otherwise (row, payload) where payload is
+    None when the row did not change since ``last_raw``.
+    """
+    with db.connection() as conn:
+        job = conn.execute(
+            "SELECT status, message, started_at, result_json FROM PlanningJobs WHERE id=?",
+            (job_id,),
+        ).fetchone()
+    if job is None:
+        return None
+    raw = tuple(job)
+    # The queue position moves without the row changing.
+    if raw == last_raw and job['status'] != 'queued':
+        return raw, None
+    return raw, job_status_payload(db, job_id, job)
+
+
+async def stream_job_events(
+    db,
+    job_id: str,
+    poll_interval: float = STREAM_POLL_INTERVAL_SECONDS,
+    keepalive_seconds: float = STREAM_KEEPALIVE_SECONDS,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield SSE messages for ``job_id`` until the job finished or the client left.
+
+    A reconnecting client gets the current state again (including all stored
+    convergence points), so the UI can rebuild its view from any event.
+    ``is_disconnected`` (e.g. Request.is_disconnected) is checked before
+    every poll.
+    """
+    yield f"retry: {STREAM_RETRY_MILLISECONDS}\n\n"
+    previous: Optional[Dict[str, Any]] = None
+    last_raw = None
+    last_sent = time.monotonic()
+    while True:
+        if is_disconnected is not None and await is_disconnected():
+            return
+        polled = await run_in_threadpool(_poll_job, db, job_id, last_raw)
+        if polled is None:
+            yield format_sse('done', {'status': 'error', 'message': 'Job not found'})
+            return
+
+        last_raw, current = polled
+        if current is not None:
+            for event, data in job_events(previous, current):
+                yield format_sse(event, data)
+                last_sent = time.monotonic()
+                if event == 'done':
+                    return
+            previous = current
+
+        if time.monotonic() - last_sent >= keepalive_seconds:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(poll_interval)
@@ -1,10 +1,37 @@
-"""Persistence helpers for asynchronous planning jobs."""
+"""
+Persistence helpers for asynchronous planning jobs.
 
+PlanningJobs doubles as a persistent job queue shared by all processes on
+the database:
+
+    queued --claim_next_job()--> running --update_job()--> success | error | cancelled
+
+A worker claims a job with a lease (lease_owner, lease_expires_at) and keeps
+renewing it while the job runs.  When a worker dies its lease runs out and
+the next claim puts the job back into the queue (at most MAX_JOB_ATTEMPTS
+claims).  Queue order is priority (higher first), then FIFO.
+"""
+
+import json
+import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from .ops_metrics import increment
 
+logger = logging.getLogger(__name__)
+
+# Minimum delay between two progress writes of one job.
+PROGRESS_WRITE_INTERVAL_SECONDS = 0.5
+
+# A claimed job must be renewed within this time or it counts as abandoned.
+JOB_LEASE_SECONDS = 60
+# Claims per job before an abandoned job is failed instead of re-queued.
+MAX_JOB_ATTEMPTS = 3
+
+FINISHED_JOB_STATES = ("completed", "error", "cancelled", "success")
+
 
 def cleanup_old_jobs(db) -> None:
     """Remove finished jobs older than 24 hours."""
@@ -37,7 +64,7 @@ def update_job(
     message: Optional[str] = None,
     result_json: Optional[str] = None,
 ) -> None:
-    finished_at = datetime.utcnow().isoformat() if status in ("completed", "error", "cancelled", "success") else None
+    finished_at = datetime.utcnow().isoformat() if status in FINISHED_JOB_STATES else None
     with db.connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT status FROM PlanningJobs WHERE id=?", (job_id,))
@@ -47,6 +74,11 @@ def update_job(
             "UPDATE PlanningJobs SET status=?, message=?, finished_at=? WHERE id=?",
             (status, message, finished_at, job_id),
         )
+        if finished_at is not None:
+            conn.execute(
+                "UPDATE PlanningJobs SET lease_owner=NULL, lease_expires_at=NULL WHERE id=?",
+                (job_id,),
+            )
         if result_json is not None:
             conn.execute("UPDATE PlanningJobs SET result_json=? WHERE id=?", (result_json, job_id))
         conn.commit()
@@ -60,8 +92,263 @@ def update_job(
             increment('planning_jobs_cancelled')
 
 
+def enqueue_job(db, job_id: str, kind: str, params: Dict[str, Any], priority: int = 0) -> None:
+    """
+    Append a job to the queue.
+
+    Args:
+        job_id: New job id
+        kind: Job type understood by the workers ('plan', 'repair')
+        params: JSON-serialisable job arguments
+        priority: Higher values are claimed first; equal priorities run FIFO
+    """
+    cleanup_old_jobs(db)
+    with db.connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO PlanningJobs (id, status, message, kind, params_json, priority, queued_at)
+            VALUES (?, 'queued', 'Wartet auf freien Planungsplatz…', ?, ?, ?, ?)
+            """,
+            (job_id, kind, json.dumps(params), priority, datetime.utcnow().isoformat()),
+        )
+        conn.commit()
+    increment('planning_jobs_queued')
+
+
+def find_queued_job(db, kind: str, params: Dict[str, Any]) -> Optional[str]:
+    """
+    Id of a queued job of ``kind`` with the same parameters, or None.
+
+    A queued job has not read its input yet, so a new identical request can
+    share it: both get the plan of the data at the time the job runs.
+    """
+    with db.connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, params_json FROM PlanningJobs
+            WHERE status='queued' AND kind=?
+            ORDER BY priority DESC, queued_at, rowid
+            """,
+            (kind,),
+        ).fetchall()
+    for row in rows:
+        try:
+            if json.loads(row['params_json'] or 'null') == params:
+                return row['id']
+        except ValueError:
+            continue
+    return None
+
+
+def claim_next_job(db, worker_id: str, max_running: int, lease_seconds: int = JOB_LEASE_SECONDS):
+    """
+    Atomically move the next queued job to 'running' for ``worker_id``.
+
+    Runs in one IMMEDIATE transaction so concurrent workers (threads or
+    processes) never claim the same job.  Running jobs with an expired lease
+    are re-queued first (or failed after MAX_JOB_ATTEMPTS claims).  Nothing is
+    claimed while ``max_running`` jobs are running on the database.
+
+    Returns:
+        The claimed PlanningJobs row, or None
+    """
+    now = datetime.utcnow()
+    now_iso = now.isoformat()
+    expires = (now + timedelta(seconds=lease_seconds)).isoformat()
+    with db.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            abandoned = conn.execute(
+                "SELECT id, attempts FROM PlanningJobs WHERE status='running' AND lease_expires_at < ?",
+                (now_iso,),
+            ).fetchall()
+            for job in abandoned:
+                logger.warning("Lease of planning job %s expired (attempt %s)", job['id'], job['attempts'])
+                if job['attempts'] >= MAX_JOB_ATTEMPTS:
+                    conn.execute(
+                        """
+                        UPDATE PlanningJobs
+                        SET status='error', finished_at=?, lease_owner=NULL, lease_expires_at=NULL,
+                            message='Planungsjob wurde wiederholt unterbrochen und abgebrochen.'
+                        WHERE id=?
+                        """,
+                        (now_iso, job['id']),
+                    )
+                    increment('planning_jobs_error')
+                else:
+                    conn.execute(
+                        """
+                        UPDATE PlanningJobs
+                        SET status='queued', lease_owner=NULL, lease_expires_at=NULL,
+                            message='Planungsprozess wurde unterbrochen – Job wartet erneut.'
+                        WHERE id=?
+                        """,
+                        (job['id'],),
+                    )
+
+            running = conn.execute("SELECT COUNT(*) FROM PlanningJobs WHERE status='running'").fetchone()[0]
+            job = None
+            if running < max_running:
+                job = conn.execute(
+                    """
+                    SELECT id FROM PlanningJobs WHERE status='queued'
+                    ORDER BY priority DESC, queued_at, rowid
+                    LIMIT 1
+                    """
+                ).fetchone()
+            if job is not None:
+                conn.execute(
+                    """
+                    UPDATE PlanningJobs
+                    SET status='running', message='Planung wird gestartet…', started_at=?,
+                        lease_owner=?, lease_expires_at=?, attempts=attempts + 1
+                    WHERE id=?
+                    """,
+                    (now_iso, worker_id, expires, job['id']),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    if job is None:
+        return None
+    increment('planning_jobs_started')
+    return get_job(db, job['id'])
+
+
+def renew_job_lease(db, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+    """Extend the lease of a running job; False if the worker no longer owns it."""
+    expires = (datetime.utcnow() + timedelta(seconds=lease_seconds)).isoformat()
+    with db.connection() as conn:
+        cursor = conn.execute(
+            "UPDATE PlanningJobs SET lease_expires_at=? WHERE id=? AND lease_owner=? AND status='running'",
+            (expires, job_id, worker_id),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+
+
+def get_queue_position(db, job_id: str) -> Optional[int]:
+    """1-based position of a queued job (None if the job is not queued)."""
+    with db.connection() as conn:
+        row = conn.execute(
+            """
+            SELECT COUNT(*) FROM PlanningJobs q, PlanningJobs j
+            WHERE j.id = ? AND j.status = 'queued' AND q.status = 'queued'
+              AND (q.priority > j.priority
+                   OR (q.priority = j.priority
+                       AND (q.queued_at < j.queued_at
+                            OR (q.queued_at = j.queued_at AND q.rowid <= j.rowid))))
+            """,
+            (job_id,),
+        ).fetchone()
+    return row[0] or None
+
+
+def write_job_progress(db, job_id: str, message: Optional[str], result_json: Optional[str]) -> None:
+    """
+    Store the progress of a running job with a single UPDATE.
+
+    Unlike update_job() this never changes the status and does not touch jobs
+    that already finished or were cancelled.
+    """
+    with db.connection() as conn:
+        conn.execute(
+            "UPDATE PlanningJobs SET message=?, result_json=? WHERE id=? AND finished_at IS NULL",
+            (message, result_json, job_id),
+        )
+        conn.commit()
+
+
+class JobProgressSink:
+    """
+    Coalescing, throttled writer for the progress of one running job.
+
+    push() only updates an in-memory snapshot and wakes a background thread,
+    so it is safe to call from the CP-SAT solution callback.  The thread writes
+    the latest snapshot at most every ``interval_seconds``; events arriving in
+    between are merged and only the newest state reaches PlanningJobs.
+
+    close() writes whatever is still pending and stops the thread.  Final
+    status changes (success/error) go through update_job() after close().
+    """
+
+    def __init__(self, db, job_id: str, interval_seconds: float = PROGRESS_WRITE_INTERVAL_SECONDS):
+        self._db = db
+        self._job_id = job_id
+        self._interval = interval_seconds
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._message: Optional[str] = None
+        self._data: Dict[str, Any] = {}
+        self._dirty = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"planning-progress-{job_id}", daemon=True
+        )
+        self._thread.start()
+
+    def push(self, message: str, data: Optional[Dict[str, Any]] = None, merge: bool = False) -> None:
+        """
+        Record new progress.
+
+        By default ``data`` replaces the previous result_json snapshot;
+        with ``merge=True`` its keys are merged into it.
+        """
+        with self._lock:
+            if merge:
+                self._data.update(data or {})
+            else:
+                self._data = dict(data or {})
+            self._message = message
+            self._dirty = True
+        self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            if not self._dirty:
+                return None
+            self._dirty = False
+            return self._message, (json.dumps(self._data) if self._data else None)
+
+    def _write_pending(self) -> None:
+        pending = self._take()
+        if pending is None:
+            return
+        try:
+            write_job_progress(self._db, self._job_id, *pending)
+        except Exception:
+            # Progress is informational - never let a locked database kill the job.
+            logger.warning("Could not store progress of planning job %s", self._job_id, exc_info=True)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            if self._closing.is_set():
+                return
+            self._wake.clear()
+            self._write_pending()
+            # Throttle: sleep out the interval unless close() interrupts it.
+            self._closing.wait(self._interval)
+
+    def close(self) -> None:
+        """Write pending progress and stop the writer thread (idempotent)."""
+        if not self._closing.is_set():
+            self._closing.set()
+            self._wake.set()
+            self._thread.join()
+        self._write_pending()
+
+
 def get_job(db, job_id: str):
     with db.connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM PlanningJobs WHERE id=?", (job_id,))
         return cursor.fetchone()
+
+
+def is_job_cancelled(db, job_id: str) -> bool:
+    """Cheap status check polled by running jobs (see solve_shift_planning(should_stop=...))."""
+    with db.connection() as conn:
+        row = conn.execute("SELECT status FROM PlanningJobs WHERE id=?", (job_id,)).fetchone()
+    return row is not None and row['status'] == 'cancelled'
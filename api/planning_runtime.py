@@ -11,11 +11,36 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass(frozen=True)
 class PlanningRuntimeConfig:
     cpu_count: int
     max_concurrent_jobs: int
     solver_workers_per_job: int
+    # Race solver stages 1-3 concurrently instead of running the fallbacks sequentially.
+    parallel_stages: bool = False
+    # Stage 1 as large-neighbourhood search (ShiftPlanningSolver.solve_lns()).
+    lns: bool = False
+    # Solve rotation groups in parallel processes plus a coordinating solve
+    # (decomposed_solver.solve_decomposed()); for large multi-group sites.
+    decompose: bool = False
+    # Reuse the stored result of a month whose solver input did not change
+    # (api/planning_cache.py) and let identical running jobs share one solve.
+    result_cache: bool = True
+    # Conflict-core check before Stage 1 (ShiftPlanningSolver.find_infeasibility_core());
+    # skips the stages it proves infeasible.
+    core_check: bool = False
+    # Per-stage CP-SAT time cap for repair runs (POST /api/shifts/plan/repair).
+    repair_time_limit_seconds: int = 30
+    # Web processes run queued planning jobs themselves (see api/planning_worker.py);
+    # disable when dedicated `main.py worker` processes drain the queue.
+    embedded_planning_worker: bool = True
 
 
 def load_planning_runtime_config() -> PlanningRuntimeConfig:
@@ -40,8 +65,22 @@ def load_planning_runtime_config() -> PlanningRuntimeConfig:
         ),
     )
     solver_workers_per_job = min(solver_workers_per_job, cpu_count)
+    parallel_stages = _env_bool("DIENSTPLAN_PARALLEL_STAGES", False)
+    lns = _env_bool("DIENSTPLAN_LNS", False)
+    decompose = _env_bool("DIENSTPLAN_DECOMPOSE", False)
+    result_cache = _env_bool("DIENSTPLAN_RESULT_CACHE", True)
+    core_check = _env_bool("DIENSTPLAN_CORE_CHECK", False)
+    repair_time_limit_seconds = max(1, _env_int("DIENSTPLAN_REPAIR_TIME_LIMIT_SECONDS", 30))
+    embedded_planning_worker = _env_bool("DIENSTPLAN_EMBEDDED_PLANNING_WORKER", True)
     return PlanningRuntimeConfig(
         cpu_count=cpu_count,
         max_concurrent_jobs=max_concurrent_jobs,
         solver_workers_per_job=solver_workers_per_job,
+        parallel_stages=parallel_stages,
+        lns=lns,
+        decompose=decompose,
+        result_cache=result_cache,
+        core_check=core_check,
+        repair_time_limit_seconds=repair_time_limit_seconds,
+        embedded_planning_worker=embedded_planning_worker,
     )
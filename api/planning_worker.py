@@ -0,0 +1,264 @@
+"""
+Dispatcher that drains the PlanningJobs queue into the solver process pool.
+
+Every process running a PlanningWorker competes for queued jobs through
+claim_next_job() (see planning_job_store.py), so any number of web workers
+and separate planner processes (``python main.py worker``) can share one
+database.  MAX_CONCURRENT_JOBS limits the running jobs of the whole
+database, not of a single process.
+
+By default each web process runs an embedded worker; set
+DIENSTPLAN_EMBEDDED_PLANNING_WORKER=false when dedicated planner processes
+should run all jobs.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .planning_job_store import (
+    JOB_LEASE_SECONDS,
+    claim_next_job,
+    get_job,
+    renew_job_lease,
+    update_job,
+)
+from .shared import Database
+
+logger = logging.getLogger(__name__)
+
+# Fallback polling for jobs queued by other processes (own jobs wake the worker).
+POLL_INTERVAL_SECONDS = 1.0
+# Longest wait between rounds after repeated failures (the wait doubles per failure).
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def _schema_missing(exc: Exception) -> bool:
+    """True if ``exc`` means the database has no PlanningJobs table (file removed or replaced)."""
+    return isinstance(exc, sqlite3.OperationalError) and 'no such table' in str(exc)
+
+
+def _job_call(job) -> Tuple[Callable[..., Any], tuple]:
+    """Worker function and arguments (without job id and db path) of a queued job."""
+    from .shifts_planning_core import _run_batch_planning_job, _run_planning_job, _run_repair_job
+
+    params = json.loads(job['params_json'] or '{}')
+    if job['kind'] == 'plan':
+        return _run_planning_job, (
+            date.fromisoformat(params['startDate']),
+            date.fromisoformat(params['endDate']),
+            bool(params.get('force')),
+        )
+    if job['kind'] == 'batch':
+        return _run_batch_planning_job, (
+            date.fromisoformat(params['startDate']),
+            int(params['months']),
+            bool(params.get('force')),
+            int(params.get('lookaheadWeeks') or 0),
+        )
+    if job['kind'] == 'repair':
+        return _run_repair_job, (
+            date.fromisoformat(params['startDate']),
+            date.fromisoformat(params['endDate']),
+            int(params['windowDays']),
+            [int(emp_id) for emp_id in params.get('employeeIds') or []],
+        )
+    raise ValueError(f"Unknown planning job kind {job['kind']!r}")
+
+
+class PlanningWorker:
+    """
+    Claims queued planning jobs and runs them in ``executor``.
+
+    A background thread loops over run_once(): reap finished futures, renew
+    the leases of running jobs and claim new jobs while fewer than
+    ``max_jobs`` of this worker are running.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        executor: Executor,
+        max_jobs: int,
+        lease_seconds: int = JOB_LEASE_SECONDS,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+    ):
+        self.db_path = db_path
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._db = Database(db_path)
+        self._executor = executor
+        self._max_jobs = max_jobs
+        self._lease_seconds = lease_seconds
+        self._poll_interval = poll_interval
+        self._futures: Dict[str, Future] = {}
+        self._leases_renewed_at = 0.0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="planning-worker", daemon=True)
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self) -> None:
+        """Look for new jobs now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs (running jobs are not interrupted)."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> int:
+        """One dispatch round; returns the number of jobs started."""
+        self._reap()
+        self._renew_leases()
+        started = 0
+        while len(self._futures) < self._max_jobs and not self._stopping.is_set():
+            job = claim_next_job(self._db, self.worker_id, self._max_jobs, self._lease_seconds)
+            if job is None:
+                break
+            self._submit(job)
+            started += 1
+        return started
+
+    def _submit(self, job) -> None:
+        try:
+            worker, args = _job_call(job)
+            future = self._executor.submit(worker, job['id'], *args, self.db_path)
+        except Exception as exc:
+            logger.exception("Could not start planning job %s", job['id'])
+            update_job(self._db, job['id'], 'error', 'Planungsjob konnte nicht gestartet werden',
+                       json.dumps({'details': str(exc)}))
+            return
+        self._futures[job['id']] = future
+        future.add_done_callback(lambda _future: self._wake.set())
+
+    def _reap(self) -> None:
+        """Forget finished futures; fail jobs whose process ended without a final status."""
+        for job_id, future in list(self._futures.items()):
+            if not future.done():
+                continue
+            del self._futures[job_id]
+            exc = future.exception()
+            row = get_job(self._db, job_id)
+            if row is not None and row['finished_at'] is None:
+                if exc is not None:
+                    logger.error("Planning job %s crashed: %s", job_id, exc)
+                details = str(exc) if exc is not None else 'Der Planungsprozess hat kein Ergebnis gemeldet.'
+                update_job(self._db, job_id, 'error', 'Planungsjob fehlgeschlagen',
+                           json.dumps({'details': details}))
+
+    def _renew_leases(self) -> None:
+        now = time.monotonic()
+        if not self._futures or now - self._leases_renewed_at < self._lease_seconds / 3:
+            return
+        self._leases_renewed_at = now
+        for job_id in self._futures:
+            if renew_job_lease(self._db, job_id, self.worker_id, self._lease_seconds):
+                continue
+            row = get_job(self._db, job_id)
+            if row is not None and row['status'] == 'running':
+                logger.warning("Planning job %s is now leased by %s", job_id, row['lease_owner'])
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stopping.is_set():
+            if not self._futures and not os.path.exists(self.db_path):
+                logger.info("Database %s no longer exists, stopping planning worker", self.db_path)
+                return
+            try:
+                self.run_once()
+                failures = 0
+            except Exception as exc:
+                if _schema_missing(exc):
+                    # Reconnecting recreated the removed file empty; it will never hold jobs again.
+                    logger.warning("Database %s has no planning job queue (%s), stopping planning worker",
+                                   self.db_path, exc)
+                    return
+                failures += 1
+                if failures == 1:
+                    logger.exception("Planning worker round failed")
+                else:
+                    logger.warning("Planning worker round failed again (%s in a row): %s", failures, exc)
+            self._wake.wait(min(self._poll_interval * 2 ** failures, MAX_BACKOFF_SECONDS))
+            self._wake.clear()
+
+
+_embedded_workers: Dict[str, PlanningWorker] = {}
+_embedded_lock = threading.Lock()
+
+
+def ensure_planning_worker(db_path: str) -> Optional[PlanningWorker]:
+    """
+    Start the embedded worker of this process for ``db_path`` (once).
+
+    Returns None when embedded workers are disabled.
+    """
+    from .shifts_planning_pool import EMBEDDED_PLANNING_WORKER, MAX_CONCURRENT_JOBS, _solver_pool
+
+    if not EMBEDDED_PLANNING_WORKER:
+        return None
+    with _embedded_lock:
+        worker = _embedded_workers.get(db_path)
+        if worker is None or not worker.is_alive():
+            worker = PlanningWorker(db_path, _solver_pool, MAX_CONCURRENT_JOBS)
+            worker.start()
+            _embedded_workers[db_path] = worker
+    return worker
+
+
+def stop_planning_workers(timeout: Optional[float] = None) -> None:
+    """Stop every embedded worker of this process (tests, shutdown)."""
+    with _embedded_lock:
+        workers = list(_embedded_workers.values())
+        _embedded_workers.clear()
+    for worker in workers:
+        worker.stop(timeout)
+
+
+def resume_queued_jobs(db: Database) -> None:
+    """Start the embedded worker at startup if jobs are waiting in the queue."""
+    try:
+        with db.connection() as conn:
+            waiting = conn.execute(
+                "SELECT COUNT(*) FROM PlanningJobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+    except Exception:
+        logger.warning("Could not check the planning job queue of %s", db.db_path, exc_info=True)
+        return
+    if waiting:
+        logger.info("%s planning job(s) waiting in %s", waiting, db.db_path)
+        ensure_planning_worker(db.db_path)
+
+
+def run_planning_worker(db_path: str) -> None:
+    """Run a dedicated planner process until interrupted (python main.py worker)."""
+    from .shifts_planning_pool import MAX_CONCURRENT_JOBS, _solver_pool
+
+    worker = PlanningWorker(db_path, _solver_pool, MAX_CONCURRENT_JOBS)
+    logger.info("Planning worker %s started for %s (max. %s jobs)", worker.worker_id, db_path, MAX_CONCURRENT_JOBS)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(1.0)
+    except KeyboardInterrupt:
+        logger.info("Planning worker %s stopping", worker.worker_id)
+        worker.stop()
@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 DEFAULT_COMPANY_NAME = 'Fritz Winter Eisengießerei GmbH & Co. KG'
 DEFAULT_HEADER_LOGO_URL = '/images/fw-logo-white.svg'
+# Allowed ranges of the solver early-stop settings (None/empty = criterion off)
+SOLVER_GAP_LIMIT_PERCENT_RANGE = (0.1, 50.0)
+SOLVER_PLATEAU_SECONDS_RANGE = (10, 3600)
 
 
 def _ensure_app_settings_table(cursor) -> None:
@@ -38,6 +41,40 @@ def _get_app_setting(cursor, key: str, fallback: str) -> str:
     return fallback
 
 
+def _parse_solver_early_stop(data: dict, existing) -> tuple:
+    """
+    Read solverGapLimitPercent / solverPlateauSeconds from a settings payload.
+
+    Missing keys keep the ``existing`` GlobalSettings values; null or '' turns a
+    criterion off.
+
+    Returns:
+        (gap_limit_percent, plateau_seconds, error_message)
+    """
+    def _current(column):
+        return existing[column] if existing is not None and column in existing.keys() else None
+
+    gap = _current('SolverGapLimitPercent')
+    plateau = _current('SolverPlateauSeconds')
+    try:
+        if 'solverGapLimitPercent' in data:
+            raw = data['solverGapLimitPercent']
+            gap = float(raw) if raw not in (None, '') else None
+        if 'solverPlateauSeconds' in data:
+            raw = data['solverPlateauSeconds']
+            plateau = int(raw) if raw not in (None, '') else None
+    except (TypeError, ValueError):
+        return None, None, 'Ungültiger Wert für das vorzeitige Beenden der Optimierung'
+
+    low, high = SOLVER_GAP_LIMIT_PERCENT_RANGE
+    if gap is not None and not low <= gap <= high:
+        return None, None, f'Optimalitätslücke muss zwischen {low} und {high} % liegen'
+    low, high = SOLVER_PLATEAU_SECONDS_RANGE
+    if plateau is not None and not low <= plateau <= high:
+        return None, None, f'Zeit ohne Verbesserung muss zwischen {low} und {high} Sekunden liegen'
+    return gap, plateau, None
+
+
 def _upsert_app_setting(cursor, key: str, value: str, modified_by: str) -> None:
     cursor.execute("""
         INSERT INTO AppSettings (Key, Value, ModifiedAt, ModifiedBy)
@@ -66,13 +103,17 @@ def get_global_settings(request: Request):
             return {
                 'maxConsecutiveShifts': 6,
                 'maxConsecutiveNightShifts': 3,
-                'minRestHoursBetweenShifts': 11
+                'minRestHoursBetweenShifts': 11,
+                'solverGapLimitPercent': None,
+                'solverPlateauSeconds': None,
             }
         
         return {
             'maxConsecutiveShifts': row['MaxConsecutiveShifts'],
             'maxConsecutiveNightShifts': row['MaxConsecutiveNightShifts'],
             'minRestHoursBetweenShifts': row['MinRestHoursBetweenShifts'],
+            'solverGapLimitPercent': row['SolverGapLimitPercent'],
+            'solverPlateauSeconds': row['SolverPlateauSeconds'],
             'modifiedAt': row['ModifiedAt'],
             'modifiedBy': row['ModifiedBy']
         }
@@ -102,7 +143,7 @@ def update_global_settings(request: Request, data: dict = Depends(parse_json_bod
             cursor = conn.cursor()
 
             # Load existing values for deprecated fields
-            cursor.execute("SELECT MaxConsecutiveShifts, MaxConsecutiveNightShifts FROM GlobalSettings WHERE Id = 1")
+            cursor.execute("SELECT * FROM GlobalSettings WHERE Id = 1")
             existing = cursor.fetchone()
 
             # Use existing values for deprecated fields, or defaults if not found
@@ -116,25 +157,39 @@ def update_global_settings(request: Request, data: dict = Depends(parse_json_bod
             if min_rest_hours < 8 or min_rest_hours > 24:
                 return JSONResponse(content={'error': 'Mindest-Ruhezeit muss zwischen 8 und 24 Stunden liegen'}, status_code=400)
 
+            # Early-stop policy of the solver (see solver.EarlyStopPolicy)
+            gap_limit_percent, plateau_seconds, error = _parse_solver_early_stop(data, existing)
+            if error:
+                return JSONResponse(content={'error': error}, status_code=400)
+
             # Update or insert settings (keeping deprecated fields as-is)
             cursor.execute("""
                 INSERT INTO GlobalSettings
-                (Id, MaxConsecutiveShifts, MaxConsecutiveNightShifts, MinRestHoursBetweenShifts, ModifiedAt, ModifiedBy)
-                VALUES (1, ?, ?, ?, ?, ?)
+                (Id, MaxConsecutiveShifts, MaxConsecutiveNightShifts, MinRestHoursBetweenShifts,
+                 SolverGapLimitPercent, SolverPlateauSeconds, ModifiedAt, ModifiedBy)
+                VALUES (1, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(Id) DO UPDATE SET
                     MinRestHoursBetweenShifts = excluded.MinRestHoursBetweenShifts,
+                    SolverGapLimitPercent = excluded.SolverGapLimitPercent,
+                    SolverPlateauSeconds = excluded.SolverPlateauSeconds,
                     ModifiedAt = excluded.ModifiedAt,
                     ModifiedBy = excluded.ModifiedBy
             """, (
                 max_consecutive_shifts,
                 max_consecutive_night_shifts,
                 min_rest_hours,
+                gap_limit_percent,
+                plateau_seconds,
                 datetime.utcnow().isoformat(),
                 request.session.get('user_email', 'system')
             ))
 
             # Log audit entry
-            changes = json.dumps({'minRestHoursBetweenShifts': min_rest_hours}, ensure_ascii=False)
+            changes = json.dumps({
+                'minRestHoursBetweenShifts': min_rest_hours,
+                'solverGapLimitPercent': gap_limit_percent,
+                'solverPlateauSeconds': plateau_seconds,
+            }, ensure_ascii=False)
             log_audit(conn, 'GlobalSettings', 1, 'Updated', changes,
                       user_id=request.session.get('user_id'), user_name=request.session.get('user_email'))
 
@@ -572,6 +627,8 @@ def export_shift_settings(request: Request):
             'maxConsecutiveShifts': gs_row['MaxConsecutiveShifts'] if gs_row else 6,
             'maxConsecutiveNightShifts': gs_row['MaxConsecutiveNightShifts'] if gs_row else 3,
             'minRestHoursBetweenShifts': gs_row['MinRestHoursBetweenShifts'] if gs_row else 11,
+            'solverGapLimitPercent': gs_row['SolverGapLimitPercent'] if gs_row else None,
+            'solverPlateauSeconds': gs_row['SolverPlateauSeconds'] if gs_row else None,
         }
 
         conn.close()
@@ -806,19 +863,28 @@ async def import_shift_settings(request: Request, file: UploadFile = File(...)):
                 min_rest = global_settings.get('minRestHoursBetweenShifts', 11)
                 max_consec = global_settings.get('maxConsecutiveShifts', 6)
                 max_consec_night = global_settings.get('maxConsecutiveNightShifts', 3)
+                # Exports from before the early-stop settings keep the current values.
+                cursor.execute("SELECT * FROM GlobalSettings WHERE Id = 1")
+                gap_limit, plateau, error = _parse_solver_early_stop(global_settings, cursor.fetchone())
+                if error:
+                    raise ValueError(error)
 
                 cursor.execute("""
                     INSERT INTO GlobalSettings
                         (Id, MaxConsecutiveShifts, MaxConsecutiveNightShifts,
-                         MinRestHoursBetweenShifts, ModifiedAt, ModifiedBy)
-                    VALUES (1, ?, ?, ?, ?, ?)
+                         MinRestHoursBetweenShifts, SolverGapLimitPercent, SolverPlateauSeconds,
+                         ModifiedAt, ModifiedBy)
+                    VALUES (1, ?, ?, ?, ?, ?, ?, ?)
                     ON CONFLICT(Id) DO UPDATE SET
                         MaxConsecutiveShifts = excluded.MaxConsecutiveShifts,
                         MaxConsecutiveNightShifts = excluded.MaxConsecutiveNightShifts,
                         MinRestHoursBetweenShifts = excluded.MinRestHoursBetweenShifts,
+                        SolverGapLimitPercent = excluded.SolverGapLimitPercent,
+                        SolverPlateauSeconds = excluded.SolverPlateauSeconds,
                         ModifiedAt = excluded.ModifiedAt,
                         ModifiedBy = excluded.ModifiedBy
-                """, (max_consec, max_consec_night, min_rest, datetime.utcnow().isoformat(), user))
+                """, (max_consec, max_consec_night, min_rest, gap_limit, plateau,
+                      datetime.utcnow().isoformat(), user))
 
             except Exception as e:
                 result['errors'].append(f"Allgemeine Einstellungen: {e}")
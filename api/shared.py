@@ -21,6 +21,19 @@ from fastapi.responses import JSONResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from db_pool import (  # noqa: F401 - pool API re-exported for API modules
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE,
+    DB_CACHED_STATEMENTS,
+    DB_JOURNAL_MODE,
+    DB_MMAP_SIZE,
+    DB_POOL_SIZE,
+    PooledConnection,
+    SQLiteConnectionPool,
+    close_connection_pools,
+    get_connection,
+)
+
 logger = logging.getLogger(__name__)
 
 # Module-level rate limiter – attached to app in create_app()
@@ -77,24 +90,19 @@ def get_row_value(row: sqlite3.Row, key: str, default):
 
 
 class Database:
-    """Database connection helper"""
+    """Database connection helper (connections come from a per-process pool)"""
     
     def __init__(self, db_path: str):
         self.db_path = db_path
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get a pooled database connection; close() hands it back to the pool"""
+        return get_connection(self.db_path)
 
     @contextmanager
     def connection(self):
         """Context manager for database connection - auto-closes on exit."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row
+        conn = self.get_connection()
         try:
             yield conn
         finally:
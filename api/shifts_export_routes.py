@@ -2,8 +2,7 @@
 
 import io
 import logging
-from datetime import date, datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, Response
@@ -89,8 +88,11 @@ def _get_shift_color(shift_code: str) -> tuple:
 def _group_data_by_team_and_employee(conn, start_date: date, end_date: date, view_type: str = 'week'):
     """
     Group shift assignments by team and employee, mirroring the UI's groupByTeamAndEmployee logic.
-    Returns: (team_groups, dates, absences_by_employee)
+    Returns: (team_groups, dates, schedule) where schedule is a ScheduleMatrix
+    with the absences as overlay and its rows in the order of team_groups.
     """
+    from schedule_matrix import ScheduleMatrix
+
     cursor = conn.cursor()
     
     # Get all employees with their team info and special functions
@@ -106,7 +108,7 @@ def _group_data_by_team_and_employee(conn, start_date: date, end_date: date, vie
     
     # Get all shift assignments in the date range
     cursor.execute("""
-        SELECT sa.Date, sa.EmployeeId, st.Code, st.Name as ShiftName, st.ColorCode
+        SELECT sa.Date, sa.EmployeeId, sa.ShiftTypeId, st.Code
         FROM ShiftAssignments sa
         JOIN ShiftTypes st ON sa.ShiftTypeId = st.Id
         WHERE sa.Date >= ? AND sa.Date <= ?
@@ -117,10 +119,8 @@ def _group_data_by_team_and_employee(conn, start_date: date, end_date: date, vie
     cursor.execute("""
         SELECT a.EmployeeId, a.StartDate, a.EndDate, a.Type, a.Notes
         FROM Absences a
-        WHERE (a.StartDate <= ? AND a.EndDate >= ?)
-           OR (a.StartDate >= ? AND a.StartDate <= ?)
-    """, (end_date.isoformat(), start_date.isoformat(), 
-          start_date.isoformat(), end_date.isoformat()))
+        WHERE a.StartDate <= ? AND a.EndDate >= ?
+    """, (end_date.isoformat(), start_date.isoformat()))
     absences = cursor.fetchall()
     
     # Generate date range
@@ -130,22 +130,6 @@ def _group_data_by_team_and_employee(conn, start_date: date, end_date: date, vie
         dates.append(current.isoformat())
         current += timedelta(days=1)
     
-    # Build absences lookup
-    absences_by_employee = {}
-    for absence in absences:
-        emp_id = absence['EmployeeId']
-        if emp_id not in absences_by_employee:
-            absences_by_employee[emp_id] = []
-        absences_by_employee[emp_id].append(absence)
-    
-    # Build assignments lookup
-    assignments_by_emp_date = {}
-    for assignment in assignments:
-        key = (assignment['EmployeeId'], assignment['Date'])
-        if key not in assignments_by_emp_date:
-            assignments_by_emp_date[key] = []
-        assignments_by_emp_date[key].append(assignment)
-    
     # Group by team
     UNASSIGNED_TEAM_ID = -1
     
@@ -170,17 +154,8 @@ def _group_data_by_team_and_employee(conn, start_date: date, end_date: date, vie
         teams[team_id]['employees'][emp['Id']] = {
             'id': emp['Id'],
             'name': emp_name,
-            'shifts': {}
         }
     
-    # Populate shifts for each employee
-    for team in teams.values():
-        for emp_id, emp_data in team['employees'].items():
-            for date_str in dates:
-                key = (emp_id, date_str)
-                shifts = assignments_by_emp_date.get(key, [])
-                emp_data['shifts'][date_str] = shifts
-    
     # Sort teams (regular -> Ohne Team)
     sorted_teams = []
     for team_id in sorted(teams.keys()):
@@ -198,18 +173,23 @@ def _group_data_by_team_and_employee(conn, start_date: date, end_date: date, vie
             key=lambda x: x[1]['name']
         ))
     
-    return sorted_teams, dates, absences_by_employee
-
-
-def _get_absence_for_date(absences: list, date_str: str) -> Optional[dict]:
-    """Check if an employee has an absence on a specific date"""
-    target_date = date.fromisoformat(date_str)
+    # One matrix row per employee in display order, absences as overlay
+    schedule = ScheduleMatrix.from_rows(
+        assignments,
+        [emp_id for team in sorted_teams for emp_id in team['employees']],
+        start_date,
+        end_date,
+        team_of={emp_id: team['teamId'] for team in sorted_teams for emp_id in team['employees']},
+    )
     for absence in absences:
-        start = date.fromisoformat(absence['StartDate'])
-        end = date.fromisoformat(absence['EndDate'])
-        if start <= target_date <= end:
-            return absence
-    return None
+        schedule.add_absence(
+            absence['EmployeeId'],
+            date.fromisoformat(absence['StartDate']),
+            date.fromisoformat(absence['EndDate']),
+            _get_absence_code(absence['Type']),
+        )
+    
+    return sorted_teams, dates, schedule
 
 
 def _get_absence_code(absence_type: int) -> str:
@@ -238,7 +218,8 @@ def export_schedule_pdf(request: Request):
         conn = db.get_connection()
         
         # Get grouped data matching UI structure
-        team_groups, dates, absences_by_employee = _group_data_by_team_and_employee(conn, start_date, end_date, view_type)
+        team_groups, dates, schedule = _group_data_by_team_and_employee(conn, start_date, end_date, view_type)
+        labels = schedule.cell_labels()
         
         # Create PDF
         import io
@@ -329,24 +310,8 @@ def export_schedule_pdf(request: Request):
             
             # Employee rows
             for emp_id, emp_data in team['employees'].items():
-                emp_row = [f"  - {emp_data['name']}"]
-                
-                for date_str in dates:
-                    # Check for absence first
-                    abs_list = absences_by_employee.get(emp_id, [])
-                    absence = _get_absence_for_date(abs_list, date_str)
-                    
-                    if absence:
-                        absence_code = _get_absence_code(absence['Type'])
-                        emp_row.append(absence_code)
-                    else:
-                        # Get shifts for this date
-                        shifts = emp_data['shifts'].get(date_str, [])
-                        if shifts:
-                            shift_codes = ' '.join([s['Code'] for s in shifts])
-                            emp_row.append(shift_codes)
-                        else:
-                            emp_row.append('-')
+                # Absence code first, then shift codes, '-' for a free day
+                emp_row = [f"  - {emp_data['name']}"] + labels[schedule.row(emp_id)].tolist()
                 
                 table_data.append(emp_row)
         
@@ -454,7 +419,8 @@ def export_schedule_excel(request: Request):
         conn = db.get_connection()
         
         # Get grouped data matching UI structure
-        team_groups, dates, absences_by_employee = _group_data_by_team_and_employee(conn, start_date, end_date, view_type)
+        team_groups, dates, schedule = _group_data_by_team_and_employee(conn, start_date, end_date, view_type)
+        labels = schedule.cell_labels()
         
         # Create workbook
         wb = openpyxl.Workbook()
@@ -527,24 +493,8 @@ def export_schedule_excel(request: Request):
             
             # Employee rows
             for emp_id, emp_data in team['employees'].items():
-                emp_row = [f"  - {emp_data['name']}"]
-                
-                for date_str in dates:
-                    # Check for absence first
-                    abs_list = absences_by_employee.get(emp_id, [])
-                    absence = _get_absence_for_date(abs_list, date_str)
-                    
-                    if absence:
-                        absence_code = _get_absence_code(absence['Type'])
-                        emp_row.append(absence_code)
-                    else:
-                        # Get shifts for this date
-                        shifts = emp_data['shifts'].get(date_str, [])
-                        if shifts:
-                            shift_codes = ' '.join([s['Code'] for s in shifts])
-                            emp_row.append(shift_codes)
-                        else:
-                            emp_row.append('-')
+                # Absence code first, then shift codes, '-' for a free day
+                emp_row = [f"  - {emp_data['name']}"] + labels[schedule.row(emp_id)].tolist()
                 
                 ws.append(emp_row)
                 
@@ -1,13 +1,15 @@
 """
 Process pool and worker budget for asynchronous shift planning jobs.
 
-Imported by planning routes and planning core so a single executor is shared.
+Shared by the planning workers of a process (see planning_worker.py), so a
+single executor runs all jobs the process claims from the queue.
 """
 
 import logging
-import threading
 from concurrent.futures import ProcessPoolExecutor
 
+from db_pool import process_context
+
 from .planning_runtime import load_planning_runtime_config
 
 logger = logging.getLogger(__name__)
@@ -15,10 +17,14 @@ logger = logging.getLogger(__name__)
 _runtime_cfg = load_planning_runtime_config()
 MAX_CONCURRENT_JOBS = _runtime_cfg.max_concurrent_jobs
 SOLVER_WORKERS_PER_JOB = _runtime_cfg.solver_workers_per_job
+EMBEDDED_PLANNING_WORKER = _runtime_cfg.embedded_planning_worker
 
-_solver_pool = ProcessPoolExecutor(max_workers=MAX_CONCURRENT_JOBS)
-_active_futures: dict = {}
-_futures_lock = threading.Lock()
+# Jobs are submitted from the planning worker thread while request and progress
+# threads use SQLite, so the pool must not fork (see db_pool.process_context()).
+_solver_pool = ProcessPoolExecutor(
+    max_workers=MAX_CONCURRENT_JOBS,
+    mp_context=process_context(),
+)
 
 logger.info(
     "Planning worker budget configured: cpu=%s, max_jobs=%s, solver_workers_per_job=%s",
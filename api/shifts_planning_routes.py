@@ -1,34 +1,77 @@
 """Async shift planning and plan approval API routes."""
 
-import json
 import logging
 import uuid
 from datetime import date, datetime
 
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from .error_utils import api_error
-from .planning_job_store import create_job, get_job, update_job
+from .planning_job_events import job_status_payload, stream_job_events
+from .planning_job_store import enqueue_job, find_queued_job, get_job, get_queue_position, update_job
+from .planning_runtime import load_planning_runtime_config
+from .planning_worker import ensure_planning_worker
 from .shared import get_db, require_role, validate_monthly_date_range, check_csrf, parse_json_body
-from .shifts_planning_core import _run_planning_job
-from .shifts_planning_pool import (
-    MAX_CONCURRENT_JOBS,
-    _active_futures,
-    _futures_lock,
-    _solver_pool,
-)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Days added on both sides of the changed range in POST /api/shifts/plan/repair
+DEFAULT_REPAIR_WINDOW_DAYS = 7
+MAX_REPAIR_WINDOW_DAYS = 28
+# Longest changed range of a repair; longer changes need a full re-plan
+MAX_REPAIR_RANGE_DAYS = 31
+
+# Limits of POST /api/shifts/plan/batch
+MAX_BATCH_MONTHS = 12
+MAX_BATCH_LOOKAHEAD_WEEKS = 4
+
+# Queue priorities: repairs react to acute changes (sick notes) and are small,
+# so they overtake queued full re-plans.  Batches occupy a planning slot for a
+# long time and queue behind single months.
+PLAN_JOB_PRIORITY = 0
+REPAIR_JOB_PRIORITY = 10
+BATCH_JOB_PRIORITY = -10
+
+# Identical requests share one queued job (see api/planning_cache.py).
+RESULT_CACHE = load_planning_runtime_config().result_cache
+
+
+def _submit_planning_job(kind: str, params: dict, priority: int) -> JSONResponse:
+    """
+    Queue a planning job (see planning_job_store.py) and wake this process's worker.
+
+    Returns 202 with the new job id, its status ('queued' or already
+    'running') and, while queued, its queue position.  A request identical to
+    a job that is still queued gets that job's id instead of a second job.
+    """
+    db = get_db()
+    job_id = find_queued_job(db, kind, params) if RESULT_CACHE else None
+    if job_id is not None:
+        logger.info(f"Planning request coalesced onto queued job {job_id}")
+    else:
+        job_id = str(uuid.uuid4())
+        enqueue_job(db, job_id, kind, params, priority)
+    worker = ensure_planning_worker(db.db_path)
+    if worker is not None:
+        worker.wake()
+
+    job = get_job(db, job_id)
+    content = {'jobId': job_id, 'status': job['status']}
+    position = get_queue_position(db, job_id)
+    if position is not None:
+        content['queuePosition'] = position
+    return JSONResponse(content=content, status_code=202)
+
+
 @router.post('/api/shifts/plan', dependencies=[Depends(require_role('Admin', 'Disponent')), Depends(check_csrf)])
 def plan_shifts(request: Request):
     """
-    Start asynchronous shift planning using OR-Tools.
+    Queue asynchronous shift planning using OR-Tools.
 
     Returns a job_id immediately; the caller should poll
-    GET /api/shifts/plan/status/{job_id} for progress and result.
+    GET /api/shifts/plan/status/{job_id} for queue position, progress and result.
     """
     start_date_str = request.query_params.get('startDate')
     end_date_str = request.query_params.get('endDate')
@@ -45,37 +88,147 @@ def plan_shifts(request: Request):
         if not is_valid:
             return JSONResponse(content={'error': error_msg}, status_code=400)
 
-        # Enforce max concurrent job limit
-        with _futures_lock:
-            running = sum(1 for f in _active_futures.values() if not f.done())
-            if running >= MAX_CONCURRENT_JOBS:
-                return JSONResponse(
-                    content={'error': f'Maximale Anzahl gleichzeitiger Planungsjobs ({MAX_CONCURRENT_JOBS}) erreicht. Bitte warten Sie, bis ein Job abgeschlossen ist.'},
-                    status_code=503
-                )
-
-        # Create job entry and submit to process pool
-        job_id = str(uuid.uuid4())
-        db = get_db()
-        create_job(db, job_id)
+        return _submit_planning_job(
+            'plan',
+            {'startDate': start_date.isoformat(), 'endDate': end_date.isoformat(), 'force': force},
+            PLAN_JOB_PRIORITY,
+        )
 
-        future = _solver_pool.submit(
-            _run_planning_job,
-            job_id, start_date, end_date, force, db.db_path
+    except Exception as e:
+        return api_error(
+            logger,
+            'Planungsjob konnte nicht gestartet werden',
+            status_code=500,
+            exc=e,
+            context='plan_shifts failed',
         )
-        with _futures_lock:
-            _active_futures[job_id] = future
 
 
-        return JSONResponse(content={'jobId': job_id, 'status': 'running'}, status_code=202)
+@router.post('/api/shifts/plan/batch', dependencies=[Depends(require_role('Admin', 'Disponent')), Depends(check_csrf)])
+def plan_shifts_batch(request: Request):
+    """
+    Queue planning of several consecutive months as one job.
+
+    Query parameters:
+        startDate: First day of the first month (required).
+        months: Number of months, 1 to MAX_BATCH_MONTHS (required).
+        force: Replace existing non-fixed assignments like POST /api/shifts/plan.
+        lookaheadWeeks: Extra weeks each month is solved with (rolling
+            horizon, 0 to MAX_BATCH_LOOKAHEAD_WEEKS, default 0); only the
+            month itself is saved.
+
+    Returns a job_id like POST /api/shifts/plan; progress reports the current
+    month in batchMonthIndex/batchTotalMonths.
+    """
+    start_date_str = request.query_params.get('startDate')
+    months_str = request.query_params.get('months')
+    force = request.query_params.get('force', 'false').lower() == 'true'
+    if not start_date_str or not months_str:
+        return JSONResponse(content={'error': 'startDate and months are required'}, status_code=400)
+
+    try:
+        start_date = date.fromisoformat(start_date_str)
+        months = int(months_str)
+        lookahead_weeks = int(request.query_params.get('lookaheadWeeks', 0))
+    except ValueError:
+        return JSONResponse(content={'error': 'Invalid startDate, months or lookaheadWeeks'}, status_code=400)
+
+    if start_date.day != 1:
+        return JSONResponse(content={'error': 'startDate must be the first day of a month'}, status_code=400)
+    if not 1 <= months <= MAX_BATCH_MONTHS:
+        return JSONResponse(
+            content={'error': f'months must be between 1 and {MAX_BATCH_MONTHS}'},
+            status_code=400,
+        )
+    if not 0 <= lookahead_weeks <= MAX_BATCH_LOOKAHEAD_WEEKS:
+        return JSONResponse(
+            content={'error': f'lookaheadWeeks must be between 0 and {MAX_BATCH_LOOKAHEAD_WEEKS}'},
+            status_code=400,
+        )
 
+    try:
+        return _submit_planning_job(
+            'batch',
+            {
+                'startDate': start_date.isoformat(),
+                'months': months,
+                'force': force,
+                'lookaheadWeeks': lookahead_weeks,
+            },
+            BATCH_JOB_PRIORITY,
+        )
     except Exception as e:
         return api_error(
             logger,
             'Planungsjob konnte nicht gestartet werden',
             status_code=500,
             exc=e,
-            context='plan_shifts failed',
+            context='plan_shifts_batch failed',
+        )
+
+
+@router.post('/api/shifts/plan/repair', dependencies=[Depends(require_role('Admin', 'Disponent')), Depends(check_csrf)])
+def repair_plan(request: Request):
+    """
+    Start an incremental repair of the stored plan after a change (e.g. a new sick note).
+
+    Query parameters:
+        startDate, endDate: The changed date range (required, at most
+            MAX_REPAIR_RANGE_DAYS days).
+        windowDays: Days re-optimised on both sides of the range
+            (default DEFAULT_REPAIR_WINDOW_DAYS, at most MAX_REPAIR_WINDOW_DAYS).
+        employeeIds: Optional comma-separated employee ids whose teams are
+            re-planned; defaults to every employee absent in the changed range.
+
+    Everything outside the window stays locked.  Returns a job_id like
+    POST /api/shifts/plan; poll GET /api/shifts/plan/status/{job_id}.
+    """
+    start_date_str = request.query_params.get('startDate')
+    end_date_str = request.query_params.get('endDate')
+    if not start_date_str or not end_date_str:
+        return JSONResponse(content={'error': 'startDate and endDate are required'}, status_code=400)
+
+    try:
+        start_date = date.fromisoformat(start_date_str)
+        end_date = date.fromisoformat(end_date_str)
+        window_days = int(request.query_params.get('windowDays', DEFAULT_REPAIR_WINDOW_DAYS))
+        employee_ids = [
+            int(part) for part in request.query_params.get('employeeIds', '').split(',') if part.strip()
+        ]
+    except ValueError:
+        return JSONResponse(content={'error': 'Invalid startDate, endDate, windowDays or employeeIds'}, status_code=400)
+
+    if end_date < start_date:
+        return JSONResponse(content={'error': 'endDate must not be before startDate'}, status_code=400)
+    if (end_date - start_date).days + 1 > MAX_REPAIR_RANGE_DAYS:
+        return JSONResponse(
+            content={'error': f'The changed range must not exceed {MAX_REPAIR_RANGE_DAYS} days'},
+            status_code=400,
+        )
+    if not 0 <= window_days <= MAX_REPAIR_WINDOW_DAYS:
+        return JSONResponse(
+            content={'error': f'windowDays must be between 0 and {MAX_REPAIR_WINDOW_DAYS}'},
+            status_code=400,
+        )
+
+    try:
+        return _submit_planning_job(
+            'repair',
+            {
+                'startDate': start_date.isoformat(),
+                'endDate': end_date.isoformat(),
+                'windowDays': window_days,
+                'employeeIds': employee_ids,
+            },
+            REPAIR_JOB_PRIORITY,
+        )
+    except Exception as e:
+        return api_error(
+            logger,
+            'Reparaturjob konnte nicht gestartet werden',
+            status_code=500,
+            exc=e,
+            context='repair_plan failed',
         )
 
 
@@ -85,8 +238,9 @@ def get_plan_status(request: Request, job_id: str):
     Poll the status of a background planning job.
 
     Returns:
-        status: 'running' | 'success' | 'error'
+        status: 'queued' | 'running' | 'success' | 'error' | 'cancelled'
         message: human-readable status text
+        (while queued) queuePosition: 1-based position in the queue
         (on success) assignmentsCount, year, month, extendedPlanning
         (on error)   details, diagnostics
     """
@@ -94,42 +248,49 @@ def get_plan_status(request: Request, job_id: str):
     job = get_job(db, job_id)
     if job is None:
         return JSONResponse(content={'error': 'Job not found'}, status_code=404)
+    return job_status_payload(db, job_id, job)
 
-    result = {
-        'status': job['status'],
-        'message': job['message'],
-    }
-    if job['result_json']:
-        try:
-            result.update(json.loads(job['result_json']))
-        except Exception:
-            pass
 
-    if job['started_at']:
-        try:
-            started = datetime.fromisoformat(job['started_at'])
-            elapsed = int((datetime.utcnow() - started).total_seconds())
-            result['elapsedSeconds'] = elapsed
-        except Exception:
-            result['elapsedSeconds'] = 0
+@router.get('/api/shifts/plan/stream/{job_id}', dependencies=[Depends(require_role('Admin', 'Disponent'))])
+def stream_plan_status(request: Request, job_id: str):
+    """
+    Stream the progress of a background planning job as Server-Sent Events.
 
-    return result
+    Replaces polling GET /api/shifts/plan/status/{job_id}: events 'progress',
+    'stage', 'solution' (objective and best bound of each improving solution)
+    and a final 'done' (see planning_job_events.py).  The stream ends when
+    the client disconnects.
+    """
+    db = get_db()
+    if get_job(db, job_id) is None:
+        return JSONResponse(content={'error': 'Job not found'}, status_code=404)
+    return StreamingResponse(
+        stream_job_events(db, job_id, is_disconnected=request.is_disconnected),
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Keep GZipMiddleware and reverse proxies from buffering the events.
+            'Content-Encoding': 'identity',
+            'X-Accel-Buffering': 'no',
+        },
+    )
 
 
 @router.delete('/api/shifts/plan/{job_id}', dependencies=[Depends(require_role('Admin', 'Disponent')), Depends(check_csrf)])
 
 def cancel_plan_job(request: Request, job_id):
     """
-    Request cancellation of a background planning job.
+    Request cancellation of a queued or running planning job.
 
-    The job is marked as cancelled. Since OR-Tools may not immediately stop,
-    this sets the job status to 'cancelled' in the job store.
+    The job is marked as cancelled. A queued job is never started; a running
+    job's solver watchdog sees the status within about a second, stops the
+    CP-SAT search and skips the remaining fallback stages.
     """
     db = get_db()
     job = get_job(db, job_id)
     if job is None:
         return JSONResponse(content={'error': 'Job not found'}, status_code=404)
-    if job['status'] != 'running':
+    if job['status'] not in ('queued', 'running'):
         return JSONResponse(content={'error': 'Job is not running'}, status_code=400)
     update_job(db, job_id, 'cancelled', 'Planung wurde abgebrochen.')
     return {'success': True, 'message': 'Planung wird abgebrochen.'}
@@ -141,11 +141,9 @@ def get_schedule(request: Request):
         
         # Get absences from Absences table
         absence_conditions = [
-            "((a.StartDate <= ? AND a.EndDate >= ?) OR (a.StartDate >= ? AND a.StartDate <= ?))"
-        ]
-        absence_params = [
-            end_date.isoformat(), start_date.isoformat(), start_date.isoformat(), end_date.isoformat()
+            "a.StartDate <= ? AND a.EndDate >= ?"
         ]
+        absence_params = [end_date.isoformat(), start_date.isoformat()]
         if team_id is not None:
             absence_conditions.append("e.TeamId = ?")
             absence_params.append(team_id)
@@ -177,11 +175,9 @@ def get_schedule(request: Request):
         
         # Also get vacation requests (all statuses) and add them as absences
         vacation_conditions = [
-            "((vr.StartDate <= ? AND vr.EndDate >= ?) OR (vr.StartDate >= ? AND vr.StartDate <= ?))"
-        ]
-        vacation_params = [
-            end_date.isoformat(), start_date.isoformat(), start_date.isoformat(), end_date.isoformat()
+            "vr.StartDate <= ? AND vr.EndDate >= ?"
         ]
+        vacation_params = [end_date.isoformat(), start_date.isoformat()]
         if team_id is not None:
             vacation_conditions.append("e.TeamId = ?")
             vacation_params.append(team_id)
@@ -226,11 +222,9 @@ def get_schedule(request: Request):
         cursor.execute("""
             SELECT Id, Name, StartDate, EndDate, ColorCode
             FROM VacationPeriods
-            WHERE (StartDate <= ? AND EndDate >= ?)
-               OR (StartDate >= ? AND StartDate <= ?)
+            WHERE StartDate <= ? AND EndDate >= ?
             ORDER BY StartDate
-        """, (end_date.isoformat(), start_date.isoformat(),
-              start_date.isoformat(), end_date.isoformat()))
+        """, (end_date.isoformat(), start_date.isoformat()))
         
         vacation_periods = []
         for row in cursor.fetchall():
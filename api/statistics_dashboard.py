@@ -104,15 +104,12 @@ def build_dashboard_payload(cursor, start_date: date, end_date: date) -> dict[st
         FROM Absences a
         JOIN Employees e ON e.Id = a.EmployeeId
         LEFT JOIN AbsenceTypes at ON a.AbsenceTypeId = at.Id
-        WHERE (a.StartDate <= ? AND a.EndDate >= ?)
-           OR (a.StartDate >= ? AND a.StartDate <= ?)
+        WHERE a.StartDate <= ? AND a.EndDate >= ?
         ORDER BY e.Vorname, e.Name, a.StartDate
     """,
         (
             end_date.isoformat(),
             start_date.isoformat(),
-            start_date.isoformat(),
-            end_date.isoformat(),
         ),
     )
 
@@ -10,3 +10,7 @@ DEFAULT_WEEKLY_HOURS = 48.0  # Default maximum weekly hours for constraint calcu
 CROSS_MONTH_BOUNDARY_PENALTY = 50000
 
 DEFAULT_ROTATION_PATTERN = ["F", "N", "S"]  # Fallback when DB has no rotation config
+
+# Day-to-day shift changes that leave less than the minimum rest time
+# (previous day's code, next day's code), e.g. S ends 21:45, F starts 05:45.
+FORBIDDEN_SHIFT_TRANSITIONS = frozenset({("S", "F"), ("N", "F"), ("N", "S")})
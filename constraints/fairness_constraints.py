@@ -1,7 +1,8 @@
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from entities import Employee, Absence, ShiftType, Team, get_shift_type_by_id
+from model import PlanningIndex
 from .constants import (
     CROSS_MONTH_BOUNDARY_PENALTY,
     DEFAULT_MAXIMUM_CONSECUTIVE_NIGHT_SHIFTS_WEEKS,
@@ -26,7 +27,8 @@ def add_fairness_objectives(
     shift_codes: List[str],
     ytd_weekend_counts: Dict[int, int] = None,
     ytd_night_counts: Dict[int, int] = None,
-    ytd_holiday_counts: Dict[int, int] = None
+    ytd_holiday_counts: Dict[int, int] = None,
+    index: Optional[PlanningIndex] = None
 ) -> List:
     """
     SOFT CONSTRAINTS: Fairness and optimization objectives with YEAR-LONG fairness tracking.
@@ -51,12 +53,16 @@ def add_fairness_objectives(
         ytd_weekend_counts: Dict mapping employee_id -> count of weekend days worked this year
         ytd_night_counts: Dict mapping employee_id -> count of night shifts worked this year
         ytd_holiday_counts: Dict mapping employee_id -> count of holidays worked this year
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
     
     Returns list of objective terms to minimize.
     """
     ytd_weekend_counts = ytd_weekend_counts or {}
     ytd_night_counts = ytd_night_counts or {}
     ytd_holiday_counts = ytd_holiday_counts or {}
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
     
     objective_terms = []
     
@@ -68,11 +74,7 @@ def add_fairness_objectives(
             return frozenset()
         
         # Find employee's team
-        emp_team = None
-        for t in teams:
-            if t.id == emp.team_id:
-                emp_team = t
-                break
+        emp_team = index.team_of(emp)
         
         if not emp_team:
             return frozenset()
@@ -303,11 +305,7 @@ def add_fairness_objectives(
                 night_shifts_current = []
                 
                 # Regular team night shifts
-                emp_team = None
-                for t in teams:
-                    if t.id == emp.team_id:
-                        emp_team = t
-                        break
+                emp_team = index.team_of(emp)
                 
                 if emp_team:
                     for week_idx in range(num_weeks):
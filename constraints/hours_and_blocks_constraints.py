@@ -1,7 +1,8 @@
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from entities import Employee, Absence, ShiftType, Team, get_shift_type_by_id
+from model import PlanningIndex
 from .constants import (
     CROSS_MONTH_BOUNDARY_PENALTY,
     DEFAULT_MAXIMUM_CONSECUTIVE_NIGHT_SHIFTS_WEEKS,
@@ -29,6 +30,7 @@ def add_working_hours_constraints(
     violation_tracker=None,
     target_start_date: date = None,
     target_end_date: date = None,
+    index: Optional[PlanningIndex] = None,
 ) -> List[cp_model.IntVar]:
     """
     HARD + SOFT CONSTRAINT: Working hours target based on proportional calculation INCLUDING cross-team.
@@ -64,6 +66,8 @@ def add_working_hours_constraints(
         target_start_date: First day of the planning MONTH (not the extended week boundary).
                            When None, all dates in the extended period are used (backward-compat).
         target_end_date:   Last day of the planning MONTH.  Same behaviour as target_start_date.
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
     
     Returns:
         List of IntVar representing shortage from target hours for soft optimization
@@ -76,6 +80,8 @@ def add_working_hours_constraints(
     Cross-team hours are based on the actual shift worked.
     """
     absences = absences or []
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, absences=absences)
     
     # Initialize list for soft objective variables (minimize shortage from target hours)
     soft_objectives = []
@@ -201,11 +207,7 @@ def add_working_hours_constraints(
         total_hours_terms = []
         
         # PERFORMANCE OPTIMIZATION: Pre-compute absent dates for this employee once
-        # This avoids O(dates × absences) complexity in nested loops
-        absent_dates = set()
-        for d in dates:
-            if any(abs.employee_id == emp.id and abs.overlaps_date(d) for abs in absences):
-                absent_dates.add(d)
+        absent_dates = {d for d in dates if index.has_absence(emp.id, d)}
         
         # Calculate total days without absences for this employee
         # Use only target-period days so that extended-week days (e.g. April 1-4 when
@@ -354,6 +356,7 @@ def add_no_gap_constraints(
     absences: List[Absence],
     target_start_date: date = None,
     target_end_date: date = None,
+    index: Optional[PlanningIndex] = None,
 ) -> List[cp_model.IntVar]:
     """
     SOFT CONSTRAINT: Penalise employees for having zero work days in any week where they
@@ -388,14 +391,9 @@ def add_no_gap_constraints(
     else:
         target_date_set = frozenset(dates)
 
-    # Build employee→team lookup once
-    emp_to_team: Dict[int, Team] = {}
-    for emp in employees:
-        if emp.team_id:
-            for t in teams:
-                if t.id == emp.team_id:
-                    emp_to_team[emp.id] = t
-                    break
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, absences=absences)
+    emp_to_team = index.team_by_employee_id
 
     for emp in employees:
         if not emp.team_id:
@@ -405,10 +403,7 @@ def add_no_gap_constraints(
             continue
 
         # Pre-compute absent dates once for this employee
-        absent_dates = frozenset(
-            d for d in dates
-            if any(a.employee_id == emp.id and a.overlaps_date(d) for a in absences)
-        )
+        absent_dates = frozenset(d for d in dates if index.has_absence(emp.id, d))
 
         for week_idx, week_dates in enumerate(weeks):
             # Collect work-indicator variables for non-absent target-period days this week
@@ -573,7 +568,8 @@ def add_team_member_block_constraints(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    absences: List[Absence]
+    absences: List[Absence],
+    index: Optional[PlanningIndex] = None
 ) -> List[cp_model.IntVar]:
     """
     SOFT OBJECTIVES: Encourage block scheduling (Mon-Fri, Mon-Sun, Sat-Sun).
@@ -598,23 +594,23 @@ def add_team_member_block_constraints(
         weeks: List of weeks (each week is a list of dates)
         shift_codes: All shift codes
         absences: Employee absences
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
     
     Returns:
         List of objective variables for block scheduling preferences
     """
     
     objective_vars = []
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, absences=absences)
     
     for emp in employees:
         if not emp.team_id:
             continue
         
         # Find employee's team
-        team = None
-        for t in teams:
-            if t.id == emp.team_id:
-                team = t
-                break
+        team = index.team_of(emp)
         
         if not team:
             continue
@@ -629,10 +625,7 @@ def add_team_member_block_constraints(
             all_week_dates = []
             
             for d in week_dates:
-                is_absent = any(
-                    abs.employee_id == emp.id and abs.overlaps_date(d)
-                    for abs in absences
-                )
+                is_absent = index.has_absence(emp.id, d)
                 
                 if not is_absent:
                     if d.weekday() < 5 and (emp.id, d) in employee_active:
@@ -648,10 +641,7 @@ def add_team_member_block_constraints(
             if len(weekdays) >= 5:
                 weekday_vars = []
                 for d in weekdays:
-                    is_absent = any(
-                        abs.employee_id == emp.id and abs.overlaps_date(d)
-                        for abs in absences
-                    )
+                    is_absent = index.has_absence(emp.id, d)
                     if not is_absent and (emp.id, d) in employee_active:
                         weekday_vars.append(employee_active[(emp.id, d)])
                 
@@ -668,14 +658,8 @@ def add_team_member_block_constraints(
                 sat = weekend_days[0] if weekend_days[0].weekday() == 5 else weekend_days[1]
                 sun = weekend_days[1] if weekend_days[1].weekday() == 6 else weekend_days[0]
                 
-                sat_absent = any(
-                    abs.employee_id == emp.id and abs.overlaps_date(sat)
-                    for abs in absences
-                )
-                sun_absent = any(
-                    abs.employee_id == emp.id and abs.overlaps_date(sun)
-                    for abs in absences
-                )
+                sat_absent = index.has_absence(emp.id, sat)
+                sun_absent = index.has_absence(emp.id, sun)
                 
                 if not sat_absent and not sun_absent:
                     if (emp.id, sat) in employee_weekend_shift and (emp.id, sun) in employee_weekend_shift:
@@ -1,7 +1,8 @@
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from entities import Employee, Absence, ShiftType, Team, get_shift_type_by_id
+from model import PlanningIndex
 from .constants import (
     CROSS_MONTH_BOUNDARY_PENALTY,
     DEFAULT_MAXIMUM_CONSECUTIVE_NIGHT_SHIFTS_WEEKS,
@@ -9,6 +10,7 @@ from .constants import (
     DEFAULT_MINIMUM_REST_HOURS,
     DEFAULT_ROTATION_PATTERN,
     DEFAULT_WEEKLY_HOURS,
+    FORBIDDEN_SHIFT_TRANSITIONS,
 )
 
 
@@ -26,6 +28,7 @@ def add_rest_time_constraints(
     teams: List[Team] = None,
     violation_tracker=None,
     previous_employee_shifts: Dict[Tuple[int, date], str] = None,
+    index: Optional[PlanningIndex] = None,
 ):
     """
     SOFT CONSTRAINT: Minimum 11 hours rest between shifts (allows violations for feasibility).
@@ -65,6 +68,8 @@ def add_rest_time_constraints(
     
     # Track violation penalties
     rest_violation_penalties = []
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
     
     # For each employee, track forbidden transitions between consecutive days
     for emp in employees:
@@ -82,18 +87,10 @@ def add_rest_time_constraints(
             # Check team shift for today
             if today.weekday() < 5 and (emp.id, today) in employee_active:
                 # Find team's shift this week
-                week_idx = None
-                for w_idx, week_dates in enumerate(weeks):
-                    if today in week_dates:
-                        week_idx = w_idx
-                        break
+                week_idx = index.week_index(today)
                 
                 if week_idx is not None:
-                    team = None
-                    for t in teams:
-                        if t.id == emp.team_id:
-                            team = t
-                            break
+                    team = index.team_of(emp)
                     
                     if team:
                         for shift_code in shift_codes:
@@ -108,18 +105,10 @@ def add_rest_time_constraints(
                                 today_shift_codes.append(shift_code)
             elif today.weekday() >= 5 and (emp.id, today) in employee_weekend_shift:
                 # Weekend team shift
-                week_idx = None
-                for w_idx, week_dates in enumerate(weeks):
-                    if today in week_dates:
-                        week_idx = w_idx
-                        break
+                week_idx = index.week_index(today)
                 
                 if week_idx is not None:
-                    team = None
-                    for t in teams:
-                        if t.id == emp.team_id:
-                            team = t
-                            break
+                    team = index.team_of(emp)
                     
                     if team:
                         for shift_code in shift_codes:
@@ -148,18 +137,10 @@ def add_rest_time_constraints(
             
             # Similar logic for tomorrow...
             if tomorrow.weekday() < 5 and (emp.id, tomorrow) in employee_active:
-                week_idx = None
-                for w_idx, week_dates in enumerate(weeks):
-                    if tomorrow in week_dates:
-                        week_idx = w_idx
-                        break
+                week_idx = index.week_index(tomorrow)
                 
                 if week_idx is not None:
-                    team = None
-                    for t in teams:
-                        if t.id == emp.team_id:
-                            team = t
-                            break
+                    team = index.team_of(emp)
                     
                     if team:
                         for shift_code in shift_codes:
@@ -172,18 +153,10 @@ def add_rest_time_constraints(
                                 tomorrow_shifts.append(has_shift)
                                 tomorrow_shift_codes.append(shift_code)
             elif tomorrow.weekday() >= 5 and (emp.id, tomorrow) in employee_weekend_shift:
-                week_idx = None
-                for w_idx, week_dates in enumerate(weeks):
-                    if tomorrow in week_dates:
-                        week_idx = w_idx
-                        break
+                week_idx = index.week_index(tomorrow)
                 
                 if week_idx is not None:
-                    team = None
-                    for t in teams:
-                        if t.id == emp.team_id:
-                            team = t
-                            break
+                    team = index.team_of(emp)
                     
                     if team:
                         for shift_code in shift_codes:
@@ -214,9 +187,7 @@ def add_rest_time_constraints(
             for i_today, today_shift_code in enumerate(today_shift_codes):
                 for i_tomorrow, tomorrow_shift_code in enumerate(tomorrow_shift_codes):
                     # Check if this is a forbidden transition
-                    if (today_shift_code == "S" and tomorrow_shift_code == "F") or \
-                       (today_shift_code == "N" and tomorrow_shift_code == "F") or \
-                       (today_shift_code == "N" and tomorrow_shift_code == "S"):
+                    if (today_shift_code, tomorrow_shift_code) in FORBIDDEN_SHIFT_TRANSITIONS:
                         
                         # Create a violation indicator variable
                         # violation = 1 if both shifts happen (forbidden transition occurs)
@@ -267,13 +238,9 @@ def add_rest_time_constraints(
             first_day_shift_codes = []
 
             if first_day.weekday() < 5 and (emp.id, first_day) in employee_active:
-                week_idx = next(
-                    (w for w, wd in enumerate(weeks) if first_day in wd), None
-                )
+                week_idx = index.week_index(first_day)
                 if week_idx is not None:
-                    team = next(
-                        (t for t in (teams or []) if t.id == emp.team_id), None
-                    )
+                    team = index.team_of(emp)
                     if team:
                         for sc in shift_codes:
                             if (team.id, week_idx, sc) in team_shift:
@@ -290,13 +257,9 @@ def add_rest_time_constraints(
                                 first_day_shifts.append(bv)
                                 first_day_shift_codes.append(sc)
             elif first_day.weekday() >= 5 and (emp.id, first_day) in employee_weekend_shift:
-                week_idx = next(
-                    (w for w, wd in enumerate(weeks) if first_day in wd), None
-                )
+                week_idx = index.week_index(first_day)
                 if week_idx is not None:
-                    team = next(
-                        (t for t in (teams or []) if t.id == emp.team_id), None
-                    )
+                    team = index.team_of(emp)
                     if team:
                         for sc in shift_codes:
                             if (team.id, week_idx, sc) in team_shift:
@@ -334,11 +297,7 @@ def add_rest_time_constraints(
             _SUNDAY = 6
             _MONDAY = 0
             for i_fd, fd_sc in enumerate(first_day_shift_codes):
-                is_forbidden = (
-                    (prev_shift_code == "S" and fd_sc == "F") or
-                    (prev_shift_code == "N" and fd_sc == "F") or
-                    (prev_shift_code == "N" and fd_sc == "S")
-                )
+                is_forbidden = (prev_shift_code, fd_sc) in FORBIDDEN_SHIFT_TRANSITIONS
                 if is_forbidden:
                     is_sunday_monday = (
                         prev_day.weekday() == _SUNDAY and first_day.weekday() == _MONDAY
@@ -365,7 +324,8 @@ def add_shift_stability_constraints(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    teams: List[Team] = None
+    teams: List[Team] = None,
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Prevent shift hopping (rapid changes like N→S→N).
@@ -385,6 +345,8 @@ def add_shift_stability_constraints(
         List of penalty variables for shift hopping violations
     """
     hopping_penalties = []
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
     
     # Define shift change penalty
     # Higher penalty for rapid back-and-forth changes
@@ -399,21 +361,11 @@ def add_shift_stability_constraints(
         # Team shift (weekday)
         if weekday < 5 and (emp_id, d) in employee_active:
             # Find team and week
-            week_idx = None
-            for w_idx, week_dates in enumerate(weeks):
-                if d in week_dates:
-                    week_idx = w_idx
-                    break
+            week_idx = index.week_index(d)
             
             if week_idx is not None:
-                team = None
-                for t in teams:
-                    if t.id == emp_id or any(e.id == emp_id for e in employees if e.team_id == t.id):
-                        for emp in employees:
-                            if emp.id == emp_id and emp.team_id == t.id:
-                                team = t
-                                break
-                        break
+                emp = index.employee_by_id.get(emp_id)
+                team = index.team_of(emp) if emp else None
                 
                 if team:
                     for shift_code in shift_codes:
@@ -425,21 +377,11 @@ def add_shift_stability_constraints(
         # Team shift (weekend)
         elif weekday >= 5 and (emp_id, d) in employee_weekend_shift:
             # Find team and week
-            week_idx = None
-            for w_idx, week_dates in enumerate(weeks):
-                if d in week_dates:
-                    week_idx = w_idx
-                    break
+            week_idx = index.week_index(d)
             
             if week_idx is not None:
-                team = None
-                for emp in employees:
-                    if emp.id == emp_id:
-                        for t in teams:
-                            if t.id == emp.team_id:
-                                team = t
-                                break
-                        break
+                emp = index.employee_by_id.get(emp_id)
+                team = index.team_of(emp) if emp else None
                 
                 if team:
                     for shift_code in shift_codes:
@@ -524,7 +466,8 @@ def add_shift_sequence_grouping_constraints(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    teams: List[Team] = None
+    teams: List[Team] = None,
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Prevent isolated shift types in sequences of working days.
@@ -558,20 +501,11 @@ def add_shift_sequence_grouping_constraints(
     WINDOW_CLOSE = 7    # calendar-day radius for ultra-high penalty
     WINDOW_FAR = 14     # calendar-day radius for normal isolation penalty
 
-    # Pre-compute employee→team and date→week-index lookups once
-    emp_to_team: Dict[int, "Team"] = {}
-    if teams:
-        for emp in employees:
-            if emp.team_id:
-                for t in teams:
-                    if t.id == emp.team_id:
-                        emp_to_team[emp.id] = t
-                        break
-
-    date_to_week: Dict[date, int] = {}
-    for w_idx, week_dates in enumerate(weeks):
-        for d in week_dates:
-            date_to_week[d] = w_idx
+    # Employee→team and date→week-index lookups
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
+    emp_to_team = index.team_by_employee_id
+    date_to_week = index.week_idx_by_date
 
     def get_shift_type_for_day(emp_id: int, d: date) -> Dict[str, List]:
         """
@@ -734,7 +668,8 @@ def add_minimum_consecutive_weekday_shifts_constraints(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    teams: List[Team] = None
+    teams: List[Team] = None,
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Enforce minimum 2 consecutive days for same shift type during weekdays.
@@ -768,21 +703,11 @@ def add_minimum_consecutive_weekday_shifts_constraints(
     # Increased even further to prevent A-B-A patterns at all costs
     SINGLE_DAY_PENALTY = 8000  # Maximum priority penalty for clear violations
     
-    # Pre-compute date-to-week mapping
-    date_to_week = {}
-    for week_idx, week_dates in enumerate(weeks):
-        for d in week_dates:
-            date_to_week[d] = week_idx
-    
-    # Pre-compute employee-to-team mapping
-    emp_to_team = {}
-    if teams:
-        for emp in employees:
-            if emp.team_id:
-                for team in teams:
-                    if team.id == emp.team_id:
-                        emp_to_team[emp.id] = team
-                        break
+    # Date-to-week and employee-to-team lookups
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
+    date_to_week = index.week_idx_by_date
+    emp_to_team = index.team_by_employee_id
     
     # Helper function to get shift type variables for a specific day
     def get_shift_vars_for_day(emp_id, d):
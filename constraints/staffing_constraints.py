@@ -1,7 +1,8 @@
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from entities import Employee, Absence, ShiftType, Team, get_shift_type_by_id
+from model import ConstraintGroups, PlanningIndex
 from .constants import (
     CROSS_MONTH_BOUNDARY_PENALTY,
     DEFAULT_MAXIMUM_CONSECUTIVE_NIGHT_SHIFTS_WEEKS,
@@ -26,7 +27,10 @@ def add_staffing_constraints(
     shift_codes: List[str],
     shift_types: List[ShiftType],
     violation_tracker=None,
-    relax_min_staffing: bool = False
+    relax_min_staffing: bool = False,
+    min_staffing_enforcement_literal: Optional[cp_model.IntVar] = None,
+    index: Optional[PlanningIndex] = None,
+    constraint_groups: Optional[ConstraintGroups] = None
 ) -> Tuple[List[cp_model.IntVar], List[Tuple[cp_model.IntVar, date]], Dict[str, List[Tuple[cp_model.IntVar, date]]], List[cp_model.IntVar], List[cp_model.IntVar]]:
     """
     HARD MINIMUM + SOFT MAXIMUM: Staffing per shift, INCLUDING cross-team workers.
@@ -65,6 +69,17 @@ def add_staffing_constraints(
             with penalty variables instead of a hard constraint. The returned
             min_staffing_violations list will contain the penalty variables.
             When False (default), minimum staffing is a hard constraint.
+        min_staffing_enforcement_literal: Optional BoolVar that switches minimum
+            staffing between hard and soft inside ONE model. When given, the
+            penalty variables are always created and the hard minimum is added
+            with OnlyEnforceIf(literal): literal=1 behaves like
+            relax_min_staffing=False, literal=0 like relax_min_staffing=True.
+            relax_min_staffing is ignored in that case.
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
+        constraint_groups: Optional registry that records the hard minimum
+            per (shift, date) as ("min_staffing", shift, d) and the hard
+            weekend maximum as ("max_staffing", shift, d)
         
     Returns:
         5-tuple of (weekday_overstaffing_penalties, weekend_overstaffing_penalties, 
@@ -74,7 +89,8 @@ def add_staffing_constraints(
                   - weekday_understaffing_by_shift is a dict mapping shift codes to lists of (penalty_var, date) tuples
                   - team_priority_violations are penalties for using cross-team when team has capacity
                   - min_staffing_violations is a list of IntVar penalty variables representing how far below
-                    minimum staffing each shift/day falls (non-empty only when relax_min_staffing=True)
+                    minimum staffing each shift/day falls (non-empty only when relax_min_staffing=True
+                    or a min_staffing_enforcement_literal is given)
     """
     if not shift_types:
         raise ValueError("shift_types parameter is required and must contain ShiftType objects from database")
@@ -93,28 +109,23 @@ def add_staffing_constraints(
                 "max": st.max_staff_weekend
             }
     
-    shift_type_by_code = {st.code: st for st in shift_types}
-    date_to_week_idx: Dict[date, int] = {}
-    for w_idx, week_dates in enumerate(weeks):
-        for wd in week_dates:
-            date_to_week_idx[wd] = w_idx
-    team_members: Dict[int, List[Employee]] = {}
-    for emp in employees:
-        if emp.team_id is not None:
-            team_members.setdefault(emp.team_id, []).append(emp)
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, shift_types=shift_types)
 
     # Initialize separate lists for different penalty types
     weekday_overstaffing_penalties = []
     weekend_overstaffing_penalties = []
     weekday_understaffing_by_shift = {shift: [] for shift in shift_codes}  # Separate by shift type for priority
     team_priority_violations = []  # Penalties for using cross-team when team has capacity
-    min_staffing_violations = []  # Only populated when relax_min_staffing=True
+    min_staffing_violations = []  # Only populated when min staffing can be soft
+    guarded_min_staffing = min_staffing_enforcement_literal is not None
+    soft_min_staffing = relax_min_staffing or guarded_min_staffing
     
     for d in dates:
         is_weekend = d.weekday() >= 5
         staffing = staffing_weekend if is_weekend else staffing_weekday
         
-        week_idx = date_to_week_idx.get(d)
+        week_idx = index.week_index(d)
         if week_idx is None:
             continue
         
@@ -124,7 +135,7 @@ def add_staffing_constraints(
             
             # Check if this shift works on this day (Mon-Fri vs Sat-Sun)
             # Find the shift type for this shift code
-            shift_type = shift_type_by_code.get(shift)
+            shift_type = index.shift_type_by_code.get(shift)
             
             # Skip if shift doesn't work on this day
             if shift_type and not shift_type.works_on_date(d):
@@ -142,7 +153,7 @@ def add_staffing_constraints(
                         continue
                     
                     # Count members of this team working on this weekend day
-                    for emp in team_members.get(team.id, []):
+                    for emp in index.team_members.get(team.id, []):
                         if (emp.id, d) not in employee_weekend_shift:
                             continue
                         
@@ -168,16 +179,24 @@ def add_staffing_constraints(
                     total_assigned = sum(assigned)
                     # Minimum staffing: HARD by default, SOFT when relax_min_staffing=True
                     min_required = staffing[shift]["min"]
-                    if relax_min_staffing:
+                    if soft_min_staffing:
                         # Soft constraint: penalise shortfall instead of forbidding it
                         viol = model.NewIntVar(0, min_required, f"min_staff_viol_{shift}_{d}_weekend")
                         model.Add(viol >= min_required - total_assigned)
                         model.Add(viol >= 0)
                         min_staffing_violations.append(viol)
-                    else:
-                        model.Add(total_assigned >= min_required)
+                    min_ct = None
+                    if guarded_min_staffing:
+                        min_ct = model.Add(total_assigned >= min_required)
+                        min_ct.OnlyEnforceIf(min_staffing_enforcement_literal)
+                    elif not relax_min_staffing:
+                        min_ct = model.Add(total_assigned >= min_required)
                     # HARD maximum staffing on weekends: enforce configured max strictly
-                    model.Add(total_assigned <= staffing[shift]["max"])
+                    max_ct = model.Add(total_assigned <= staffing[shift]["max"])
+                    if constraint_groups is not None:
+                        if min_ct is not None:
+                            constraint_groups.add(("min_staffing", shift, d), min_ct)
+                        constraint_groups.add(("max_staffing", shift, d), max_ct)
                     
                     # NEW: Penalize cross-team usage when team has unfilled capacity on weekends too
                     if team_assigned and cross_team_assigned:
@@ -207,7 +226,7 @@ def add_staffing_constraints(
                         continue
                     
                     # Count active members of this team on this day
-                    for emp in team_members.get(team.id, []):
+                    for emp in index.team_members.get(team.id, []):
                         if (emp.id, d) not in employee_active:
                             continue
                         
@@ -231,13 +250,19 @@ def add_staffing_constraints(
                     total_assigned = sum(assigned)
                     # Minimum staffing: HARD by default, SOFT when relax_min_staffing=True
                     min_required = staffing[shift]["min"]
-                    if relax_min_staffing:
+                    if soft_min_staffing:
                         viol = model.NewIntVar(0, min_required, f"min_staff_viol_{shift}_{d}_weekday")
                         model.Add(viol >= min_required - total_assigned)
                         model.Add(viol >= 0)
                         min_staffing_violations.append(viol)
-                    else:
-                        model.Add(total_assigned >= min_required)
+                    min_ct = None
+                    if guarded_min_staffing:
+                        min_ct = model.Add(total_assigned >= min_required)
+                        min_ct.OnlyEnforceIf(min_staffing_enforcement_literal)
+                    elif not relax_min_staffing:
+                        min_ct = model.Add(total_assigned >= min_required)
+                    if constraint_groups is not None and min_ct is not None:
+                        constraint_groups.add(("min_staffing", shift, d), min_ct)
                     # SOFT maximum staffing - create penalty variable for overstaffing
                     overstaffing = model.NewIntVar(0, 20, f"overstaff_{shift}_{d}_weekday")
                     model.Add(overstaffing >= total_assigned - staffing[shift]["max"])
@@ -286,7 +311,8 @@ def add_total_weekend_staffing_limit(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    max_total_weekend_staff: int = 12
+    max_total_weekend_staff: int = 12,
+    index: Optional[PlanningIndex] = None
 ) -> List[Tuple[cp_model.IntVar, date]]:
     """
     SOFT CONSTRAINT: Limit total number of employees working on weekends across ALL shifts.
@@ -310,11 +336,15 @@ def add_total_weekend_staffing_limit(
     
     Args:
         max_total_weekend_staff: Maximum total employees allowed on weekend days (default 12)
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
         
     Returns:
         List of (penalty_var, date) tuples for total weekend overstaffing
     """
     total_weekend_overstaffing_penalties = []
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
     
     for d in dates:
         # Only apply to weekends (Saturday=5, Sunday=6)
@@ -322,11 +352,7 @@ def add_total_weekend_staffing_limit(
             continue
         
         # Find which week this date belongs to
-        week_idx = None
-        for w_idx, week_dates in enumerate(weeks):
-            if d in week_dates:
-                week_idx = w_idx
-                break
+        week_idx = index.week_index(d)
         
         if week_idx is None:
             continue
@@ -341,9 +367,7 @@ def add_total_weekend_staffing_limit(
                     continue
                 
                 # Count members of this team working on this weekend day
-                for emp in employees:
-                    if emp.team_id != team.id:
-                        continue
+                for emp in index.team_members.get(team.id, []):
                     
                     if (emp.id, d) not in employee_weekend_shift:
                         continue
@@ -390,7 +414,8 @@ def add_cross_shift_capacity_enforcement(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    shift_types: List[ShiftType]
+    shift_types: List[ShiftType],
+    index: Optional[PlanningIndex] = None
 ) -> List[cp_model.IntVar]:
     """
     SOFT CONSTRAINT: Prevent overstaffing lower-capacity shifts when higher-capacity shifts have space.
@@ -415,12 +440,16 @@ def add_cross_shift_capacity_enforcement(
     
     Args:
         shift_types: List of ShiftType objects from database (REQUIRED)
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
         
     Returns:
         List of penalty variables for cross-shift capacity violations
     """
     if not shift_types:
         raise ValueError("shift_types parameter is required")
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, shift_types=shift_types)
     
     # Build staffing lookup from shift_types
     staffing_weekday = {}
@@ -457,11 +486,7 @@ def add_cross_shift_capacity_enforcement(
         shifts_by_capacity = shifts_by_capacity_weekend if is_weekend else shifts_by_capacity_weekday
         
         # Find which week this date belongs to
-        week_idx = None
-        for w_idx, week_dates in enumerate(weeks):
-            if d in week_dates:
-                week_idx = w_idx
-                break
+        week_idx = index.week_index(d)
         
         if week_idx is None:
             continue
@@ -475,13 +500,8 @@ def add_cross_shift_capacity_enforcement(
                     continue  # Only enforce when there's a clear capacity difference
                 
                 # Check if this shift works on this day
-                shift_type_low = None
-                shift_type_high = None
-                for st in shift_types:
-                    if st.code == shift_low:
-                        shift_type_low = st
-                    if st.code == shift_high:
-                        shift_type_high = st
+                shift_type_low = index.shift_type_by_code.get(shift_low)
+                shift_type_high = index.shift_type_by_code.get(shift_high)
                 
                 # Skip if either shift doesn't work on this day
                 if shift_type_low and not shift_type_low.works_on_date(d):
@@ -496,9 +516,7 @@ def add_cross_shift_capacity_enforcement(
                     for team in teams:
                         if (team.id, week_idx, shift_low) not in team_shift:
                             continue
-                        for emp in employees:
-                            if emp.team_id != team.id:
-                                continue
+                        for emp in index.team_members.get(team.id, []):
                             if (emp.id, d) not in employee_weekend_shift:
                                 continue
                             is_on_shift = model.NewBoolVar(f"emp{emp.id}_onshift{shift_low}_d{d}_check")
@@ -516,9 +534,7 @@ def add_cross_shift_capacity_enforcement(
                     for team in teams:
                         if (team.id, week_idx, shift_low) not in team_shift:
                             continue
-                        for emp in employees:
-                            if emp.team_id != team.id:
-                                continue
+                        for emp in index.team_members.get(team.id, []):
                             if (emp.id, d) not in employee_active:
                                 continue
                             is_on_shift = model.NewBoolVar(f"emp{emp.id}_onshift{shift_low}_d{d}_check")
@@ -539,9 +555,7 @@ def add_cross_shift_capacity_enforcement(
                     for team in teams:
                         if (team.id, week_idx, shift_high) not in team_shift:
                             continue
-                        for emp in employees:
-                            if emp.team_id != team.id:
-                                continue
+                        for emp in index.team_members.get(team.id, []):
                             if (emp.id, d) not in employee_weekend_shift:
                                 continue
                             is_on_shift = model.NewBoolVar(f"emp{emp.id}_onshift{shift_high}_d{d}_check")
@@ -559,9 +573,7 @@ def add_cross_shift_capacity_enforcement(
                     for team in teams:
                         if (team.id, week_idx, shift_high) not in team_shift:
                             continue
-                        for emp in employees:
-                            if emp.team_id != team.id:
-                                continue
+                        for emp in index.team_members.get(team.id, []):
                             if (emp.id, d) not in employee_active:
                                 continue
                             is_on_shift = model.NewBoolVar(f"emp{emp.id}_onshift{shift_high}_d{d}_check")
@@ -613,7 +625,8 @@ def add_daily_shift_ratio_constraints(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    shift_types: List[ShiftType]
+    shift_types: List[ShiftType],
+    index: Optional[PlanningIndex] = None
 ) -> List[cp_model.IntVar]:
     """
     SOFT CONSTRAINT: Ensure shifts are staffed proportionally to their max_staff capacity on all days.
@@ -635,12 +648,16 @@ def add_daily_shift_ratio_constraints(
     
     Args:
         shift_types: List of ShiftType objects from database
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
         
     Returns:
         List of penalty variables for ratio violations (to be minimized in objective)
     """
     if not shift_types:
         raise ValueError("shift_types parameter is required")
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, shift_types=shift_types)
     
     # Build mapping from shift code to max_staff for weekdays and weekends
     shift_max_staff_weekday = {}
@@ -673,11 +690,7 @@ def add_daily_shift_ratio_constraints(
         sorted_shifts = sorted(shift_max_staff.items(), key=lambda x: x[1], reverse=True)
         
         # Find which week this date belongs to
-        week_idx = None
-        for w_idx, week_dates in enumerate(weeks):
-            if d in week_dates:
-                week_idx = w_idx
-                break
+        week_idx = index.week_index(d)
         
         if week_idx is None:
             continue
@@ -696,9 +709,7 @@ def add_daily_shift_ratio_constraints(
                 if (team.id, week_idx, shift_code) not in team_shift:
                     continue
                 
-                for emp in employees:
-                    if emp.team_id != team.id:
-                        continue
+                for emp in index.team_members.get(team.id, []):
                     
                     # Use appropriate employee variable based on day type
                     if is_weekend:
@@ -1,7 +1,8 @@
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from entities import Employee, Absence, ShiftType, Team, get_shift_type_by_id
+from model import ConstraintGroups, PlanningIndex
 from .constants import (
     CROSS_MONTH_BOUNDARY_PENALTY,
     DEFAULT_MAXIMUM_CONSECUTIVE_NIGHT_SHIFTS_WEEKS,
@@ -18,7 +19,8 @@ def add_team_shift_assignment_constraints(
     teams: List[Team],
     weeks: List[List[date]],
     shift_codes: List[str],
-    shift_types: List[ShiftType] = None
+    shift_types: List[ShiftType] = None,
+    index: Optional[PlanningIndex] = None
 ):
     """
     HARD CONSTRAINT: Each team must have exactly ONE shift per week.
@@ -32,11 +34,8 @@ def add_team_shift_assignment_constraints(
     
     EXCLUDES virtual team "Fire Alarm System" (ID 99) which doesn't participate in rotation.
     """
-    # Build shift type ID to code mapping
-    shift_id_to_code = {}
-    if shift_types:
-        for st in shift_types:
-            shift_id_to_code[st.id] = st.code
+    if index is None:
+        index = PlanningIndex(teams=teams, weeks=weeks, shift_types=shift_types)
     
     for team in teams:
         for week_idx in range(len(weeks)):
@@ -49,11 +48,8 @@ def add_team_shift_assignment_constraints(
                 # If team has allowed_shift_type_ids configured, enforce it
                 if team.allowed_shift_type_ids:
                     # Find shift type ID for this code
-                    shift_type_id = None
-                    for st_id, st_code in shift_id_to_code.items():
-                        if st_code == shift_code:
-                            shift_type_id = st_id
-                            break
+                    st = index.shift_type_by_code.get(shift_code)
+                    shift_type_id = st.id if st else None
                     
                     # Only add this shift if team is allowed to work it
                     if shift_type_id and shift_type_id in team.allowed_shift_type_ids:
@@ -80,7 +76,10 @@ def add_team_rotation_constraints(
     shift_codes: List[str],
     locked_team_shift: Dict[Tuple[int, int], str] = None,
     shift_types: List[ShiftType] = None,
-    rotation_patterns: Dict[int, List[str]] = None
+    rotation_patterns: Dict[int, List[str]] = None,
+    enforcement_literal: Optional[cp_model.IntVar] = None,
+    index: Optional[PlanningIndex] = None,
+    constraint_groups: Optional[ConstraintGroups] = None
 ):
     """
     HARD CONSTRAINT: Teams follow rotation pattern (database-driven or default F → N → S).
@@ -111,18 +110,22 @@ def add_team_rotation_constraints(
         locked_team_shift: Dict of locked team shifts
         shift_types: List of shift types
         rotation_patterns: Dict mapping rotation_group_id to list of shift codes (from database)
+        enforcement_literal: Optional BoolVar guarding every rotation constraint
+            (OnlyEnforceIf). When given, the rotation is only enforced while the
+            literal is true, so fallback stages can switch it off without
+            rebuilding the model. None (default) adds the constraints unconditionally.
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
+        constraint_groups: Optional registry that records each rotation
+            constraint as ("team_rotation", team_id, week_idx)
     """
     # Default fallback pattern if no database pattern available
     DEFAULT_ROTATION = ["F", "N", "S"]
     
     locked_team_shift = locked_team_shift or {}
     rotation_patterns = rotation_patterns or {}
-    
-    # Build shift type ID to code mapping
-    shift_id_to_code = {}
-    if shift_types:
-        for st in shift_types:
-            shift_id_to_code[st.id] = st.code
+    if index is None:
+        index = PlanningIndex(teams=teams, weeks=weeks, shift_types=shift_types)
     
     # For each team, assign shifts based on rotation pattern
     sorted_teams = sorted(teams, key=lambda t: t.id)
@@ -143,12 +146,9 @@ def add_team_rotation_constraints(
             continue
         
         # Check if team has all rotation shifts in allowed shifts (if configured)
-        if team.allowed_shift_type_ids and shift_id_to_code:
+        if team.allowed_shift_type_ids and index.shift_type_by_id:
             # Build set of allowed shift codes for this team
-            allowed_shift_codes = set()
-            for st_id in team.allowed_shift_type_ids:
-                if st_id in shift_id_to_code:
-                    allowed_shift_codes.add(shift_id_to_code[st_id])
+            allowed_shift_codes = set(index.allowed_shift_codes(team, shift_codes))
             
             # Check if all rotation shifts are allowed
             rotation_set = set(rotation)
@@ -180,7 +180,11 @@ def add_team_rotation_constraints(
             
             # Force this team to have this specific shift this week
             if (team.id, week_idx, assigned_shift) in team_shift:
-                model.Add(team_shift[(team.id, week_idx, assigned_shift)] == 1)
+                ct = model.Add(team_shift[(team.id, week_idx, assigned_shift)] == 1)
+                if enforcement_literal is not None:
+                    ct.OnlyEnforceIf(enforcement_literal)
+                if constraint_groups is not None:
+                    constraint_groups.add(("team_rotation", team.id, week_idx), ct)
 
 
 def add_employee_weekly_rotation_order_constraints(
@@ -194,7 +198,8 @@ def add_employee_weekly_rotation_order_constraints(
     teams: List[Team],
     dates: List[date],
     weeks: List[List[date]],
-    shift_codes: List[str]
+    shift_codes: List[str],
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Enforce F → N → S rotation order for employees across weeks.
@@ -241,17 +246,16 @@ def add_employee_weekly_rotation_order_constraints(
     if not all(shift in shift_codes for shift in rotation_shifts):
         return rotation_order_penalties  # Cannot enforce if shifts are missing
     
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
+    
     # For each employee, determine which shift they work each week
     for emp in employees:
         if not emp.team_id:
             continue
         
         # Find employee's team
-        team = None
-        for t in teams:
-            if t.id == emp.team_id:
-                team = t
-                break
+        team = index.team_of(emp)
         
         if not team:
             continue
@@ -406,7 +410,8 @@ def add_employee_team_linkage_constraints(
     shift_codes: List[str],
     absences: List[Absence],
     employee_weekend_shift: Dict[Tuple[int, date], cp_model.IntVar] = None,
-    employee_cross_team_weekend: Dict[Tuple[int, date, str], cp_model.IntVar] = None
+    employee_cross_team_weekend: Dict[Tuple[int, date, str], cp_model.IntVar] = None,
+    index: Optional[PlanningIndex] = None
 ):
     """
     HARD CONSTRAINT: Link employee_active to team shifts and enforce cross-team rules.
@@ -424,6 +429,8 @@ def add_employee_team_linkage_constraints(
         employee_weekend_shift = {}
     if employee_cross_team_weekend is None:
         employee_cross_team_weekend = {}
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, absences=absences)
     
     # For each employee
     for emp in employees:
@@ -432,11 +439,7 @@ def add_employee_team_linkage_constraints(
             continue
         
         # Find employee's team
-        team = None
-        for t in teams:
-            if t.id == emp.team_id:
-                team = t
-                break
+        team = index.team_of(emp)
         
         if not team:
             continue
@@ -444,10 +447,7 @@ def add_employee_team_linkage_constraints(
         # For each day
         for d in dates:
             # Check if employee is absent
-            is_absent = any(
-                abs.employee_id == emp.id and abs.overlaps_date(d)
-                for abs in absences
-            )
+            is_absent = index.has_absence(emp.id, d)
             
             if is_absent:
                 # Force inactive if absent (both regular and cross-team)
@@ -1,7 +1,8 @@
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from entities import Employee, Absence, ShiftType, Team, get_shift_type_by_id
+from model import ConstraintGroups, PlanningIndex
 from .constants import (
     CROSS_MONTH_BOUNDARY_PENALTY,
     DEFAULT_MAXIMUM_CONSECUTIVE_NIGHT_SHIFTS_WEEKS,
@@ -24,7 +25,8 @@ def add_weekly_shift_type_limit_constraints(
     dates: List[date],
     weeks: List[List[date]],
     shift_codes: List[str],
-    max_shift_types_per_week: int = 2
+    max_shift_types_per_week: int = 2,
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Limit the number of different shift types an employee works in a week.
@@ -42,6 +44,8 @@ def add_weekly_shift_type_limit_constraints(
     
     Args:
         max_shift_types_per_week: Maximum number of different shift types allowed per week
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
     
     Returns:
         List of penalty variables for shift type diversity violations
@@ -51,20 +55,10 @@ def add_weekly_shift_type_limit_constraints(
     # High penalty for having too many shift types in a week
     DIVERSITY_PENALTY = 500
     
-    # Pre-compute date-to-week mapping
-    date_to_week = {}
-    for week_idx, week_dates in enumerate(weeks):
-        for d in week_dates:
-            date_to_week[d] = week_idx
-    
-    # Pre-compute employee-to-team mapping
-    emp_to_team = {}
-    for emp in employees:
-        if emp.team_id:
-            for team in teams:
-                if team.id == emp.team_id:
-                    emp_to_team[emp.id] = team
-                    break
+    # Employee-to-team lookup
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
+    emp_to_team = index.team_by_employee_id
     
     for emp in employees:
         if not emp.team_id:
@@ -149,7 +143,8 @@ def add_weekend_shift_consistency_constraints(
     teams: List[Team],
     dates: List[date],
     weeks: List[List[date]],
-    shift_codes: List[str]
+    shift_codes: List[str],
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Prevent shift type changes within weekends.
@@ -173,14 +168,10 @@ def add_weekend_shift_consistency_constraints(
     # Penalty for shift type changes from Friday to weekend
     WEEKEND_CONSISTENCY_PENALTY = 300
     
-    # Pre-compute employee-to-team mapping
-    emp_to_team = {}
-    for emp in employees:
-        if emp.team_id:
-            for team in teams:
-                if team.id == emp.team_id:
-                    emp_to_team[emp.id] = team
-                    break
+    # Employee-to-team lookup
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
+    emp_to_team = index.team_by_employee_id
     
     for emp in employees:
         if not emp.team_id:
@@ -295,7 +286,8 @@ def add_team_night_shift_consistency_constraints(
     teams: List[Team],
     dates: List[date],
     weeks: List[List[date]],
-    shift_codes: List[str]
+    shift_codes: List[str],
+    index: Optional[PlanningIndex] = None
 ):
     """
     SOFT CONSTRAINT: Strongly discourage cross-team night shifts when employee's team is not on night shift.
@@ -319,14 +311,10 @@ def add_team_night_shift_consistency_constraints(
     # Very high penalty for cross-team night shifts when own team is not on night shift
     NIGHT_TEAM_PENALTY = 600
     
-    # Pre-compute employee-to-team mapping
-    emp_to_team = {}
-    for emp in employees:
-        if emp.team_id:
-            for team in teams:
-                if team.id == emp.team_id:
-                    emp_to_team[emp.id] = team
-                    break
+    # Employee-to-team lookup
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks)
+    emp_to_team = index.team_by_employee_id
     
     for emp in employees:
         if not emp.team_id:
@@ -389,7 +377,9 @@ def add_consecutive_shifts_constraints(
     weeks: List[List[date]],
     shift_codes: List[str],
     shift_types: List[ShiftType],
-    previous_employee_shifts: Dict[Tuple[int, date], str] = None
+    previous_employee_shifts: Dict[Tuple[int, date], str] = None,
+    index: Optional[PlanningIndex] = None,
+    constraint_groups: Optional[ConstraintGroups] = None
 ):
     """
     HARD CONSTRAINT (within period) + SOFT (cross-month boundary):
@@ -423,29 +413,21 @@ def add_consecutive_shifts_constraints(
         shift_types: List of shift types with their max_consecutive_days settings
         previous_employee_shifts: Dict mapping (emp_id, date) -> shift_code for dates BEFORE planning period.
                                  Used to check consecutive shifts across month boundaries.
+        index: Lookup tables of the planning model (built from the other
+            arguments if omitted)
+        constraint_groups: Optional registry that records the within-period
+            hard limits of each employee as ("consecutive_days", emp_id)
     
     Returns:
         List of penalty variables for cross-month boundary violations only
     """
     consecutive_violation_penalties = []
     
-    # Build a mapping from shift code to shift type
-    shift_code_to_type = {st.code: st for st in shift_types}
-    
-    # Pre-compute date-to-week mapping for efficiency
-    date_to_week = {}
-    for week_idx, week_dates in enumerate(weeks):
-        for d in week_dates:
-            date_to_week[d] = week_idx
-    
-    # Pre-compute employee-to-team mapping for efficiency
-    emp_to_team = {}
-    for emp in employees:
-        if emp.team_id:
-            for team in teams:
-                if team.id == emp.team_id:
-                    emp_to_team[emp.id] = team
-                    break
+    # Employee-to-team and date-to-week lookups
+    if index is None:
+        index = PlanningIndex(employees=employees, teams=teams, weeks=weeks, shift_types=shift_types)
+    emp_to_team = index.team_by_employee_id
+    date_to_week = index.week_idx_by_date
     
     # Initialize previous_employee_shifts if not provided
     if previous_employee_shifts is None:
@@ -476,7 +458,7 @@ def add_consecutive_shifts_constraints(
     for emp in employees:
         for shift_code in shift_codes:
             # Get the shift type's max consecutive days setting
-            shift_type = shift_code_to_type.get(shift_code)
+            shift_type = index.shift_type_by_code.get(shift_code)
             if not shift_type:
                 continue
             
@@ -657,7 +639,9 @@ def add_consecutive_shifts_constraints(
                 
                 # HARD CONSTRAINT: At most max_consecutive_days of this shift type in any (max+1)-day window
                 if len(shift_indicators) == max_consecutive_days + 1:
-                    model.Add(sum(shift_indicators) <= max_consecutive_days)
+                    ct = model.Add(sum(shift_indicators) <= max_consecutive_days)
+                    if constraint_groups is not None:
+                        constraint_groups.add(("consecutive_days", emp.id), ct)
                     
                     # CROSS-SHIFT-TYPE ENFORCEMENT (HARD):
                     # After working max_consecutive_days of shift_code, employee must have a break
@@ -722,7 +706,10 @@ def add_consecutive_shifts_constraints(
                             model.Add(sum(any_shift_last_day_vars) == 0).OnlyEnforceIf(works_any_shift_last_day.Not())
                             
                             # Hard enforcement: after max_consecutive_days of this shift, day (max+1) must be free
-                            model.Add(works_any_shift_last_day == 0).OnlyEnforceIf(first_n_days_this_shift)
+                            ct = model.Add(works_any_shift_last_day == 0)
+                            ct.OnlyEnforceIf(first_n_days_this_shift)
+                            if constraint_groups is not None:
+                                constraint_groups.add(("consecutive_days", emp.id), ct)
     
     # TOTAL CONSECUTIVE WORKING DAYS CONSTRAINT:
     # Enforce maximum total consecutive working days across ALL shift types.
@@ -898,7 +885,9 @@ def add_consecutive_shifts_constraints(
             
             # HARD: At most max_total_consecutive working days in any (max+1)-day window
             if len(any_shift_indicators) == max_total_consecutive + 1:
-                model.Add(sum(any_shift_indicators) <= max_total_consecutive)
+                ct = model.Add(sum(any_shift_indicators) <= max_total_consecutive)
+                if constraint_groups is not None:
+                    constraint_groups.add(("consecutive_days", emp.id), ct)
     
     return consecutive_violation_penalties
 
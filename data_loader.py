@@ -3,14 +3,27 @@ Data loader for the shift planning system.
 Generates sample data or loads from external sources.
 """
 
+import sqlite3
 from datetime import date, timedelta
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+from db_pool import get_connection
 from entities import (
     Employee, Team, Absence, AbsenceType,
     ShiftAssignment, STANDARD_SHIFT_TYPES
 )
 
 
+def _connect(db_path: str):
+    """
+    Pooled connection to ``db_path`` (see db_pool).
+
+    The planning worker loads its data through here, so the pool's PRAGMAs
+    (WAL, busy_timeout, cache_size) apply and connections are reused across
+    jobs.  Rows are sqlite3.Row; close() hands the connection back.
+    """
+    return get_connection(db_path)
+
+
 def generate_sample_data() -> Tuple[List[Employee], List[Team], List[Absence]]:
     """
     Generate sample data for testing the shift planning system.
@@ -106,9 +119,7 @@ def load_rotation_groups_from_db(db_path: str) -> Dict[int, List[str]]:
     Returns:
         Dict mapping rotation_group_id to list of shift codes in rotation order
     """
-    import sqlite3
-    
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
     cursor = conn.cursor()
     
     rotation_patterns = {}
@@ -158,14 +169,13 @@ def load_global_settings(db_path: str) -> Dict:
         - max_consecutive_shifts_weeks: DEPRECATED - Now configured per shift type (ShiftType.max_consecutive_days)
         - max_consecutive_night_shifts_weeks: DEPRECATED - Now configured per shift type (ShiftType.max_consecutive_days)
         - min_rest_hours: Minimum rest hours between shifts (still used globally)
+        - solver_gap_limit_percent / solver_plateau_seconds: early-stop policy of
+          the solver stages (None = off, see solver.EarlyStopPolicy)
     
     Note: The max_consecutive_* values are kept for backward compatibility but are no longer
     used by the shift planning algorithm. Use ShiftType.max_consecutive_days instead.
     """
-    import sqlite3
-    
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    conn = _connect(db_path)
     cursor = conn.cursor()
     
     try:
@@ -173,10 +183,13 @@ def load_global_settings(db_path: str) -> Dict:
         row = cursor.fetchone()
         
         if row:
+            columns = row.keys()
             settings = {
                 'max_consecutive_shifts_weeks': row['MaxConsecutiveShifts'],  # In weeks
                 'max_consecutive_night_shifts_weeks': row['MaxConsecutiveNightShifts'],  # In weeks
-                'min_rest_hours': row['MinRestHoursBetweenShifts']
+                'min_rest_hours': row['MinRestHoursBetweenShifts'],
+                'solver_gap_limit_percent': row['SolverGapLimitPercent'] if 'SolverGapLimitPercent' in columns else None,
+                'solver_plateau_seconds': row['SolverPlateauSeconds'] if 'SolverPlateauSeconds' in columns else None,
             }
         else:
             # Default values if not found (same as DB defaults)
@@ -199,7 +212,40 @@ def load_global_settings(db_path: str) -> Dict:
     return settings
 
 
-def load_from_database(db_path: str = "dienstplan.db"):
+# Days before the planning start for which absences are still loaded by
+# load_planning_window(); matches the longest previous-shift lookback of the
+# planning job (max_lookback_days in api/shifts_planning_core.py).
+PLANNING_LOOKBACK_DAYS = 60
+
+
+def load_planning_window(db_path: str, start_date: date, end_date: date,
+                         lookback_days: int = PLANNING_LOOKBACK_DAYS):
+    """
+    Load the data needed to plan [start_date, end_date].
+
+    Same result as load_from_database(), but absences and approved vacation
+    requests are restricted to those overlapping
+    [start_date - lookback_days, end_date] instead of the full history.
+
+    Args:
+        db_path: Path to the SQLite database file
+        start_date: First day of the (extended) planning period
+        end_date: Last day of the (extended) planning period
+        lookback_days: Days before start_date that are still relevant
+
+    Returns:
+        Tuple of (employees, teams, absences, shift_types)
+    """
+    return load_from_database(
+        db_path,
+        start_date=start_date - timedelta(days=lookback_days),
+        end_date=end_date,
+    )
+
+
+def load_from_database(db_path: str = "dienstplan.db",
+                       start_date: Optional[date] = None,
+                       end_date: Optional[date] = None):
     """
     Load data from SQLite database (compatibility with .NET version).
     
@@ -208,15 +254,16 @@ def load_from_database(db_path: str = "dienstplan.db"):
     
     Args:
         db_path: Path to the SQLite database file
+        start_date: If given together with end_date, only absences and
+            vacation requests overlapping this range are loaded
+        end_date: See start_date
         
     Returns:
         Tuple of (employees, teams, absences, shift_types)
     """
-    import sqlite3
     from entities import ShiftType
     
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row  # Enable access by column name
+    conn = _connect(db_path)  # rows are sqlite3.Row (access by column name)
     cursor = conn.cursor()
     
     # Load shift types from database
@@ -391,10 +438,18 @@ def load_from_database(db_path: str = "dienstplan.db"):
     # Map database Type values to official AbsenceType codes
     # Old: 1=KRANK, 2=URLAUB, 3=LEHRGANG
     # New: AU=Sick, U=Vacation, L=Training
+    # Optional date window: absences overlapping [start_date, end_date]
+    # (dates are stored as ISO strings, so string comparison is date order)
+    window_sql = ""
+    window_params: Tuple = ()
+    if start_date is not None and end_date is not None:
+        window_sql = " AND EndDate >= ? AND StartDate <= ?"
+        window_params = (start_date.isoformat(), end_date.isoformat())
+
     cursor.execute("""
         SELECT Id, EmployeeId, Type, StartDate, EndDate, Notes
         FROM Absences
-    """)
+        WHERE 1 = 1""" + window_sql, window_params)
     absences = []
     for row in cursor.fetchall():
         # Map old integer types to new official codes
@@ -418,8 +473,7 @@ def load_from_database(db_path: str = "dienstplan.db"):
     cursor.execute("""
         SELECT Id, EmployeeId, StartDate, EndDate, Notes
         FROM VacationRequests
-        WHERE Status = 'Genehmigt'
-    """)
+        WHERE Status = 'Genehmigt'""" + window_sql, window_params)
     vacation_id_offset = 10000  # Offset to avoid ID conflicts with Absences table
     for row in cursor.fetchall():
         absence = Absence(
@@ -449,9 +503,7 @@ def get_existing_assignments(db_path: str, start_date: date, end_date: date) ->
     Returns:
         List of existing shift assignments
     """
-    import sqlite3
-    
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
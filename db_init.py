@@ -447,6 +447,8 @@ def create_database_schema(db_path: str = "dienstplan.db"):
             MaxConsecutiveShifts INTEGER NOT NULL DEFAULT 6,
             MaxConsecutiveNightShifts INTEGER NOT NULL DEFAULT 3,
             MinRestHoursBetweenShifts INTEGER NOT NULL DEFAULT 11,
+            SolverGapLimitPercent REAL,
+            SolverPlateauSeconds INTEGER,
             ModifiedAt TEXT,
             ModifiedBy TEXT
         )
@@ -525,17 +527,57 @@ def create_database_schema(db_path: str = "dienstplan.db"):
         )
     """)
 
-    # PlanningJobs table (tracks async planning job status and results)
+    # PlanningWarmStarts table (last solver solution per month, used as hints on re-plans)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS PlanningWarmStarts (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            year        INTEGER NOT NULL,
+            month       INTEGER NOT NULL,
+            created_at  TEXT    NOT NULL,
+            state_json  TEXT    NOT NULL,
+            UNIQUE (year, month)
+        )
+    """)
+
+    # PlanningResultCache table (solved plans by input fingerprint, see
+    # api/planning_cache.py; rows without schedule_json mark a running solve)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS PlanningResultCache (
+            fingerprint     TEXT PRIMARY KEY,
+            year            INTEGER NOT NULL,
+            month           INTEGER NOT NULL,
+            job_id          TEXT,
+            created_at      TEXT    NOT NULL,
+            schedule_json   TEXT,
+            report_status   TEXT,
+            report_json     TEXT,
+            warm_start_json TEXT
+        )
+    """)
+
+    # PlanningJobs table (persistent queue of async planning jobs, see
+    # api/planning_job_store.py: queued -> running (leased) -> success/error/cancelled)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS PlanningJobs (
-            id          TEXT PRIMARY KEY,
-            status      TEXT NOT NULL DEFAULT 'pending',
-            message     TEXT,
-            started_at  TEXT,
-            finished_at TEXT,
-            result_json TEXT
+            id               TEXT PRIMARY KEY,
+            status           TEXT NOT NULL DEFAULT 'pending',
+            message          TEXT,
+            started_at       TEXT,
+            finished_at      TEXT,
+            result_json      TEXT,
+            kind             TEXT,
+            params_json      TEXT,
+            priority         INTEGER NOT NULL DEFAULT 0,
+            queued_at        TEXT,
+            lease_owner      TEXT,
+            lease_expires_at TEXT,
+            attempts         INTEGER NOT NULL DEFAULT 0
         )
     """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_planningjobs_queue
+        ON PlanningJobs(status, priority, queued_at)
+    """)
 
     # Create indexes for performance
     cursor.execute("""
@@ -0,0 +1,230 @@
+"""
+SQLite connection pool shared by the API and the planning core.
+
+Every connection gets the tuned PRAGMAs (WAL, busy_timeout, cache_size, mmap)
+and idle connections are reused per database file and process.  Used by
+api.shared.Database and by data_loader, so this module only depends on the
+standard library: solver processes load their data without the web stack.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import threading
+from typing import Dict
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
+# Idle connections kept per database file and process.
+DB_POOL_SIZE = max(0, _env_int("DIENSTPLAN_DB_POOL_SIZE", 8))
+# WAL lets readers continue while a planning job commits.  Use DELETE for
+# database files on network shares, where WAL's shared memory is unsupported.
+DB_JOURNAL_MODE = os.environ.get("DIENSTPLAN_SQLITE_JOURNAL_MODE", "WAL").strip().upper() or "WAL"
+DB_BUSY_TIMEOUT_MS = max(0, _env_int("DIENSTPLAN_SQLITE_BUSY_TIMEOUT_MS", 5000))
+# Negative cache_size is in KiB (here: 20 MiB page cache per connection).
+DB_CACHE_SIZE = _env_int("DIENSTPLAN_SQLITE_CACHE_SIZE", -20000)
+DB_MMAP_SIZE = max(0, _env_int("DIENSTPLAN_SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+# Prepared statements cached per connection by the sqlite3 module.
+DB_CACHED_STATEMENTS = max(0, _env_int("DIENSTPLAN_SQLITE_CACHED_STATEMENTS", 256))
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+
+
+def _open_sqlite_connection(db_path: str) -> sqlite3.Connection:
+    """Open a connection with the tuned PRAGMAs used by every pooled connection."""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000.0,
+        check_same_thread=False,  # pooled connections are handed between request threads
+        cached_statements=DB_CACHED_STATEMENTS,
+    )
+    conn.execute("PRAGMA foreign_keys = ON")
+    if DB_JOURNAL_MODE in _JOURNAL_MODES:
+        conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size = {int(DB_CACHE_SIZE)}")
+    conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE)}")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class PooledConnection:
+    """
+    sqlite3.Connection proxy whose close() returns the connection to its pool.
+
+    Everything else (cursor, execute, commit, ``with conn:`` transactions, ...)
+    is delegated, so existing ``conn = db.get_connection() ... conn.close()``
+    code keeps working unchanged.
+    """
+
+    __slots__ = ("_conn", "_pool", "_file_id")
+
+    def __init__(self, conn: sqlite3.Connection, pool: "SQLiteConnectionPool", file_id=None):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_file_id", file_id)
+
+    def close(self) -> None:
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn, self._file_id)
+
+    def __getattr__(self, name):
+        conn = self._conn
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        # Connections that were never closed explicitly still go back to the pool.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class SQLiteConnectionPool:
+    """
+    Thread-safe pool of idle connections to one database file in one process.
+
+    Connections are opened lazily; at most ``max_idle`` are kept for reuse and
+    extra ones are closed on release.  A connection returned with an open
+    transaction is rolled back first, exactly as sqlite3's close() would do.
+    After a fork (planning worker processes) inherited connections are dropped
+    without touching them and the child opens its own.  Idle connections are
+    also dropped when the database file was replaced or deleted (restore from
+    a backup copy), so callers never keep working on the old file.
+    """
+
+    def __init__(self, db_path: str, max_idle: int = DB_POOL_SIZE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle: list = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._file_id = None
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._idle = []
+            self._pid = os.getpid()
+
+    def _current_file_id(self):
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def acquire(self) -> PooledConnection:
+        conn = None
+        stale: list = []
+        file_id = self._current_file_id()
+        with self._lock:
+            self._check_pid()
+            if file_id != self._file_id:
+                stale, self._idle = self._idle, []
+            elif self._idle:
+                conn = self._idle.pop()
+        for old in stale:
+            old.close()
+        if conn is None:
+            conn = _open_sqlite_connection(self.db_path)
+            # The file exists now even if it did not before the connect.
+            file_id = self._current_file_id()
+            with self._lock:
+                self._file_id = file_id
+        return PooledConnection(conn, self, file_id)
+
+    def release(self, conn: sqlite3.Connection, file_id=None) -> None:
+        if file_id != self._file_id:
+            conn.close()
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            self._check_pid()
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        """Close every idle connection (e.g. before deleting the database file)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(db_path: str) -> SQLiteConnectionPool:
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLiteConnectionPool(db_path)
+        return pool
+
+
+def close_connection_pools() -> None:
+    """Close all idle pooled connections of this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+def get_connection(db_path: str):
+    """Pooled connection to ``db_path``; close() hands it back to the pool."""
+    if db_path == ":memory:":
+        # Every in-memory connection is its own database - nothing to share.
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+    return _get_pool(db_path).acquire()
+
+
+def process_context():
+    """
+    multiprocessing context for worker processes of a process that uses SQLite.
+
+    A plain fork copies locks that other threads (requests, job progress,
+    cancellation watchdogs) hold at that moment into the child, which then
+    blocks forever in its first sqlite3.connect().  forkserver children start
+    from a clean single-threaded process; spawn where forkserver is missing
+    (Windows).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
@@ -0,0 +1,359 @@
+"""
+Decomposed solving of large sites by rotation group.
+
+Teams of different rotation groups (load_rotation_groups_from_db(),
+entities.RotationGroup) only interact through the shared daily staffing
+totals and cross-team assignments.  solve_decomposed() therefore:
+
+1. splits the teams into clusters, one per rotation group (teams without a
+   group form one cluster),
+2. solves every cluster as its own ShiftPlanningModel in a separate process
+   (full stage chain of solve_shift_planning()).  Each cluster gets its
+   share of the minimum / maximum staffing of every shift type, apportioned
+   by the team-weeks it works that shift under the rotation.  Team weeks are
+   pinned to the shift of the full model's rotation, because the rotation
+   offset depends on the position of a team among ALL teams,
+3. runs a coordinating solve_shift_planning() of the full model with the
+   merged cluster plans as warm-start hints.
+
+The clusters only see their apportioned share of the staffing limits.  The
+site-wide staffing per shift and day, cross-team assignments and every other
+rule that spans clusters are enforced by the coordinating solve alone: the
+merged cluster plan is a hint, not a constraint, and there is no separate
+merge step.  The returned plan is always the coordinating solve's result -
+its best full-model solution within coordination_time_limit_seconds, or the
+result of its fallback stages - however far that is from the cluster plans.
+How much of the merged cluster plan it kept is reported as
+"hints_kept_percent" in the DECOMPOSITION stage_metrics entry.
+
+With fewer than two clusters it is a plain solve_shift_planning() call.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import replace
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from constructive_planner import team_week_shifts
+from db_pool import process_context
+from entities import ShiftAssignment, ShiftType, Team
+from model import ShiftPlanningModel
+from planning_report import PlanningReport
+from solver import (
+    CANCEL_POLL_INTERVAL_SECONDS,
+    EarlyStopPolicy,
+    PlanningCancelled,
+    _default_num_workers,
+    _emit_progress,
+    _load_rotation_patterns,
+    solve_shift_planning,
+)
+
+# Time limit of the coordinating full-model solve (all of its stages).
+DECOMPOSITION_COORDINATION_TIME_LIMIT_SECONDS = 120
+
+
+def rotation_group_clusters(teams: List[Team]) -> List[List[Team]]:
+    """Teams grouped by rotation group (teams without a group together), ordered by group id."""
+    clusters: Dict[Optional[int], List[Team]] = {}
+    for team in sorted(teams, key=lambda t: t.id):
+        clusters.setdefault(team.rotation_group_id, []).append(team)
+    return [clusters[key] for key in sorted(clusters, key=lambda k: (k is None, k or 0))]
+
+
+def _apportion(total: int, weights: List[float]) -> List[int]:
+    """Split ``total`` proportionally to ``weights`` (largest remainder); shares sum to ``total``."""
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    quotas = [total * w / weight_sum for w in weights]
+    shares = [int(q) for q in quotas]
+    by_remainder = sorted(range(len(weights)), key=lambda i: (shares[i] - quotas[i], i))
+    for i in by_remainder[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def cluster_shift_types(
+    planning_model: ShiftPlanningModel,
+    clusters: List[List[Team]],
+    team_shift: Dict[Tuple[int, int], str],
+) -> List[List[ShiftType]]:
+    """
+    Shift types of every cluster with its share of the staffing limits.
+
+    A cluster's weight for a shift is the number of member-weeks its teams work
+    that shift under ``team_shift``; shifts outside every rotation (e.g. BMT)
+    are split by the members of teams allowed to work them.
+    """
+    index = planning_model.index
+    shift_codes = planning_model.shift_codes
+    result: List[List[ShiftType]] = [[] for _ in clusters]
+    for st in planning_model.shift_types:
+        weights = [
+            float(sum(
+                len(index.team_members.get(team.id, []))
+                for team in cluster
+                for week_idx in range(len(planning_model.weeks))
+                if team_shift.get((team.id, week_idx)) == st.code
+            ))
+            for cluster in clusters
+        ]
+        if not any(weights):
+            weights = [
+                float(sum(
+                    len(index.team_members.get(team.id, []))
+                    for team in cluster
+                    if st.code in index.allowed_shift_codes(team, shift_codes)
+                ))
+                for cluster in clusters
+            ]
+        shares = zip(
+            _apportion(st.min_staff_weekday, weights),
+            _apportion(st.max_staff_weekday, weights),
+            _apportion(st.min_staff_weekend, weights),
+            _apportion(st.max_staff_weekend, weights),
+        )
+        for cluster_types, (min_wd, max_wd, min_we, max_we) in zip(result, shares):
+            cluster_types.append(replace(
+                st,
+                min_staff_weekday=min_wd,
+                max_staff_weekday=max(max_wd, min_wd),
+                min_staff_weekend=min_we,
+                max_staff_weekend=max(max_we, min_we),
+            ))
+    return result
+
+
+def hints_kept_percent(
+    hints: Dict[Tuple[int, date], str],
+    schedule: Dict[Tuple[int, date], str],
+) -> float:
+    """Share of ``hints`` (in %) that ``schedule`` kept unchanged; 100.0 without hints."""
+    if not hints:
+        return 100.0
+    kept = sum(schedule.get(key) == code for key, code in hints.items())
+    return round(100.0 * kept / len(hints), 1)
+
+
+def _cluster_model_args(
+    planning_model: ShiftPlanningModel,
+    cluster: List[Team],
+    shift_types: List[ShiftType],
+    team_shift: Dict[Tuple[int, int], str],
+) -> Dict[str, Any]:
+    """Picklable ShiftPlanningModel arguments of one cluster."""
+    team_ids = {team.id for team in cluster}
+    employees = [emp for emp in planning_model.employees if emp.team_id in team_ids]
+    emp_ids = {emp.id for emp in employees}
+
+    def _of_employees(values: Dict) -> Dict:
+        return {key: value for key, value in values.items() if key[0] in emp_ids}
+
+    locked_team_shift = {key: code for key, code in team_shift.items() if key[0] in team_ids}
+    locked_team_shift.update(
+        (key, code) for key, code in planning_model.locked_team_shift.items() if key[0] in team_ids
+    )
+    return {
+        "employees": employees,
+        "teams": cluster,
+        "start_date": planning_model.original_start_date,
+        "end_date": planning_model.original_end_date,
+        "absences": [a for a in planning_model.absences if a.employee_id in emp_ids],
+        "shift_types": shift_types,
+        "locked_team_shift": locked_team_shift,
+        "locked_employee_weekend": _of_employees(planning_model.locked_employee_weekend),
+        "locked_absence": _of_employees(planning_model.locked_absence),
+        "locked_employee_shift": _of_employees(planning_model.locked_employee_shift),
+        "ytd_weekend_counts": {k: v for k, v in planning_model.ytd_weekend_counts.items() if k in emp_ids},
+        "ytd_night_counts": {k: v for k, v in planning_model.ytd_night_counts.items() if k in emp_ids},
+        "ytd_holiday_counts": {k: v for k, v in planning_model.ytd_holiday_counts.items() if k in emp_ids},
+        "previous_employee_shifts": _of_employees(planning_model.previous_employee_shifts),
+    }
+
+
+# Set in every cluster process by _init_cluster_process(); set by the parent to cancel.
+_cluster_stop_event = None
+
+
+def _init_cluster_process(stop_event) -> None:
+    global _cluster_stop_event
+    _cluster_stop_event = stop_event
+
+
+def _solve_cluster(
+    model_args: Dict[str, Any],
+    solve_args: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Solve one cluster (runs in a cluster process)."""
+    started = time.perf_counter()
+    stop_event = _cluster_stop_event
+    _, schedule, report = solve_shift_planning(
+        ShiftPlanningModel(**model_args),
+        should_stop=(lambda: stop_event.is_set()) if stop_event is not None else None,
+        **solve_args,
+    )
+    return {
+        "team_ids": [team.id for team in model_args["teams"]],
+        "employees": len(model_args["employees"]),
+        "status": report.status,
+        "objective_value": report.objective_value,
+        "seconds": round(time.perf_counter() - started, 3),
+        "schedule": schedule,
+    }
+
+
+def solve_decomposed(
+    planning_model: ShiftPlanningModel,
+    cluster_time_limit_seconds: Optional[int] = None,
+    coordination_time_limit_seconds: Optional[int] = DECOMPOSITION_COORDINATION_TIME_LIMIT_SECONDS,
+    num_workers: Optional[int] = None,
+    max_processes: Optional[int] = None,
+    global_settings: Dict = None,
+    warm_start_shifts: Optional[Dict[Tuple[int, date], str]] = None,
+    db_path: str = "dienstplan.db",
+    random_seed: Optional[int] = None,
+    progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    early_stop: Optional[EarlyStopPolicy] = None,
+) -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str], PlanningReport]:
+    """
+    Solve ``planning_model`` by rotation-group clusters plus a coordinating solve.
+
+    The result is the coordinating full-model solve's result; the cluster
+    plans only seed it as hints (see the module docstring).
+
+    Args:
+        planning_model: The shift planning model of the whole site
+        cluster_time_limit_seconds: time_limit_seconds of every cluster solve
+            (None: the stage defaults of solve_shift_planning())
+        coordination_time_limit_seconds: time_limit_seconds of the full-model solve
+        num_workers: CP-SAT worker budget, split across the concurrent cluster
+            solves; the coordinating solve uses all of it.  None uses all cores.
+        max_processes: Cluster processes running at the same time (default: one
+            per cluster)
+        global_settings, db_path, random_seed, early_stop: as for solve_shift_planning()
+        warm_start_shifts: Hints for the coordinating solve; the cluster plans
+            take precedence inside the planning period
+        progress_callback: Receives "decomposition_started" (clusters),
+            "decomposition_cluster_finished" (finished, clusters, status) and then
+            the events of the coordinating solve_shift_planning()
+        should_stop: Polled while the clusters run and passed to the coordinating
+            solve; cancels everything with PlanningCancelled
+
+    Returns:
+        Same 3-tuple as solve_shift_planning().  The report's stage_metrics start
+        with a "DECOMPOSITION" entry (clusters, their status and solve time,
+        hints_kept_percent of the merged cluster plan).
+    """
+    clusters = [
+        cluster for cluster in rotation_group_clusters(planning_model.teams)
+        if any(planning_model.index.team_members.get(team.id) for team in cluster)
+    ]
+    coordination_args = dict(
+        num_workers=num_workers,
+        global_settings=global_settings,
+        db_path=db_path,
+        random_seed=random_seed,
+        progress_callback=progress_callback,
+        should_stop=should_stop,
+        early_stop=early_stop,
+    )
+    if len(clusters) < 2:
+        return solve_shift_planning(
+            planning_model,
+            warm_start_shifts=warm_start_shifts,
+            **coordination_args,
+        )
+
+    started = time.perf_counter()
+    # Loaded once here and handed to every solve, so cluster processes never
+    # open the database.
+    rotation_patterns = _load_rotation_patterns(db_path) or {}
+    coordination_args["rotation_patterns"] = rotation_patterns
+    team_shift = team_week_shifts(planning_model, rotation_patterns)
+    shift_types = cluster_shift_types(planning_model, clusters, team_shift)
+    process_count = min(max_processes or len(clusters), len(clusters))
+    worker_budget = num_workers if num_workers is not None else _default_num_workers()
+    cluster_workers = max(1, worker_budget // process_count)
+
+    print("\n" + "=" * 60)
+    print(f"DEKOMPOSITION: {len(clusters)} Rotationsgruppen-Cluster, "
+          f"{process_count} Prozesse (Worker je Prozess: {cluster_workers})")
+    print("=" * 60)
+    _emit_progress(progress_callback, "decomposition_started", clusters=len(clusters))
+
+    # The planning job already runs progress and watchdog threads: no plain fork.
+    context = process_context()
+    stop_event = context.Event()
+    cluster_results: List[Optional[Dict[str, Any]]] = [None] * len(clusters)
+    with ProcessPoolExecutor(
+        max_workers=process_count,
+        mp_context=context,
+        initializer=_init_cluster_process,
+        initargs=(stop_event,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _solve_cluster,
+                _cluster_model_args(planning_model, cluster, shift_types[i], team_shift),
+                {
+                    "time_limit_seconds": cluster_time_limit_seconds,
+                    "num_workers": cluster_workers,
+                    "global_settings": global_settings,
+                    "db_path": db_path,
+                    "random_seed": random_seed,
+                    "early_stop": early_stop,
+                    "rotation_patterns": rotation_patterns,
+                },
+            ): i
+            for i, cluster in enumerate(clusters)
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+            if should_stop is not None and should_stop():
+                stop_event.set()
+                for future in pending:
+                    future.cancel()
+                raise PlanningCancelled("Planung wurde abgebrochen")
+            for future in done:
+                i = futures[future]
+                cluster_results[i] = future.result()
+                finished = sum(result is not None for result in cluster_results)
+                print(f"  Cluster {i + 1}/{len(clusters)} "
+                      f"(Teams {cluster_results[i]['team_ids']}): {cluster_results[i]['status']} "
+                      f"in {cluster_results[i]['seconds']:.1f}s")
+                _emit_progress(
+                    progress_callback,
+                    "decomposition_cluster_finished",
+                    finished=finished,
+                    clusters=len(clusters),
+                    status=cluster_results[i]["status"],
+                )
+    decomposition_seconds = time.perf_counter() - started
+
+    cluster_plan: Dict[Tuple[int, date], str] = {}
+    for result in cluster_results:
+        cluster_plan.update(result.pop("schedule"))
+    hints = {**(warm_start_shifts or {}), **cluster_plan}
+
+    print(f"\nKoordinierender Gesamtlauf mit {len(hints)} Hinweisen aus den Clustern")
+    assignments, schedule, report = solve_shift_planning(
+        planning_model,
+        time_limit_seconds=coordination_time_limit_seconds,
+        warm_start_shifts=hints,
+        **coordination_args,
+    )
+    kept = hints_kept_percent(cluster_plan, schedule)
+    print(f"Koordinierender Gesamtlauf: {report.status}, {kept:.1f}% der Cluster-Pläne übernommen")
+    report.stage_metrics.insert(0, {
+        "stage": "DECOMPOSITION",
+        "label": "Dekomposition nach Rotationsgruppen",
+        "clusters": cluster_results,
+        "processes": process_count,
+        "solve_seconds": round(decomposition_seconds, 3),
+        "hints_kept_percent": kept,
+    })
+    return assignments, schedule, report
@@ -10,7 +10,7 @@ import sys
 from datetime import date, timedelta
 from typing import Optional
 
-from data_loader import generate_sample_data, load_from_database
+from data_loader import generate_sample_data, load_planning_window
 from db_init import initialize_database, run_migrations
 from model import create_shift_planning_model
 from solver import solve_shift_planning
@@ -50,7 +50,7 @@ def run_cli_planning(
     else:
         logger.info(f"Loading data from database: {db_path}")
         try:
-            employees, teams, absences, shift_types = load_from_database(db_path)
+            employees, teams, absences, shift_types = load_planning_window(db_path, start_date, end_date)
         except Exception as e:
             logger.error(f"Error loading database: {e}")
             logger.warning("Using sample data instead...")
@@ -208,6 +208,28 @@ def start_web_server(host: str = "0.0.0.0", port: int = 5000, db_path: str = "di
     )
 
 
+def start_planning_worker(db_path: str = "dienstplan.db"):
+    """
+    Run a dedicated planner process that drains the planning job queue.
+
+    Web processes queue jobs in the PlanningJobs table; any number of these
+    workers (on this or other hosts sharing the database) run them.  Start
+    the web server with DIENSTPLAN_EMBEDDED_PLANNING_WORKER=false to leave
+    all planning to the dedicated workers.
+
+    Args:
+        db_path: Path to SQLite database
+    """
+    from api.planning_worker import run_planning_worker
+
+    if not os.path.exists(db_path):
+        logger.error(f"Database {db_path} not found. Run 'python main.py init-db' first.")
+        return 1
+    run_migrations(db_path)
+    run_planning_worker(db_path)
+    return 0
+
+
 def main():
     """Main entry point with argument parsing"""
     parser = argparse.ArgumentParser(
@@ -288,6 +310,15 @@ def main():
         help="Enable debug mode (WARNING: Only for development!)"
     )
     
+    # Dedicated planner process command
+    worker_parser = subparsers.add_parser("worker", help="Run queued planning jobs")
+    worker_parser.add_argument(
+        "--db",
+        type=str,
+        default="dienstplan.db",
+        help="Path to SQLite database (default: dienstplan.db)"
+    )
+    
     args = parser.parse_args()
     
     if args.command == "init-db":
@@ -309,6 +340,9 @@ def main():
         start_web_server(args.host, args.port, args.db, args.debug)
         return 0
     
+    elif args.command == "worker":
+        return start_planning_worker(args.db)
+    
     else:
         parser.print_help()
         return 1
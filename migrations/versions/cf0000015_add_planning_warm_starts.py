@@ -0,0 +1,35 @@
+"""Add PlanningWarmStarts table.
+
+Stores the last successful solver solution of each planning month in a compact
+JSON form so that re-planning the same month can warm-start CP-SAT from it.
+
+Revision ID: cf0000015
+Revises: ce0000014
+Create Date: 2026-10-16
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 'cf0000015'
+down_revision = 'ce0000014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS PlanningWarmStarts (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            year       INTEGER NOT NULL,
+            month      INTEGER NOT NULL,
+            created_at TEXT    NOT NULL,
+            state_json TEXT    NOT NULL,
+            UNIQUE (year, month)
+        )
+    """))
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS PlanningWarmStarts")
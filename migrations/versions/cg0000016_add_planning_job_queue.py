@@ -0,0 +1,65 @@
+"""Turn PlanningJobs into a persistent job queue.
+
+Adds the columns needed to queue planning jobs in the database and let any
+worker process claim them with a lease:
+
+- kind / params_json: which job to run ('plan', 'repair') and its arguments
+- priority / queued_at: queue order (higher priority first, then FIFO)
+- lease_owner / lease_expires_at: worker currently running the job
+- attempts: how often the job was claimed (jobs of crashed workers are retried)
+
+Jobs that were 'running' before the upgrade lived only in the memory of the
+old process and cannot be resumed; they are marked as failed.
+
+Revision ID: cg0000016
+Revises: cf0000015
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+
+from alembic import op
+from sqlalchemy import text
+
+revision = 'cg0000016'
+down_revision = 'cf0000015'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = [
+    ("kind", "TEXT"),
+    ("params_json", "TEXT"),
+    ("priority", "INTEGER NOT NULL DEFAULT 0"),
+    ("queued_at", "TEXT"),
+    ("lease_owner", "TEXT"),
+    ("lease_expires_at", "TEXT"),
+    ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_info(PlanningJobs)"))}
+    for name, definition in _COLUMNS:
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE PlanningJobs ADD COLUMN {name} {definition}"))
+
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_planningjobs_queue
+        ON PlanningJobs(status, priority, queued_at)
+    """))
+    conn.execute(
+        text("""
+            UPDATE PlanningJobs
+            SET status = 'error',
+                message = 'Planungsjob wurde durch einen Neustart unterbrochen.',
+                finished_at = :now
+            WHERE status = 'running'
+        """),
+        {"now": datetime.utcnow().isoformat()},
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_planningjobs_queue")
+    for name, _definition in reversed(_COLUMNS):
+        op.execute(f"ALTER TABLE PlanningJobs DROP COLUMN {name}")
@@ -0,0 +1,36 @@
+"""Add early-stop settings for the CP-SAT solver to GlobalSettings.
+
+- SolverGapLimitPercent: stop a solver stage once the relative gap to the best
+  bound is at most this many percent (NULL = off)
+- SolverPlateauSeconds: stop a solver stage when the objective has not
+  improved for this many seconds (NULL = off)
+
+Revision ID: ch0000017
+Revises: cg0000016
+Create Date: 2026-10-17
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 'ch0000017'
+down_revision = 'cg0000016'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = [
+    ("SolverGapLimitPercent", "REAL"),
+    ("SolverPlateauSeconds", "INTEGER"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_info(GlobalSettings)"))}
+    for name, definition in _COLUMNS:
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE GlobalSettings ADD COLUMN {name} {definition}"))
+
+
+def downgrade() -> None:
+    for name, _definition in reversed(_COLUMNS):
+        op.execute(f"ALTER TABLE GlobalSettings DROP COLUMN {name}")
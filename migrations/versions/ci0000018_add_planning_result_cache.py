@@ -0,0 +1,40 @@
+"""Add PlanningResultCache table.
+
+Stores successful planning results under a fingerprint of the solver input,
+so planning a month again with unchanged data reuses the result instead of
+solving it again (see api/planning_cache.py).  Rows without schedule_json
+mark a fingerprint that a running job is solving.
+
+Revision ID: ci0000018
+Revises: ch0000017
+Create Date: 2026-10-17
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 'ci0000018'
+down_revision = 'ch0000017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS PlanningResultCache (
+            fingerprint     TEXT PRIMARY KEY,
+            year            INTEGER NOT NULL,
+            month           INTEGER NOT NULL,
+            job_id          TEXT,
+            created_at      TEXT    NOT NULL,
+            schedule_json   TEXT,
+            report_status   TEXT,
+            report_json     TEXT,
+            warm_start_json TEXT
+        )
+    """))
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS PlanningResultCache")
@@ -10,8 +10,143 @@ Important: This model implements team-based shift planning where:
 
 from ortools.sat.python import cp_model
 from datetime import date, timedelta
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Optional, Tuple
 from entities import Employee, Absence, ShiftType, STANDARD_SHIFT_TYPES, Team
+from absence_calendar import AbsenceCalendar, deduplicate_absences
+
+
+class PlanningIndex:
+    """
+    Lookup tables over the static planning input, built once per model.
+
+    Constraint builders iterate employees x dates x shifts; resolving an
+    employee's team, a date's week or an absence by scanning the input lists
+    inside those loops makes model construction quadratic. ShiftPlanningModel
+    exposes one instance as ``planning_model.index``; builders called without
+    one (e.g. directly from tests) construct their own from the lists they get.
+    """
+
+    def __init__(
+        self,
+        employees: List[Employee] = None,
+        teams: List[Team] = None,
+        weeks: List[List[date]] = None,
+        absences: List[Absence] = None,
+        shift_types: List[ShiftType] = None,
+    ):
+        """
+        Build the lookup tables.
+
+        Args:
+            employees: List of all employees
+            teams: List of teams
+            weeks: Planning weeks (list of date lists), as in ShiftPlanningModel.weeks
+            absences: List of employee absences
+            shift_types: List of shift types
+        """
+        employees = employees or []
+        teams = teams or []
+        weeks = weeks or []
+        absences = absences or []
+        shift_types = shift_types or []
+
+        # emp_id -> Employee and team_id -> Team
+        self.employee_by_id: Dict[int, Employee] = {emp.id: emp for emp in employees}
+        self.team_by_id: Dict[int, Team] = {team.id: team for team in teams}
+
+        # emp_id -> Team (employees without a known team are omitted)
+        self.team_by_employee_id: Dict[int, Team] = {
+            emp.id: self.team_by_id[emp.team_id]
+            for emp in employees
+            if emp.team_id and emp.team_id in self.team_by_id
+        }
+
+        # team_id -> members (in employee list order)
+        self.team_members: Dict[int, List[Employee]] = {team.id: [] for team in teams}
+        for emp in employees:
+            if emp.team_id:
+                self.team_members.setdefault(emp.team_id, []).append(emp)
+
+        # date -> week_idx
+        self.week_idx_by_date: Dict[date, int] = {
+            d: week_idx for week_idx, week_dates in enumerate(weeks) for d in week_dates
+        }
+
+        # shift_code -> ShiftType and shift_type_id -> ShiftType (first match wins,
+        # like the linear lookups they replace)
+        self.shift_type_by_code: Dict[str, ShiftType] = {}
+        self.shift_type_by_id: Dict[int, ShiftType] = {}
+        for st in shift_types:
+            self.shift_type_by_code.setdefault(st.code, st)
+            self.shift_type_by_id.setdefault(st.id, st)
+
+        # Absence lookups: O(1) for every day of the planning weeks, binary
+        # search over the per-employee intervals for dates outside them.
+        self.absence_calendar = AbsenceCalendar(
+            absences,
+            window_start=min(self.week_idx_by_date) if self.week_idx_by_date else None,
+            window_end=max(self.week_idx_by_date) if self.week_idx_by_date else None,
+        )
+
+    def team_of(self, emp: Employee) -> Optional[Team]:
+        """Return the team of an employee, or None if the employee has no (known) team."""
+        if not emp.team_id:
+            return None
+        return self.team_by_id.get(emp.team_id)
+
+    def week_index(self, d: date) -> Optional[int]:
+        """Return the index of the week containing d, or None if d is outside the planning weeks."""
+        return self.week_idx_by_date.get(d)
+
+    def absence_on(self, emp_id: int, d: date) -> Optional[Absence]:
+        """Return the absence of an employee on a date, or None if the employee is present."""
+        return self.absence_calendar.absence_on(emp_id, d)
+
+    def has_absence(self, emp_id: int, d: date) -> bool:
+        """Check if an employee has an absence on a specific date."""
+        return self.absence_calendar.is_absent(emp_id, d)
+
+    def allowed_shift_codes(self, team: Team, default: List[str]) -> List[str]:
+        """
+        Return the shift codes a team may work.
+
+        Teams without allowed_shift_type_ids may work every code in default.
+        """
+        if not team.allowed_shift_type_ids:
+            return default
+        return [
+            self.shift_type_by_id[shift_type_id].code
+            for shift_type_id in team.allowed_shift_type_ids
+            if shift_type_id in self.shift_type_by_id
+        ]
+
+
+class ConstraintGroups:
+    """
+    Hard constraints of the model grouped by the rule and object they enforce.
+
+    A key is a tuple starting with the group kind, e.g.
+    ``("min_staffing", "F", date)``, ``("team_rotation", team_id, week_idx)``
+    or ``("employee_lock", emp_id, date)``. Builders that receive an instance
+    record the proto index of every hard constraint they add; the solver's
+    explain mode (ShiftPlanningSolver.find_infeasibility_core) guards each
+    group with one assumption literal to find a minimal conflicting set.
+    """
+
+    def __init__(self):
+        # key -> indices into model.Proto().constraints
+        self.indices: Dict[Tuple, List[int]] = {}
+
+    def add(self, key: Tuple, constraint):
+        """Record constraint under key and return it (for OnlyEnforceIf chaining)."""
+        self.indices.setdefault(key, []).append(constraint.Index())
+        return constraint
+
+    def keys(self) -> List[Tuple]:
+        return list(self.indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
 
 
 class ShiftPlanningModel:
@@ -34,7 +169,8 @@ class ShiftPlanningModel:
         ytd_weekend_counts: Dict[int, int] = None,
         ytd_night_counts: Dict[int, int] = None,
         ytd_holiday_counts: Dict[int, int] = None,
-        previous_employee_shifts: Dict[Tuple[int, date], str] = None
+        previous_employee_shifts: Dict[Tuple[int, date], str] = None,
+        fixed_employee_days: Dict[Tuple[int, date], Optional[str]] = None
     ):
         """
         Initialize the shift planning model.
@@ -56,6 +192,9 @@ class ShiftPlanningModel:
             previous_employee_shifts: Dict mapping (emp_id, date) -> shift_code for dates BEFORE planning period.
                                      Used to check consecutive shifts across month boundaries.
                                      Should contain shifts from up to max_consecutive_days before start_date.
+            fixed_employee_days: Dict mapping (emp_id, date) -> shift_code or None (day off).
+                                 Unlike locked_employee_shift, every variable of the employee on
+                                 that day is fixed, so the solver can neither add nor move a shift.
         
         Note:
             shift_types MUST be loaded from the database. STANDARD_SHIFT_TYPES should only
@@ -76,24 +215,7 @@ class ShiftPlanningModel:
         # (employee_id, date) pair not already covered by a previously-seen absence.
         # This prevents duplicate constraint registrations in the CP-SAT model when
         # the same employee has overlapping or identical absence records.
-        seen_absence_days: Set[Tuple[int, date]] = set()
-        deduplicated_absences = []
-        for absence in (absences or []):
-            # Check if this absence has any day not already covered
-            has_new_day = False
-            for day_offset in range((absence.end_date - absence.start_date).days + 1):
-                key = (absence.employee_id, absence.start_date + timedelta(days=day_offset))
-                if key not in seen_absence_days:
-                    has_new_day = True
-                    break
-            if has_new_day:
-                # Mark all days of this absence so subsequent absences can skip duplicates
-                for day_offset in range((absence.end_date - absence.start_date).days + 1):
-                    seen_absence_days.add(
-                        (absence.employee_id, absence.start_date + timedelta(days=day_offset))
-                    )
-                deduplicated_absences.append(absence)
-        self.absences = deduplicated_absences
+        self.absences = deduplicate_absences(absences or [])
         # shift_types is REQUIRED and must be loaded from database
         # STANDARD_SHIFT_TYPES should only be used for DB initialization, not at runtime
         if not shift_types:
@@ -110,6 +232,9 @@ class ShiftPlanningModel:
         # Previous shifts for cross-month consecutive days checking
         self.previous_employee_shifts = previous_employee_shifts or {}
         
+        # Employee days that must keep their current shift or day off exactly (repair planning)
+        self.fixed_employee_days = fixed_employee_days or {}
+        
         # Year-to-date statistics for fairness tracking
         self.ytd_weekend_counts = ytd_weekend_counts or {}
         self.ytd_night_counts = ytd_night_counts or {}
@@ -149,6 +274,19 @@ class ShiftPlanningModel:
             self.dates.append(current)
             current += timedelta(days=1)
         
+        # Generate weeks (Sunday to Saturday)
+        self.weeks = self._generate_weeks()
+        
+        # Lookup tables (emp→team, team→members, date→week_idx, (emp,date)→absence,
+        # shift_code→ShiftType) shared by the model and all constraint builders
+        self.index = PlanningIndex(
+            employees=self.employees,
+            teams=self.teams,
+            weeks=self.weeks,
+            absences=self.absences,
+            shift_types=self.shift_types,
+        )
+        
         # Determine which shift codes to include in the model
         # Include F, S, N for standard rotation
         # Also include any other shifts that teams are configured to work
@@ -162,19 +300,11 @@ class ShiftPlanningModel:
         # Add any shifts that teams are explicitly configured to work
         for team in self.teams:
             if team.allowed_shift_type_ids:
-                for shift_type_id in team.allowed_shift_type_ids:
-                    # Find the shift type code for this ID
-                    for st in self.shift_types:
-                        if st.id == shift_type_id:
-                            shift_codes_set.add(st.code)
-                            break
+                shift_codes_set.update(self.index.allowed_shift_codes(team, []))
         
         # Convert to sorted list for consistency
         self.shift_codes = sorted(list(shift_codes_set))
         
-        # Generate weeks (Monday to Sunday)
-        self.weeks = self._generate_weeks()
-        
         # Decision variables
         self.team_shift = {}  # team_shift[team_id, week_idx, shift_code] = 0 or 1
         self.employee_active = {}  # employee_active[employee_id, date] = 0 or 1 (derived from team shift)
@@ -182,9 +312,14 @@ class ShiftPlanningModel:
         self.employee_cross_team_shift = {}  # employee_cross_team_shift[emp_id, date, shift_code] = 0 or 1 (cross-team weekday work)
         self.employee_cross_team_weekend = {}  # employee_cross_team_weekend[emp_id, date, shift_code] = 0 or 1 (cross-team weekend work)
         
+        # Hard constraints by rule and object (locks here, staffing/rotation/
+        # consecutive days in the constraint builders); used by the explain mode
+        self.constraint_groups = ConstraintGroups()
+        
         # Build the model
         self._create_decision_variables()
         self._apply_locked_assignments()
+        self._apply_fixed_employee_days()
     
     
     def _employee_has_absence_on_date(self, emp_id: int, check_date: date) -> bool:
@@ -198,10 +333,7 @@ class ShiftPlanningModel:
         Returns:
             True if employee has an absence on this date, False otherwise
         """
-        return any(
-            abs.employee_id == emp_id and abs.overlaps_date(check_date)
-            for abs in self.absences
-        )
+        return self.index.has_absence(emp_id, check_date)
     
     
     def _employee_has_absence_in_week(self, emp_id: int, week_dates: List[date]) -> bool:
@@ -215,10 +347,9 @@ class ShiftPlanningModel:
         Returns:
             True if employee has an absence on any day in the week, False otherwise
         """
-        return any(
-            self._employee_has_absence_on_date(emp_id, d)
-            for d in week_dates
-        )
+        if not week_dates:
+            return False
+        return self.index.absence_calendar.absent_between(emp_id, min(week_dates), max(week_dates))
     
     
     def _apply_locked_assignments(self):
@@ -242,8 +373,7 @@ class ShiftPlanningModel:
         # Apply locked employee shift assignments (from previous planning periods)
         # This prevents double shifts when planning across months
         
-        # Create employee ID mapping for efficient lookups
-        emp_by_id = {emp.id: emp for emp in self.employees}
+        emp_by_id = self.index.employee_by_id
         
         for (emp_id, d), shift_code in self.locked_employee_shift.items():
             # CRITICAL FIX: Check for conflicts with absences BEFORE adding constraints
@@ -269,13 +399,8 @@ class ShiftPlanningModel:
             
             # CRITICAL FIX: Determine if this date is in a week that spans month boundaries
             # Find which week this date belongs to
-            week_idx_for_date = None
-            week_dates_for_date = None
-            for idx, week_dates in enumerate(self.weeks):
-                if d in week_dates:
-                    week_idx_for_date = idx
-                    week_dates_for_date = week_dates
-                    break
+            week_idx_for_date = self.index.week_index(d)
+            week_dates_for_date = self.weeks[week_idx_for_date] if week_idx_for_date is not None else None
             
             # Check if this week spans boundaries
             date_in_boundary_week = False
@@ -332,11 +457,17 @@ class ShiftPlanningModel:
             if d.weekday() < 5:  # Monday to Friday
                 if (emp_id, d) in self.employee_active:
                     # Force employee to be active on this date
-                    self.model.Add(self.employee_active[(emp_id, d)] == 1)
+                    self.constraint_groups.add(
+                        ("employee_lock", emp_id, d),
+                        self.model.Add(self.employee_active[(emp_id, d)] == 1),
+                    )
             else:  # Weekend
                 if (emp_id, d) in self.employee_weekend_shift:
                     # Force employee to work on this weekend day
-                    self.model.Add(self.employee_weekend_shift[(emp_id, d)] == 1)
+                    self.constraint_groups.add(
+                        ("employee_lock", emp_id, d),
+                        self.model.Add(self.employee_weekend_shift[(emp_id, d)] == 1),
+                    )
             
             # Additionally, update the consolidated team lock for this employee's team/week
             if emp and emp.team_id and week_idx_for_date is not None:
@@ -352,7 +483,10 @@ class ShiftPlanningModel:
                 # Force this team to have this shift in this week
                 # Note: Other shifts for this team/week are implicitly set to 0
                 # by the "exactly one shift per team per week" constraint
-                self.model.Add(self.team_shift[(team_id, week_idx, shift_code)] == 1)
+                self.constraint_groups.add(
+                    ("team_lock", team_id, week_idx),
+                    self.model.Add(self.team_shift[(team_id, week_idx, shift_code)] == 1),
+                )
         
         # Apply locked employee weekend work
         for (emp_id, d), is_working in self.locked_employee_weekend.items():
@@ -370,7 +504,56 @@ class ShiftPlanningModel:
             
             if (emp_id, d) in self.employee_weekend_shift:
                 # Force employee to work (1) or not work (0) on this weekend day
-                self.model.Add(self.employee_weekend_shift[(emp_id, d)] == (1 if is_working else 0))
+                self.constraint_groups.add(
+                    ("weekend_lock", emp_id, d),
+                    self.model.Add(self.employee_weekend_shift[(emp_id, d)] == (1 if is_working else 0)),
+                )
+    
+    
+    def _apply_fixed_employee_days(self):
+        """
+        Fix every decision variable of the employee days in fixed_employee_days.
+        
+        The employee works the given shift either with the team (presence variable
+        set and the team has that shift this week) or cross-team; every other
+        cross-team variable of the day is 0.  None fixes a day off.  Days with an
+        absence are skipped (the absence already forces a day off), as are shift
+        codes the model does not plan: the employee is off in the model and the
+        stored shift stays untouched.
+        """
+        for (emp_id, d), shift_code in self.fixed_employee_days.items():
+            if self._employee_has_absence_on_date(emp_id, d):
+                continue
+            week_idx = self.index.week_index(d)
+            if week_idx is None:
+                continue
+            emp = self.index.employee_by_id.get(emp_id)
+            weekday = d.weekday() < 5
+            presence = (self.employee_active if weekday else self.employee_weekend_shift).get((emp_id, d))
+            cross_vars = self.employee_cross_team_shift if weekday else self.employee_cross_team_weekend
+            working = [] if presence is None else [presence]
+            for code in self.shift_codes:
+                cross = cross_vars.get((emp_id, d, code))
+                if cross is None:
+                    continue
+                if code == shift_code:
+                    working.append(cross)
+                else:
+                    self.constraint_groups.add(("employee_lock", emp_id, d), self.model.Add(cross == 0))
+            team_var = None
+            if emp and emp.team_id and shift_code is not None:
+                team_var = self.team_shift.get((emp.team_id, week_idx, shift_code))
+            if presence is not None and team_var is None:
+                # Without the team shift the presence variable cannot stand for shift_code
+                self.constraint_groups.add(("employee_lock", emp_id, d), self.model.Add(presence == 0))
+                working.remove(presence)
+            elif presence is not None:
+                ct = self.model.Add(team_var == 1)
+                ct.OnlyEnforceIf(presence)
+                self.constraint_groups.add(("employee_lock", emp_id, d), ct)
+            works = 1 if shift_code is not None and working else 0
+            if working:
+                self.constraint_groups.add(("employee_lock", emp_id, d), self.model.Add(sum(working) == works))
     
     
     def _generate_weeks(self) -> List[List[date]]:
@@ -459,28 +642,15 @@ class ShiftPlanningModel:
                 continue
             
             # Find employee's team
-            emp_team = None
-            for t in self.teams:
-                if t.id == emp.team_id:
-                    emp_team = t
-                    break
+            emp_team = self.index.team_of(emp)
             
             if not emp_team:
                 continue
             
             # Determine which shifts this employee can work cross-team
             # RULE: Employee can only work shifts that their team is allowed to work
-            allowed_shift_codes = []
-            if emp_team.allowed_shift_type_ids:
-                # Team has specific allowed shifts
-                for shift_type_id in emp_team.allowed_shift_type_ids:
-                    for st in self.shift_types:
-                        if st.id == shift_type_id:
-                            allowed_shift_codes.append(st.code)
-                            break
-            else:
-                # No restriction - can work all shifts (backward compatibility)
-                allowed_shift_codes = self.shift_codes
+            # (no restriction = all shifts, for backward compatibility)
+            allowed_shift_codes = self.index.allowed_shift_codes(emp_team, self.shift_codes)
             
             # Create cross-team variables for weekdays
             for d in self.dates:
@@ -521,30 +691,30 @@ class ShiftPlanningModel:
     
     def get_team_by_id(self, team_id: int) -> Team:
         """Get team by ID"""
-        for team in self.teams:
-            if team.id == team_id:
-                return team
+        team = self.index.team_by_id.get(team_id)
+        if team is not None:
+            return team
         raise ValueError(f"Team {team_id} not found")
     
     def get_employee_by_id(self, emp_id: int) -> Employee:
         """Get employee by ID"""
-        for emp in self.employees:
-            if emp.id == emp_id:
-                return emp
+        emp = self.index.employee_by_id.get(emp_id)
+        if emp is not None:
+            return emp
         raise ValueError(f"Employee {emp_id} not found")
     
     def get_shift_type_by_code(self, code: str) -> ShiftType:
         """Get shift type by code"""
-        for st in self.shift_types:
-            if st.code == code:
-                return st
+        st = self.index.shift_type_by_code.get(code)
+        if st is not None:
+            return st
         raise ValueError(f"Shift type {code} not found")
     
     def get_week_index(self, d: date) -> int:
         """Get the week index for a given date"""
-        for week_idx, week_dates in enumerate(self.weeks):
-            if d in week_dates:
-                return week_idx
+        week_idx = self.index.week_index(d)
+        if week_idx is not None:
+            return week_idx
         raise ValueError(f"Date {d} not in any week")
     
     def print_model_statistics(self):
@@ -558,7 +728,7 @@ class ShiftPlanningModel:
         print(f"Number of weeks: {actual_weeks:.1f} (approx {len(self.weeks)} calendar weeks)")
         print(f"Number of teams: {len(self.teams)}")
         for team in self.teams:
-            team_members = [e for e in self.employees if e.team_id == team.id]
+            team_members = self.index.team_members.get(team.id, [])
             print(f"  - {team.name}: {len(team_members)} members")
         print(f"Number of employees: {len(self.employees)}")
         print(f"  - In teams: {len([e for e in self.employees if e.team_id])}")
@@ -585,7 +755,8 @@ def create_shift_planning_model(
     locked_employee_weekend: Dict[Tuple[int, date], bool] = None,
     locked_absence: Dict[Tuple[int, date], str] = None,
     locked_employee_shift: Dict[Tuple[int, date], str] = None,
-    previous_employee_shifts: Dict[Tuple[int, date], str] = None
+    previous_employee_shifts: Dict[Tuple[int, date], str] = None,
+    fixed_employee_days: Dict[Tuple[int, date], Optional[str]] = None
 ) -> ShiftPlanningModel:
     """
     Factory function to create a shift planning model.
@@ -602,6 +773,8 @@ def create_shift_planning_model(
         locked_absence: Dict mapping (emp_id, date) -> absence_code (U/AU/L) (manual overrides)
         locked_employee_shift: Dict mapping (emp_id, date) -> shift_code (existing assignments from previous planning)
         previous_employee_shifts: Dict mapping (emp_id, date) -> shift_code for dates BEFORE planning period
+        fixed_employee_days: Dict mapping (emp_id, date) -> shift_code or None (day off), every
+                             variable of that employee day is fixed (repair planning)
         
     Returns:
         ShiftPlanningModel instance
@@ -624,7 +797,8 @@ def create_shift_planning_model(
         ytd_weekend_counts=None,
         ytd_night_counts=None,
         ytd_holiday_counts=None,
-        previous_employee_shifts=previous_employee_shifts
+        previous_employee_shifts=previous_employee_shifts,
+        fixed_employee_days=fixed_employee_days
     )
 
 
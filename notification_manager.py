@@ -8,9 +8,11 @@ This module provides functions to:
 """
 
 from datetime import date, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Set, Tuple, Optional
 import sqlite3
 
+from absence_calendar import load_absence_calendar
+
 
 # Date format for German locale
 DATE_FORMAT_DE = '%d.%m.%Y'
@@ -152,28 +154,41 @@ def check_absence_impact(
     absence_codes = {1: 'Krank / AU', 2: 'Urlaub', 3: 'Lehrgang'}
     absence_name = absence_codes.get(absence_type, 'Abwesenheit')
     
+    # Load everything for the absence period once instead of querying per day
+    # (same counting as check_staffing_for_date(): assigned and not absent)
+    staffing_reqs = get_staffing_requirements(conn)
+    absence_calendar = load_absence_calendar(conn, start_date, end_date)
+    cursor.execute("""
+        SELECT sa.EmployeeId, sa.Date, st.Code, st.Name
+        FROM ShiftAssignments sa
+        JOIN ShiftTypes st ON sa.ShiftTypeId = st.Id
+        JOIN Employees e ON sa.EmployeeId = e.Id
+        WHERE sa.Date >= ? AND sa.Date <= ?
+          AND st.Code IN ('F', 'S', 'N')
+    """, (start_date.isoformat(), end_date.isoformat()))
+    
+    own_shifts: Dict[str, List[Tuple[str, str]]] = {}
+    staff_by_date_code: Dict[Tuple[str, str], Set[int]] = {}
+    for emp_id, date_str, code, name in cursor.fetchall():
+        staff_by_date_code.setdefault((date_str, code), set()).add(emp_id)
+        if emp_id == employee_id:
+            own_shifts.setdefault(date_str, []).append((code, name))
+    
     # Check each date in the absence period
     current = start_date
     while current <= end_date:
-        # Get shift assignments for this employee on this date
-        cursor.execute("""
-            SELECT st.Code, st.Name
-            FROM ShiftAssignments sa
-            JOIN ShiftTypes st ON sa.ShiftTypeId = st.Id
-            WHERE sa.EmployeeId = ?
-              AND sa.Date = ?
-              AND st.Code IN ('F', 'S', 'N')
-        """, (employee_id, current.isoformat()))
-        
-        for shift_row in cursor.fetchall():
-            shift_code = shift_row[0]
-            shift_name = shift_row[1]
+        for shift_code, shift_name in own_shifts.get(current.isoformat(), []):
+            if shift_code not in staffing_reqs:
+                continue
             
             # Check staffing after removing this employee
-            required, actual, is_understaffed = check_staffing_for_date(conn, current, shift_code)
+            day_type = "weekend" if current.weekday() >= 5 else "weekday"
+            required = staffing_reqs[shift_code][day_type]["min"]
+            assigned = staff_by_date_code.get((current.isoformat(), shift_code), set())
+            actual = len(assigned - absence_calendar.absent_employees_on(current))
             
             # If removing this employee causes understaffing
-            if is_understaffed:
+            if actual < required:
                 issues.append({
                     'date': current,
                     'shift_code': shift_code,
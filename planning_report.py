@@ -125,7 +125,7 @@ _STATUS_LABELS: Dict[str, str] = {
     "FEASIBLE": "Machbar (nicht bewiesen optimal)",
     "FALLBACK_L1": "Fallback-Stufe 1 (Mindestbesetzung relaxiert)",
     "FALLBACK_L2": "Fallback-Stufe 2 (Mindestbesetzung + Rotation relaxiert)",
-    "EMERGENCY": "Notfallplan (Greedy-Algorithmus)",
+    "EMERGENCY": "Notfallplan (konstruktiver Startplan)",
 }
 
 
@@ -188,6 +188,11 @@ class PlanningReport:
     stage_metrics: List[Dict[str, Any]] = field(default_factory=list)
     """Metriken je Solver-Stufe (Build-/Solve-Zeit, Ergebnisstatus, Relaxation-Level)."""
 
+    warm_start_state: Dict[str, Any] = field(default_factory=dict)
+    """Kompakter Lösungszustand für den Warmstart einer Neuplanung desselben Zeitraums
+    (siehe ShiftPlanningSolver.export_warm_start_state()); leer beim Notfallplan.
+    Wird separat gespeichert und ist nicht Teil des serialisierten Berichts."""
+
     # -----------------------------------------------------------------------
     # Computed properties
     # -----------------------------------------------------------------------
@@ -0,0 +1,345 @@
+"""
+Schedule matrix: a compact employee × day representation of a shift plan.
+
+The same plan travels through the system as ShiftAssignment lists (solver,
+validation), complete_schedule dicts keyed by (employee_id, date), sqlite
+rows and JSON.  ScheduleMatrix is the common interchange format between
+them:
+
+- ``cells``: int16 array (employees × days) of indices into ``codes``,
+  EMPTY for a day without shift
+- ``absence``: int16 overlay of the same shape with indices into
+  ``absence_codes``, EMPTY for a present employee
+- ``codes`` / ``shift_type_ids``: the code table (code and shift type id per
+  index)
+
+Rows can be grouped by team so that employee, team and date views are plain
+NumPy slices of ``cells`` (no copies).  A second shift of an employee on the
+same day (only possible for manual data) is kept in a small overflow dict so
+conversions stay lossless.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from entities import ShiftAssignment, get_shift_type_by_id
+
+EMPTY = -1  # Cell value of a day without shift / without absence
+
+# complete_schedule values (see ShiftPlanningSolver.extract_solution())
+ABSENT = "ABSENT"
+OFF = "OFF"
+
+
+class ScheduleMatrix:
+    """
+    Employee × day matrix of shift codes with an absence overlay.
+
+    Rows follow ``employee_ids``; when ``team_of`` is given the rows are
+    regrouped (stable, teams in order of first appearance) so every team is
+    a contiguous block and team() can return a view.  Columns cover every
+    day from start_date to end_date.
+    """
+
+    def __init__(
+        self,
+        employee_ids: Sequence[int],
+        start_date: date,
+        end_date: date,
+        team_of: Optional[Mapping[int, Optional[int]]] = None,
+    ):
+        """
+        Args:
+            employee_ids: Employees in row order (duplicates are ignored)
+            start_date: First day (column 0)
+            end_date: Last day
+            team_of: Optional employee id -> team id (None = without team)
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        employee_ids = list(dict.fromkeys(employee_ids))
+        self._team_slices: Dict[Optional[int], slice] = {}
+        if team_of is not None:
+            groups: Dict[Optional[int], List[int]] = {}
+            for emp_id in employee_ids:
+                groups.setdefault(team_of.get(emp_id), []).append(emp_id)
+            employee_ids = []
+            for team_id, members in groups.items():
+                self._team_slices[team_id] = slice(len(employee_ids), len(employee_ids) + len(members))
+                employee_ids.extend(members)
+
+        self.employee_ids: List[int] = employee_ids
+        self.start_date = start_date
+        self.end_date = end_date
+        self._day0 = start_date.toordinal()
+        self._row_of: Dict[int, int] = {emp_id: row for row, emp_id in enumerate(employee_ids)}
+
+        shape = (len(employee_ids), (end_date - start_date).days + 1)
+        self.cells = np.full(shape, EMPTY, dtype=np.int16)
+        self.absence = np.full(shape, EMPTY, dtype=np.int16)
+        self.codes: List[str] = []
+        self.shift_type_ids: List[Optional[int]] = []
+        self.absence_codes: List[str] = []
+        self._code_index: Dict[str, int] = {}
+        self._absence_index: Dict[str, int] = {}
+        # (row, col) -> further code indices after the one in cells
+        self._overflow: Dict[Tuple[int, int], List[int]] = {}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_assignments(
+        cls,
+        assignments: Iterable[ShiftAssignment],
+        employee_ids: Sequence[int],
+        start_date: date,
+        end_date: date,
+        shift_types: Optional[Sequence[Any]] = None,
+        absences: Iterable[Any] = (),
+        team_of: Optional[Mapping[int, Optional[int]]] = None,
+    ) -> "ScheduleMatrix":
+        """
+        Build a matrix from ShiftAssignment objects.
+
+        Shift type ids are resolved with ``shift_types`` (falling back to the
+        standard shift types); unknown ids get their id as code, like the
+        planning report.  Assignments of other employees or outside
+        [start_date, end_date] are ignored.  ``absences`` are entities.Absence
+        objects for the overlay.
+        """
+        matrix = cls(employee_ids, start_date, end_date, team_of)
+        shift_type_by_id = {st.id: st for st in reversed(shift_types or ())}
+        index_of_type: Dict[int, int] = {}
+        for a in assignments:
+            index = index_of_type.get(a.shift_type_id)
+            if index is None:
+                shift_type = shift_type_by_id.get(a.shift_type_id) or get_shift_type_by_id(a.shift_type_id)
+                code = shift_type.code if shift_type else str(a.shift_type_id)
+                index = index_of_type[a.shift_type_id] = matrix.intern_code(code, a.shift_type_id)
+            matrix._add(a.employee_id, a.date, index)
+        for absence in absences:
+            matrix.add_absence(absence.employee_id, absence.start_date, absence.end_date, absence.get_code())
+        return matrix
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Mapping[str, Any]],
+        employee_ids: Sequence[int],
+        start_date: date,
+        end_date: date,
+        team_of: Optional[Mapping[int, Optional[int]]] = None,
+    ) -> "ScheduleMatrix":
+        """
+        Build a matrix from ShiftAssignments database rows.
+
+        Rows need ``EmployeeId``, ``Date`` (ISO string) and ``Code`` columns
+        (sqlite3.Row or dicts); ``ShiftTypeId`` is used when present.  Rows of
+        other employees or outside [start_date, end_date] are ignored.
+        """
+        matrix = cls(employee_ids, start_date, end_date, team_of)
+        for row in rows:
+            shift_type_id = row["ShiftTypeId"] if "ShiftTypeId" in row.keys() else None
+            index = matrix.intern_code(row["Code"], shift_type_id)
+            matrix._add(row["EmployeeId"], date.fromisoformat(row["Date"]), index)
+        return matrix
+
+    @classmethod
+    def from_complete_schedule(
+        cls,
+        complete_schedule: Mapping[Tuple[int, date], str],
+        employee_ids: Sequence[int],
+        start_date: date,
+        end_date: date,
+        shift_types: Optional[Sequence[Any]] = None,
+        team_of: Optional[Mapping[int, Optional[int]]] = None,
+    ) -> "ScheduleMatrix":
+        """
+        Build a matrix from a complete_schedule dict ((employee_id, date) -> code).
+
+        "OFF" cells stay empty, "ABSENT" cells go to the absence overlay.
+        """
+        matrix = cls(employee_ids, start_date, end_date, team_of)
+        type_id_of_code: Dict[str, int] = {}
+        for st in shift_types or ():
+            type_id_of_code.setdefault(st.code, st.id)
+        for (emp_id, d), code in complete_schedule.items():
+            if code == OFF:
+                continue
+            if code == ABSENT:
+                matrix.add_absence(emp_id, d, d, ABSENT)
+            else:
+                matrix._add(emp_id, d, matrix.intern_code(code, type_id_of_code.get(code)))
+        return matrix
+
+    def intern_code(self, code: str, shift_type_id: Optional[int] = None) -> int:
+        """Return the index of a shift code in the code table, adding it if needed."""
+        index = self._code_index.get(code)
+        if index is None:
+            index = self._code_index[code] = len(self.codes)
+            self.codes.append(code)
+            self.shift_type_ids.append(shift_type_id)
+        elif self.shift_type_ids[index] is None:
+            self.shift_type_ids[index] = shift_type_id
+        return index
+
+    def add(self, emp_id: int, d: date, code: str, shift_type_id: Optional[int] = None) -> None:
+        """Add a shift (a second shift on the same day goes to the overflow)."""
+        self._add(emp_id, d, self.intern_code(code, shift_type_id))
+
+    def _add(self, emp_id: int, d: date, index: int) -> None:
+        row = self._row_of.get(emp_id)
+        col = d.toordinal() - self._day0
+        if row is None or not 0 <= col < self.cells.shape[1]:
+            return
+        if self.cells[row, col] == EMPTY:
+            self.cells[row, col] = index
+        else:
+            self._overflow.setdefault((row, col), []).append(index)
+
+    def add_absence(self, emp_id: int, start: date, end: date, code: str) -> None:
+        """
+        Mark [start, end] as absent with an absence code.
+
+        Days already marked keep their code, so when absences overlap the one
+        added first wins (like AbsenceCalendar.absence_on()).
+        """
+        row = self._row_of.get(emp_id)
+        first = max(start.toordinal() - self._day0, 0)
+        last = min(end.toordinal() - self._day0, self.absence.shape[1] - 1)
+        if row is None or first > last:
+            return
+        index = self._absence_index.get(code)
+        if index is None:
+            index = self._absence_index[code] = len(self.absence_codes)
+            self.absence_codes.append(code)
+        segment = self.absence[row, first:last + 1]
+        segment[segment == EMPTY] = index
+
+    # ------------------------------------------------------------------
+    # Lookups and views
+    # ------------------------------------------------------------------
+
+    @property
+    def dates(self) -> List[date]:
+        """All days of the matrix (one per column)."""
+        return [self.start_date + timedelta(days=i) for i in range(self.cells.shape[1])]
+
+    def row(self, emp_id: int) -> int:
+        """Row index of an employee (KeyError if not in the matrix)."""
+        return self._row_of[emp_id]
+
+    def col(self, d: date) -> int:
+        """Column index of a date (KeyError if outside the matrix)."""
+        col = d.toordinal() - self._day0
+        if not 0 <= col < self.cells.shape[1]:
+            raise KeyError(d)
+        return col
+
+    def employee(self, emp_id: int) -> np.ndarray:
+        """Code indices of one employee over all days (view)."""
+        return self.cells[self._row_of[emp_id]]
+
+    def day(self, d: date) -> np.ndarray:
+        """Code indices of all employees on one day (view)."""
+        return self.cells[:, self.col(d)]
+
+    def team(self, team_id: Optional[int]) -> np.ndarray:
+        """Rows of one team (view; requires team_of at construction)."""
+        return self.cells[self._team_slice(team_id)]
+
+    def team_employee_ids(self, team_id: Optional[int]) -> List[int]:
+        """Employee ids of the rows returned by team()."""
+        return self.employee_ids[self._team_slice(team_id)]
+
+    def _team_slice(self, team_id: Optional[int]) -> slice:
+        try:
+            return self._team_slices[team_id]
+        except KeyError:
+            raise KeyError(f"team {team_id!r} is not grouped in this matrix") from None
+
+    def code_at(self, emp_id: int, d: date) -> Optional[str]:
+        """Shift code of an employee on a day, or None."""
+        index = self.cells[self._row_of[emp_id], self.col(d)]
+        return self.codes[index] if index != EMPTY else None
+
+    def codes_at(self, emp_id: int, d: date) -> List[str]:
+        """All shift codes of an employee on a day (including a second shift)."""
+        row, col = self._row_of[emp_id], self.col(d)
+        index = self.cells[row, col]
+        if index == EMPTY:
+            return []
+        return [self.codes[i] for i in [index] + self._overflow.get((row, col), [])]
+
+    def absence_at(self, emp_id: int, d: date) -> Optional[str]:
+        """Absence code of an employee on a day, or None."""
+        index = self.absence[self._row_of[emp_id], self.col(d)]
+        return self.absence_codes[index] if index != EMPTY else None
+
+    def code_counts(self) -> Dict[str, int]:
+        """Number of shifts per code (every assignment counted, absences ignored)."""
+        counts = np.bincount(self.cells[self.cells != EMPTY], minlength=len(self.codes))
+        for extra in self._overflow.values():
+            for index in extra:
+                counts[index] += 1
+        return {code: int(counts[i]) for i, code in enumerate(self.codes) if counts[i]}
+
+    def cell_labels(self, empty: str = "-") -> np.ndarray:
+        """
+        Display label per cell as an object array (for PDF/Excel exports).
+
+        Absence code if absent, otherwise the shift code(s) separated by
+        spaces, otherwise ``empty``.
+        """
+        # EMPTY (-1) picks the trailing entry of each lookup table.
+        labels = np.array(self.codes + [empty], dtype=object)[self.cells]
+        absence_labels = np.array(self.absence_codes + [None], dtype=object)[self.absence]
+        for (row, col), extra in self._overflow.items():
+            labels[row, col] = " ".join(self.codes[i] for i in [self.cells[row, col]] + extra)
+        absent = self.absence != EMPTY
+        labels[absent] = absence_labels[absent]
+        return labels
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+
+    def iter_cells(self) -> Iterable[Tuple[int, date, int]]:
+        """(employee_id, date, shift_type_id) per shift, row by row and day by day."""
+        dates = self.dates
+        rows, cols = np.nonzero(self.cells != EMPTY)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            emp_id, d = self.employee_ids[row], dates[col]
+            for index in [int(self.cells[row, col])] + self._overflow.get((row, col), []):
+                yield emp_id, d, self.shift_type_ids[index]
+
+    def to_assignments(self, first_id: int = 1) -> List[ShiftAssignment]:
+        """ShiftAssignment objects with consecutive ids (see iter_cells() for the order)."""
+        return [
+            ShiftAssignment(id=first_id + i, employee_id=emp_id, shift_type_id=shift_type_id, date=d)
+            for i, (emp_id, d, shift_type_id) in enumerate(self.iter_cells())
+        ]
+
+    def to_rows(self) -> List[Tuple[int, Optional[int], str]]:
+        """(EmployeeId, ShiftTypeId, Date ISO) tuples for ShiftAssignments inserts."""
+        return [(emp_id, shift_type_id, d.isoformat()) for emp_id, d, shift_type_id in self.iter_cells()]
+
+    def to_complete_schedule(self) -> Dict[Tuple[int, date], str]:
+        """
+        complete_schedule dict over all employees and days.
+
+        Same priorities as ShiftPlanningSolver.extract_solution(): "ABSENT"
+        over the shift code over "OFF".
+        """
+        dates = self.dates
+        labels = np.array(self.codes + [OFF], dtype=object)[self.cells]
+        labels[self.absence != EMPTY] = ABSENT
+        return {
+            (emp_id, d): label
+            for emp_id, row_labels in zip(self.employee_ids, labels.tolist())
+            for d, label in zip(dates, row_labels)
+        }
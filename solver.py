@@ -4,12 +4,23 @@ Configures and runs the solver, returns solution.
 """
 
 from ortools.sat.python import cp_model
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
+import copy
 import os
+import threading
 import time
-from typing import List, Dict, Tuple, Optional, Callable, Any
+import tracemalloc
+from typing import List, Dict, Tuple, Optional, Callable, Any, Union
+
+import numpy as np
+
 from entities import Employee, ShiftAssignment, RelaxedConstraint, STANDARD_SHIFT_TYPES, get_shift_type_by_id
 from model import ShiftPlanningModel
+from constructive_planner import build_constructive_plan
+from absence_calendar import AbsenceCalendar
+from schedule_matrix import ScheduleMatrix
 from planning_report import (
     PlanningReport,
     RuleViolation,
@@ -38,6 +49,7 @@ from constraints import (
     add_cross_shift_capacity_enforcement,
     add_total_weekend_staffing_limit
 )
+from constraints.constants import DEFAULT_WEEKLY_HOURS
 
 
 def _default_num_workers() -> int:
@@ -69,6 +81,153 @@ def _emit_progress(
         pass
 
 
+# Format version of export_warm_start_state(); stored snapshots with another
+# version are ignored instead of being hinted with a wrong interpretation.
+WARM_START_STATE_VERSION = 1
+
+
+def _is_working_code(shift_code: Optional[str]) -> bool:
+    """True for a real shift code, False for empty, "OFF" and "ABSENT"."""
+    return bool(shift_code) and shift_code not in ("OFF", "ABSENT")
+
+
+def _decode_warm_start_state(state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a JSON snapshot from export_warm_start_state() back into lookup structures.
+
+    Returns None for a missing, outdated or malformed snapshot (warm starts are
+    an optimisation and must never break a planning run), otherwise a dict with
+    start/end dates, schedule {(emp_id, date): code}, team_shift
+    {(team_id, week_start): code}, cross_team {(emp_id, date, code)} and
+    weekend {(emp_id, date)}.
+    """
+    if not state or state.get("version") != WARM_START_STATE_VERSION:
+        return None
+    try:
+        start = date.fromisoformat(state["start"])
+        end = date.fromisoformat(state["end"])
+        schedule: Dict[Tuple[int, date], str] = {}
+        for emp_id, codes in state.get("schedule", {}).items():
+            for offset, code in enumerate(codes):
+                if code is not None:
+                    schedule[(int(emp_id), start + timedelta(days=offset))] = code
+        team_shift = {
+            (int(team_id), date.fromisoformat(week_start)): code
+            for team_id, weeks_codes in state.get("team_shift", {}).items()
+            for week_start, code in weeks_codes.items()
+        }
+        cross_team = {
+            (int(emp_id), date.fromisoformat(d), code)
+            for emp_id, d, code in state.get("cross_team", [])
+        }
+        weekend = {
+            (int(emp_id), date.fromisoformat(d))
+            for emp_id, days in state.get("weekend", {}).items()
+            for d in days
+        }
+    except (KeyError, TypeError, ValueError) as exc:
+        print(f"  [!] Ignoring malformed warm_start_state: {exc}")
+        return None
+    return {
+        "start": start,
+        "end": end,
+        "schedule": schedule,
+        "team_shift": team_shift,
+        "cross_team": cross_team,
+        "weekend": weekend,
+    }
+
+
+def _profile_model_build_from_env() -> bool:
+    """Return True when DIENSTPLAN_PROFILE_MODEL_BUILD enables the model-build profiler."""
+    value = os.environ.get("DIENSTPLAN_PROFILE_MODEL_BUILD", "")
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _load_rotation_patterns(db_path: str) -> Optional[Dict[int, List[str]]]:
+    """Rotation group patterns of the database, None when they cannot be loaded (F → N → S then)."""
+    try:
+        from data_loader import load_rotation_groups_from_db
+        return load_rotation_groups_from_db(db_path) or None
+    except Exception:
+        return None
+
+
+class _ModelBuildProfiler:
+    """
+    Per-constraint-family profile of add_all_constraints().
+
+    Each family is a section from section(label) to the next section() or
+    finish() call.  For every section the profiler records wall time, Python
+    allocations (via tracemalloc) and how many variables and constraints were
+    added to the CpModel proto.  tracemalloc slows model construction down
+    noticeably, which is why profiling is opt-in.
+    """
+
+    def __init__(self, model: cp_model.CpModel):
+        self._model = model
+        self._label: Optional[str] = None
+        self._started_tracemalloc = False
+        self.entries: List[Dict[str, Any]] = []
+
+    def _model_size(self) -> Tuple[int, int]:
+        proto = self._model.Proto()
+        return len(proto.variables), len(proto.constraints)
+
+    def section(self, label: str) -> None:
+        """Close the running section (if any) and start measuring ``label``."""
+        self._close()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._label = label
+        self._num_vars, self._num_constraints = self._model_size()
+        self._alloc_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Close the running section, stop tracemalloc if we started it and return the entries."""
+        self._close()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return self.entries
+
+    def _close(self) -> None:
+        if self._label is None:
+            return
+        seconds = time.perf_counter() - self._start
+        alloc_end, alloc_peak = tracemalloc.get_traced_memory()
+        num_vars, num_constraints = self._model_size()
+        self.entries.append({
+            "label": self._label,
+            "seconds": round(seconds, 4),
+            "alloc_bytes": alloc_end - self._alloc_start,
+            "peak_alloc_bytes": max(alloc_peak - self._alloc_start, 0),
+            "variables_added": num_vars - self._num_vars,
+            "constraints_added": num_constraints - self._num_constraints,
+        })
+        self._label = None
+
+
+def _print_build_profile(build_profile: List[Dict[str, Any]]) -> None:
+    """Print the model-build profile, most expensive constraint family first."""
+    if not build_profile:
+        return
+    print("\n" + "=" * 60)
+    print("MODEL-BUILD PROFIL (je Constraint-Familie)")
+    print("=" * 60)
+    print(f"  {'Familie':<48} {'Sek.':>8} {'KiB':>9} {'Var.':>8} {'Constr.':>8}")
+    for entry in sorted(build_profile, key=lambda e: e["seconds"], reverse=True):
+        print(
+            f"  {entry['label']:<48} {entry['seconds']:>8.3f} "
+            f"{entry['alloc_bytes'] / 1024:>9.0f} {entry['variables_added']:>8} "
+            f"{entry['constraints_added']:>8}"
+        )
+    print("=" * 60)
+
+
 # Soft constraint penalty weights - Priority hierarchy (highest to lowest):
 # 1. Operational constraints (200-20000): Rest time, shift grouping, etc. - CRITICAL for safety/compliance
 # 2. DAILY_SHIFT_RATIO (200): Enforce shift ordering based on max_staff (F >= S >= N on weekdays)
@@ -127,6 +286,119 @@ CROSS_SHIFT_CAPACITY_VIOLATION_WEIGHT = 150  # NEW: Penalty for overstaffing low
 # Must be extremely high to signal a severely sub-optimal plan to the user.
 MIN_STAFFING_RELAXED_PENALTY_WEIGHT = 200_000
 
+# Penalty groups that only belong to the full (Stage 1) objective.  Fallback
+# stages drop them to reach a feasible plan faster; a model shared across
+# stages (use_relaxation_literals=True) filters them out when switching level.
+STRICT_ONLY_PENALTY_GROUPS = frozenset({
+    "Tagesschicht-Verhältnis (Kapazitätsreihenfolge)",
+    "Schicht-Kapazitätsüberschreitung (N-Overflow)",
+    "Späte Wochenendarbeit (zeitgewichtet)",
+})
+
+
+def _relaxed_constraint_descriptions(relaxation_level: int) -> List[str]:
+    """
+    Return the (German) descriptions of all constraints relaxed at a fallback level.
+
+    The order matches the order in which add_all_constraints() processes the
+    constraint families, so reports look identical whether the model was built
+    for a single level or shared across stages via enforcement literals.
+
+    Args:
+        relaxation_level: 0 (normal), 1 (min staffing soft) or 2 (additionally
+            no team rotation).
+
+    Returns:
+        List of human-readable descriptions; empty for relaxation_level 0.
+    """
+    if relaxation_level <= 0:
+        return []
+    descriptions: List[str] = []
+    if relaxation_level >= 2:
+        descriptions.append(
+            "Teamrotation (F→N→S): Reihenfolge nicht mehr erzwungen – Teams können beliebige Schichten wählen"
+        )
+    descriptions.extend([
+        "Mindestbesetzung (H3): Als Soft-Constraint mit Strafgewicht 200.000 behandelt – Unterschreitungen sind möglich",
+        "Schicht-Kapazitätsfeinsteuerung: In Fallback deaktiviert, um schneller eine machbare Lösung zu finden",
+        "Tagesschicht-Verhältnis (F>=S>=N etc.): In Fallback deaktiviert, Fokus auf Besetzbarkeit",
+        "Fairness-Ziele (jahrweite Verteilung): In Fallback deaktiviert, um Laufzeit zu reduzieren",
+        "Schichttyp-Präferenz (max_staff-Proportion): In Fallback deaktiviert",
+        "Zeitgewichtete Wochenendpräferenz: In Fallback deaktiviert",
+    ])
+    return descriptions
+
+
+# Explain mode (ShiftPlanningSolver.find_infeasibility_core()): time for the
+# first solve under assumptions and the total budget for shrinking its core.
+INFEASIBILITY_CORE_TIME_LIMIT_SECONDS = 60.0
+INFEASIBILITY_CORE_MINIMIZE_SECONDS = 60.0
+
+# Constraint group kinds (model.ConstraintGroups keys) that are no longer hard
+# at a fallback level; must match set_relaxation_level().
+RELAXED_CONSTRAINT_GROUPS = {
+    0: frozenset(),
+    1: frozenset({"min_staffing"}),
+    2: frozenset({"min_staffing", "team_rotation"}),
+}
+
+
+def fallback_level_for_core(core_groups: List[Tuple]) -> int:
+    """
+    Return the first fallback level that an infeasibility core does not rule out.
+
+    A core is a set of constraint groups that cannot hold together.  Every level
+    that keeps all of them hard is infeasible too, so the first level relaxing
+    one of the core's group kinds is the earliest stage worth solving.  3 means
+    no CP-SAT stage can succeed (e.g. a conflict between locks, or an empty core:
+    the structural rules alone are contradictory) and Stage 4 is next.
+    """
+    kinds = {key[0] for key in core_groups}
+    for level in sorted(RELAXED_CONSTRAINT_GROUPS):
+        if kinds & RELAXED_CONSTRAINT_GROUPS[level]:
+            return level
+    return 3
+
+
+def core_conflicts(stage_metrics: List[Dict[str, Any]]) -> List[str]:
+    """Conflicting rules of the last conflict core in stage_metrics ("CORE_CHECK"; empty if none)."""
+    for entry in reversed(stage_metrics):
+        if entry.get("stage") == "CORE_CHECK" and entry.get("core_status") == "INFEASIBLE":
+            return list(entry.get("conflicts") or [])
+    return []
+
+
+def describe_constraint_group(key: Tuple, planning_model: ShiftPlanningModel) -> str:
+    """German description of a model.ConstraintGroups key for reports and error messages."""
+    kind = key[0]
+    index = planning_model.index
+
+    def _employee(emp_id) -> str:
+        emp = index.employee_by_id.get(emp_id)
+        return emp.full_name if emp else f"Mitarbeiter {emp_id}"
+
+    def _week(team_id, week_idx) -> str:
+        team = index.team_by_id.get(team_id)
+        team_name = team.name if team else f"Team {team_id}"
+        week_start = planning_model.weeks[week_idx][0]
+        return f"{team_name} in der Woche ab {week_start.strftime('%d.%m.%Y')}"
+
+    if kind == "min_staffing":
+        return f"Mindestbesetzung {key[1]} am {key[2].strftime('%d.%m.%Y')}"
+    if kind == "max_staffing":
+        return f"Maximalbesetzung {key[1]} am Wochenende {key[2].strftime('%d.%m.%Y')}"
+    if kind == "team_rotation":
+        return f"Teamrotation: {_week(key[1], key[2])}"
+    if kind == "team_lock":
+        return f"Gesperrte Teamschicht: {_week(key[1], key[2])}"
+    if kind == "employee_lock":
+        return f"Gesperrte Schicht von {_employee(key[1])} am {key[2].strftime('%d.%m.%Y')}"
+    if kind == "weekend_lock":
+        return f"Gesperrter Wochenenddienst von {_employee(key[1])} am {key[2].strftime('%d.%m.%Y')}"
+    if kind == "consecutive_days":
+        return f"Max. aufeinanderfolgende Arbeitstage von {_employee(key[1])}"
+    return " ".join(str(part) for part in key)
+
 # Expected performance improvements from solver optimizations:
 # - All CPU cores used (num_workers = os.cpu_count()): Every available core is put
 #   to work; CP-SAT scales well across cores and more workers always helps.
@@ -154,6 +426,56 @@ MIN_STAFFING_RELAXED_PENALTY_WEIGHT = 200_000
 #   results across runs with identical inputs.
 
 
+@dataclass(frozen=True)
+class EarlyStopPolicy:
+    """
+    When a CP-SAT stage may stop before its time limit (whichever comes first).
+
+    gap_percent: Stop once the relative gap between the best solution and the
+        best bound is at most this many percent of the objective.
+    plateau_seconds: Stop when the objective has not improved for this many
+        seconds since the last improving solution.
+    None disables a criterion; the default policy runs every stage until it is
+    proven optimal or reaches its time limit.  Configured per site in
+    GlobalSettings (SolverGapLimitPercent / SolverPlateauSeconds).
+    """
+
+    gap_percent: Optional[float] = None
+    plateau_seconds: Optional[float] = None
+
+    @classmethod
+    def from_global_settings(cls, global_settings: Optional[Dict]) -> "EarlyStopPolicy":
+        settings = global_settings or {}
+        gap_percent = settings.get('solver_gap_limit_percent')
+        plateau_seconds = settings.get('solver_plateau_seconds')
+        return cls(
+            gap_percent=float(gap_percent) if gap_percent else None,
+            plateau_seconds=float(plateau_seconds) if plateau_seconds else None,
+        )
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {"gap_percent": self.gap_percent, "plateau_seconds": self.plateau_seconds}
+
+
+def _relative_gap_percent(objective: float, bound: float) -> float:
+    """Gap between objective and best bound in percent of the objective (CP-SAT definition)."""
+    return abs(objective - bound) / max(abs(objective), 1.0) * 100.0
+
+
+# Large-neighbourhood search (ShiftPlanningSolver.solve_lns()): neighbourhood
+# kinds in the order they take turns, CP-SAT limit per neighbourhood, employees
+# freed by one "worst_employees" neighbourhood and the number of neighbourhoods
+# in a row without improvement after which the search ends.
+LNS_NEIGHBOURHOOD_KINDS = ("team", "week", "worst_employees")
+LNS_NEIGHBOURHOOD_TIME_LIMIT_SECONDS = 10.0
+LNS_WORST_EMPLOYEE_COUNT = 6
+LNS_MAX_STALLED_NEIGHBOURHOODS = 12
+
+# How often ShiftPlanningSolver.solve() re-checks stop requests and the
+# plateau criterion while CP-SAT is searching.
+SEARCH_WATCH_INTERVAL_SECONDS = 0.1
+
+
 class ShiftPlanSolutionCallback(cp_model.CpSolverSolutionCallback):
     """
     Callback that logs each improving solution found during CP-SAT search.
@@ -172,12 +494,18 @@ class ShiftPlanSolutionCallback(cp_model.CpSolverSolutionCallback):
     the very first solution is found.  This is the correct behaviour for fallback
     stages (relaxation_level > 0) where feasibility – not optimality – is the goal
     and further optimisation would only waste time.
+
+    With ``gap_limit_percent`` the search is halted as soon as an improving
+    solution is within that relative gap of the best bound (stop_reason "gap").
+    The plateau criterion of EarlyStopPolicy needs a timer and is watched by
+    ShiftPlanningSolver.solve() via seconds_since_improvement().
     """
 
     def __init__(
         self,
         stop_after_first_feasible: bool = False,
-        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        gap_limit_percent: Optional[float] = None,
     ):
         super().__init__()
         self._solution_count = 0
@@ -185,6 +513,9 @@ class ShiftPlanSolutionCallback(cp_model.CpSolverSolutionCallback):
         self._start_time = None
         self._stop_after_first_feasible = stop_after_first_feasible
         self._progress_callback = progress_callback
+        self._gap_limit_percent = gap_limit_percent
+        self._last_improvement_at: Optional[float] = None
+        self.stop_reason: Optional[str] = None
 
     def OnSolutionCallback(self):
         """Called by the solver each time a new improving solution is found."""
@@ -200,18 +531,33 @@ class ShiftPlanSolutionCallback(cp_model.CpSolverSolutionCallback):
         if self._best_objective is None or current_obj < self._best_objective:
             self._best_objective = current_obj
             self._solution_count += 1
+            self._last_improvement_at = time.monotonic()
             print(f"  → Solution #{self._solution_count}: objective={current_obj:.0f}, elapsed={elapsed:.1f}s")
             _emit_progress(
                 self._progress_callback,
                 "solver_solution_progress",
                 solutionCount=self._solution_count,
                 objectiveValue=float(current_obj),
+                bestBound=float(self.BestObjectiveBound()),
                 elapsedSeconds=float(elapsed),
             )
 
         # For fallback stages feasibility is sufficient; stop as soon as we have one.
         if self._stop_after_first_feasible and self._solution_count >= 1:
             self.StopSearch()
+            return
+
+        if (self._gap_limit_percent is not None and self.stop_reason is None
+                and _relative_gap_percent(current_obj, self.BestObjectiveBound()) <= self._gap_limit_percent):
+            print(f"  → Gap limit of {self._gap_limit_percent}% reached, stopping search")
+            self.stop_reason = "gap"
+            self.StopSearch()
+
+    def seconds_since_improvement(self) -> Optional[float]:
+        """Seconds since the last improving solution (None before the first one)."""
+        if self._last_improvement_at is None:
+            return None
+        return time.monotonic() - self._last_improvement_at
 
     @property
     def solution_count(self) -> int:
@@ -240,6 +586,11 @@ class ShiftPlanningSolver:
         warm_start_shifts: Optional[Dict[Tuple[int, date], str]] = None,
         relaxation_level: int = 0,
         random_seed: Optional[int] = None,
+        use_relaxation_literals: bool = False,
+        profile_model_build: bool = False,
+        warm_start_state: Optional[Dict[str, Any]] = None,
+        early_stop: Optional[EarlyStopPolicy] = None,
+        rotation_patterns: Optional[Dict[int, List[str]]] = None,
     ):
         """
         Initialize the solver.
@@ -279,15 +630,42 @@ class ShiftPlanningSolver:
                 When set, results are reproducible across identical runs. Useful for
                 regression testing and performance comparisons. None (default) lets
                 OR-Tools choose its own seed (non-deterministic).
+            use_relaxation_literals: When True, add_all_constraints() builds the full
+                (level 0) model once and guards minimum staffing (H3) and the team
+                rotation with enforcement literals.  set_relaxation_level() then
+                switches between fallback levels by fixing those literals and
+                resetting the objective, so fallback stages reuse the same model
+                instead of rebuilding it.  Default False keeps the classic
+                one-model-per-level behaviour.
+            profile_model_build: When True, add_all_constraints() records wall time,
+                Python allocations and added variables/constraints per constraint
+                family in self.build_profile (see _ModelBuildProfiler).
+            warm_start_state: Optional snapshot of an earlier solution of the SAME
+                planning period as produced by export_warm_start_state().  Its
+                schedule, team_shift, cross-team and weekend values are hinted for
+                every variable inside the snapshot's date range, so a re-plan after
+                a small change starts from the previous solution instead of from
+                scratch.  Takes precedence over warm_start_shifts.
+            early_stop: Gap / plateau criteria for stopping solve() before the time
+                limit (see EarlyStopPolicy).  None reads them from global_settings
+                (solver_gap_limit_percent, solver_plateau_seconds).
+            rotation_patterns: Rotation group patterns (rotation_group_id -> shift
+                codes in order) to use instead of loading them from db_path; an
+                empty dict means "no patterns" (F → N → S).  None (default) loads
+                them from the database.
         """
         self.planning_model = planning_model
         self.time_limit_seconds = time_limit_seconds
         self.num_workers = num_workers if num_workers is not None else _default_num_workers()
         self.solution = None
+        self._solution_vector = None
+        self._variable_index_cache: Dict[int, Tuple[Any, np.ndarray]] = {}
         self.status = None
         self.db_path = db_path
+        self.rotation_patterns = rotation_patterns
         self.search_strategy = search_strategy
         self.warm_start_shifts = warm_start_shifts
+        self.warm_start_state = warm_start_state
         self.relaxation_level = relaxation_level
         self.random_seed = random_seed
         # Records which constraints were relaxed (populated by add_all_constraints)
@@ -295,6 +673,24 @@ class ShiftPlanningSolver:
         # Penalty groups: category name → list of (cp_var, weight) tuples.
         # Populated during add_all_constraints; used by compute_penalty_breakdown().
         self.penalty_groups: Dict[str, List[Tuple]] = {}
+        # Shared-model mode: enforcement literals for the relaxable hard constraint
+        # families and the objective split needed to switch levels after building.
+        self.use_relaxation_literals = use_relaxation_literals
+        self.min_staffing_literal: Optional[cp_model.IntVar] = None
+        self.team_rotation_literal: Optional[cp_model.IntVar] = None
+        self._core_objective_terms: List = []
+        self._strict_objective_terms: List = []
+        self._all_penalty_groups: Dict[str, List[Tuple]] = {}
+        # Clone of the shared model used by fork_for_relaxation_level(); None means
+        # the planning model's own CpModel is solved.
+        self._cp_model_override: Optional[cp_model.CpModel] = None
+        # Running CpSolver (set during solve()) so the search can be stopped from
+        # another thread, plus a flag for stop requests that arrive before Solve().
+        self._cp_solver: Optional[cp_model.CpSolver] = None
+        self._stop_requested = False
+        # Per-constraint-family build profile (filled by add_all_constraints when profiling)
+        self.profile_model_build = profile_model_build
+        self.build_profile: List[Dict[str, Any]] = []
         
         # Store global settings
         if global_settings is None:
@@ -302,6 +698,14 @@ class ShiftPlanningSolver:
         # Note: max_consecutive_shifts_weeks and max_consecutive_night_shifts_weeks are deprecated
         # These settings are now configured per shift type (ShiftType.max_consecutive_days)
         self.min_rest_hours = global_settings.get('min_rest_hours', 11)
+        self.early_stop = early_stop if early_stop is not None else EarlyStopPolicy.from_global_settings(global_settings)
+        # Outcome of the last solve(): "gap" / "plateau" when the policy ended the
+        # search, and the final relative gap in percent.
+        self.early_stop_reason: Optional[str] = None
+        self.final_gap_percent: Optional[float] = None
+        # Improving solutions of the last solve() / solve_lns() and the LNS summary.
+        self.solution_count = 0
+        self.lns_stats: Optional[Dict[str, Any]] = None
     
     def add_all_constraints(
         self,
@@ -309,6 +713,11 @@ class ShiftPlanningSolver:
     ):
         """
         Add all constraints to the TEAM-BASED model with CROSS-TEAM support.
+
+        With use_relaxation_literals=True the model is always built with the full
+        level-0 structure; minimum staffing and team rotation are guarded by
+        enforcement literals and self.relaxation_level is applied afterwards via
+        set_relaxation_level().
         """
         model = self.planning_model.get_model()
         (team_shift, employee_active, employee_weekend_shift, 
@@ -323,6 +732,19 @@ class ShiftPlanningSolver:
         
         # Get locked assignments
         locked_team_shift = self.planning_model.locked_team_shift
+        # Lookup tables shared by all constraint builders (built once per model)
+        index = self.planning_model.index
+        # Hard constraints by group, for the explain mode (find_infeasibility_core)
+        constraint_groups = self.planning_model.constraint_groups
+
+        # Level whose structure is built.  A shared model always contains the
+        # full level-0 structure; relaxations are applied afterwards.
+        build_level = 0 if self.use_relaxation_literals else self.relaxation_level
+        self.relaxed_constraints = [] if self.use_relaxation_literals else \
+            _relaxed_constraint_descriptions(self.relaxation_level)
+        if self.use_relaxation_literals:
+            self.min_staffing_literal = model.NewBoolVar("enforce_min_staffing")
+            self.team_rotation_literal = model.NewBoolVar("enforce_team_rotation")
         
         print("Adding constraints...")
 
@@ -350,10 +772,13 @@ class ShiftPlanningSolver:
         ]
         constraint_total = len(constraint_labels)
         constraint_index = 0
+        profiler = _ModelBuildProfiler(model) if self.profile_model_build else None
 
         def _constraint_progress(label: str):
             nonlocal constraint_index
             constraint_index += 1
+            if profiler is not None:
+                profiler.section(label)
             _emit_progress(
                 progress_callback,
                 "constraint",
@@ -366,14 +791,15 @@ class ShiftPlanningSolver:
         # CORE TEAM-BASED CONSTRAINTS
         _constraint_progress("Team shift assignment")
         print("  - Team shift assignment (exactly one shift per team per week)")
-        add_team_shift_assignment_constraints(model, team_shift, teams, weeks, shift_codes, shift_types)
+        add_team_shift_assignment_constraints(model, team_shift, teams, weeks, shift_codes, shift_types, index=index)
         
         _constraint_progress("Team rotation")
-        # Try to load rotation patterns from database
-        rotation_patterns = None
+        # Rotation patterns passed in by the caller, otherwise loaded from the database
+        rotation_patterns = self.rotation_patterns
         try:
-            from data_loader import load_rotation_groups_from_db
-            rotation_patterns = load_rotation_groups_from_db(self.db_path)
+            if rotation_patterns is None:
+                from data_loader import load_rotation_groups_from_db
+                rotation_patterns = load_rotation_groups_from_db(self.db_path)
             if rotation_patterns:
                 print(f"  - Team rotation (DATABASE-DRIVEN: {len(rotation_patterns)} rotation pattern(s) loaded)")
                 for group_id, pattern in rotation_patterns.items():
@@ -386,33 +812,31 @@ class ShiftPlanningSolver:
             rotation_patterns = None
         
         # Level 2+: skip the hard rotation pattern constraint so teams can use any shift order
-        if self.relaxation_level >= 2:
+        if build_level >= 2:
             print("  - [FALLBACK 2] Team rotation constraint SKIPPED (relaxed for feasibility)")
-            self.relaxed_constraints.append(
-                "Teamrotation (F→N→S): Reihenfolge nicht mehr erzwungen – Teams können beliebige Schichten wählen"
-            )
         else:
-            add_team_rotation_constraints(model, team_shift, teams, weeks, shift_codes, locked_team_shift, shift_types, rotation_patterns)
+            add_team_rotation_constraints(model, team_shift, teams, weeks, shift_codes, locked_team_shift, shift_types, rotation_patterns,
+                                          enforcement_literal=self.team_rotation_literal, index=index,
+                                          constraint_groups=constraint_groups)
         
         _constraint_progress("Employee weekly rotation order")
         print("  - Employee weekly rotation order (enforce F → N → S transition order)")
         rotation_order_penalties = add_employee_weekly_rotation_order_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, teams, dates, weeks, shift_codes)
+            employees, teams, dates, weeks, shift_codes, index=index)
         
         _constraint_progress("Employee-team linkage")
         print("  - Employee-team linkage (derive employee activity from team shifts)")
-        add_employee_team_linkage_constraints(model, team_shift, employee_active, employee_cross_team_shift, employees, teams, dates, weeks, shift_codes, absences, employee_weekend_shift, employee_cross_team_weekend)
+        add_employee_team_linkage_constraints(model, team_shift, employee_active, employee_cross_team_shift, employees, teams, dates, weeks, shift_codes, absences, employee_weekend_shift, employee_cross_team_weekend, index=index)
         
         # STAFFING AND WORKING CONDITIONS
         _constraint_progress("Staffing requirements")
-        relax_min = self.relaxation_level >= 1
-        if relax_min:
+        relax_min = build_level >= 1
+        if self.use_relaxation_literals:
+            print("  - Staffing requirements (min hard/soft via enforcement literal / max soft, including cross-team)")
+        elif relax_min:
             print("  - Staffing requirements (min SOFT with penalty 200000 / max soft, including cross-team)")
-            self.relaxed_constraints.append(
-                "Mindestbesetzung (H3): Als Soft-Constraint mit Strafgewicht 200.000 behandelt – Unterschreitungen sind möglich"
-            )
         else:
             print("  - Staffing requirements (min hard / max soft, including cross-team)")
         # NEW: Collect separate penalties for weekday/weekend overstaffing and weekday understaffing by shift
@@ -421,24 +845,26 @@ class ShiftPlanningSolver:
             model, employee_active, employee_weekend_shift, team_shift, 
             employee_cross_team_shift, employee_cross_team_weekend, 
             employees, teams, dates, weeks, shift_codes, shift_types,
-            relax_min_staffing=relax_min)
+            relax_min_staffing=relax_min,
+            min_staffing_enforcement_literal=self.min_staffing_literal,
+            index=index, constraint_groups=constraint_groups)
         
         _constraint_progress("Total weekend staffing limit")
         print("  - Total weekend staffing limit (max 12 employees across all shifts)")
         total_weekend_overstaffing = add_total_weekend_staffing_limit(
             model, employee_active, employee_weekend_shift, 
             employee_cross_team_shift, employee_cross_team_weekend, team_shift,
-            employees, teams, dates, weeks, shift_codes, max_total_weekend_staff=12)
+            employees, teams, dates, weeks, shift_codes, max_total_weekend_staff=12, index=index)
 
         cross_shift_capacity_violations = []
         daily_ratio_violations = []
-        if self.relaxation_level == 0:
+        if build_level == 0:
             _constraint_progress("Cross-shift capacity enforcement")
             print("  - Cross-shift capacity enforcement (prevent N overflow when F/S have capacity)")
             cross_shift_capacity_violations = add_cross_shift_capacity_enforcement(
                 model, employee_active, employee_weekend_shift, team_shift,
                 employee_cross_team_shift, employee_cross_team_weekend,
-                employees, teams, dates, weeks, shift_codes, shift_types)
+                employees, teams, dates, weeks, shift_codes, shift_types, index=index)
 
             _constraint_progress("Daily shift ratio constraints")
             print("  - Daily shift ratio constraints (ensure F >= S on weekdays)")
@@ -446,25 +872,20 @@ class ShiftPlanningSolver:
             daily_ratio_violations = add_daily_shift_ratio_constraints(
                 model, employee_active, employee_weekend_shift, team_shift,
                 employee_cross_team_shift, employee_cross_team_weekend,
-                employees, teams, dates, weeks, shift_codes, shift_types)
+                employees, teams, dates, weeks, shift_codes, shift_types, index=index)
         else:
             _constraint_progress("Cross-shift capacity enforcement")
             print("  - [FALLBACK] Cross-shift capacity enforcement SKIPPED (faster feasibility)")
-            self.relaxed_constraints.append(
-                "Schicht-Kapazitätsfeinsteuerung: In Fallback deaktiviert, um schneller eine machbare Lösung zu finden"
-            )
             _constraint_progress("Daily shift ratio constraints")
             print("  - [FALLBACK] Daily shift ratio constraints SKIPPED (faster feasibility)")
-            self.relaxed_constraints.append(
-                "Tagesschicht-Verhältnis (F>=S>=N etc.): In Fallback deaktiviert, Fokus auf Besetzbarkeit"
-            )
         
         _constraint_progress("Rest time constraints")
         print("  - Rest time constraints (11h min, soft penalties for violations)")
         rest_violation_penalties = add_rest_time_constraints(model, employee_active, employee_weekend_shift, team_shift, 
                                  employee_cross_team_shift, employee_cross_team_weekend, 
                                  employees, dates, weeks, shift_codes, teams,
-                                 previous_employee_shifts=self.planning_model.previous_employee_shifts)
+                                 previous_employee_shifts=self.planning_model.previous_employee_shifts,
+                                 index=index)
         
         # Shift stability constraint (prevent shift hopping)
         _constraint_progress("Shift stability constraints")
@@ -473,7 +894,7 @@ class ShiftPlanningSolver:
         shift_hopping_penalties = add_shift_stability_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, dates, weeks, shift_codes, teams)
+            employees, dates, weeks, shift_codes, teams, index=index)
         
         # Shift sequence grouping constraint (prevent isolated shift types)
         _constraint_progress("Shift sequence grouping constraints")
@@ -482,7 +903,7 @@ class ShiftPlanningSolver:
         shift_grouping_penalties = add_shift_sequence_grouping_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, dates, weeks, shift_codes, teams)
+            employees, dates, weeks, shift_codes, teams, index=index)
         
         # Minimum consecutive weekday shifts constraint (enforce at least 2 consecutive days for same shift during weekdays)
         _constraint_progress("Minimum consecutive weekday shifts constraints")
@@ -490,7 +911,7 @@ class ShiftPlanningSolver:
         min_consecutive_weekday_penalties = add_minimum_consecutive_weekday_shifts_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, dates, weeks, shift_codes, teams)
+            employees, dates, weeks, shift_codes, teams, index=index)
         
         # Weekly shift type limit constraint (max 2 different shift types per week)
         _constraint_progress("Weekly shift type limit constraints")
@@ -498,7 +919,7 @@ class ShiftPlanningSolver:
         weekly_shift_type_penalties = add_weekly_shift_type_limit_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, teams, dates, weeks, shift_codes, max_shift_types_per_week=2)
+            employees, teams, dates, weeks, shift_codes, max_shift_types_per_week=2, index=index)
         
         # Weekend shift consistency constraint (no shift type changes within weekends)
         _constraint_progress("Weekend shift consistency constraints")
@@ -506,7 +927,7 @@ class ShiftPlanningSolver:
         weekend_consistency_penalties = add_weekend_shift_consistency_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, teams, dates, weeks, shift_codes)
+            employees, teams, dates, weeks, shift_codes, index=index)
         
         # Team night shift consistency constraint (discourage cross-team night shifts)
         _constraint_progress("Team night shift consistency constraints")
@@ -514,7 +935,7 @@ class ShiftPlanningSolver:
         night_team_consistency_penalties = add_team_night_shift_consistency_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend,
-            employees, teams, dates, weeks, shift_codes)
+            employees, teams, dates, weeks, shift_codes, index=index)
         
         # Consecutive shifts constraint (HARD within period, SOFT for cross-month boundaries)
         # Limits consecutive working days per shift type (HARD: model.Add constraints)
@@ -525,7 +946,8 @@ class ShiftPlanningSolver:
             model, employee_active, employee_weekend_shift, team_shift,
             employee_cross_team_shift, employee_cross_team_weekend, 
             employees, teams, dates, weeks, shift_codes, shift_types,
-            self.planning_model.previous_employee_shifts)
+            self.planning_model.previous_employee_shifts, index=index,
+            constraint_groups=constraint_groups)
         
         _constraint_progress("Working hours constraints")
         print("  - Working hours constraints (HARD: min 192h/month, SOFT: proportional target)")
@@ -534,7 +956,8 @@ class ShiftPlanningSolver:
             employee_cross_team_shift, employee_cross_team_weekend, 
             employees, teams, dates, weeks, shift_codes, shift_types, absences,
             target_start_date=self.planning_model.original_start_date,
-            target_end_date=self.planning_model.original_end_date)
+            target_end_date=self.planning_model.original_end_date,
+            index=index)
         
         print("  - No-gap constraints (prevent idle weeks for present employees)")
         no_gap_penalties = add_no_gap_constraints(
@@ -542,7 +965,8 @@ class ShiftPlanningSolver:
             employee_cross_team_shift, employee_cross_team_weekend,
             employees, teams, dates, weeks, shift_codes, absences,
             target_start_date=self.planning_model.original_start_date,
-            target_end_date=self.planning_model.original_end_date)
+            target_end_date=self.planning_model.original_end_date,
+            index=index)
         
         # BLOCK SCHEDULING FOR CROSS-TEAM
         _constraint_progress("Weekly block constraints")
@@ -557,7 +981,7 @@ class ShiftPlanningSolver:
         from constraints import add_team_member_block_constraints
         block_objective_vars = add_team_member_block_constraints(
             model, employee_active, employee_weekend_shift, team_shift,
-            employees, teams, dates, weeks, shift_codes, absences)
+            employees, teams, dates, weeks, shift_codes, absences, index=index)
         
         # DISABLED: Weekly available employee constraint - conflicts with configured weekly_working_hours requirement
         # The constraint forces at least 1 employee to have 0 working days per week,
@@ -570,21 +994,23 @@ class ShiftPlanningSolver:
         # SOFT CONSTRAINTS (OPTIMIZATION)
         _constraint_progress("Fairness objectives")
         objective_terms = []
-        if self.relaxation_level == 0:
+        # Terms that only belong to the full (level 0) objective; fallback levels drop them.
+        strict_objective_terms = []
+        if build_level == 0:
             print("  - Fairness objectives (per-employee, year-long, including block scheduling)")
-            objective_terms = add_fairness_objectives(
+            strict_objective_terms = add_fairness_objectives(
                 model, employee_active, employee_weekend_shift, team_shift,
                 employee_cross_team_shift, employee_cross_team_weekend,
                 employees, teams, dates, weeks, shift_codes,
                 self.planning_model.ytd_weekend_counts,
                 self.planning_model.ytd_night_counts,
-                self.planning_model.ytd_holiday_counts
+                self.planning_model.ytd_holiday_counts,
+                index=index
             )
         else:
             print("  - [FALLBACK] Fairness objectives SKIPPED (faster feasibility)")
-            self.relaxed_constraints.append(
-                "Fairness-Ziele (jahrweite Verteilung): In Fallback deaktiviert, um Laufzeit zu reduzieren"
-            )
+        if profiler is not None:
+            self.build_profile = profiler.finish()
         
         # Add block scheduling objectives (encourage full blocks)
         # These are bonuses, so we want to maximize them (minimize negative sum)
@@ -681,7 +1107,7 @@ class ShiftPlanningSolver:
         if daily_ratio_violations:
             print(f"  Adding {len(daily_ratio_violations)} daily shift ratio penalties (enforce capacity-based ordering)...")
             for penalty_var in daily_ratio_violations:
-                objective_terms.append(penalty_var)  # Already weighted (200 per violation - higher than hours shortage)
+                strict_objective_terms.append(penalty_var)  # Already weighted (200 per violation - higher than hours shortage)
             self.penalty_groups.setdefault("Tagesschicht-Verhältnis (Kapazitätsreihenfolge)", []).extend(
                 (v, 1) for v in daily_ratio_violations
             )
@@ -690,7 +1116,7 @@ class ShiftPlanningSolver:
         if cross_shift_capacity_violations:
             print(f"  Adding {len(cross_shift_capacity_violations)} cross-shift capacity violation penalties (weight {CROSS_SHIFT_CAPACITY_VIOLATION_WEIGHT}x)...")
             for penalty_var in cross_shift_capacity_violations:
-                objective_terms.append(penalty_var * CROSS_SHIFT_CAPACITY_VIOLATION_WEIGHT)
+                strict_objective_terms.append(penalty_var * CROSS_SHIFT_CAPACITY_VIOLATION_WEIGHT)
             self.penalty_groups.setdefault("Schicht-Kapazitätsüberschreitung (N-Overflow)", []).extend(
                 (v, CROSS_SHIFT_CAPACITY_VIOLATION_WEIGHT) for v in cross_shift_capacity_violations
             )
@@ -897,7 +1323,7 @@ class ShiftPlanningSolver:
                 'N': 3    # Nacht/Night - stronger PENALTY (discourage when possible)
             }
         
-        if self.relaxation_level == 0:
+        if build_level == 0:
             print("  Adding shift type preference objectives (proportional to max_staff)...")
             # Pre-build day→week_idx map for O(1) lookup (avoid re-scanning weeks per date)
             date_to_week_idx: Dict[date, int] = {}
@@ -942,12 +1368,12 @@ class ShiftPlanningSolver:
                             continue
                         count = active_team_members.get(team.id, {}).get(d, 0)
                         if count:
-                            objective_terms.append(team_shift[(team.id, week_idx, shift)] * (count * weight))
+                            strict_objective_terms.append(team_shift[(team.id, week_idx, shift)] * (count * weight))
 
                     # Cross-team workers: these are individual BoolVars, add directly.
                     for emp in employees:
                         if (emp.id, d, shift) in employee_cross_team_shift:
-                            objective_terms.append(employee_cross_team_shift[(emp.id, d, shift)] * weight)
+                            strict_objective_terms.append(employee_cross_team_shift[(emp.id, d, shift)] * weight)
 
             # Add temporal penalty for weekend work (discourage working late-month weekends)
             print("  Adding temporal weekend work penalties (discourage late-month weekends)...")
@@ -962,7 +1388,7 @@ class ShiftPlanningSolver:
                     temporal_weight = 1000.0 * (day_index / total_days)
                     if temporal_weight > 0:
                         final_w = round(temporal_weight)
-                        objective_terms.append(employee_weekend_shift[(emp.id, d)] * final_w)
+                        strict_objective_terms.append(employee_weekend_shift[(emp.id, d)] * final_w)
                         self.penalty_groups.setdefault("Späte Wochenendarbeit (zeitgewichtet)", []).append(
                             (employee_weekend_shift[(emp.id, d)], final_w)
                         )
@@ -979,7 +1405,7 @@ class ShiftPlanningSolver:
                         temporal_weight = 1000.0 * (day_index / total_days)
                         if temporal_weight > 0:
                             final_w = round(temporal_weight)
-                            objective_terms.append(employee_cross_team_weekend[(emp.id, d, shift)] * final_w)
+                            strict_objective_terms.append(employee_cross_team_weekend[(emp.id, d, shift)] * final_w)
                             self.penalty_groups.setdefault("Späte Wochenendarbeit (zeitgewichtet)", []).append(
                                 (employee_cross_team_weekend[(emp.id, d, shift)], final_w)
                             )
@@ -988,19 +1414,148 @@ class ShiftPlanningSolver:
             print(f"  Added {weekend_work_penalties} temporal weekend work penalties")
         else:
             print("  - [FALLBACK] Shift type preference objectives SKIPPED (faster feasibility)")
-            self.relaxed_constraints.append(
-                "Schichttyp-Präferenz (max_staff-Proportion): In Fallback deaktiviert"
-            )
             print("  - [FALLBACK] Temporal weekend work penalties SKIPPED (faster feasibility)")
-            self.relaxed_constraints.append(
-                "Zeitgewichtete Wochenendpräferenz: In Fallback deaktiviert"
-            )
         
-        # Set objective function (minimize sum of objective terms)
-        if objective_terms:
-            model.Minimize(sum(objective_terms))
+        self._core_objective_terms = objective_terms
+        self._strict_objective_terms = strict_objective_terms
+        self._all_penalty_groups = dict(self.penalty_groups)
+
+        if self.use_relaxation_literals:
+            # Fix the enforcement literals and objective for the requested level.
+            self.set_relaxation_level(self.relaxation_level)
+        elif objective_terms or strict_objective_terms:
+            # Set objective function (minimize sum of objective terms)
+            model.Minimize(sum(objective_terms + strict_objective_terms))
         
         print("All constraints added successfully!")
+        if profiler is not None:
+            _print_build_profile(self.build_profile)
+
+    def set_relaxation_level(self, relaxation_level: int) -> None:
+        """
+        Switch a shared model (use_relaxation_literals=True) to another fallback level.
+
+        Instead of rebuilding the model for each fallback stage, the enforcement
+        literals are fixed via their variable domains (presolve then removes the
+        disabled constraints completely) and the objective is reset:
+          - Level 0: min staffing and rotation enforced, full objective.
+          - Level 1: min staffing soft (penalised via MIN_STAFFING_RELAXED_PENALTY_WEIGHT),
+                     strict-only objective terms dropped.
+          - Level 2: additionally team rotation disabled.
+        relaxed_constraints and penalty_groups are updated accordingly and any
+        previous solve result is discarded.
+
+        Args:
+            relaxation_level: Target fallback level (0, 1 or 2).
+
+        Raises:
+            RuntimeError: If the model was not built with use_relaxation_literals=True.
+        """
+        if not self.use_relaxation_literals or self.min_staffing_literal is None:
+            raise RuntimeError(
+                "set_relaxation_level() requires add_all_constraints() with use_relaxation_literals=True"
+            )
+        model = self._get_cp_model()
+        self.relaxation_level = relaxation_level
+
+        proto = model.Proto()
+        for literal, enforced in (
+            (self.min_staffing_literal, relaxation_level < 1),
+            (self.team_rotation_literal, relaxation_level < 2),
+        ):
+            domain = proto.variables[literal.Index()].domain
+            domain[0] = int(enforced)
+            domain[1] = int(enforced)
+
+        objective_terms = list(self._core_objective_terms)
+        if relaxation_level == 0:
+            objective_terms.extend(self._strict_objective_terms)
+        if objective_terms:
+            model.Minimize(sum(objective_terms))
+        else:
+            model.ClearObjective()
+
+        self.penalty_groups = {
+            category: pairs for category, pairs in self._all_penalty_groups.items()
+            if relaxation_level == 0 or category not in STRICT_ONLY_PENALTY_GROUPS
+        }
+        self.relaxed_constraints = _relaxed_constraint_descriptions(relaxation_level)
+        self.status = None
+        self.solution = None
+        self._solution_vector = None
+
+    def fork_for_relaxation_level(
+        self,
+        relaxation_level: int,
+        time_limit_seconds: Optional[int] = None,
+        num_workers: Optional[int] = None,
+    ) -> "ShiftPlanningSolver":
+        """
+        Return an independent solver for another fallback level of the shared model.
+
+        The CP-SAT model is cloned (a proto copy – no Python model construction) and
+        switched to relaxation_level via set_relaxation_level(), so several levels
+        can be solved concurrently.  Decision variables keep their indices, hence
+        extract_solution() and compute_penalty_breakdown() work unchanged.
+
+        Args:
+            relaxation_level: Fallback level of the forked solver (0, 1 or 2).
+            time_limit_seconds: Time limit of the forked solver (None = no limit).
+            num_workers: CP-SAT workers of the forked solver. None keeps the
+                worker count of this solver.
+
+        Returns:
+            New ShiftPlanningSolver sharing the planning model but solving its own
+            copy of the CP-SAT model.
+
+        Raises:
+            RuntimeError: If the model was not built with use_relaxation_literals=True.
+        """
+        if not self.use_relaxation_literals or self.min_staffing_literal is None:
+            raise RuntimeError(
+                "fork_for_relaxation_level() requires add_all_constraints() with use_relaxation_literals=True"
+            )
+        forked = copy.copy(self)
+        forked._cp_model_override = self._get_cp_model().Clone()
+        forked.time_limit_seconds = time_limit_seconds
+        if num_workers is not None:
+            forked.num_workers = num_workers
+        forked._cp_solver = None
+        forked._stop_requested = False
+        forked.set_relaxation_level(relaxation_level)
+        return forked
+
+    @property
+    def proven_optimal(self) -> bool:
+        """OPTIMAL status that was not produced by a gap early stop."""
+        return self.status == cp_model.OPTIMAL and self.early_stop_reason is None
+
+    def early_stop_metrics(self) -> Dict[str, Any]:
+        """Configured early-stop policy and its outcome for stage_metrics."""
+        return {
+            **self.early_stop.as_dict(),
+            "reason": self.early_stop_reason,
+            "final_gap_percent": self.final_gap_percent,
+        }
+
+    def stop_search(self) -> None:
+        """
+        Ask a running (or about to start) solve() to stop as soon as possible.
+
+        Safe to call from another thread.  A stop that arrives while solve() is
+        still setting up the search is re-issued by its search watcher once
+        CP-SAT is running (see SEARCH_WATCH_INTERVAL_SECONDS).  The solver keeps the best solution found
+        so far, i.e. solve() then returns with status FEASIBLE or UNKNOWN.
+        """
+        self._stop_requested = True
+        if self._cp_solver is not None:
+            self._cp_solver.StopSearch()
+
+    def _get_cp_model(self) -> cp_model.CpModel:
+        """Return the CpModel solved by this solver (forked clone or the planning model)."""
+        if self._cp_model_override is not None:
+            return self._cp_model_override
+        return self.planning_model.get_model()
     
     def _add_warm_start_hints(self):
         """
@@ -1012,33 +1567,47 @@ class ShiftPlanningSolver:
         is similar to the current one. Even partially correct hints help the solver
         by narrowing the initial search space.
 
-        Hint sources (combined, with warm_start_shifts taking precedence):
+        Hint sources (combined, later sources take precedence):
           1. planning_model.locked_employee_shift: Existing assignments for the current
              period (already enforced as hard constraints; hinting them is harmless and
              also helps derive team-level shift hints which are NOT separately locked).
           2. warm_start_shifts: External previous-month assignments (if provided).
              These are the most valuable for warmstarting fresh planning runs.
+          3. warm_start_state: The last solution of this same period (see
+             export_warm_start_state()).  Inside its date range the stored
+             team_shift, cross-team and weekend values are hinted exactly, so a
+             re-plan starts from a complete assignment instead of a partial one.
 
         Variables hinted:
-          - team_shift[team, week, shift]: Inferred by majority vote from employee data.
+          - team_shift[team, week, shift]: Taken from warm_start_state where present,
+            otherwise inferred by majority vote from employee data.
             This is the most impactful hint because all other assignment variables are
             derived from or constrained by the team's weekly shift.
           - employee_active[emp, date]: Weekday activity (1 = working, 0 = off).
           - employee_weekend_shift[emp, date]: Weekend activity (1 = working, 0 = off).
+          - employee_cross_team_shift / employee_cross_team_weekend: only from
+            warm_start_state (1 = stored cross-team assignment, 0 = otherwise).
         """
-        model = self.planning_model.get_model()
+        model = self._get_cp_model()
+        # Drop hints of a previous solve on the same (reused) model so each
+        # variable is hinted at most once.
+        model.ClearHints()
         (team_shift, employee_active, employee_weekend_shift,
          employee_cross_team_shift, employee_cross_team_weekend) = self.planning_model.get_variables()
         employees = self.planning_model.employees
         weeks = self.planning_model.weeks
 
-        # Combine available hint data; warm_start_shifts overrides locked_employee_shift
+        # Combine available hint data; later sources override earlier ones
         hint_data: Dict[Tuple[int, date], str] = {}
         if self.planning_model.locked_employee_shift:
             hint_data.update(self.planning_model.locked_employee_shift)
         if self.warm_start_shifts:
             hint_data.update(self.warm_start_shifts)
 
+        state = _decode_warm_start_state(self.warm_start_state)
+        if state is not None:
+            hint_data.update(state["schedule"])
+
         if not hint_data:
             return
 
@@ -1055,7 +1624,7 @@ class ShiftPlanningSolver:
         team_week_shift_votes: Dict[Tuple[int, int], Dict[str, int]] = {}
 
         for (emp_id, d), shift_code in hint_data.items():
-            if not shift_code or shift_code == "OFF":
+            if not _is_working_code(shift_code):
                 continue
             team_id = emp_to_team.get(emp_id)
             if team_id is None:
@@ -1070,39 +1639,64 @@ class ShiftPlanningSolver:
                 team_week_shift_votes[key].get(shift_code, 0) + 1
             )
 
+        # Tie-break by shift_code name for deterministic results across runs
+        team_week_shift: Dict[Tuple[int, int], str] = {
+            key: max(votes.items(), key=lambda x: (x[1], x[0]))[0]
+            for key, votes in team_week_shift_votes.items() if votes
+        }
+        cross_team_keys: set = set()
+        if state is not None:
+            week_idx_by_start = {week_dates[0]: w_idx for w_idx, week_dates in enumerate(weeks)}
+            for (team_id, week_start), shift_code in state["team_shift"].items():
+                w_idx = week_idx_by_start.get(week_start)
+                if w_idx is not None:
+                    team_week_shift[(team_id, w_idx)] = shift_code
+            cross_team_keys = state["cross_team"]
+        cross_team_days = {(emp_id, d) for emp_id, d, _ in cross_team_keys}
+
         hint_count = 0
 
         # Apply team_shift hints: winning shift = 1, all others = 0
-        for (team_id, week_idx), votes in team_week_shift_votes.items():
-            if not votes:
-                continue
-            # Tie-break by shift_code name for deterministic results across runs
-            best_shift = max(votes.items(), key=lambda x: (x[1], x[0]))[0]
+        for (team_id, week_idx), best_shift in team_week_shift.items():
             for shift_code in self.planning_model.shift_codes:
                 if (team_id, week_idx, shift_code) in team_shift:
                     model.add_hint(team_shift[(team_id, week_idx, shift_code)],
                                    1 if shift_code == best_shift else 0)
                     hint_count += 1
 
-        # Apply employee_active hints for weekdays
+        # Apply employee_active hints for weekdays.  Inside the warm_start_state
+        # window a cross-team day is not own-team activity.
         for (emp_id, d), shift_code in hint_data.items():
             if d.weekday() >= 5:
                 continue
             if (emp_id, d) in employee_active:
-                model.add_hint(employee_active[(emp_id, d)],
-                               1 if shift_code and shift_code != "OFF" else 0)
+                working = _is_working_code(shift_code) and (emp_id, d) not in cross_team_days
+                model.add_hint(employee_active[(emp_id, d)], 1 if working else 0)
                 hint_count += 1
 
         # Apply employee_weekend_shift hints for weekends
+        weekend_hints: Dict[Tuple[int, date], int] = {}
         for (emp_id, d), shift_code in hint_data.items():
-            if d.weekday() < 5:
-                continue
-            if (emp_id, d) in employee_weekend_shift:
-                model.add_hint(employee_weekend_shift[(emp_id, d)],
-                               1 if shift_code and shift_code != "OFF" else 0)
-                hint_count += 1
-
-        print(f"  Applied {hint_count} warmstart hints from {len(hint_data)} previous shift assignments")
+            if d.weekday() >= 5 and (emp_id, d) in employee_weekend_shift:
+                weekend_hints[(emp_id, d)] = 1 if _is_working_code(shift_code) else 0
+        if state is not None:
+            for key in employee_weekend_shift:
+                if state["start"] <= key[1] <= state["end"]:
+                    weekend_hints[key] = 1 if key in state["weekend"] else 0
+        for key, value in weekend_hints.items():
+            model.add_hint(employee_weekend_shift[key], value)
+            hint_count += 1
+
+        # Apply cross-team hints (only the stored state knows them)
+        if state is not None:
+            for cross_vars in (employee_cross_team_shift, employee_cross_team_weekend):
+                for key, var in cross_vars.items():
+                    if state["start"] <= key[1] <= state["end"]:
+                        model.add_hint(var, 1 if key in cross_team_keys else 0)
+                        hint_count += 1
+
+        suffix = " (incl. stored solution of this period)" if state is not None else ""
+        print(f"  Applied {hint_count} warmstart hints from {len(hint_data)} previous shift assignments{suffix}")
 
     def compute_penalty_breakdown(self) -> Dict[str, float]:
         """
@@ -1119,13 +1713,197 @@ class ShiftPlanningSolver:
 
         breakdown: Dict[str, float] = {}
         for category, var_weight_pairs in self.penalty_groups.items():
-            total = 0.0
-            for var, weight in var_weight_pairs:
-                total += self.solution.Value(var) * weight
+            if not var_weight_pairs:
+                continue
+            values = self._solution_values(var_weight_pairs, key=lambda pair: pair[0])
+            weights = np.fromiter(
+                (weight for _, weight in var_weight_pairs), dtype=np.float64, count=len(var_weight_pairs)
+            )
+            total = float(np.dot(values, weights))
             if total != 0.0:
                 breakdown[category] = total
         return breakdown
 
+    def _variable_indices(self, variables, key: Optional[Callable[[Any], Any]] = None) -> np.ndarray:
+        """
+        Proto indices of ``variables`` (a list or dict of model variables) as an int64 array.
+
+        ``key`` picks the variable out of each entry (e.g. of a (var, weight)
+        pair).  Entries that are not plain model variables (negated literals,
+        constants, expressions) get -1.  The array is cached per container:
+        the variable dicts of the model and the penalty groups do not change
+        between solves.
+        """
+        cached = self._variable_index_cache.get(id(variables))
+        if cached is not None and cached[0] is variables and len(cached[1]) == len(variables):
+            return cached[1]
+        entries = variables.values() if isinstance(variables, dict) else variables
+        if key is not None:
+            entries = map(key, entries)
+        indices = np.fromiter(
+            (var.index if isinstance(var, cp_model.IntVar) else -1 for var in entries),
+            dtype=np.int64,
+            count=len(variables),
+        )
+        self._variable_index_cache[id(variables)] = (variables, indices)
+        return indices
+
+    def _solution_values(self, variables, key: Optional[Callable[[Any], Any]] = None) -> np.ndarray:
+        """
+        Values of ``variables`` (a list or dict, see _variable_indices()) in the current solution.
+
+        The response's solution vector is converted to a NumPy array once per
+        solve and indexed with the cached variable indices in one bulk read.
+        Entries that are not plain model variables fall back to Value().
+        """
+        if self._solution_vector is None:
+            self._solution_vector = np.asarray(self.solution.response_proto.solution, dtype=np.int64)
+        indices = self._variable_indices(variables, key)
+        values = self._solution_vector[np.maximum(indices, 0)]
+        others = np.flatnonzero(indices < 0)
+        if len(others):
+            entries = list(variables.values() if isinstance(variables, dict) else variables)
+            for pos in others.tolist():
+                var = entries[pos] if key is None else key(entries[pos])
+                values[pos] = self.solution.Value(var)
+        return values
+
+    def _solution_value_map(self, variables: Dict[Any, Any]) -> Dict[Any, int]:
+        """Solution value per key of a variable dict (see _solution_values())."""
+        return dict(zip(variables.keys(), self._solution_values(variables).tolist()))
+
+    def find_infeasibility_core(
+        self,
+        relaxation_level: Optional[int] = None,
+        time_limit_seconds: float = INFEASIBILITY_CORE_TIME_LIMIT_SECONDS,
+        minimize_seconds: float = INFEASIBILITY_CORE_MINIMIZE_SECONDS,
+    ) -> Dict[str, Any]:
+        """
+        Explain mode: find a small set of hard constraint groups that cannot hold together.
+
+        Works on a clone of the built model (add_all_constraints() must have run).
+        Every group of planning_model.constraint_groups that is hard at the level
+        (see RELAXED_CONSTRAINT_GROUPS) gets one assumption literal, added to the
+        enforcement literals of its constraints, and the objective is dropped.
+        If CP-SAT proves the clone INFEASIBLE, its sufficient assumptions are a
+        core; the core is then shrunk by deletion (drop one group, re-check)
+        within minimize_seconds.  Structural rules (one shift per team and week,
+        employee-team linkage) have no literal, so an empty core means they are
+        contradictory on their own.
+
+        Args:
+            relaxation_level: Fallback level to explain.  None uses
+                self.relaxation_level; other levels need use_relaxation_literals=True.
+            time_limit_seconds: Limit of the first solve.  Each deletion check
+                gets twice the time the first proof took.
+            minimize_seconds: Total budget for the deletion checks.
+
+        Returns:
+            Dict with 'status' ('INFEASIBLE', 'FEASIBLE' or 'UNKNOWN'),
+            'relaxation_level' and 'solve_seconds'; for INFEASIBLE additionally
+            'groups' (ConstraintGroups keys), 'conflicts' (German descriptions),
+            'minimal' (False when the budget ran out or a check was inconclusive)
+            and 'fallback_level' (see fallback_level_for_core()).
+        """
+        level = self.relaxation_level if relaxation_level is None else relaxation_level
+        if level != self.relaxation_level and self.min_staffing_literal is None:
+            raise RuntimeError(
+                "find_infeasibility_core() for another level requires use_relaxation_literals=True"
+            )
+        start = time.perf_counter()
+        model = self._get_cp_model().Clone()
+        proto = model.Proto()
+        if self.min_staffing_literal is not None:
+            for literal, enforced in (
+                (self.min_staffing_literal, level < 1),
+                (self.team_rotation_literal, level < 2),
+            ):
+                domain = proto.variables[literal.Index()].domain
+                domain[0] = int(enforced)
+                domain[1] = int(enforced)
+        model.ClearObjective()
+
+        relaxed = RELAXED_CONSTRAINT_GROUPS.get(level, frozenset())
+        key_by_literal: Dict[int, Tuple] = {}
+        literals: List[cp_model.IntVar] = []
+        for key, indices in self.planning_model.constraint_groups.indices.items():
+            if key[0] in relaxed:
+                continue
+            literal = model.NewBoolVar(f"assume_{len(literals)}")
+            for constraint_index in indices:
+                proto.constraints[constraint_index].enforcement_literal.append(literal.Index())
+            key_by_literal[literal.Index()] = key
+            literals.append(literal)
+
+        def _check(assumed: List[cp_model.IntVar], limit: float) -> Tuple[int, List[cp_model.IntVar]]:
+            model.ClearAssumptions()
+            model.AddAssumptions(assumed)
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = max(limit, 0.1)
+            # CP-SAT solves under assumptions with one sequential worker anyway.
+            # On a model this size presolve, probing and the LP relaxation cost
+            # far more than the propagation that finds these conflicts.
+            solver.parameters.num_search_workers = 1
+            solver.parameters.cp_model_presolve = False
+            solver.parameters.cp_model_probing_level = 0
+            solver.parameters.linearization_level = 0
+            solver.parameters.symmetry_level = 0
+            if self.random_seed is not None:
+                solver.parameters.random_seed = self.random_seed
+            self._cp_solver = solver
+            try:
+                if self._stop_requested:
+                    return cp_model.UNKNOWN, []
+                status = solver.Solve(model)
+            finally:
+                self._cp_solver = None
+            if status != cp_model.INFEASIBLE:
+                return status, []
+            in_core = set(solver.SufficientAssumptionsForInfeasibility())
+            return status, [lit for lit in assumed if lit.Index() in in_core]
+
+        status, core = _check(literals, time_limit_seconds)
+        result: Dict[str, Any] = {
+            "relaxation_level": level,
+            "status": {cp_model.INFEASIBLE: "INFEASIBLE", cp_model.FEASIBLE: "FEASIBLE",
+                       cp_model.OPTIMAL: "FEASIBLE"}.get(status, "UNKNOWN"),
+        }
+        if status != cp_model.INFEASIBLE:
+            result["solve_seconds"] = round(time.perf_counter() - start, 3)
+            return result
+
+        # Deletion-based minimisation: core[:i] are known to be necessary.  A
+        # check proving INFEASIBLE again should take about as long as the first
+        # proof; one that runs much longer has to find a whole plan and is
+        # treated as inconclusive (the group stays in the core).
+        minimal = True
+        check_limit = max(2 * (time.perf_counter() - start), 1.0)
+        deadline = time.perf_counter() + minimize_seconds
+        i = 0
+        while i < len(core):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or self._stop_requested:
+                minimal = False
+                break
+            candidate = core[:i] + core[i + 1:]
+            check_status, sub_core = _check(candidate, min(remaining, check_limit))
+            if check_status == cp_model.INFEASIBLE:
+                core = sub_core
+            else:
+                if check_status not in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+                    minimal = False
+                i += 1
+
+        groups = [key_by_literal[lit.Index()] for lit in core]
+        result.update({
+            "groups": groups,
+            "conflicts": [describe_constraint_group(key, self.planning_model) for key in groups],
+            "minimal": minimal,
+            "fallback_level": fallback_level_for_core(groups),
+            "solve_seconds": round(time.perf_counter() - start, 3),
+        })
+        return result
+
     def diagnose_infeasibility(self) -> Dict[str, any]:
         """
         Diagnose potential causes of infeasibility by analyzing the model configuration.
@@ -1439,41 +2217,11 @@ class ShiftPlanningSolver:
         
         return diagnostics
     
-    def solve(
-        self,
-        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
-    ) -> bool:
-        """
-        Solve the shift planning problem.
-
-        Applies warmstart hints (if available) and uses a solution callback to log
-        intermediate improvements. The search strategy (PORTFOLIO / FIXED_SEARCH /
-        AUTOMATIC) is set on the solver before solving starts.
-
-        Additional solver tuning applied here:
-          - All CPU cores as workers: num_search_workers = os.cpu_count() so every
-            core is exploited; no artificial cap is applied.
-          - linearization_level=2: stronger LP relaxation for tighter bounds and
-            faster pruning (typically 15-40% speedup on scheduling problems).
-          - interleave_search: disabled – prevents fast workers from making rapid
-            progress; time-to-first-solution is better without it.
-          - symmetry_level=2: automatic symmetry-breaking for the repeated
-            team/week structure in this model.
-          - random_seed: when set, makes the search fully reproducible.
-          - stop_after_first_feasible callback (relaxation_level > 0): for fallback
-            stages feasibility is the goal; halting early avoids wasted optimisation.
-        
-        Returns:
-            True if a solution was found, False otherwise
-        """
-        model = self.planning_model.get_model()
-        
-        _emit_progress(progress_callback, "solver_setup_started")
-
-        # Configure solver
+    def _new_cp_solver(self, time_limit_seconds: Optional[float]) -> cp_model.CpSolver:
+        """CpSolver with the search parameters of this solver (see solve())."""
         solver = cp_model.CpSolver()
-        if self.time_limit_seconds is not None:
-            solver.parameters.max_time_in_seconds = self.time_limit_seconds
+        if time_limit_seconds is not None:
+            solver.parameters.max_time_in_seconds = time_limit_seconds
         solver.parameters.num_search_workers = self.num_workers
         solver.parameters.log_search_progress = True
 
@@ -1514,6 +2262,53 @@ class ShiftPlanningSolver:
         if self.random_seed is not None:
             solver.parameters.random_seed = self.random_seed
 
+        # Early-stop policy: CP-SAT checks the gap itself, including bound
+        # improvements that arrive without a new solution.
+        policy = self.early_stop
+        if policy.gap_percent is not None:
+            solver.parameters.relative_gap_limit = policy.gap_percent / 100.0
+        return solver
+
+    def solve(
+        self,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        stop_after_first_solution: bool = False,
+    ) -> bool:
+        """
+        Solve the shift planning problem.
+
+        Applies warmstart hints (if available) and uses a solution callback to log
+        intermediate improvements. The search strategy (PORTFOLIO / FIXED_SEARCH /
+        AUTOMATIC) is set on the solver before solving starts.
+
+        Additional solver tuning applied here:
+          - All CPU cores as workers: num_search_workers = os.cpu_count() so every
+            core is exploited; no artificial cap is applied.
+          - linearization_level=2: stronger LP relaxation for tighter bounds and
+            faster pruning (typically 15-40% speedup on scheduling problems).
+          - interleave_search: disabled – prevents fast workers from making rapid
+            progress; time-to-first-solution is better without it.
+          - symmetry_level=2: automatic symmetry-breaking for the repeated
+            team/week structure in this model.
+          - random_seed: when set, makes the search fully reproducible.
+          - stop_after_first_feasible callback (relaxation_level > 0): for fallback
+            stages feasibility is the goal; halting early avoids wasted optimisation.
+
+        Args:
+            progress_callback: Optional callback(event, payload) for progress events.
+            stop_after_first_solution: Stop as soon as the first solution is found
+                (start solution of solve_lns()).
+        
+        Returns:
+            True if a solution was found, False otherwise
+        """
+        model = self._get_cp_model()
+        
+        _emit_progress(progress_callback, "solver_setup_started")
+
+        solver = self._new_cp_solver(self.time_limit_seconds)
+        policy = self.early_stop
+
         print("\n" + "=" * 60)
         print("STARTING SOLVER")
         print("=" * 60)
@@ -1527,10 +2322,14 @@ class ShiftPlanningSolver:
             print(f"Random seed: {self.random_seed}")
         if self.relaxation_level > 0:
             print(f"Stop-after-first-feasible: enabled (fallback stage {self.relaxation_level})")
+        if policy.gap_percent is not None or policy.plateau_seconds is not None:
+            print(f"Early stop: gap <= {policy.gap_percent}% / "
+                  f"no improvement for {policy.plateau_seconds} seconds")
 
         # Apply warmstart hints to bias the solver toward a known-good starting point.
         # Expected benefit: 20-40% faster first feasible solution on re-planning runs.
-        has_hints = (self.warm_start_shifts or self.planning_model.locked_employee_shift)
+        has_hints = (self.warm_start_shifts or self.warm_start_state
+                     or self.planning_model.locked_employee_shift)
         if has_hints:
             print("Applying warmstart hints from previous shift assignments...")
             self._add_warm_start_hints()
@@ -1543,21 +2342,66 @@ class ShiftPlanningSolver:
         # Fallback stages must also optimise so that present employees reach their monthly
         # hours target and no work gaps arise in high-absence situations.
         callback = ShiftPlanSolutionCallback(
-            stop_after_first_feasible=False,
-            progress_callback=progress_callback
+            stop_after_first_feasible=stop_after_first_solution,
+            progress_callback=progress_callback,
+            gap_limit_percent=policy.gap_percent,
         )
 
         # Solve with callback so each new improving solution is logged immediately.
         # The solver retains the best solution found; if it times out with status
         # FEASIBLE, solver.Value() still returns the best assignment found so far.
+        self._cp_solver = solver
+        if self._stop_requested:
+            # Stopped before the search started (e.g. a parallel stage already won).
+            solver.parameters.max_time_in_seconds = 0.0
+        plateau_stop = threading.Event()
+        search_done = threading.Event()
+
+        def _watch_search():
+            # A stop_search() after the check above but before Solve() has set
+            # up its search is a no-op on the CpSolver, so it is re-issued on
+            # every poll until Solve() returns.
+            while not search_done.wait(SEARCH_WATCH_INTERVAL_SECONDS):
+                if self._stop_requested:
+                    solver.StopSearch()
+                    continue
+                if policy.plateau_seconds is None or plateau_stop.is_set():
+                    continue
+                idle = callback.seconds_since_improvement()
+                if idle is not None and idle >= policy.plateau_seconds:
+                    print(f"  → No improvement for {policy.plateau_seconds:.0f}s, stopping search")
+                    plateau_stop.set()
+                    solver.StopSearch()
+
+        watch_thread = threading.Thread(target=_watch_search, name="solver-search-watch", daemon=True)
+        watch_thread.start()
         _emit_progress(progress_callback, "solver_search_started")
         self.status = solver.Solve(model, callback)
+        search_done.set()
+        watch_thread.join()
+        self._cp_solver = None
+        has_solution = self.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        self.final_gap_percent = (
+            round(_relative_gap_percent(solver.ObjectiveValue(), solver.BestObjectiveBound()), 4)
+            if has_solution else None
+        )
+        self.solution_count = callback.solution_count
+        self.early_stop_reason = callback.stop_reason
+        if self.early_stop_reason is None and plateau_stop.is_set():
+            self.early_stop_reason = "plateau"
+        if (self.early_stop_reason is None and self.status == cp_model.OPTIMAL
+                and policy.gap_percent is not None and self.final_gap_percent):
+            # relative_gap_limit reached: CP-SAT reports OPTIMAL within the tolerance.
+            self.early_stop_reason = "gap"
         _emit_progress(
             progress_callback,
             "solver_search_finished",
-            status=int(self.status)
+            status=int(self.status),
+            objectiveValue=float(solver.ObjectiveValue()) if has_solution else None,
+            bestBound=float(solver.BestObjectiveBound()) if has_solution else None,
         )
         self.solution = solver
+        self._solution_vector = None
         
         # Print results
         print("\n" + "=" * 60)
@@ -1618,41 +2462,288 @@ class ShiftPlanningSolver:
         
         return True
     
-    def extract_solution(self) -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str]]:
+    def solve_lns(
+        self,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        neighbourhood_time_limit_seconds: float = LNS_NEIGHBOURHOOD_TIME_LIMIT_SECONDS,
+        max_stalled_neighbourhoods: int = LNS_MAX_STALLED_NEIGHBOURHOODS,
+    ) -> bool:
         """
-        Extract shift assignments from the TEAM-BASED solution with CROSS-TEAM support.
-        
+        Solve with a large-neighbourhood search (LNS) around an incumbent plan.
+
+        The first solution of solve() is the incumbent (with the constructive
+        warm-start hints it is usually found right away).  Then one team, one
+        week or the employees furthest below their hours target take turns as
+        the neighbourhood: a clone of the model fixes every other decision
+        variable to the incumbent, is hinted with the complete incumbent and
+        solved with ``neighbourhood_time_limit_seconds``.  A better objective
+        becomes the new incumbent and is reported as "solver_solution_progress"
+        (with the neighbourhood label), the end as "solver_search_finished".
+
+        The search ends at time_limit_seconds (total, including the first
+        solution), after ``max_stalled_neighbourhoods`` neighbourhoods in a row
+        without improvement, on the plateau criterion of the early-stop policy
+        or on stop_search().  self.solution then holds the best plan, so
+        extract_solution() and compute_penalty_breakdown() work unchanged;
+        lns_stats summarises the run.
+
         Returns:
-            Tuple of (shift_assignments, complete_schedule)
-            where:
-            - shift_assignments: List of ShiftAssignment objects (includes cross-team assignments)
-            - complete_schedule: dict mapping (employee_id, date) to shift_code or "OFF"
-                                 This ensures ALL employees appear for ALL days
+            True if a solution was found, False otherwise
         """
-        if not self.solution or self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            return [], {}
-        
-        (team_shift, employee_active, employee_weekend_shift, 
-         employee_cross_team_shift, employee_cross_team_weekend) = self.planning_model.get_variables()
-        employees = self.planning_model.employees
-        teams = self.planning_model.teams
-        dates = self.planning_model.dates
+        started = time.monotonic()
+        deadline = None if self.time_limit_seconds is None else started + self.time_limit_seconds
+
+        def _initial_progress(event: str, payload: Dict[str, Any]) -> None:
+            # The search only finishes after the LNS rounds.
+            if event != "solver_search_finished":
+                _emit_progress(progress_callback, event, **payload)
+
+        self.lns_stats = None
+        if not self.solve(progress_callback=_initial_progress, stop_after_first_solution=True):
+            _emit_progress(progress_callback, "solver_search_finished",
+                           status=int(self.status), objectiveValue=None, bestBound=None)
+            return False
+
+        best_solver = self.solution
+        best_objective = best_solver.ObjectiveValue()
+        best_bound = best_solver.BestObjectiveBound()
+        vector = np.array(best_solver.response_proto.solution, dtype=np.int64)
+        stats: Dict[str, Any] = {
+            "initial_objective": best_objective,
+            "neighbourhoods": 0,
+            "improvements": 0,
+            "by_kind": {kind: {"tried": 0, "improved": 0} for kind in LNS_NEIGHBOURHOOD_KINDS},
+        }
+        stop_reason: Optional[str] = None
+        if self.status == cp_model.OPTIMAL:
+            stop_reason = "optimal"
+        else:
+            self.status = cp_model.FEASIBLE
+            print("\n" + "=" * 60)
+            print("LARGE-NEIGHBOURHOOD SEARCH")
+            print("=" * 60)
+
+        groups = self._lns_variable_groups()
+        teams = sorted(self.planning_model.teams, key=lambda t: t.id)
         weeks = self.planning_model.weeks
-        shift_codes = self.planning_model.shift_codes
-        absences = self.planning_model.absences
-        
-        assignments = []
-        assignment_id = 1
-        
-        # Complete schedule: every employee, every day
-        complete_schedule = {}
-        
-        # Track assigned shifts to prevent double assignments (safety check)
-        # Maps (employee_id, date) -> shift_type_id
-        assigned_shifts = {}
-        
-        # Helper function to safely add assignment (prevents double shifts)
-        def try_add_assignment(emp_id, shift_type_id, d, notes=None):
+        turns = {kind: 0 for kind in LNS_NEIGHBOURHOOD_KINDS}
+        worst_offset = 0
+        stalled = 0
+        last_improvement = time.monotonic()
+        plateau_seconds = self.early_stop.plateau_seconds
+        while stop_reason is None:
+            now = time.monotonic()
+            if self._stop_requested:
+                stop_reason = "stopped"
+                break
+            if deadline is not None and now >= deadline:
+                stop_reason = "time_limit"
+                break
+            if stalled >= max_stalled_neighbourhoods:
+                stop_reason = "stalled"
+                break
+            if plateau_seconds is not None and now - last_improvement >= plateau_seconds:
+                stop_reason = "plateau"
+                break
+
+            kind = LNS_NEIGHBOURHOOD_KINDS[stats["neighbourhoods"] % len(LNS_NEIGHBOURHOOD_KINDS)]
+            turn = turns[kind]
+            turns[kind] += 1
+            if kind == "team":
+                if not teams:
+                    stats["neighbourhoods"] += 1
+                    continue
+                team = teams[turn % len(teams)]
+                free = groups["team"] == team.id
+                label = f"team {team.name}"
+            elif kind == "week":
+                week_idx = turn % len(weeks)
+                free = groups["week"] == week_idx
+                label = f"week {week_idx + 1}"
+            else:
+                ranking = self._hours_shortfall_ranking(self.extract_solution()[1])
+                if not ranking:
+                    stats["neighbourhoods"] += 1
+                    continue
+                start = (worst_offset * LNS_WORST_EMPLOYEE_COUNT) % len(ranking)
+                worst = ranking[start:start + LNS_WORST_EMPLOYEE_COUNT]
+                worst_offset += 1
+                free = np.isin(groups["employee"], worst)
+                label = "employees " + ", ".join(str(emp_id) for emp_id in worst)
+
+            sub_model = self._get_cp_model().Clone()
+            proto = sub_model.Proto()
+            fixed = groups["index"][~free]
+            for var_index, value in zip(fixed.tolist(), vector[fixed].tolist()):
+                domain = proto.variables[var_index].domain
+                domain[0] = value
+                domain[1] = value
+            sub_model.ClearHints()
+            proto.solution_hint.vars.extend(range(len(vector)))
+            proto.solution_hint.values.extend(vector.tolist())
+
+            limit = neighbourhood_time_limit_seconds
+            if deadline is not None:
+                limit = min(limit, max(deadline - now, 0.0))
+            sub_solver = self._new_cp_solver(limit)
+            sub_solver.parameters.log_search_progress = False
+            self._cp_solver = sub_solver
+            if self._stop_requested:
+                sub_solver.parameters.max_time_in_seconds = 0.0
+            sub_status = sub_solver.Solve(sub_model)
+            self._cp_solver = None
+
+            stats["neighbourhoods"] += 1
+            stats["by_kind"][kind]["tried"] += 1
+            if (sub_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+                    and sub_solver.ObjectiveValue() < best_objective):
+                best_solver = sub_solver
+                best_objective = sub_solver.ObjectiveValue()
+                vector = np.array(sub_solver.response_proto.solution, dtype=np.int64)
+                self.solution = best_solver
+                self._solution_vector = vector
+                self.solution_count += 1
+                stats["improvements"] += 1
+                stats["by_kind"][kind]["improved"] += 1
+                stalled = 0
+                worst_offset = 0
+                last_improvement = time.monotonic()
+                elapsed = last_improvement - started
+                print(f"  → LNS {label}: objective={best_objective:.0f}, elapsed={elapsed:.1f}s")
+                _emit_progress(
+                    progress_callback,
+                    "solver_solution_progress",
+                    solutionCount=self.solution_count,
+                    objectiveValue=float(best_objective),
+                    bestBound=float(best_bound),
+                    elapsedSeconds=float(elapsed),
+                    neighbourhood=label,
+                )
+            else:
+                stalled += 1
+
+        self.solution = best_solver
+        self._solution_vector = vector
+        self.final_gap_percent = round(_relative_gap_percent(best_objective, best_bound), 4)
+        if stop_reason == "plateau":
+            self.early_stop_reason = "plateau"
+        stats.update({
+            "final_objective": best_objective,
+            "stop_reason": stop_reason,
+            "seconds": round(time.monotonic() - started, 3),
+        })
+        self.lns_stats = stats
+        print(f"LNS finished ({stop_reason}): {stats['improvements']} improvements in "
+              f"{stats['neighbourhoods']} neighbourhoods, objective "
+              f"{stats['initial_objective']:.0f} → {best_objective:.0f}")
+        _emit_progress(
+            progress_callback,
+            "solver_search_finished",
+            status=int(self.status),
+            objectiveValue=float(best_objective),
+            bestBound=float(best_bound),
+        )
+        return True
+
+    def _lns_variable_groups(self) -> Dict[str, np.ndarray]:
+        """
+        Decision variables of the model for solve_lns(), as parallel arrays.
+
+        index: CP-SAT variable index; team: team of the variable (team_shift) or
+        of its employee; week: week index; employee: employee id (-1 for team_shift).
+        """
+        (team_shift, employee_active, employee_weekend_shift,
+         employee_cross_team_shift, employee_cross_team_weekend) = self.planning_model.get_variables()
+        index = self.planning_model.index
+        team_of_employee = {emp.id: emp.team_id or -1 for emp in self.planning_model.employees}
+
+        def _week(d: date) -> int:
+            week_idx = index.week_index(d)
+            return -1 if week_idx is None else week_idx
+
+        rows: List[Tuple[int, int, int, int]] = [
+            (var.Index(), team_id, week_idx, -1)
+            for (team_id, week_idx, _), var in team_shift.items()
+        ]
+        for variables in (employee_active, employee_weekend_shift):
+            rows.extend(
+                (var.Index(), team_of_employee.get(emp_id, -1), _week(d), emp_id)
+                for (emp_id, d), var in variables.items()
+            )
+        for variables in (employee_cross_team_shift, employee_cross_team_weekend):
+            rows.extend(
+                (var.Index(), team_of_employee.get(emp_id, -1), _week(d), emp_id)
+                for (emp_id, d, _), var in variables.items()
+            )
+        table = np.array(rows, dtype=np.int64).reshape(-1, 4)
+        return {
+            "index": table[:, 0],
+            "team": table[:, 1],
+            "week": table[:, 2],
+            "employee": table[:, 3],
+        }
+
+    def _hours_shortfall_ranking(self, complete_schedule: Dict[Tuple[int, date], str]) -> List[int]:
+        """
+        Team members ordered by their shortfall against the pro-rata hours target
+        (weekly_working_hours / 7 per present day of the target period), largest first.
+        """
+        planning_model = self.planning_model
+        shift_type_by_code = planning_model.index.shift_type_by_code
+        start, end = planning_model.original_start_date, planning_model.original_end_date
+        shortfall: Dict[int, float] = {}
+        for emp in planning_model.employees:
+            if not emp.team_id:
+                continue
+            hours = 0.0
+            present_days = 0
+            weekly_hours = DEFAULT_WEEKLY_HOURS
+            for d in planning_model.dates:
+                code = complete_schedule.get((emp.id, d))
+                if not start <= d <= end or code == "ABSENT":
+                    continue
+                present_days += 1
+                shift_type = shift_type_by_code.get(code)
+                if shift_type is not None:
+                    hours += shift_type.hours
+                    weekly_hours = shift_type.weekly_working_hours
+            shortfall[emp.id] = weekly_hours / 7.0 * present_days - hours
+        return sorted(shortfall, key=lambda emp_id: (-shortfall[emp_id], emp_id))
+
+    def extract_solution(self) -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str]]:
+        """
+        Extract shift assignments from the TEAM-BASED solution with CROSS-TEAM support.
+        
+        Returns:
+            Tuple of (shift_assignments, complete_schedule)
+            where:
+            - shift_assignments: List of ShiftAssignment objects (includes cross-team assignments)
+            - complete_schedule: dict mapping (employee_id, date) to shift_code or "OFF"
+                                 This ensures ALL employees appear for ALL days
+        """
+        if not self.solution or self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            return [], {}
+        
+        (team_shift, employee_active, employee_weekend_shift, 
+         employee_cross_team_shift, employee_cross_team_weekend) = self.planning_model.get_variables()
+        employees = self.planning_model.employees
+        teams = self.planning_model.teams
+        dates = self.planning_model.dates
+        weeks = self.planning_model.weeks
+        shift_codes = self.planning_model.shift_codes
+        
+        assignments = []
+        assignment_id = 1
+        
+        # Complete schedule: every employee, every day
+        complete_schedule = {}
+        
+        # Track assigned shifts to prevent double assignments (safety check)
+        # Maps (employee_id, date) -> shift_type_id
+        assigned_shifts = {}
+        
+        # Helper function to safely add assignment (prevents double shifts)
+        def try_add_assignment(emp_id, shift_type_id, d, notes=None):
             """
             Try to add an assignment, preventing double shifts.
             Returns True if added, False if prevented.
@@ -1678,134 +2769,79 @@ class ShiftPlanningSolver:
             assignment_id += 1
             return True
         
+        # Read every decision variable of the solution in one bulk call per
+        # variable group instead of one solver.Value() call per lookup.
+        team_shift_values = self._solution_value_map(team_shift)
+        active_values = self._solution_value_map(employee_active)
+        weekend_values = self._solution_value_map(employee_weekend_shift)
+        cross_team_values = self._solution_value_map(employee_cross_team_shift)
+        cross_weekend_values = self._solution_value_map(employee_cross_team_weekend)
+
+        teams_by_id = {}
+        for t in teams:
+            teams_by_id.setdefault(t.id, t)
+        shift_type_id_by_code = {}
+        shift_code_by_type_id = {}
+        for st in STANDARD_SHIFT_TYPES:
+            shift_type_id_by_code.setdefault(st.code, st.id)
+            shift_code_by_type_id.setdefault(st.id, st.code)
+
+        # Which shift each team has in each week (first shift code set to 1)
+        team_week_shift = {}
+        for team in teams_by_id.values():
+            for week_idx in range(len(weeks)):
+                for shift_code in shift_codes:
+                    if team_shift_values.get((team.id, week_idx, shift_code)) == 1:
+                        team_week_shift[(team.id, week_idx)] = shift_code
+                        break
+
         # Extract shift assignments based on team shifts and employee activity
         for emp in employees:
             # Regular team members
             if not emp.team_id:
                 continue
-            
-            # Find employee's team
-            team = None
-            for t in teams:
-                if t.id == emp.team_id:
-                    team = t
-                    break
-            
+
+            team = teams_by_id.get(emp.team_id)
             if not team:
                 continue
-            
-            # For each date, check if employee is active
+
             for d in dates:
-                weekday = d.weekday()
-                
-                if weekday < 5:  # WEEKDAY (Mon-Fri): Use team shift
-                    if (emp.id, d) not in employee_active:
-                        continue
-                    
-                    if self.solution.Value(employee_active[(emp.id, d)]) == 0:
-                        continue  # Not working this day
-                    
-                    # Find which week this date belongs to
-                    week_idx = self.planning_model.get_week_index(d)
-                    
-                    # Find which shift the team has this week
-                    team_shift_code = None
-                    for shift_code in shift_codes:
-                        if (team.id, week_idx, shift_code) in team_shift:
-                            if self.solution.Value(team_shift[(team.id, week_idx, shift_code)]) == 1:
-                                team_shift_code = shift_code
-                                break
-                    
-                    if not team_shift_code:
-                        continue  # No shift found
-                    
-                    # Find shift type ID
-                    shift_type_id = None
-                    for st in STANDARD_SHIFT_TYPES:
-                        if st.code == team_shift_code:
-                            shift_type_id = st.id
-                            break
-                    
-                    if shift_type_id:
-                        try_add_assignment(emp.id, shift_type_id, d)
-                
-                else:  # WEEKEND (Sat-Sun): Use team shift type with individual presence
-                    # Check if employee is working this weekend day
-                    if (emp.id, d) not in employee_weekend_shift:
-                        continue
-                    
-                    if self.solution.Value(employee_weekend_shift[(emp.id, d)]) == 0:
-                        continue  # Not working this weekend day
-                    
-                    # Find which week this date belongs to
-                    week_idx = self.planning_model.get_week_index(d)
-                    
-                    # Find which shift the team has this week (same for weekends)
-                    team_shift_code = None
-                    for shift_code in shift_codes:
-                        if (team.id, week_idx, shift_code) in team_shift:
-                            if self.solution.Value(team_shift[(team.id, week_idx, shift_code)]) == 1:
-                                team_shift_code = shift_code
-                                break
-                    
-                    if not team_shift_code:
-                        continue  # No shift found
-                    
-                    # Find shift type ID
-                    shift_type_id = None
-                    for st in STANDARD_SHIFT_TYPES:
-                        if st.code == team_shift_code:
-                            shift_type_id = st.id
-                            break
-                    
-                    if shift_type_id:
-                        try_add_assignment(emp.id, shift_type_id, d)
-        
-        # Extract CROSS-TEAM assignments (NEW)
+                # Weekdays (Mon-Fri) use the team shift, weekends (Sat-Sun) the
+                # team shift type with individual presence
+                presence = active_values if d.weekday() < 5 else weekend_values
+                if not presence.get((emp.id, d)):
+                    continue  # No variable or not working this day
+
+                week_idx = self.planning_model.get_week_index(d)
+                team_shift_code = team_week_shift.get((team.id, week_idx))
+                if not team_shift_code:
+                    continue  # No shift found
+
+                shift_type_id = shift_type_id_by_code.get(team_shift_code)
+                if shift_type_id:
+                    try_add_assignment(emp.id, shift_type_id, d)
+
+        # Extract CROSS-TEAM assignments
         # These are employees working shifts from other teams to meet their monthly hours
         for emp in employees:
             if not emp.team_id:
                 continue
-            
+
             for d in dates:
-                weekday = d.weekday()
-                
-                if weekday < 5:  # WEEKDAY cross-team
-                    # Check all shift codes this employee can work cross-team
-                    for shift_code in shift_codes:
-                        if (emp.id, d, shift_code) not in employee_cross_team_shift:
-                            continue
-                        
-                        if self.solution.Value(employee_cross_team_shift[(emp.id, d, shift_code)]) == 1:
-                            # Find shift type ID
-                            shift_type_id = None
-                            for st in STANDARD_SHIFT_TYPES:
-                                if st.code == shift_code:
-                                    shift_type_id = st.id
-                                    break
-                            
-                            if shift_type_id:
-                                if try_add_assignment(emp.id, shift_type_id, d, "Cross-team assignment"):
-                                    break  # Only one shift per day
-                
+                if d.weekday() < 5:  # WEEKDAY cross-team
+                    cross_values, notes = cross_team_values, "Cross-team assignment"
                 else:  # WEEKEND cross-team
-                    # Check all shift codes this employee can work cross-team on weekends
-                    for shift_code in shift_codes:
-                        if (emp.id, d, shift_code) not in employee_cross_team_weekend:
-                            continue
-                        
-                        if self.solution.Value(employee_cross_team_weekend[(emp.id, d, shift_code)]) == 1:
-                            # Find shift type ID
-                            shift_type_id = None
-                            for st in STANDARD_SHIFT_TYPES:
-                                if st.code == shift_code:
-                                    shift_type_id = st.id
-                                    break
-                            
-                            if shift_type_id:
-                                if try_add_assignment(emp.id, shift_type_id, d, "Cross-team weekend assignment"):
-                                    break  # Only one shift per day
-        
+                    cross_values, notes = cross_weekend_values, "Cross-team weekend assignment"
+
+                # Check all shift codes this employee can work cross-team
+                for shift_code in shift_codes:
+                    if cross_values.get((emp.id, d, shift_code)) != 1:
+                        continue
+                    shift_type_id = shift_type_id_by_code.get(shift_code)
+                    if shift_type_id:
+                        if try_add_assignment(emp.id, shift_type_id, d, notes):
+                            break  # Only one shift per day
+
         # Build complete schedule: every employee for every day
         # This ensures ALL employees appear in the output, even without shifts
         # 
@@ -1822,33 +2858,98 @@ class ShiftPlanningSolver:
             for d in dates:
                 # PRIORITY 1: Check if employee is absent (HIGHEST PRIORITY)
                 # Absences ALWAYS override shifts and TD
-                absence = None
-                for abs in absences:
-                    if abs.employee_id == emp.id and abs.overlaps_date(d):
-                        absence = abs
-                        break
+                absence = self.planning_model.index.absence_on(emp.id, d)
                 
                 if absence:
                     # Mark as ABSENT (consistent with complete_schedule contract)
                     complete_schedule[(emp.id, d)] = "ABSENT"
                     continue
                 
-                # PRIORITY 2: Check if employee has a shift assignment
-                has_assignment = False
-                for assignment in assignments:
-                    if assignment.employee_id == emp.id and assignment.date == d:
-                        # Get shift code
-                        shift_type = next((st for st in STANDARD_SHIFT_TYPES if st.id == assignment.shift_type_id), None)
-                        if shift_type:
-                            complete_schedule[(emp.id, d)] = shift_type.code
-                            has_assignment = True
-                            break
-                
-                # PRIORITY 3: No assignment - mark as OFF
-                if not has_assignment:
-                    complete_schedule[(emp.id, d)] = "OFF"
+                # PRIORITY 2: shift assignment, PRIORITY 3: no assignment - mark as OFF
+                shift_type_id = assigned_shifts.get((emp.id, d))
+                complete_schedule[(emp.id, d)] = shift_code_by_type_id.get(shift_type_id, "OFF")
         
         return assignments, complete_schedule
+
+    def extract_schedule_matrix(self) -> Optional[ScheduleMatrix]:
+        """
+        Extract the solution as a ScheduleMatrix over the model's date range.
+
+        Same assignments as extract_solution(), with the absences as overlay
+        and the rows grouped by team.  Returns None without a solution.
+        """
+        if not self.solution or self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            return None
+        assignments, _complete_schedule = self.extract_solution()
+        employees = self.planning_model.employees
+        dates = self.planning_model.dates
+        return ScheduleMatrix.from_assignments(
+            assignments,
+            [emp.id for emp in employees],
+            dates[0],
+            dates[-1],
+            shift_types=self.planning_model.shift_types,
+            absences=self.planning_model.absences,
+            team_of={emp.id: emp.team_id for emp in employees},
+        )
+
+    def export_warm_start_state(
+        self, complete_schedule: Dict[Tuple[int, date], str]
+    ) -> Dict[str, Any]:
+        """
+        Snapshot the current solution compactly for warm-starting a re-plan.
+
+        Must be called after a successful solve.  The result is plain JSON
+        (see _decode_warm_start_state() for the reverse direction):
+          - start/end: ISO dates of the planning model's (extended) date range
+          - schedule: {emp_id: [code per day from start]} from complete_schedule
+          - team_shift: {team_id: {week_start: code}} of all team_shift vars = 1
+          - cross_team: [[emp_id, date, code], ...] of all cross-team vars = 1
+          - weekend: {emp_id: [date, ...]} of all employee_weekend_shift vars = 1
+        Only the variables set to 1 are stored; everything else in the date
+        range is implicitly 0.
+        """
+        if not self.solution or self.status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            return {}
+
+        (team_shift, _employee_active, employee_weekend_shift,
+         employee_cross_team_shift, employee_cross_team_weekend) = self.planning_model.get_variables()
+        dates = self.planning_model.dates
+        weeks = self.planning_model.weeks
+        start = dates[0]
+
+        schedule: Dict[str, List[Optional[str]]] = {}
+        for (emp_id, d), shift_code in complete_schedule.items():
+            offset = (d - start).days
+            if 0 <= offset < len(dates):
+                schedule.setdefault(str(emp_id), [None] * len(dates))[offset] = shift_code
+
+        team_state: Dict[str, Dict[str, str]] = {}
+        for (team_id, week_idx, shift_code), val in self._solution_value_map(team_shift).items():
+            if val:
+                team_state.setdefault(str(team_id), {})[weeks[week_idx][0].isoformat()] = shift_code
+
+        cross_team = [
+            [emp_id, d.isoformat(), shift_code]
+            for cross_vars in (employee_cross_team_shift, employee_cross_team_weekend)
+            for (emp_id, d, shift_code), val in self._solution_value_map(cross_vars).items()
+            if val
+        ]
+
+        weekend: Dict[str, List[str]] = {}
+        for (emp_id, d), val in self._solution_value_map(employee_weekend_shift).items():
+            if val:
+                weekend.setdefault(str(emp_id), []).append(d.isoformat())
+
+        return {
+            "version": WARM_START_STATE_VERSION,
+            "start": start.isoformat(),
+            "end": dates[-1].isoformat(),
+            "schedule": schedule,
+            "team_shift": team_state,
+            "cross_team": cross_team,
+            "weekend": weekend,
+        }
     
     def print_planning_summary(
         self,
@@ -1874,7 +2975,6 @@ class ShiftPlanningSolver:
         dates = self.planning_model.dates
         weeks = self.planning_model.weeks
         shift_types = self.planning_model.shift_types
-        absences = self.planning_model.absences
         
         print("\n" + "=" * 80)
         print("SCHICHTPLAN ZUSAMMENFASSUNG (PLANNING SUMMARY)")
@@ -1956,9 +3056,7 @@ class ShiftPlanningSolver:
             # Count days without absence for this employee
             days_without_absence = 0
             for d in dates:
-                is_absent = any(abs.employee_id == emp.id and abs.overlaps_date(d) 
-                              for abs in absences)
-                if not is_absent:
+                if not self.planning_model.index.has_absence(emp.id, d):
                     days_without_absence += 1
             
             # Calculate required hours: (weekly_hours / 7) × days_without_absence
@@ -2012,6 +3110,119 @@ class ShiftPlanningSolver:
 # Helper functions used by solve_shift_planning()
 # ---------------------------------------------------------------------------
 
+# How often a running solve_shift_planning() polls its should_stop() callback.
+CANCEL_POLL_INTERVAL_SECONDS = 0.5
+
+
+class PlanningCancelled(Exception):
+    """Raised by solve_shift_planning() when its should_stop() callback requested a stop."""
+
+
+class _CancellationWatchdog:
+    """
+    Background thread that polls ``should_stop()`` and stops running searches.
+
+    CP-SAT only calls back on improving solutions, so a long search without
+    progress would never see a cancellation from its solution callback.  The
+    watchdog polls on its own timer instead and calls stop_search() on every
+    solver registered via watch(), which frees the search workers within about
+    one poll interval.  Without ``should_stop`` no thread is started.
+    """
+
+    def __init__(
+        self,
+        should_stop: Optional[Callable[[], bool]],
+        interval_seconds: float = CANCEL_POLL_INTERVAL_SECONDS,
+    ):
+        self._should_stop = should_stop
+        self._interval = interval_seconds
+        self._lock = threading.Lock()
+        self._solvers: List["ShiftPlanningSolver"] = []
+        self._closing = threading.Event()
+        self.cancelled = False
+        self._thread: Optional[threading.Thread] = None
+        if should_stop is not None:
+            self._thread = threading.Thread(
+                target=self._run, name="solver-cancel-watchdog", daemon=True
+            )
+            self._thread.start()
+
+    def watch(self, solver: "ShiftPlanningSolver") -> None:
+        """Stop ``solver`` on cancellation (immediately if already cancelled)."""
+        with self._lock:
+            if all(s is not solver for s in self._solvers):
+                self._solvers.append(solver)
+            cancelled = self.cancelled
+        if cancelled:
+            solver.stop_search()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise PlanningCancelled("Planung wurde abgebrochen")
+
+    def _run(self) -> None:
+        while not self._closing.wait(self._interval):
+            try:
+                stop = self._should_stop()
+            except Exception:
+                # A failing check (e.g. a locked database) must not end the solve.
+                continue
+            if stop:
+                self._cancel()
+                return
+
+    def _cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            solvers = list(self._solvers)
+        print("\n⚠️  Planung wurde abgebrochen – laufende Suche wird gestoppt")
+        for solver in solvers:
+            solver.stop_search()
+
+    def close(self) -> None:
+        """Stop polling (idempotent)."""
+        self._closing.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# Stage identifiers, labels and report statuses of the solver stages by relaxation level.
+SOLVER_STAGES = {
+    0: ("STAGE_1", "Normaler Lösungsversuch", "Alle Hard-Constraints aktiv"),
+    1: ("STAGE_2", "Fallback 1", "Mindestbesetzung als Soft-Constraint"),
+    2: ("STAGE_3", "Fallback 2", "Mindestbesetzung soft + Teamrotation deaktiviert"),
+}
+
+
+def _split_parallel_stage_workers(total_workers: int, stage_count: int) -> List[int]:
+    """
+    Split a CP-SAT worker budget across concurrently raced solver stages.
+
+    The strictest stage – the one whose result is preferred – gets half of the
+    budget (rounded up); the relaxed stages share the remainder evenly.  Every
+    stage gets at least one worker, so with very small budgets the total may
+    exceed total_workers slightly.
+
+    Args:
+        total_workers: Worker budget of the planning job (e.g. SOLVER_WORKERS_PER_JOB).
+        stage_count: Number of stages raced in parallel.
+
+    Returns:
+        List of worker counts, strictest stage first.
+    """
+    total_workers = max(1, total_workers)
+    if stage_count <= 1:
+        return [total_workers]
+    strict_workers = (total_workers + 1) // 2
+    remaining = max(total_workers - strict_workers, 0)
+    relaxed_count = stage_count - 1
+    relaxed_workers = [
+        max(1, remaining // relaxed_count + (1 if i < remaining % relaxed_count else 0))
+        for i in range(relaxed_count)
+    ]
+    return [strict_workers] + relaxed_workers
+
+
 def _print_relaxation_summary(relaxed_constraints: List[str]) -> None:
     """Print a summary of which constraints were relaxed during fallback solving."""
     if not relaxed_constraints:
@@ -2216,89 +3427,6 @@ def create_emergency_plan(
     return assignments, relaxed_constraints
 
 
-def _create_greedy_emergency_plan(
-    planning_model: ShiftPlanningModel,
-) -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str]]:
-    """
-    Stage 4 emergency fallback: build a minimal shift plan using a greedy algorithm
-    without OR-Tools. This guarantees a non-empty result even when the CP-SAT solver
-    cannot find any feasible solution in all relaxed configurations.
-
-    Strategy:
-    - For each day, collect employees who are not absent.
-    - Round-robin distribute available employees across active shift types for that day.
-    - Respects absences (employees on U/AU/L are never assigned shifts).
-    - Does NOT enforce minimum staffing, rotation order, rest times, or hours targets.
-
-    Returns:
-        Tuple of (assignments, complete_schedule) – same format as extract_solution().
-    """
-    employees = planning_model.employees
-    dates = planning_model.dates
-    absences = planning_model.absences
-    shift_types = planning_model.shift_types
-    shift_codes = planning_model.shift_codes
-
-    # Build fast absence lookup: (emp_id, date) -> absence
-    absence_lookup: Dict[Tuple[int, date], object] = {}
-    for absence in absences:
-        for d in dates:
-            if absence.start_date <= d <= absence.end_date:
-                absence_lookup[(absence.employee_id, d)] = absence
-
-    # Only schedule shifts that are active for the day type
-    def active_shifts_for_day(d: date) -> List[str]:
-        result = []
-        for st in shift_types:
-            if st.code in shift_codes and st.works_on_date(d):
-                result.append(st.code)
-        return result or list(shift_codes)  # fallback: all shifts
-
-    assignments: List[ShiftAssignment] = []
-    complete_schedule: Dict[Tuple[int, date], str] = {}
-    assignment_id = 1
-    already_assigned: Dict[Tuple[int, date], str] = {}
-
-    # Track which employees are available (not absent) per day
-    for d in dates:
-        available = [
-            emp for emp in employees
-            if emp.team_id and (emp.id, d) not in absence_lookup
-        ]
-        day_shift_codes = active_shifts_for_day(d)
-
-        for idx, emp in enumerate(available):
-            if (emp.id, d) in already_assigned:
-                continue
-            # Round-robin assignment across shift types
-            shift_code = day_shift_codes[idx % len(day_shift_codes)]
-            shift_type = next((st for st in shift_types if st.code == shift_code), None)
-            if shift_type is None:
-                continue
-            assignments.append(ShiftAssignment(
-                id=assignment_id,
-                employee_id=emp.id,
-                shift_type_id=shift_type.id,
-                date=d,
-                notes="Notfallplan (greedy)",
-            ))
-            already_assigned[(emp.id, d)] = shift_code
-            assignment_id += 1
-
-    # Build complete_schedule: every employee × every date
-    for emp in employees:
-        for d in dates:
-            if (emp.id, d) in absence_lookup:
-                complete_schedule[(emp.id, d)] = "ABSENT"
-            elif (emp.id, d) in already_assigned:
-                complete_schedule[(emp.id, d)] = already_assigned[(emp.id, d)]
-            else:
-                complete_schedule[(emp.id, d)] = "OFF"
-
-    print(f"  Notfallplan erstellt: {len(assignments)} Schichtzuweisungen für {len(employees)} Mitarbeiter über {len(dates)} Tage.")
-    return assignments, complete_schedule
-
-
 # ---------------------------------------------------------------------------
 # PlanningReport helper functions
 # ---------------------------------------------------------------------------
@@ -2369,7 +3497,7 @@ def _validation_result_to_rule_violations(
 
 
 def _build_planning_report(
-    assignments: List[ShiftAssignment],
+    assignments: Union[List[ShiftAssignment], ScheduleMatrix],
     complete_schedule: Dict,
     planning_model: "ShiftPlanningModel",
     status: str,
@@ -2378,8 +3506,13 @@ def _build_planning_report(
     relaxed_constraints_strs: List[str],
     penalty_breakdown: Optional[Dict[str, float]] = None,
     stage_metrics: Optional[List[Dict[str, Any]]] = None,
+    warm_start_state: Optional[Dict[str, Any]] = None,
 ) -> PlanningReport:
-    """Build a PlanningReport from solver outputs and a fresh validation run."""
+    """
+    Build a PlanningReport from solver outputs and a fresh validation run.
+
+    ``assignments`` may be the assignment list or a ScheduleMatrix of it.
+    """
     start_date = planning_model.original_start_date
     end_date = planning_model.original_end_date
 
@@ -2408,10 +3541,13 @@ def _build_planning_report(
 
     # Shift count per code
     shifts_assigned: Dict[str, int] = {}
-    for assignment in assignments:
-        shift_type = get_shift_type_by_id(assignment.shift_type_id)
-        code = shift_type.code if shift_type else str(assignment.shift_type_id)
-        shifts_assigned[code] = shifts_assigned.get(code, 0) + 1
+    if isinstance(assignments, ScheduleMatrix):
+        shifts_assigned = assignments.code_counts()
+    else:
+        for assignment in assignments:
+            shift_type = get_shift_type_by_id(assignment.shift_type_id)
+            code = shift_type.code if shift_type else str(assignment.shift_type_id)
+            shifts_assigned[code] = shifts_assigned.get(code, 0) + 1
 
     # Relaxed constraints
     relaxed_constraints = _parse_relaxed_constraints(relaxed_constraints_strs)
@@ -2452,6 +3588,7 @@ def _build_planning_report(
         solver_time_seconds=solver_time_seconds,
         penalty_breakdown=penalty_breakdown or {},
         stage_metrics=stage_metrics or [],
+        warm_start_state=warm_start_state or {},
     )
 
 
@@ -2465,6 +3602,14 @@ def solve_shift_planning(
     db_path: str = "dienstplan.db",
     random_seed: Optional[int] = None,
     progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    parallel_stages: bool = False,
+    profile_model_build: Optional[bool] = None,
+    warm_start_state: Optional[Dict[str, Any]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    early_stop: Optional[EarlyStopPolicy] = None,
+    lns: bool = False,
+    core_check: bool = False,
+    rotation_patterns: Optional[Dict[int, List[str]]] = None,
 ) -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str], PlanningReport]:
     """
     Solve the shift planning problem.
@@ -2487,6 +3632,8 @@ def solve_shift_planning(
             previous shift assignments to use as solver hints (AddHint). Typically
             the previous month's complete schedule. Expected benefit: 20-40% faster
             first feasible solution on re-planning runs with similar structure.
+            Without warm_start_state, days not covered here are hinted with the
+            constructive start plan (constructive_planner.build_constructive_plan()).
         db_path: Path to the SQLite database file, used to load rotation group
             patterns. Defaults to "dienstplan.db".
         random_seed: Optional integer seed for the CP-SAT pseudo-random number
@@ -2494,6 +3641,44 @@ def solve_shift_planning(
             Useful for regression testing and performance comparisons.
         progress_callback: Optional callback(event, payload) used to report
             optimization stage and sub-step progress to callers (e.g. API status).
+        parallel_stages: When True, Stages 1-3 are raced concurrently instead of
+            one after another (see _race_solver_stages()).  The worker budget
+            (num_workers) is split across the stages and the strictest stage that
+            finds a solution wins, so the worst-case latency is one stage limit
+            instead of the sum of all three.  Default False keeps the sequential
+            fallback chain.
+        profile_model_build: When True, the model construction is profiled per
+            constraint family (wall time, Python allocations, variables and
+            constraints added) and the result is attached to the first executed
+            stage's stage_metrics entry as "build_profile".  None (default) reads
+            the DIENSTPLAN_PROFILE_MODEL_BUILD environment variable.
+        warm_start_state: Optional planning_report.warm_start_state of an earlier
+            run for the SAME period.  All stored variable values are fed to
+            ShiftPlanningSolver._add_warm_start_hints(), so re-planning after a
+            small change (e.g. one new absence) starts from the previous solution.
+        should_stop: Optional callable polled every CANCEL_POLL_INTERVAL_SECONDS
+            by a watchdog thread (e.g. "was the planning job cancelled?").  When
+            it returns True the running CP-SAT search is stopped, the remaining
+            fallback stages are skipped and PlanningCancelled is raised.
+        early_stop: Optional EarlyStopPolicy for all CP-SAT stages: stop once the
+            relative gap to the best bound is small enough or the objective has
+            not improved for a while.  None reads the policy from global_settings
+            (GlobalSettings of the site).  Each stage_metrics entry reports the
+            policy, the stop reason and the final gap under "early_stop".
+        lns: When True, Stage 1 runs ShiftPlanningSolver.solve_lns() instead of
+            one monolithic search: after the first solution, teams, weeks and
+            the employees furthest below their hours target are re-optimised
+            in turns with everything else fixed.  Its stage_metrics entry
+            reports the run under "lns".  Ignored with parallel_stages.
+        core_check: When True, the shared model is solved once under assumption
+            literals before Stage 1 (ShiftPlanningSolver.find_infeasibility_core()).
+            A conflict core found there skips every stage it proves infeasible.
+            Independent of this flag, a stage that is proven INFEASIBLE is
+            explained the same way afterwards.  Each analysis is reported as a
+            "CORE_CHECK" stage_metrics entry with the conflicting rules.
+        rotation_patterns: Rotation group patterns to use instead of loading
+            them from db_path (see ShiftPlanningSolver); with them the solve
+            does not open the database at all.  None (default) loads them.
         
     Returns:
         Always returns a non-None 3-tuple of
@@ -2503,7 +3688,11 @@ def solve_shift_planning(
           Stage 2 – Fallback 1: minimum staffing (H3) relaxed to soft with
                     penalty weight MIN_STAFFING_RELAXED_PENALTY_WEIGHT (200,000).
           Stage 3 – Fallback 2: minimum staffing soft + team rotation skipped.
-          Stage 4 – Emergency plan: greedy assignment without OR-Tools.
+          Stage 4 – Emergency plan: constructive start plan without OR-Tools
+                    (constructive_planner.build_constructive_plan()).
+        Stages 1-3 share one CP-SAT model: it is built once by the first stage
+        that runs and later stages only toggle the enforcement literals of H3 and
+        the team rotation (see ShiftPlanningSolver.set_relaxation_level()).
         Which constraints were relaxed is printed via _print_relaxation_summary().
         - shift_assignments: List of ShiftAssignment objects for employees who work
         - complete_schedule: dict mapping (employee_id, date) to shift_code/"OFF"/"ABSENT"
@@ -2511,6 +3700,56 @@ def solve_shift_planning(
         - planning_report: PlanningReport with solver metrics, violations, and
                            relaxed constraints for this planning run
     """
+    watchdog = _CancellationWatchdog(should_stop)
+    try:
+        return _solve_shift_planning_stages(
+            planning_model,
+            time_limit_seconds=time_limit_seconds,
+            num_workers=num_workers,
+            global_settings=global_settings,
+            search_strategy=search_strategy,
+            warm_start_shifts=warm_start_shifts,
+            db_path=db_path,
+            random_seed=random_seed,
+            progress_callback=progress_callback,
+            parallel_stages=parallel_stages,
+            profile_model_build=profile_model_build,
+            warm_start_state=warm_start_state,
+            early_stop=early_stop,
+            lns=lns,
+            core_check=core_check,
+            rotation_patterns=rotation_patterns,
+            watchdog=watchdog,
+        )
+    finally:
+        watchdog.close()
+
+
+def _solve_shift_planning_stages(
+    planning_model: ShiftPlanningModel,
+    time_limit_seconds: Optional[int],
+    num_workers: Optional[int],
+    global_settings: Optional[Dict],
+    search_strategy: str,
+    warm_start_shifts: Optional[Dict[Tuple[int, date], str]],
+    db_path: str,
+    random_seed: Optional[int],
+    progress_callback: Optional[Callable[[str, Dict[str, Any]], None]],
+    parallel_stages: bool,
+    profile_model_build: Optional[bool],
+    warm_start_state: Optional[Dict[str, Any]],
+    early_stop: Optional[EarlyStopPolicy],
+    lns: bool,
+    core_check: bool,
+    rotation_patterns: Optional[Dict[int, List[str]]],
+    watchdog: _CancellationWatchdog,
+) -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str], PlanningReport]:
+    """
+    Stage chain of solve_shift_planning() (see there for the arguments).
+
+    Every solver that runs is registered with ``watchdog``; after each stage a
+    cancellation raises PlanningCancelled instead of moving on to the next one.
+    """
 
     # Production default time limit for Stage 1: 20 minutes.
     # CP-SAT returns the best FEASIBLE solution found when the limit is reached,
@@ -2537,38 +3776,128 @@ def solve_shift_planning(
         stage2_limit = DEFAULT_STAGE2_TIME_LIMIT_SECONDS
         stage3_limit = DEFAULT_STAGE3_TIME_LIMIT_SECONDS
 
-    def _make_solver(model: ShiftPlanningModel, level: int, limit=None) -> "ShiftPlanningSolver":
-        return ShiftPlanningSolver(
-            model, limit, num_workers, global_settings,
-            db_path=db_path,
-            search_strategy=search_strategy,
-            warm_start_shifts=warm_start_shifts,
-            relaxation_level=level,
-            random_seed=random_seed,
-        )
-
-    def _rebuild_model() -> ShiftPlanningModel:
-        """Return a fresh ShiftPlanningModel with identical configuration."""
-        from model import ShiftPlanningModel as _SPM
-        return _SPM(
-            employees=planning_model.employees,
-            teams=planning_model.teams,
-            start_date=planning_model.original_start_date,
-            end_date=planning_model.original_end_date,
-            absences=planning_model.absences,
-            shift_types=planning_model.shift_types,
-            locked_team_shift=planning_model.locked_team_shift,
-            locked_employee_weekend=planning_model.locked_employee_weekend,
-            locked_absence=planning_model.locked_absence,
-            locked_employee_shift=planning_model.locked_employee_shift,
-            ytd_weekend_counts=planning_model.ytd_weekend_counts,
-            ytd_night_counts=planning_model.ytd_night_counts,
-            ytd_holiday_counts=planning_model.ytd_holiday_counts,
-            previous_employee_shifts=planning_model.previous_employee_shifts,
-        )
+    # All solver stages share ONE model: minimum staffing (H3) and team rotation
+    # are guarded by enforcement literals, so a fallback stage only re-fixes those
+    # literals and resets the objective instead of re-running the (expensive)
+    # Python model construction.  The model is built lazily by the first stage
+    # that actually runs (Stage 1 may be skipped by the pre-check below).
+    shared_solver: Optional[ShiftPlanningSolver] = None
+    model_build_seconds = 0.0
+    if profile_model_build is None:
+        profile_model_build = _profile_model_build_from_env()
+
+    def _prepare_stage(level: int, limit) -> Tuple["ShiftPlanningSolver", Dict[str, Any]]:
+        """Build the shared model on first use, otherwise switch it to ``level``.
+
+        Returns the solver plus the build-related stage_metrics entries:
+        build_seconds is the time actually spent preparing this stage (only the
+        first stage pays the full construction cost) and build_seconds_saved the
+        construction time a rebuild would have cost.
+        """
+        nonlocal shared_solver, model_build_seconds
+        build_start = time.perf_counter()
+        if shared_solver is None:
+            shared_solver = ShiftPlanningSolver(
+                planning_model, limit, num_workers, global_settings,
+                db_path=db_path,
+                search_strategy=search_strategy,
+                warm_start_shifts=warm_start_shifts,
+                relaxation_level=level,
+                random_seed=random_seed,
+                use_relaxation_literals=True,
+                profile_model_build=profile_model_build,
+                warm_start_state=warm_start_state,
+                early_stop=early_stop,
+                rotation_patterns=rotation_patterns,
+            )
+            watchdog.watch(shared_solver)
+            shared_solver.add_all_constraints(progress_callback=progress_callback)
+            model_build_seconds = time.perf_counter() - build_start
+            watchdog.raise_if_cancelled()
+            stage_build: Dict[str, Any] = {
+                "build_seconds": round(model_build_seconds, 3),
+                "model_reused": False,
+            }
+            if shared_solver.build_profile:
+                stage_build["build_profile"] = shared_solver.build_profile
+            return shared_solver, stage_build
+        shared_solver.time_limit_seconds = limit
+        shared_solver.set_relaxation_level(level)
+        build_seconds = time.perf_counter() - build_start
+        return shared_solver, {
+            "build_seconds": round(build_seconds, 3),
+            "model_reused": True,
+            "build_seconds_saved": round(max(model_build_seconds - build_seconds, 0.0), 3),
+        }
 
     stage_metrics: List[Dict[str, Any]] = []
 
+    # Constructive start plan (rotation, rest times, consecutive-day limits and
+    # hours targets respected where possible).  It is the Stage 4 result and,
+    # for a period without an earlier solution, complete warm-start hints for
+    # the CP-SAT stages.  Explicit warm_start_shifts (e.g. the previous month)
+    # take precedence over it.
+    constructive_start = time.perf_counter()
+    if rotation_patterns is None:
+        rotation_patterns = _load_rotation_patterns(db_path)
+    start_plan = build_constructive_plan(planning_model, rotation_patterns or None)
+    constructive_seconds = time.perf_counter() - constructive_start
+    print(f"Konstruktiver Startplan: {len(start_plan[0])} Schichtzuweisungen "
+          f"in {constructive_seconds:.3f}s")
+    if warm_start_state is None:
+        warm_start_shifts = {**start_plan[1], **(warm_start_shifts or {})}
+
+    def _run_emergency_stage() -> Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str], PlanningReport]:
+        """Stage 4: constructive emergency plan when no solver stage produced a plan."""
+        watchdog.raise_if_cancelled()
+        # ------------------------------------------------------------------ #
+        # Stage 4 – Emergency plan: constructive start plan (no OR-Tools)     #
+        # ------------------------------------------------------------------ #
+        _emit_progress(
+            progress_callback,
+            "stage_started",
+            stageIndex=4,
+            totalStages=4,
+            stageName="Notfallplan",
+            stageDetails="Konstruktiver Startplan ohne OR-Tools"
+        )
+        print("\n" + "=" * 60)
+        print("STUFE 4 (NOTFALLPLAN): Konstruktiver Startplan ohne OR-Tools")
+        print("  Grund: Alle Solver-Stufen waren INFEASIBLE")
+        print("=" * 60)
+        greedy_relaxed = [
+            "Mindestbesetzung (H3): nicht garantiert – nur verfügbare Teammitglieder werden eingeplant",
+            "Ruhezeiten: nur unterschritten, wenn sonst die Mindestbesetzung fehlt",
+            "Stunden-Ziele, Wochenend- und Fairness-Regeln: nicht optimiert",
+        ]
+        result = start_plan
+        _print_relaxation_summary(greedy_relaxed)
+        report = _build_planning_report(
+            assignments=result[0],
+            complete_schedule=result[1],
+            planning_model=planning_model,
+            status="EMERGENCY",
+            objective_value=0.0,
+            solver_time_seconds=0.0,
+            relaxed_constraints_strs=greedy_relaxed,
+            stage_metrics=stage_metrics + [{
+                "stage": "STAGE_4",
+                "label": "Notfallplan",
+                "relaxation_level": 3,
+                "solver_type": "CONSTRUCTIVE",
+                "solved": True,
+                "solve_seconds": round(constructive_seconds, 3),
+            }],
+        )
+        _emit_progress(
+            progress_callback,
+            "stage_completed",
+            stageIndex=4,
+            totalStages=4,
+            stageName="Notfallplan"
+        )
+        return result[0], result[1], report
+
     # ------------------------------------------------------------------ #
     # Pre-check: skip Stage 1 when min-staffing is provably infeasible   #
     # ------------------------------------------------------------------ #
@@ -2599,14 +3928,241 @@ def solve_shift_planning(
                 f"{_infeasible_days[0].strftime('%d.%m.%Y')})"
             )
 
+    # ------------------------------------------------------------------ #
+    # Conflict cores: which stages are provably infeasible               #
+    # ------------------------------------------------------------------ #
+    # find_infeasibility_core() solves the shared model under one         #
+    # assumption literal per hard constraint group.  A core rules out     #
+    # every level that keeps all of its groups hard; those stages are     #
+    # skipped instead of spending their time limit on a hopeless search.  #
+    _first_core_level = 0
+    _core_skip_reason: Optional[str] = None
+
+    def _explain_infeasibility(level: int, extra_metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Find the conflict core of ``level`` on the shared model and record it in stage_metrics."""
+        nonlocal _first_core_level, _core_skip_reason
+        # Never spend longer on the explanation than on the stage itself.
+        stage_limit = (stage1_limit, stage2_limit, stage3_limit)[level]
+        core_limit = min(stage_limit or INFEASIBILITY_CORE_TIME_LIMIT_SECONDS, INFEASIBILITY_CORE_TIME_LIMIT_SECONDS)
+        core = shared_solver.find_infeasibility_core(
+            relaxation_level=level,
+            time_limit_seconds=core_limit,
+            minimize_seconds=min(core_limit, INFEASIBILITY_CORE_MINIMIZE_SECONDS),
+        )
+        watchdog.raise_if_cancelled()
+        entry: Dict[str, Any] = {
+            "stage": "CORE_CHECK",
+            "label": "Konfliktanalyse",
+            "relaxation_level": level,
+            **(extra_metrics or {}),
+            "solve_seconds": core["solve_seconds"],
+            "core_status": core["status"],
+        }
+        if core["status"] == "INFEASIBLE":
+            conflicts = core["conflicts"]
+            entry.update(conflicts=conflicts, minimal=core["minimal"], fallback_level=core["fallback_level"])
+            _first_core_level = max(_first_core_level, core["fallback_level"])
+            if conflicts:
+                _core_skip_reason = (
+                    f"Konfliktanalyse: {len(conflicts)} harte Regel(n) widersprechen sich "
+                    f"(u. a. {conflicts[0]})"
+                )
+            else:
+                _core_skip_reason = "Konfliktanalyse: Strukturregeln widersprechen sich"
+            print("\n" + "=" * 60)
+            print(f"KONFLIKTANALYSE (Stufe {level + 1}): Widerspruch zwischen harten Regeln"
+                  + ("" if core["minimal"] else " (Minimalität nicht nachgewiesen)"))
+            for i, conflict in enumerate(conflicts, 1):
+                print(f"  {i}. {conflict}")
+            if not conflicts:
+                print("  Strukturregeln (eine Schicht je Team und Woche, Teamzuordnung) "
+                      "sind allein widersprüchlich")
+            print("=" * 60)
+        stage_metrics.append(entry)
+        return core
+
+    def _record_skipped_stage(level: int, reason: str, limit) -> None:
+        stage_id, stage_name, _details = SOLVER_STAGES[level]
+        _emit_progress(
+            progress_callback,
+            "stage_skipped",
+            stageIndex=level + 1,
+            totalStages=4,
+            stageName=stage_name,
+            stageDetails=reason,
+        )
+        stage_metrics.append({
+            "stage": stage_id,
+            "label": stage_name,
+            "relaxation_level": level,
+            "time_limit_seconds": limit,
+            "skipped": True,
+            "skip_reason": reason,
+        })
+
+    if core_check:
+        _core_level = 1 if _stage1_skip_reason else 0
+        _, _core_build_metrics = _prepare_stage(
+            level=_core_level, limit=stage2_limit if _core_level else stage1_limit
+        )
+        _explain_infeasibility(_core_level, _core_build_metrics)
+        if _first_core_level > 0 and not _stage1_skip_reason:
+            _stage1_skip_reason = _core_skip_reason
+
+    def _race_solver_stages() -> Optional[Tuple[List[ShiftAssignment], Dict[Tuple[int, date], str], PlanningReport]]:
+        """Solve Stages 1-3 concurrently and return the strictest successful result.
+
+        The shared model is built once and forked per level (proto clone).  Each
+        stage gets the limit of the first raced stage and a share of the worker
+        budget.  Stages are awaited strictest first: as soon as one succeeds, all
+        less strict stages are stopped.  Returns None when no stage found a plan.
+        """
+        stage_limits = (stage1_limit, stage2_limit, stage3_limit)
+        first_level = max(1 if _stage1_skip_reason else 0, _first_core_level)
+        if _stage1_skip_reason:
+            _record_skipped_stage(0, _stage1_skip_reason, stage1_limit)
+        for level in range(1, min(first_level, 3)):
+            _record_skipped_stage(level, _core_skip_reason, stage_limits[level])
+        levels = [level for level in SOLVER_STAGES if level >= first_level]
+        if not levels:
+            return None
+        race_limit = stage_limits[levels[0]]
+        worker_budget = num_workers if num_workers is not None else _default_num_workers()
+        stage_workers = _split_parallel_stage_workers(worker_budget, len(levels))
+
+        print("\n" + "=" * 60)
+        print(f"PARALLELE STUFEN: {len(levels)} Solver-Stufen gleichzeitig "
+              f"(Worker-Aufteilung: {stage_workers})")
+        if race_limit:
+            print(f"  Zeit-Limit je Stufe: {race_limit} Sekunden")
+        print("=" * 60)
+
+        base, base_build_metrics = _prepare_stage(level=levels[0], limit=race_limit)
+        racers: Dict[int, ShiftPlanningSolver] = {}
+        build_metrics: Dict[int, Dict[str, Any]] = {}
+        for level, workers in zip(levels, stage_workers):
+            fork_start = time.perf_counter()
+            racers[level] = base.fork_for_relaxation_level(
+                level, time_limit_seconds=race_limit, num_workers=workers
+            )
+            watchdog.watch(racers[level])
+            fork_seconds = time.perf_counter() - fork_start
+            if level == levels[0]:
+                build_metrics[level] = dict(base_build_metrics)
+                build_metrics[level]["build_seconds"] = round(
+                    base_build_metrics["build_seconds"] + fork_seconds, 3
+                )
+            else:
+                build_metrics[level] = {
+                    "build_seconds": round(fork_seconds, 3),
+                    "model_reused": True,
+                    "build_seconds_saved": round(max(model_build_seconds - fork_seconds, 0.0), 3),
+                }
+            stage_id, stage_name, stage_details = SOLVER_STAGES[level]
+            _emit_progress(
+                progress_callback,
+                "stage_started",
+                stageIndex=level + 1,
+                totalStages=4,
+                stageName=stage_name,
+                stageDetails=f"{stage_details} (parallel)",
+            )
+
+        def _timed_solve(level: int) -> Tuple[bool, float]:
+            # Only the strictest stage reports solver progress; interleaved
+            # events of several stages would make the job status jump around.
+            callback = progress_callback if level == levels[0] else None
+            solve_start = time.perf_counter()
+            ok = racers[level].solve(progress_callback=callback)
+            return ok, time.perf_counter() - solve_start
+
+        winner: Optional[int] = None
+        outcomes: Dict[int, Tuple[bool, float]] = {}
+        with ThreadPoolExecutor(max_workers=len(levels), thread_name_prefix="solver-stage") as pool:
+            futures = {level: pool.submit(_timed_solve, level) for level in levels}
+            for level in levels:
+                outcomes[level] = futures[level].result()
+                if outcomes[level][0]:
+                    winner = level
+                    for other in levels:
+                        if other > level:
+                            racers[other].stop_search()
+                    break
+            for level in levels:
+                if level not in outcomes:
+                    outcomes[level] = futures[level].result()
+        watchdog.raise_if_cancelled()
+
+        for level in levels:
+            racer = racers[level]
+            ok, solve_seconds = outcomes[level]
+            stage_id, stage_name, _details = SOLVER_STAGES[level]
+            has_solution = racer.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            stage_metrics.append({
+                "stage": stage_id,
+                "label": stage_name,
+                "relaxation_level": level,
+                "time_limit_seconds": race_limit,
+                **build_metrics[level],
+                "solve_seconds": round(solve_seconds, 3),
+                "solved": bool(ok) and level == winner,
+                "cp_status": int(racer.status) if racer.status is not None else None,
+                "objective_value": racer.solution.ObjectiveValue() if has_solution else None,
+                "solver_wall_time_seconds": racer.solution.WallTime() if has_solution else None,
+                "parallel": True,
+                "num_workers": racer.num_workers,
+                "stopped_early": winner is not None and level > winner,
+                "early_stop": racer.early_stop_metrics(),
+            })
+
+        if winner is None:
+            return None
+
+        s_win = racers[winner]
+        stage_id, stage_name, _details = SOLVER_STAGES[winner]
+        _emit_progress(
+            progress_callback,
+            "stage_completed",
+            stageIndex=winner + 1,
+            totalStages=4,
+            stageName=stage_name,
+        )
+        result = s_win.extract_solution()
+        if winner > 0:
+            _print_relaxation_summary(s_win.relaxed_constraints)
+        s_win.print_planning_summary(result[0], result[1])
+        if winner == 0:
+            status = "OPTIMAL" if s_win.proven_optimal else "FEASIBLE"
+        else:
+            status = f"FALLBACK_L{winner}"
+        report = _build_planning_report(
+            assignments=result[0],
+            complete_schedule=result[1],
+            planning_model=planning_model,
+            status=status,
+            objective_value=s_win.solution.ObjectiveValue() if s_win.solution else 0.0,
+            solver_time_seconds=s_win.solution.WallTime() if s_win.solution else 0.0,
+            relaxed_constraints_strs=s_win.relaxed_constraints,
+            penalty_breakdown=s_win.compute_penalty_breakdown(),
+            stage_metrics=stage_metrics,
+            warm_start_state=s_win.export_warm_start_state(result[1]),
+        )
+        return result[0], result[1], report
+
+    if parallel_stages:
+        raced = _race_solver_stages()
+        if raced is not None:
+            return raced
+        return _run_emergency_stage()
+
     # ------------------------------------------------------------------ #
     # Stage 1 – Normal solve                                              #
     # ------------------------------------------------------------------ #
     if _stage1_skip_reason:
         print("\n" + "=" * 60)
-        print("STUFE 1 ÜBERSPRUNGEN: Mindestbesetzung nachweislich nicht erfüllbar")
+        print("STUFE 1 ÜBERSPRUNGEN: Harte Regeln nachweislich nicht gleichzeitig erfüllbar")
         print(f"  Grund: {_stage1_skip_reason}")
-        print("  → Direkt zu Stufe 2 (Mindestbesetzung als Soft-Constraint)")
+        print(f"  → Direkt zu Stufe {min(max(_first_core_level, 1), 3) + 1}")
         print("=" * 60)
         _emit_progress(
             progress_callback,
@@ -2633,25 +4189,30 @@ def solve_shift_planning(
         print("=" * 60)
 
     if not _stage1_skip_reason:
-        s1 = _make_solver(planning_model, level=0, limit=stage1_limit)
-        stage1_build_start = time.perf_counter()
-        s1.add_all_constraints(progress_callback=progress_callback)
-        stage1_build_seconds = time.perf_counter() - stage1_build_start
+        s1, stage1_build_metrics = _prepare_stage(level=0, limit=stage1_limit)
         stage1_solve_start = time.perf_counter()
-        stage1_ok = s1.solve(progress_callback=progress_callback)
+        if lns:
+            stage1_ok = s1.solve_lns(progress_callback=progress_callback)
+        else:
+            stage1_ok = s1.solve(progress_callback=progress_callback)
+        watchdog.raise_if_cancelled()
         stage1_solve_seconds = time.perf_counter() - stage1_solve_start
         stage_metrics.append({
             "stage": "STAGE_1",
             "label": "Normaler Lösungsversuch",
             "relaxation_level": 0,
             "time_limit_seconds": stage1_limit,
-            "build_seconds": round(stage1_build_seconds, 3),
+            **stage1_build_metrics,
             "solve_seconds": round(stage1_solve_seconds, 3),
             "solved": bool(stage1_ok),
             "cp_status": int(s1.status) if s1.status is not None else None,
             "objective_value": s1.solution.ObjectiveValue() if stage1_ok and s1.solution else None,
             "solver_wall_time_seconds": s1.solution.WallTime() if stage1_ok and s1.solution else None,
+            "early_stop": s1.early_stop_metrics(),
+            **({"lns": s1.lns_stats} if lns else {}),
         })
+        if s1.status == cp_model.INFEASIBLE:
+            _explain_infeasibility(0)
     else:
         stage1_ok = False
         stage_metrics.append({
@@ -2672,7 +4233,7 @@ def solve_shift_planning(
         )
         result = s1.extract_solution()
         s1.print_planning_summary(result[0], result[1])
-        status = "OPTIMAL" if s1.status == cp_model.OPTIMAL else "FEASIBLE"
+        status = "OPTIMAL" if s1.proven_optimal else "FEASIBLE"
         report = _build_planning_report(
             assignments=result[0],
             complete_schedule=result[1],
@@ -2683,180 +4244,147 @@ def solve_shift_planning(
             relaxed_constraints_strs=[],
             penalty_breakdown=s1.compute_penalty_breakdown(),
             stage_metrics=stage_metrics,
+            warm_start_state=s1.export_warm_start_state(result[1]),
         )
         return result[0], result[1], report
 
     # ------------------------------------------------------------------ #
     # Stage 2 – Fallback 1: relax minimum staffing (H3)                  #
     # ------------------------------------------------------------------ #
-    _emit_progress(
-        progress_callback,
-        "stage_started",
-        stageIndex=2,
-        totalStages=4,
-        stageName="Fallback 1",
-        stageDetails="Mindestbesetzung als Soft-Constraint"
-    )
-    print("\n" + "=" * 60)
-    print("STUFE 2 (FALLBACK 1): Mindestbesetzung wird als Soft-Constraint behandelt")
-    if _stage1_skip_reason:
-        print(f"  Grund: Stufe 1 übersprungen – {_stage1_skip_reason}")
+    if _first_core_level > 1:
+        _record_skipped_stage(1, _core_skip_reason, stage2_limit)
     else:
-        print("  Grund: Stufe 1 war INFEASIBLE oder hat keine Lösung innerhalb des Zeit-Limits gefunden")
-    if stage2_limit:
-        print(f"  Zeit-Limit: {stage2_limit} Sekunden")
-    print("=" * 60)
-    m2 = _rebuild_model()
-    s2 = _make_solver(m2, level=1, limit=stage2_limit)
-    stage2_build_start = time.perf_counter()
-    s2.add_all_constraints(progress_callback=progress_callback)
-    stage2_build_seconds = time.perf_counter() - stage2_build_start
-    stage2_solve_start = time.perf_counter()
-    stage2_ok = s2.solve(progress_callback=progress_callback)
-    stage2_solve_seconds = time.perf_counter() - stage2_solve_start
-    stage_metrics.append({
-        "stage": "STAGE_2",
-        "label": "Fallback 1",
-        "relaxation_level": 1,
-        "time_limit_seconds": stage2_limit,
-        "build_seconds": round(stage2_build_seconds, 3),
-        "solve_seconds": round(stage2_solve_seconds, 3),
-        "solved": bool(stage2_ok),
-        "cp_status": int(s2.status) if s2.status is not None else None,
-        "objective_value": s2.solution.ObjectiveValue() if stage2_ok and s2.solution else None,
-        "solver_wall_time_seconds": s2.solution.WallTime() if stage2_ok and s2.solution else None,
-    })
-    if stage2_ok:
         _emit_progress(
             progress_callback,
-            "stage_completed",
+            "stage_started",
             stageIndex=2,
             totalStages=4,
-            stageName="Fallback 1"
-        )
-        result = s2.extract_solution()
-        _print_relaxation_summary(s2.relaxed_constraints)
-        s2.print_planning_summary(result[0], result[1])
-        report = _build_planning_report(
-            assignments=result[0],
-            complete_schedule=result[1],
-            planning_model=m2,
-            status="FALLBACK_L1",
-            objective_value=s2.solution.ObjectiveValue() if s2.solution else 0.0,
-            solver_time_seconds=s2.solution.WallTime() if s2.solution else 0.0,
-            relaxed_constraints_strs=s2.relaxed_constraints,
-            penalty_breakdown=s2.compute_penalty_breakdown(),
-            stage_metrics=stage_metrics,
+            stageName="Fallback 1",
+            stageDetails="Mindestbesetzung als Soft-Constraint"
         )
-        return result[0], result[1], report
+        print("\n" + "=" * 60)
+        print("STUFE 2 (FALLBACK 1): Mindestbesetzung wird als Soft-Constraint behandelt")
+        if _stage1_skip_reason:
+            print(f"  Grund: Stufe 1 übersprungen – {_stage1_skip_reason}")
+        else:
+            print("  Grund: Stufe 1 war INFEASIBLE oder hat keine Lösung innerhalb des Zeit-Limits gefunden")
+        if stage2_limit:
+            print(f"  Zeit-Limit: {stage2_limit} Sekunden")
+        print("=" * 60)
+        s2, stage2_build_metrics = _prepare_stage(level=1, limit=stage2_limit)
+        stage2_solve_start = time.perf_counter()
+        stage2_ok = s2.solve(progress_callback=progress_callback)
+        watchdog.raise_if_cancelled()
+        stage2_solve_seconds = time.perf_counter() - stage2_solve_start
+        stage_metrics.append({
+            "stage": "STAGE_2",
+            "label": "Fallback 1",
+            "relaxation_level": 1,
+            "time_limit_seconds": stage2_limit,
+            **stage2_build_metrics,
+            "solve_seconds": round(stage2_solve_seconds, 3),
+            "solved": bool(stage2_ok),
+            "cp_status": int(s2.status) if s2.status is not None else None,
+            "objective_value": s2.solution.ObjectiveValue() if stage2_ok and s2.solution else None,
+            "solver_wall_time_seconds": s2.solution.WallTime() if stage2_ok and s2.solution else None,
+            "early_stop": s2.early_stop_metrics(),
+        })
+        if s2.status == cp_model.INFEASIBLE:
+            _explain_infeasibility(1)
+        if stage2_ok:
+            _emit_progress(
+                progress_callback,
+                "stage_completed",
+                stageIndex=2,
+                totalStages=4,
+                stageName="Fallback 1"
+            )
+            result = s2.extract_solution()
+            _print_relaxation_summary(s2.relaxed_constraints)
+            s2.print_planning_summary(result[0], result[1])
+            report = _build_planning_report(
+                assignments=result[0],
+                complete_schedule=result[1],
+                planning_model=planning_model,
+                status="FALLBACK_L1",
+                objective_value=s2.solution.ObjectiveValue() if s2.solution else 0.0,
+                solver_time_seconds=s2.solution.WallTime() if s2.solution else 0.0,
+                relaxed_constraints_strs=s2.relaxed_constraints,
+                penalty_breakdown=s2.compute_penalty_breakdown(),
+                stage_metrics=stage_metrics,
+                warm_start_state=s2.export_warm_start_state(result[1]),
+            )
+            return result[0], result[1], report
 
     # ------------------------------------------------------------------ #
     # Stage 3 – Fallback 2: relax staffing + skip rotation constraints   #
     # ------------------------------------------------------------------ #
-    _emit_progress(
-        progress_callback,
-        "stage_started",
-        stageIndex=3,
-        totalStages=4,
-        stageName="Fallback 2",
-        stageDetails="Mindestbesetzung soft + Teamrotation deaktiviert"
-    )
-    print("\n" + "=" * 60)
-    print("STUFE 3 (FALLBACK 2): Mindestbesetzung soft + Teamrotation deaktiviert")
-    print("  Grund: Stufe 2 war INFEASIBLE oder hat keine Lösung innerhalb des Zeit-Limits gefunden")
-    if stage3_limit:
-        print(f"  Zeit-Limit: {stage3_limit} Sekunden")
-    print("=" * 60)
-    m3 = _rebuild_model()
-    s3 = _make_solver(m3, level=2, limit=stage3_limit)
-    stage3_build_start = time.perf_counter()
-    s3.add_all_constraints(progress_callback=progress_callback)
-    stage3_build_seconds = time.perf_counter() - stage3_build_start
-    stage3_solve_start = time.perf_counter()
-    stage3_ok = s3.solve(progress_callback=progress_callback)
-    stage3_solve_seconds = time.perf_counter() - stage3_solve_start
-    stage_metrics.append({
-        "stage": "STAGE_3",
-        "label": "Fallback 2",
-        "relaxation_level": 2,
-        "time_limit_seconds": stage3_limit,
-        "build_seconds": round(stage3_build_seconds, 3),
-        "solve_seconds": round(stage3_solve_seconds, 3),
-        "solved": bool(stage3_ok),
-        "cp_status": int(s3.status) if s3.status is not None else None,
-        "objective_value": s3.solution.ObjectiveValue() if stage3_ok and s3.solution else None,
-        "solver_wall_time_seconds": s3.solution.WallTime() if stage3_ok and s3.solution else None,
-    })
-    if stage3_ok:
+    if _first_core_level > 2:
+        _record_skipped_stage(2, _core_skip_reason, stage3_limit)
+    else:
         _emit_progress(
             progress_callback,
-            "stage_completed",
+            "stage_started",
             stageIndex=3,
             totalStages=4,
-            stageName="Fallback 2"
-        )
-        result = s3.extract_solution()
-        _print_relaxation_summary(s3.relaxed_constraints)
-        s3.print_planning_summary(result[0], result[1])
-        report = _build_planning_report(
-            assignments=result[0],
-            complete_schedule=result[1],
-            planning_model=m3,
-            status="FALLBACK_L2",
-            objective_value=s3.solution.ObjectiveValue() if s3.solution else 0.0,
-            solver_time_seconds=s3.solution.WallTime() if s3.solution else 0.0,
-            relaxed_constraints_strs=s3.relaxed_constraints,
-            penalty_breakdown=s3.compute_penalty_breakdown(),
-            stage_metrics=stage_metrics,
+            stageName="Fallback 2",
+            stageDetails="Mindestbesetzung soft + Teamrotation deaktiviert"
         )
-        return result[0], result[1], report
+        print("\n" + "=" * 60)
+        print("STUFE 3 (FALLBACK 2): Mindestbesetzung soft + Teamrotation deaktiviert")
+        if _first_core_level > 1:
+            print(f"  Grund: Stufe 2 übersprungen – {_core_skip_reason}")
+        else:
+            print("  Grund: Stufe 2 war INFEASIBLE oder hat keine Lösung innerhalb des Zeit-Limits gefunden")
+        if stage3_limit:
+            print(f"  Zeit-Limit: {stage3_limit} Sekunden")
+        print("=" * 60)
+        s3, stage3_build_metrics = _prepare_stage(level=2, limit=stage3_limit)
+        stage3_solve_start = time.perf_counter()
+        stage3_ok = s3.solve(progress_callback=progress_callback)
+        watchdog.raise_if_cancelled()
+        stage3_solve_seconds = time.perf_counter() - stage3_solve_start
+        stage_metrics.append({
+            "stage": "STAGE_3",
+            "label": "Fallback 2",
+            "relaxation_level": 2,
+            "time_limit_seconds": stage3_limit,
+            **stage3_build_metrics,
+            "solve_seconds": round(stage3_solve_seconds, 3),
+            "solved": bool(stage3_ok),
+            "cp_status": int(s3.status) if s3.status is not None else None,
+            "objective_value": s3.solution.ObjectiveValue() if stage3_ok and s3.solution else None,
+            "solver_wall_time_seconds": s3.solution.WallTime() if stage3_ok and s3.solution else None,
+            "early_stop": s3.early_stop_metrics(),
+        })
+        if s3.status == cp_model.INFEASIBLE:
+            _explain_infeasibility(2)
+        if stage3_ok:
+            _emit_progress(
+                progress_callback,
+                "stage_completed",
+                stageIndex=3,
+                totalStages=4,
+                stageName="Fallback 2"
+            )
+            result = s3.extract_solution()
+            _print_relaxation_summary(s3.relaxed_constraints)
+            s3.print_planning_summary(result[0], result[1])
+            report = _build_planning_report(
+                assignments=result[0],
+                complete_schedule=result[1],
+                planning_model=planning_model,
+                status="FALLBACK_L2",
+                objective_value=s3.solution.ObjectiveValue() if s3.solution else 0.0,
+                solver_time_seconds=s3.solution.WallTime() if s3.solution else 0.0,
+                relaxed_constraints_strs=s3.relaxed_constraints,
+                penalty_breakdown=s3.compute_penalty_breakdown(),
+                stage_metrics=stage_metrics,
+                warm_start_state=s3.export_warm_start_state(result[1]),
+            )
+            return result[0], result[1], report
 
-    # ------------------------------------------------------------------ #
-    # Stage 4 – Emergency plan: greedy algorithm without OR-Tools         #
-    # ------------------------------------------------------------------ #
-    _emit_progress(
-        progress_callback,
-        "stage_started",
-        stageIndex=4,
-        totalStages=4,
-        stageName="Notfallplan",
-        stageDetails="Greedy-Algorithmus ohne OR-Tools"
-    )
-    print("\n" + "=" * 60)
-    print("STUFE 4 (NOTFALLPLAN): Greedy-Algorithmus ohne OR-Tools")
-    print("  Grund: Alle Solver-Stufen waren INFEASIBLE")
-    print("=" * 60)
-    greedy_relaxed = [
-        "Mindestbesetzung (H3): nicht garantiert – nur verfügbare Mitarbeiter werden eingeplant",
-        "Teamrotation (F→N→S): nicht eingehalten",
-        "Ruhezeiten, Stunden-Ziele, Aufeinanderfolge-Regeln: nicht berücksichtigt",
-    ]
-    result = _create_greedy_emergency_plan(planning_model)
-    _print_relaxation_summary(greedy_relaxed)
-    report = _build_planning_report(
-        assignments=result[0],
-        complete_schedule=result[1],
-        planning_model=planning_model,
-        status="EMERGENCY",
-        objective_value=0.0,
-        solver_time_seconds=0.0,
-        relaxed_constraints_strs=greedy_relaxed,
-        stage_metrics=stage_metrics + [{
-            "stage": "STAGE_4",
-            "label": "Notfallplan",
-            "relaxation_level": 3,
-            "solver_type": "GREEDY_EMERGENCY",
-            "solved": True,
-        }],
-    )
-    _emit_progress(
-        progress_callback,
-        "stage_completed",
-        stageIndex=4,
-        totalStages=4,
-        stageName="Notfallplan"
-    )
-    return result[0], result[1], report
+    return _run_emergency_stage()
 
 
 def get_infeasibility_diagnostics(
@@ -2900,13 +4428,12 @@ def analyze_absence_impact(
     Returns:
         Dict[date, AbsenceImpact] – ein Eintrag pro Tag in ``dates``.
     """
-    # Pre-compute per-day absence sets for O(1) lookup
-    # Maps date -> set of employee_ids absent that day
-    absent_per_day: Dict[date, set] = {d: set() for d in dates}
-    for absence in absences:
-        for d in dates:
-            if absence.start_date <= d <= absence.end_date:
-                absent_per_day[d].add(absence.employee_id)
+    # Per-day absence sets (O(1) lookup) over the analysed dates
+    absence_calendar = AbsenceCalendar(
+        absences,
+        window_start=min(dates) if dates else None,
+        window_end=max(dates) if dates else None,
+    )
 
     total_employees = len(employees)
     all_employee_ids = {e.id for e in employees}
@@ -2914,7 +4441,7 @@ def analyze_absence_impact(
     result: Dict[date, AbsenceImpact] = {}
 
     for d in dates:
-        absent_ids = absent_per_day[d]
+        absent_ids = absence_calendar.absent_employees_on(d)
         absent_count = len(absent_ids)
         available_count = total_employees - absent_count
         absence_ratio = absent_count / total_employees if total_employees > 0 else 0.0
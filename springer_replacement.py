@@ -20,6 +20,7 @@ from datetime import date, timedelta, datetime
 from typing import List, Dict, Optional, Tuple
 import sqlite3
 from entities import Employee, ShiftType, Absence
+from absence_calendar import load_absence_calendar
 from email_service import send_email
 
 
@@ -284,6 +285,7 @@ def find_suitable_replacement(
     """, (absent_employee_id, shift_type_id, absent_team_id))
     
     candidates = cursor.fetchall()
+    absent_on_date = load_absence_calendar(conn, absence_date, absence_date).absent_employees_on(absence_date)
     
     for candidate in candidates:
         emp_id = candidate[0]
@@ -297,7 +299,7 @@ def find_suitable_replacement(
             continue  # Already working
         
         # Check if absent
-        if is_employee_absent(conn, emp_id, absence_date):
+        if emp_id in absent_on_date:
             continue  # Employee is absent
         
         # Check rest time compliance
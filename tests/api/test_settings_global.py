@@ -40,3 +40,44 @@ class TestGlobalSettings:
         )
         assert r.status_code == 200
         assert r.json().get("success") is True
+
+    def test_put_stores_solver_early_stop_policy(self, admin_client):
+        r = admin_client.put(
+            "/api/settings/global",
+            json={"minRestHoursBetweenShifts": 11, "solverGapLimitPercent": 1.5, "solverPlateauSeconds": 120},
+            headers={"X-CSRF-Token": admin_client.csrf_token},
+        )
+        assert r.status_code == 200
+        data = admin_client.get("/api/settings/global").json()
+        assert data["solverGapLimitPercent"] == 1.5
+        assert data["solverPlateauSeconds"] == 120
+
+        # Keys left out keep their value, null turns a criterion off.
+        admin_client.put(
+            "/api/settings/global",
+            json={"minRestHoursBetweenShifts": 11, "solverPlateauSeconds": None},
+            headers={"X-CSRF-Token": admin_client.csrf_token},
+        )
+        data = admin_client.get("/api/settings/global").json()
+        assert data["solverGapLimitPercent"] == 1.5
+        assert data["solverPlateauSeconds"] is None
+
+        admin_client.put(
+            "/api/settings/global",
+            json={"minRestHoursBetweenShifts": 11, "solverGapLimitPercent": None},
+            headers={"X-CSRF-Token": admin_client.csrf_token},
+        )
+
+    @pytest.mark.parametrize("payload", [
+        {"solverGapLimitPercent": 0},
+        {"solverGapLimitPercent": 80},
+        {"solverPlateauSeconds": 1},
+        {"solverPlateauSeconds": "abc"},
+    ])
+    def test_put_validates_solver_early_stop_bounds(self, admin_client, payload):
+        r = admin_client.put(
+            "/api/settings/global",
+            json={"minRestHoursBetweenShifts": 11, **payload},
+            headers={"X-CSRF-Token": admin_client.csrf_token},
+        )
+        assert r.status_code == 400
@@ -88,6 +88,23 @@ class TestPlanningEndpoint:
         data = resp.json()
         assert 'jobId' in data
 
+    def test_stream_unknown_job_returns_404(self, admin_client):
+        resp = admin_client.get('/api/shifts/plan/stream/does-not-exist')
+        assert resp.status_code == 404
+
+    def test_stream_finished_job_sends_done(self, admin_client, test_db):
+        from api.planning_job_store import create_job, update_job
+        from api.shared import Database
+
+        db = Database(test_db)
+        create_job(db, 'stream-job')
+        update_job(db, 'stream-job', 'success', 'Erfolgreich!')
+        resp = admin_client.get('/api/shifts/plan/stream/stream-job')
+        assert resp.status_code == 200
+        assert resp.headers['content-type'].startswith('text/event-stream')
+        assert 'event: done' in resp.text
+        assert '"status": "success"' in resp.text
+
     def test_plan_without_auth_returns_401(self, client):
         csrf = client.get('/api/csrf-token').json()['token']
         resp = client.post(
@@ -122,7 +139,7 @@ class TestPlanningEndpoint:
         status_payload = {}
         status = 'running'
 
-        while status == 'running' and time.monotonic() < deadline:
+        while status in ('queued', 'running') and time.monotonic() < deadline:
             time.sleep(0.2)
             status_resp = admin_client.get(
                 f'/api/shifts/plan/status/{job_id}',
@@ -132,12 +149,143 @@ class TestPlanningEndpoint:
             status_payload = status_resp.json()
             status = status_payload.get('status', 'running')
 
-        # If still running, that's acceptable for this regression test. The
+        # If still queued or running, that's acceptable for this regression test. The
         # important guarantee is that we don't crash with the historical NameError.
-        if status == 'running':
+        if status in ('queued', 'running'):
             return
 
         details = (status_payload.get('details') or '')
         message = (status_payload.get('message') or '')
         assert "name 'date' is not defined" not in details
         assert "name 'date' is not defined" not in message
+
+
+class TestBatchPlanningEndpoint:
+    def test_batch_as_admin_returns_job_id(self, admin_client):
+        resp = admin_client.post(
+            '/api/shifts/plan/batch?startDate=2025-04-01&months=3&lookaheadWeeks=1',
+            headers={'X-CSRF-Token': admin_client.csrf_token},
+        )
+        assert resp.status_code == 202
+        assert 'jobId' in resp.json()
+
+    def test_batch_without_csrf_returns_403(self, admin_client):
+        resp = admin_client.post('/api/shifts/plan/batch?startDate=2025-04-01&months=3')
+        assert resp.status_code == 403
+
+    @pytest.mark.parametrize("query", [
+        "startDate=2025-04-01",
+        "startDate=2025-04-15&months=2",
+        "startDate=2025-04-01&months=0",
+        "startDate=2025-04-01&months=13",
+        "startDate=2025-04-01&months=x",
+        "startDate=2025-04-01&months=2&lookaheadWeeks=5",
+    ])
+    def test_batch_rejects_invalid_parameters(self, admin_client, query):
+        resp = admin_client.post(
+            f'/api/shifts/plan/batch?{query}',
+            headers={'X-CSRF-Token': admin_client.csrf_token},
+        )
+        assert resp.status_code == 400
+
+
+class TestRepairPlanningEndpoint:
+    def test_repair_as_admin_returns_job_id(self, admin_client):
+        """POST /api/shifts/plan/repair should start a job like a full plan."""
+        resp = admin_client.post(
+            '/api/shifts/plan/repair?startDate=2025-03-10&endDate=2025-03-12&windowDays=3',
+            headers={'X-CSRF-Token': admin_client.csrf_token},
+        )
+        assert resp.status_code == 202
+        assert 'jobId' in resp.json()
+
+    def test_repair_without_csrf_returns_403(self, admin_client):
+        resp = admin_client.post('/api/shifts/plan/repair?startDate=2025-03-10&endDate=2025-03-12')
+        assert resp.status_code == 403
+
+    @pytest.mark.parametrize("query", [
+        "startDate=2025-03-10",
+        "startDate=2025-03-12&endDate=2025-03-10",
+        "startDate=2025-03-10&endDate=2025-03-12&windowDays=99",
+        "startDate=2025-03-10&endDate=2025-03-12&employeeIds=a,b",
+        "startDate=2025-01-01&endDate=2025-03-31",
+    ])
+    def test_repair_rejects_invalid_parameters(self, admin_client, query):
+        resp = admin_client.post(
+            f'/api/shifts/plan/repair?{query}',
+            headers={'X-CSRF-Token': admin_client.csrf_token},
+        )
+        assert resp.status_code == 400
+
+
+def test_repair_months_include_every_month_in_between():
+    from datetime import date
+    from api.shifts_planning_core import _months_between
+
+    assert _months_between(date(2025, 11, 30), date(2026, 2, 1)) == [(2025, 11), (2025, 12), (2026, 1), (2026, 2)]
+    assert _months_between(date(2025, 3, 2), date(2025, 3, 15)) == [(2025, 3)]
+
+
+def _shift_rows(db_path):
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT * FROM ShiftAssignments ORDER BY EmployeeId, Date").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.slow
+def test_repair_job_only_replans_affected_team(test_db):
+    """A repair after a new absence leaves every other team's rows untouched."""
+    import sqlite3
+    from datetime import date, datetime
+
+    from api.planning_job_store import create_job, get_job
+    from api.shared import Database
+    from api.shifts_planning_core import _bulk_insert_assignments, _run_repair_job
+    from data_loader import load_planning_window
+    from model import create_shift_planning_model
+    from solver import solve_shift_planning
+
+    # Seed three weeks: the repair window (02.–15.03.) plus its guard week
+    employees, teams, absences, shift_types = load_planning_window(test_db, date(2025, 3, 2), date(2025, 3, 22))
+    seed_model = create_shift_planning_model(
+        employees, teams, date(2025, 3, 2), date(2025, 3, 22), absences, shift_types=shift_types,
+    )
+    assignments, _schedule, _report = solve_shift_planning(
+        seed_model, time_limit_seconds=30, num_workers=4, db_path=test_db,
+    )
+    assert assignments
+    db = Database(test_db)
+    conn = db.get_connection()
+    try:
+        _bulk_insert_assignments(conn.cursor(), assignments, datetime.utcnow().isoformat())
+        conn.commit()
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(test_db)
+    try:
+        emp_id = conn.execute("SELECT EmployeeId FROM ShiftAssignments WHERE Date = '2025-03-11'").fetchone()[0]
+        team_id = conn.execute("SELECT TeamId FROM Employees WHERE Id = ?", (emp_id,)).fetchone()[0]
+        team_members = {row[0] for row in conn.execute("SELECT Id FROM Employees WHERE TeamId = ?", (team_id,))}
+        conn.execute(
+            "INSERT INTO Absences (EmployeeId, Type, StartDate, EndDate) VALUES (?, 1, '2025-03-10', '2025-03-12')",
+            (emp_id,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    others_before = [row for row in _shift_rows(test_db) if row[1] not in team_members]
+
+    create_job(db, 'repair-test')
+    _run_repair_job('repair-test', date(2025, 3, 10), date(2025, 3, 12), 2, [], test_db)
+
+    job = get_job(db, 'repair-test')
+    assert job['status'] == 'success', job['message']
+    assert [row for row in _shift_rows(test_db) if row[1] not in team_members] == others_before
+    assert not [
+        row for row in _shift_rows(test_db)
+        if row[1] == emp_id and '2025-03-10' <= row[3] <= '2025-03-12'
+    ]
@@ -0,0 +1,287 @@
+"""
+Planning pipeline benchmark across synthetic site sizes.
+
+Runs ``create_shift_planning_model`` + ``solve_shift_planning`` for every site
+in ``BENCHMARK_SITE_MATRIX`` (or the ``--site`` overrides) with a fixed random
+seed, worker count and time cap, and writes one JSON document that can be
+diffed against a stored baseline:
+
+    python -m tests.benchmarks.bench_planning --output bench.json
+    python -m tests.benchmarks.bench_planning --baseline bench.json
+
+Each site runs in a fresh process so ``peak_rss_mb`` is the peak of that site
+alone.  Recorded per site:
+
+- ``model_seconds``: create_shift_planning_model()
+- ``build_seconds``: constraint construction (sum over all solver stages)
+- ``time_to_first_solution_seconds``: from the solve_shift_planning() call to
+  the first improving CP-SAT solution (None if no stage found one)
+- ``objective``, ``status``, ``solved_stage``, ``total_seconds``, ``peak_rss_mb``
+
+The file is deliberately not named ``test_*.py``: pytest does not collect it.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+from tests.fixtures.factories import synthetic_site
+from tests.fixtures.realistic_data import (
+    BENCHMARK_PLANNING_START,
+    BENCHMARK_PLANNING_END,
+    BENCHMARK_SITE_MATRIX,
+)
+
+DEFAULT_SEED = 42
+DEFAULT_TIME_LIMIT_SECONDS = 60
+DEFAULT_NUM_WORKERS = 8
+DEFAULT_TOLERANCE = 0.20
+
+# Metrics compared against the baseline; for all of them lower is better.
+COMPARED_METRICS = (
+    "model_seconds",
+    "build_seconds",
+    "time_to_first_solution_seconds",
+    "objective",
+    "peak_rss_mb",
+)
+
+
+def case_id(num_employees: int, num_teams: int, absence_rate: float) -> str:
+    """Stable key of one site in the result JSON, e.g. ``e60_t4_a10``."""
+    return f"e{num_employees}_t{num_teams}_a{round(absence_rate * 100):02d}"
+
+
+def parse_site(spec: str) -> Tuple[int, int, float]:
+    """Parse a ``--site`` value of the form ``EMPLOYEESxTEAMSxABSENCE_RATE``."""
+    try:
+        employees, teams, rate = spec.lower().split("x")
+        return int(employees), int(teams), float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid site '{spec}', expected e.g. 60x4x0.10"
+        ) from None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process in MiB (None on Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux but bytes on macOS
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def run_case(
+    num_employees: int,
+    num_teams: int,
+    absence_rate: float,
+    seed: int = DEFAULT_SEED,
+    time_limit_seconds: int = DEFAULT_TIME_LIMIT_SECONDS,
+    num_workers: int = DEFAULT_NUM_WORKERS,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Plan one synthetic site end to end and return its measurements."""
+    from model import create_shift_planning_model
+    from solver import solve_shift_planning
+
+    employees, teams, absences, shift_types = synthetic_site(
+        num_employees, num_teams, absence_rate,
+        BENCHMARK_PLANNING_START, BENCHMARK_PLANNING_END, seed=seed,
+    )
+
+    first_solution_at: List[float] = []
+
+    def _on_progress(event: str, payload: Dict[str, Any]) -> None:
+        if event == "solver_solution_progress" and not first_solution_at:
+            first_solution_at.append(time.perf_counter())
+
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with sink:
+        t0 = time.perf_counter()
+        planning_model = create_shift_planning_model(
+            employees, teams, BENCHMARK_PLANNING_START, BENCHMARK_PLANNING_END,
+            absences, shift_types=shift_types,
+        )
+        t_solve = time.perf_counter()
+        _, _, report = solve_shift_planning(
+            planning_model,
+            time_limit_seconds=time_limit_seconds,
+            num_workers=num_workers,
+            # No rotation groups: every run uses the built-in F → N → S pattern
+            # instead of whatever the local dienstplan.db happens to contain.
+            db_path=":memory:",
+            random_seed=seed,
+            progress_callback=_on_progress,
+        )
+        t_end = time.perf_counter()
+
+    solved = next((m for m in report.stage_metrics if m.get("solved")), None)
+    return {
+        "employees": num_employees,
+        "teams": num_teams,
+        "absence_rate": absence_rate,
+        "absences": len(absences),
+        "model_seconds": round(t_solve - t0, 3),
+        "build_seconds": round(
+            sum(float(m.get("build_seconds") or 0.0) for m in report.stage_metrics), 3
+        ),
+        "time_to_first_solution_seconds": (
+            round(first_solution_at[0] - t_solve, 3) if first_solution_at else None
+        ),
+        "objective": report.objective_value,
+        "status": report.status,
+        "solved_stage": solved.get("stage") if solved else None,
+        "total_seconds": round(t_end - t0, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_benchmark(
+    sites: List[Tuple[int, int, float]],
+    seed: int = DEFAULT_SEED,
+    time_limit_seconds: int = DEFAULT_TIME_LIMIT_SECONDS,
+    num_workers: int = DEFAULT_NUM_WORKERS,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Run every site in its own worker process and collect the result document."""
+    import ortools
+
+    cases: Dict[str, Any] = {}
+    for num_employees, num_teams, absence_rate in sites:
+        key = case_id(num_employees, num_teams, absence_rate)
+        print(f"[bench] {key} ...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            cases[key] = pool.submit(
+                run_case, num_employees, num_teams, absence_rate,
+                seed, time_limit_seconds, num_workers, verbose,
+            ).result()
+        c = cases[key]
+        print(
+            f"[bench] {key}: build={c['build_seconds']}s "
+            f"first={c['time_to_first_solution_seconds']}s "
+            f"objective={c['objective']} status={c['status']} rss={c['peak_rss_mb']}MiB",
+            flush=True,
+        )
+
+    return {
+        "meta": {
+            "seed": seed,
+            "time_limit_seconds": time_limit_seconds,
+            "num_workers": num_workers,
+            "planning_period": [
+                BENCHMARK_PLANNING_START.isoformat(),
+                BENCHMARK_PLANNING_END.isoformat(),
+            ],
+            "python": platform.python_version(),
+            "ortools": getattr(ortools, "__version__", None),
+            "platform": platform.platform(),
+        },
+        "cases": cases,
+    }
+
+
+def compare_to_baseline(
+    result: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Compare two result documents and return one row per (case, metric).
+
+    A row is flagged ``regression`` when the current value exceeds the
+    baseline by more than ``tolerance`` (relative).  A solution that
+    disappeared (value None now, not None before) is always a regression.
+    Cases missing from either side are skipped.
+    """
+    rows = []
+    for key, current in result.get("cases", {}).items():
+        previous = baseline.get("cases", {}).get(key)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None and new is None:
+                continue
+            if old is None or new is None:
+                change = None
+                regression = new is None
+            else:
+                change = (new - old) / abs(old) if old else (0.0 if new == old else float("inf"))
+                regression = change > tolerance
+            rows.append({
+                "case": key,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": regression,
+            })
+    return rows
+
+
+def _print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'Case':<16} {'Metric':<32} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    for row in rows:
+        change = "n/a" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['case']:<16} {row['metric']:<32} {str(row['baseline']):>12} "
+            f"{str(row['current']):>12} {change:>9}{flag}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--site", action="append", type=parse_site, metavar="ExTxRATE",
+                        help="site to run, e.g. 60x4x0.10 (repeatable; default: full matrix)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--time-limit", type=int, default=DEFAULT_TIME_LIMIT_SECONDS,
+                        help="time cap per solver stage in seconds")
+    parser.add_argument("--workers", type=int, default=DEFAULT_NUM_WORKERS)
+    parser.add_argument("--output", help="write the result JSON to this file")
+    parser.add_argument("--baseline", help="compare against a stored result JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slack before a metric counts as regression")
+    parser.add_argument("--verbose", action="store_true", help="show solver output")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(
+        args.site or list(BENCHMARK_SITE_MATRIX),
+        seed=args.seed,
+        time_limit_seconds=args.time_limit,
+        num_workers=args.workers,
+        verbose=args.verbose,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[bench] results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_to_baseline(result, baseline, args.tolerance)
+        _print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            return 1
+    elif not args.output:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
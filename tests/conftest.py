@@ -4,7 +4,7 @@ import os
 
 # Planning shares a process-global pool with default max_concurrent_jobs=1. A test
 # that starts a plan job (e.g. ops metrics) can still be running when the next
-# planning test runs → intermittent HTTP 503. Tests clamp to cpu_count anyway.
+# planning test queues its job, which would then wait. Tests clamp to cpu_count anyway.
 os.environ.setdefault("DIENSTPLAN_MAX_CONCURRENT_JOBS", "8")
 
 import gc
@@ -43,10 +43,27 @@ def test_db(tmp_path):
     os.environ["DIENSTPLAN_INITIAL_ADMIN_PASSWORD"] = TEST_ADMIN_PASSWORD
     initialize_database(db_path, with_sample_data=True)
     yield db_path
+    # Planning jobs started by API tests must not outlive the database: cancel
+    # them (running solvers stop at their next should_stop check) and stop the
+    # embedded worker that claims and renews them.
+    from api.planning_job_store import update_job
+    from api.planning_worker import stop_planning_workers
+    from api.shared import Database
+    if os.path.exists(db_path):
+        db = Database(db_path)
+        with db.connection() as conn:
+            unfinished = [row[0] for row in conn.execute(
+                "SELECT id FROM PlanningJobs WHERE status IN ('queued', 'running')"
+            )]
+        for job_id in unfinished:
+            update_job(db, job_id, 'cancelled', 'Testende')
+    stop_planning_workers(timeout=5)
     if not os.path.exists(db_path):
         return
     # Windows keeps SQLite files locked until connections are GC'd; release then retry remove.
     gc.collect()
+    from api.shared import close_connection_pools
+    close_connection_pools()
     attempts = 30 if sys.platform == 'win32' else 1
     last_err = None
     for i in range(attempts):
@@ -1,8 +1,12 @@
-"""Small factories for HTTP tests (payloads, query strings)."""
+"""Small factories for tests (HTTP payloads, query strings, synthetic solver sites)."""
 
 from __future__ import annotations
 
 from datetime import date
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entities import Absence, Employee, ShiftType, Team
 
 
 def csrf_token(client) -> str:
@@ -34,3 +38,70 @@ def minimal_employee_payload(suffix: str) -> dict:
         "email": f"factory.user{suffix}@example.test",
         "password": "TestPass-9a!",
     }
+
+
+def synthetic_site(
+    num_employees: int,
+    num_teams: int,
+    absence_rate: float,
+    start: date,
+    end: date,
+    seed: int = 0,
+) -> tuple[list[Employee], list[Team], list[Absence], list[ShiftType]]:
+    """Deterministic in-memory site for solver benchmarks (no DB involved).
+
+    Employees are spread round-robin over ``num_teams`` teams, every team gets
+    one TD-qualified member, and absence blocks of 2–10 days are drawn until
+    roughly ``absence_rate`` of all employee-days in ``[start, end]`` are
+    absent.  Maximum staffing of the standard shift types is raised to the
+    team size so large sites are not infeasible by construction.
+    """
+    import random
+    from dataclasses import replace
+    from datetime import timedelta
+
+    from entities import STANDARD_SHIFT_TYPES, Absence, AbsenceType, Employee, Team
+
+    rng = random.Random(seed)
+    teams = [Team(id=t + 1, name=f"Team {t + 1:02d}") for t in range(num_teams)]
+    employees = []
+    for i in range(num_employees):
+        team = teams[i % num_teams]
+        emp = Employee(
+            id=i + 1,
+            vorname="Bench",
+            name=f"Employee{i + 1:03d}",
+            personalnummer=f"B{i + 1:04d}",
+            team_id=team.id,
+            is_td_qualified=i < num_teams,
+        )
+        team.employees.append(emp)
+        employees.append(emp)
+
+    num_days = (end - start).days + 1
+    target_days = int(round(absence_rate * num_employees * num_days))
+    absence_types = [AbsenceType.U, AbsenceType.AU, AbsenceType.L]
+    absences = []
+    absent_days = 0
+    while absent_days < target_days:
+        length = min(rng.randint(2, 10), num_days)
+        first = start + timedelta(days=rng.randint(0, num_days - length))
+        absences.append(Absence(
+            id=len(absences) + 1,
+            employee_id=rng.randint(1, num_employees),
+            absence_type=rng.choice(absence_types),
+            start_date=first,
+            end_date=first + timedelta(days=length - 1),
+        ))
+        absent_days += length
+
+    team_size = -(-num_employees // num_teams)
+    shift_types = [
+        replace(
+            st,
+            max_staff_weekday=max(st.max_staff_weekday, team_size),
+            max_staff_weekend=max(st.max_staff_weekend, team_size),
+        )
+        for st in STANDARD_SHIFT_TYPES
+    ]
+    return employees, teams, absences, shift_types
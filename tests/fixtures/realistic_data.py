@@ -17,3 +17,14 @@ SAMPLE_DASHBOARD_FEB_END = date(2025, 2, 28)
 # Planning job smoke tests (month with sample complexity)
 SAMPLE_PLANNING_MONTH_START = date(2025, 3, 1)
 SAMPLE_PLANNING_MONTH_END = date(2025, 3, 31)
+
+# Planning benchmark (``tests/benchmarks/bench_planning.py``): one calendar month
+# plus the parametrised synthetic site matrix (employees, teams, absence rate).
+BENCHMARK_PLANNING_START = date(2025, 3, 1)
+BENCHMARK_PLANNING_END = date(2025, 3, 31)
+BENCHMARK_SITE_MATRIX = [
+    (20, 3, 0.05),
+    (60, 4, 0.10),
+    (150, 8, 0.20),
+    (300, 12, 0.30),
+]
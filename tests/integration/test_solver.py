@@ -508,3 +508,363 @@ def test_solver_all_employees_without_team():
     _assert_solver_invariants(assignments, schedule, report)
 
 
+
+
+@pytest.mark.slow
+def test_solver_shared_model_switches_relaxation_level():
+    """Fallback stages reuse one model by toggling enforcement literals.
+
+    A solver built with use_relaxation_literals=True must be re-solvable at a
+    higher relaxation level without calling add_all_constraints() again, and must
+    then report exactly the relaxations of a model built directly for that level.
+    """
+    from solver import ShiftPlanningSolver, _relaxed_constraint_descriptions
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 12))
+    solver = ShiftPlanningSolver(model, time_limit_seconds=30, use_relaxation_literals=True)
+    solver.add_all_constraints()
+
+    assert solver.relaxed_constraints == []
+    assert solver.solve()
+
+    solver.set_relaxation_level(2)
+    proto = model.get_model().Proto()
+    assert list(proto.variables[solver.min_staffing_literal.Index()].domain) == [0, 0]
+    assert list(proto.variables[solver.team_rotation_literal.Index()].domain) == [0, 0]
+    assert solver.relaxed_constraints == _relaxed_constraint_descriptions(2)
+    assert solver.status is None
+
+    assert solver.solve()
+    assignments, schedule = solver.extract_solution()
+    assert assignments
+    emp_day = Counter((a.employee_id, a.date) for a in assignments)
+    assert all(count == 1 for count in emp_day.values())
+
+
+@pytest.mark.slow
+def test_solver_parallel_stages_prefers_strictest_result():
+    """parallel_stages=True races Stages 1-3 and keeps the strictest solution.
+
+    The sample data is solvable in Stage 1, so Stage 1 must win and the relaxed
+    stages must be reported as stopped early with their share of the workers.
+    """
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 12))
+    assignments, schedule, report = solve_shift_planning(
+        model, time_limit_seconds=30, num_workers=4, parallel_stages=True
+    )
+
+    _assert_solver_invariants(assignments, schedule, report)
+    assert report.status in {"OPTIMAL", "FEASIBLE"}
+    metrics = {m["stage"]: m for m in report.stage_metrics}
+    assert set(metrics) == {"STAGE_1", "STAGE_2", "STAGE_3"}
+    assert metrics["STAGE_1"]["solved"] is True
+    assert metrics["STAGE_1"]["num_workers"] == 2
+    for stage in ("STAGE_2", "STAGE_3"):
+        assert metrics[stage]["parallel"] is True
+        assert metrics[stage]["model_reused"] is True
+        assert metrics[stage]["stopped_early"] is True
+        assert metrics[stage]["solved"] is False
+
+
+@pytest.mark.slow
+def test_solver_lns_improves_on_first_solution():
+    """solve_lns() starts from the first solution and never gets worse.
+
+    Every improving neighbourhood is reported through the progress callback and
+    the final plan is the one extract_solution() returns.
+    """
+    from solver import ShiftPlanningSolver
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 19))
+    solver = ShiftPlanningSolver(model, time_limit_seconds=30, num_workers=4)
+    solver.add_all_constraints()
+    events = []
+    assert solver.solve_lns(
+        progress_callback=lambda event, payload: events.append((event, payload)),
+        neighbourhood_time_limit_seconds=2,
+        max_stalled_neighbourhoods=3,
+    )
+
+    stats = solver.lns_stats
+    assert stats["final_objective"] <= stats["initial_objective"]
+    assert stats["final_objective"] == solver.solution.ObjectiveValue()
+    assert stats["neighbourhoods"] >= 1 or stats["stop_reason"] == "optimal"
+    lns_points = [p for e, p in events if e == "solver_solution_progress" and "neighbourhood" in p]
+    assert len(lns_points) == stats["improvements"]
+    assert [e for e, _ in events].count("solver_search_finished") == 1
+
+    assignments, schedule = solver.extract_solution()
+    assert assignments
+    emp_day = Counter((a.employee_id, a.date) for a in assignments)
+    assert all(count == 1 for count in emp_day.values())
+
+
+@pytest.mark.slow
+def test_solver_profile_model_build_reports_constraint_families():
+    """profile_model_build=True attaches a per-family build profile to the building stage."""
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 12))
+    assignments, schedule, report = solve_shift_planning(
+        model, time_limit_seconds=30, num_workers=4, profile_model_build=True
+    )
+
+    _assert_solver_invariants(assignments, schedule, report)
+    profile = report.stage_metrics[0]["build_profile"]
+    labels = [section["label"] for section in profile]
+    assert len(labels) == len(set(labels))
+    assert sum(section["variables_added"] for section in profile) > 0
+    assert sum(section["constraints_added"] for section in profile) > 0
+    for section in profile:
+        assert section["seconds"] >= 0.0
+        assert section["peak_alloc_bytes"] >= 0
+    assert all("build_profile" not in m for m in report.stage_metrics[1:])
+
+
+@pytest.mark.slow
+def test_solver_warm_start_state_round_trips_into_replan():
+    """A re-plan fed with the previous warm_start_state reproduces a valid plan.
+
+    The snapshot must be plain JSON, cover every employee and be accepted by the
+    next solve of the same period (hints for team, weekend and cross-team vars).
+    """
+    import json
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 19))
+    _, _, report = solve_shift_planning(model, time_limit_seconds=30, num_workers=4, random_seed=1)
+
+    state = json.loads(json.dumps(report.warm_start_state))
+    assert state["version"] == 1
+    assert set(state["schedule"]) == {str(e.id) for e in employees}
+    assert state["team_shift"]
+
+    replan_model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 19))
+    assignments, schedule, replan = solve_shift_planning(
+        replan_model, time_limit_seconds=30, num_workers=4, random_seed=1,
+        warm_start_state=state,
+    )
+    _assert_solver_invariants(assignments, schedule, replan)
+    assert replan.status in {"OPTIMAL", "FEASIBLE"}
+
+
+@pytest.mark.slow
+def test_solver_should_stop_cancels_running_search():
+    """should_stop() stops the running CP-SAT search and skips all later stages."""
+    import threading
+    import time
+    from solver import PlanningCancelled
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 1), date(2025, 1, 31))
+    search_started = threading.Event()
+    stages_started = []
+
+    def _progress(event, payload):
+        if event == "solver_search_started":
+            search_started.set()
+        elif event == "stage_started":
+            stages_started.append(payload["stageIndex"])
+
+    def _should_stop():
+        return search_started.is_set() and time.monotonic() - started >= 1.0
+
+    started = time.monotonic()
+    with pytest.raises(PlanningCancelled):
+        solve_shift_planning(
+            model, time_limit_seconds=300, num_workers=4,
+            progress_callback=_progress, should_stop=_should_stop,
+        )
+    assert time.monotonic() - started < 120
+    assert stages_started == [1]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("stop_on", [None, "solver_search_started"])
+def test_solver_stop_search_before_the_search_runs(stop_on):
+    """stop_search() before solve() or just before CP-SAT starts searching is not lost."""
+    import time
+    from solver import ShiftPlanningSolver
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 1), date(2025, 1, 31))
+    solver = ShiftPlanningSolver(model, time_limit_seconds=120, num_workers=4)
+    solver.add_all_constraints()
+
+    def _progress(event, payload):
+        # Emitted after solve() checked for earlier stops, right before Solve().
+        if event == stop_on:
+            solver.stop_search()
+
+    if stop_on is None:
+        solver.stop_search()
+    started = time.monotonic()
+    solver.solve(progress_callback=_progress)
+    assert time.monotonic() - started < 30
+
+
+def test_early_stop_policy_from_global_settings():
+    from solver import EarlyStopPolicy
+
+    assert EarlyStopPolicy.from_global_settings(None) == EarlyStopPolicy()
+    policy = EarlyStopPolicy.from_global_settings(
+        {"solver_gap_limit_percent": 2.5, "solver_plateau_seconds": 90}
+    )
+    assert policy == EarlyStopPolicy(gap_percent=2.5, plateau_seconds=90.0)
+    assert policy.as_dict() == {"gap_percent": 2.5, "plateau_seconds": 90.0}
+
+
+@pytest.mark.slow
+def test_solver_early_stop_policy_is_reported_in_stage_metrics():
+    """A loose gap limit ends Stage 1 early and is reported per stage."""
+    from solver import EarlyStopPolicy
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 1), date(2025, 1, 31))
+    assignments, schedule, report = solve_shift_planning(
+        model, time_limit_seconds=120, num_workers=4,
+        early_stop=EarlyStopPolicy(gap_percent=50.0, plateau_seconds=20),
+    )
+
+    _assert_solver_invariants(assignments, schedule, report)
+    early_stop = report.stage_metrics[0]["early_stop"]
+    assert early_stop["gap_percent"] == 50.0
+    assert early_stop["plateau_seconds"] == 20
+    assert early_stop["reason"] in {"gap", "plateau", None}
+    if early_stop["reason"] is not None:
+        assert report.status == "FEASIBLE"
+    assert report.stage_metrics[0]["solve_seconds"] < 120
+
+
+def test_fallback_level_for_core():
+    from solver import fallback_level_for_core
+
+    assert fallback_level_for_core([]) == 3
+    assert fallback_level_for_core([("min_staffing", "F", date(2025, 1, 6))]) == 1
+    assert fallback_level_for_core([("team_lock", 1, 0), ("team_rotation", 1, 0)]) == 2
+    assert fallback_level_for_core([("employee_lock", 1, date(2025, 1, 6)), ("consecutive_days", 1)]) == 3
+
+
+def test_core_conflicts_reads_last_infeasible_core():
+    from solver import core_conflicts, describe_constraint_group
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 5), date(2025, 1, 18))
+    team = teams[0]
+    assert describe_constraint_group(("team_rotation", team.id, 1), model) == (
+        f"Teamrotation: {team.name} in der Woche ab 12.01.2025"
+    )
+    assert describe_constraint_group(("min_staffing", "F", date(2025, 1, 6)), model) == (
+        "Mindestbesetzung F am 06.01.2025"
+    )
+
+    metrics = [
+        {"stage": "CORE_CHECK", "core_status": "INFEASIBLE", "conflicts": ["a", "b"]},
+        {"stage": "STAGE_3", "status": 3},
+        {"stage": "CORE_CHECK", "core_status": "UNKNOWN"},
+    ]
+    assert core_conflicts(metrics) == ["a", "b"]
+    assert core_conflicts([{"stage": "STAGE_1", "status": 4}]) == []
+
+
+def _rotation_conflict_model():
+    """Two weeks from Sun 05.01.2025 with a member of the first team locked to F Mon-Fri.
+
+    The rotation gives the first team N in the week from 05.01.2025, so the lock
+    contradicts the team rotation and no stage before Stage 3 can succeed.
+    """
+    employees, teams, _ = generate_sample_data()
+    emp = next(e for e in employees if e.team_id == teams[0].id)
+    locks = {(emp.id, date(2025, 1, 6) + timedelta(days=i)): "F" for i in range(5)}
+    model = ShiftPlanningModel(
+        employees=employees, teams=teams, start_date=date(2025, 1, 5), end_date=date(2025, 1, 18),
+        absences=[], shift_types=list(STANDARD_SHIFT_TYPES[:3]), locked_employee_shift=locks,
+    )
+    return model, teams[0]
+
+
+@pytest.mark.slow
+def test_solver_infeasibility_core_names_conflicting_groups():
+    from solver import ShiftPlanningSolver
+
+    model, team = _rotation_conflict_model()
+    solver = ShiftPlanningSolver(model, time_limit_seconds=60, use_relaxation_literals=True)
+    solver.add_all_constraints()
+
+    core = solver.find_infeasibility_core(relaxation_level=0)
+    assert core["status"] == "INFEASIBLE"
+    assert ("team_lock", team.id, 0) in core["groups"]
+    assert ("team_rotation", team.id, 0) in core["groups"]
+    assert core["fallback_level"] == 2
+    assert len(core["conflicts"]) == len(core["groups"])
+
+
+@pytest.mark.slow
+def test_solver_core_check_skips_ruled_out_stages():
+    model, _team = _rotation_conflict_model()
+    assignments, schedule, report = solve_shift_planning(
+        model, time_limit_seconds=60, num_workers=4, core_check=True,
+    )
+
+    assert assignments
+    stages = [entry["stage"] for entry in report.stage_metrics]
+    assert stages[0] == "CORE_CHECK"
+    skipped = {entry["stage"] for entry in report.stage_metrics if entry.get("skipped")}
+    assert {"STAGE_1", "STAGE_2"} <= skipped
+    assert report.stage_metrics[0]["fallback_level"] == 2
+
+
+@pytest.mark.slow
+def test_solver_bulk_solution_read_matches_value():
+    """_solution_values() reads the same values as one solver.Value() call per variable."""
+    from solver import ShiftPlanningSolver
+
+    employees, teams, _ = generate_sample_data()
+    model = _build_model(employees, teams, date(2025, 1, 6), date(2025, 1, 12))
+    solver = ShiftPlanningSolver(model, time_limit_seconds=30)
+    solver.add_all_constraints()
+    assert solver.solve()
+
+    for variables in model.get_variables():
+        values = solver._solution_value_map(variables)
+        assert values == {key: solver.solution.Value(var) for key, var in variables.items()}
+    expected = {}
+    for category, pairs in solver.penalty_groups.items():
+        total = sum(solver.solution.Value(var) * weight for var, weight in pairs)
+        if total:
+            expected[category] = float(total)
+    assert solver.compute_penalty_breakdown() == pytest.approx(expected)
+
+
+@pytest.mark.slow
+def test_solver_decomposed_result_is_the_coordinating_solve(tmp_path):
+    """Cluster plans only seed the coordinating full-model solve, which owns the site-wide staffing."""
+    from decomposed_solver import solve_decomposed
+
+    employees, teams, _ = generate_sample_data()
+    for team in teams:
+        team.rotation_group_id = 1 if team.id % 2 else 2
+    model = ShiftPlanningModel(
+        employees=employees, teams=teams, start_date=date(2025, 1, 6), end_date=date(2025, 1, 19),
+        absences=[], shift_types=list(STANDARD_SHIFT_TYPES[:3]),
+    )
+    assignments, schedule, report = solve_decomposed(
+        model, cluster_time_limit_seconds=10, coordination_time_limit_seconds=30, num_workers=4,
+        db_path=str(tmp_path / "missing.db"), random_seed=1,
+    )
+
+    _assert_solver_invariants(assignments, schedule, report)
+    decomposition = report.stage_metrics[0]
+    assert decomposition["stage"] == "DECOMPOSITION"
+    assert len(decomposition["clusters"]) == 2
+    assert 0.0 <= decomposition["hints_kept_percent"] <= 100.0
+    # Stage 1 of the coordinating solve succeeded, so the site-wide minimum
+    # staffing holds although each cluster only planned its share of it.
+    assert report.status in ("OPTIMAL", "FEASIBLE")
+    for st in model.shift_types:
+        for day in (date(2025, 1, 6) + timedelta(days=i) for i in range(14)):
+            staffed = sum(schedule.get((emp.id, day)) == st.code for emp in employees)
+            minimum = st.min_staff_weekend if day.weekday() >= 5 else st.min_staff_weekday
+            assert staffed >= minimum, f"{st.code} on {day}: {staffed} < {minimum}"
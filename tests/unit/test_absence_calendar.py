@@ -0,0 +1,97 @@
+"""Unit tests for the absence interval index (absence_calendar.py)."""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from absence_calendar import AbsenceCalendar, deduplicate_absences, load_absence_calendar
+from entities import Absence, AbsenceType
+
+
+def _absence(id, emp_id, start, end):
+    return Absence(id=id, employee_id=emp_id, absence_type=AbsenceType.U,
+                   start_date=start, end_date=end)
+
+
+ABSENCES = [
+    _absence(1, 1, date(2025, 1, 6), date(2025, 1, 10)),
+    _absence(2, 1, date(2025, 1, 8), date(2025, 1, 20)),   # overlaps #1
+    _absence(3, 2, date(2024, 12, 1), date(2025, 3, 31)),  # long, starts before window
+    _absence(4, 3, date(2025, 2, 3), date(2025, 2, 3)),
+]
+
+
+@pytest.fixture(params=[None, (date(2025, 1, 1), date(2025, 1, 31))], ids=["no-window", "window"])
+def calendar(request):
+    window = request.param or (None, None)
+    return AbsenceCalendar(ABSENCES, window_start=window[0], window_end=window[1])
+
+
+@pytest.mark.unit
+class TestAbsenceCalendar:
+    def test_absence_on_returns_first_matching_absence(self, calendar):
+        assert calendar.absence_on(1, date(2025, 1, 9)) is ABSENCES[0]
+        assert calendar.absence_on(1, date(2025, 1, 15)) is ABSENCES[1]
+        assert calendar.absence_on(1, date(2025, 1, 21)) is None
+
+    def test_is_absent_inside_and_outside_window(self, calendar):
+        assert calendar.is_absent(2, date(2024, 12, 24))
+        assert calendar.is_absent(2, date(2025, 1, 15))
+        assert calendar.is_absent(3, date(2025, 2, 3))
+        assert not calendar.is_absent(3, date(2025, 2, 4))
+        assert not calendar.is_absent(99, date(2025, 1, 15))
+
+    def test_absent_between(self, calendar):
+        assert calendar.absent_between(1, date(2025, 1, 19), date(2025, 1, 25))
+        assert not calendar.absent_between(1, date(2025, 1, 21), date(2025, 1, 25))
+        assert calendar.absent_between(3, date(2025, 2, 2), date(2025, 2, 8))
+        assert not calendar.absent_between(3, date(2025, 2, 4), date(2025, 2, 8))
+
+    def test_absent_employees_on(self, calendar):
+        assert calendar.absent_employees_on(date(2025, 1, 8)) == {1, 2}
+        assert calendar.absent_employees_on(date(2025, 2, 3)) == {2, 3}
+        assert calendar.absent_employees_on(date(2025, 5, 1)) == set()
+
+    def test_matches_linear_scan(self, calendar):
+        for emp_id in (1, 2, 3, 4):
+            for offset in range(-40, 120):
+                d = date(2025, 1, 1) + timedelta(days=offset)
+                expected = next(
+                    (a for a in ABSENCES if a.employee_id == emp_id and a.overlaps_date(d)), None
+                )
+                assert calendar.absence_on(emp_id, d) is expected
+
+    def test_window_requires_both_bounds(self):
+        with pytest.raises(ValueError):
+            AbsenceCalendar(ABSENCES, window_start=date(2025, 1, 1))
+
+
+@pytest.mark.unit
+class TestDeduplicateAbsences:
+    def test_drops_fully_covered_absences(self):
+        a = _absence(1, 1, date(2025, 1, 6), date(2025, 1, 10))
+        b = _absence(2, 1, date(2025, 1, 7), date(2025, 1, 9))    # inside a
+        c = _absence(3, 1, date(2025, 1, 11), date(2025, 1, 12))  # adjacent, new days
+        d = _absence(4, 1, date(2025, 1, 6), date(2025, 1, 12))   # covered by a + c
+        e = _absence(5, 2, date(2025, 1, 7), date(2025, 1, 9))    # other employee
+        assert deduplicate_absences([a, b, c, d, e]) == [a, c, e]
+
+    def test_keeps_partially_new_absences(self):
+        a = _absence(1, 1, date(2025, 1, 6), date(2025, 1, 10))
+        b = _absence(2, 1, date(2025, 1, 9), date(2025, 1, 14))
+        assert deduplicate_absences([a, b]) == [a, b]
+
+
+@pytest.mark.unit
+def test_load_absence_calendar_reads_overlapping_rows():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Absences (Id INTEGER PRIMARY KEY, EmployeeId INTEGER, StartDate TEXT, EndDate TEXT)")
+    conn.executemany(
+        "INSERT INTO Absences (Id, EmployeeId, StartDate, EndDate) VALUES (?, ?, ?, ?)",
+        [(1, 7, "2025-01-01", "2025-01-05"), (2, 8, "2024-01-01", "2024-01-05")],
+    )
+    calendar = load_absence_calendar(conn, date(2025, 1, 3), date(2025, 1, 3))
+    conn.close()
+    assert calendar.absent_employees_on(date(2025, 1, 3)) == {7}
+    assert calendar.absence_on(7, date(2025, 1, 3)) == 1
@@ -55,3 +55,89 @@ class TestGetRowValue:
         row = cur.fetchone()
         assert get_row_value(row, "missing", "x") == "x"
         conn.close()
+
+
+@pytest.mark.unit
+class TestDatabaseConnectionPool:
+    def test_closed_connection_is_reused(self, tmp_path):
+        from api.shared import Database
+
+        db = Database(str(tmp_path / "pool.db"))
+        conn = db.get_connection()
+        raw = conn._conn
+        conn.close()
+        again = db.get_connection()
+        assert again._conn is raw
+        again.close()
+
+    def test_pragmas_and_row_factory(self, tmp_path):
+        from api.shared import Database
+
+        db = Database(str(tmp_path / "pool.db"))
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            row = conn.execute("SELECT 1 AS a").fetchone()
+            assert row["a"] == 1
+
+    def test_uncommitted_work_is_rolled_back_on_close(self, tmp_path):
+        from api.shared import Database
+
+        db = Database(str(tmp_path / "pool.db"))
+        with db.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+        with db.connection() as conn:
+            assert conn.in_transaction is False
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_closed_proxy_rejects_use(self, tmp_path):
+        import sqlite3
+
+        from api.shared import Database
+
+        conn = Database(str(tmp_path / "pool.db")).get_connection()
+        conn.close()
+        conn.close()  # idempotent like sqlite3.Connection.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_idle_connections_dropped_after_fork(self, tmp_path, monkeypatch):
+        import db_pool
+
+        pool = db_pool.SQLiteConnectionPool(str(tmp_path / "pool.db"), max_idle=2)
+        conn = pool.acquire()
+        raw = conn._conn
+        conn.close()
+        monkeypatch.setattr(db_pool.os, "getpid", lambda: pool._pid + 1)
+        fresh = pool.acquire()
+        assert fresh._conn is not raw
+        fresh.close()
+        raw.close()
+        pool.close_all()
+
+    def test_idle_connections_dropped_when_file_replaced(self, tmp_path):
+        import db_pool
+
+        path = tmp_path / "pool.db"
+        pool = db_pool.SQLiteConnectionPool(str(path), max_idle=2)
+        conn = pool.acquire()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        held = pool.acquire()
+        conn.close()
+
+        path.unlink()
+        for suffix in ("-wal", "-shm"):
+            (tmp_path / f"pool.db{suffix}").unlink(missing_ok=True)
+        fresh = pool.acquire()
+        assert fresh.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name='t'"
+        ).fetchone()[0] == 0
+        # A connection to the old file is not pooled again when returned.
+        held.close()
+        assert pool._idle == []
+        fresh.close()
+        pool.close_all()
@@ -0,0 +1,56 @@
+"""Unit tests for the planning benchmark harness (no solver run)."""
+
+import argparse
+
+import pytest
+
+from tests.benchmarks.bench_planning import case_id, compare_to_baseline, parse_site
+from tests.fixtures import realistic_data as RD
+from tests.fixtures.factories import synthetic_site
+
+
+class TestSyntheticSite:
+    def test_is_deterministic_for_a_seed(self):
+        a = synthetic_site(60, 4, 0.1, RD.BENCHMARK_PLANNING_START, RD.BENCHMARK_PLANNING_END, seed=7)
+        b = synthetic_site(60, 4, 0.1, RD.BENCHMARK_PLANNING_START, RD.BENCHMARK_PLANNING_END, seed=7)
+        assert [(x.employee_id, x.start_date, x.end_date) for x in a[2]] == \
+               [(x.employee_id, x.start_date, x.end_date) for x in b[2]]
+
+    def test_shape_and_absence_rate(self):
+        start, end = RD.BENCHMARK_PLANNING_START, RD.BENCHMARK_PLANNING_END
+        employees, teams, absences, shift_types = synthetic_site(150, 8, 0.2, start, end)
+        assert len(employees) == 150
+        assert len(teams) == 8
+        assert sum(len(t.employees) for t in teams) == 150
+        assert all(any(e.is_td_qualified for e in t.employees) for t in teams)
+        for a in absences:
+            assert start <= a.start_date <= a.end_date <= end
+        absent_days = sum((a.end_date - a.start_date).days + 1 for a in absences)
+        target = 0.2 * 150 * ((end - start).days + 1)
+        assert target <= absent_days < target + 10
+        assert all(st.max_staff_weekday >= 19 for st in shift_types)
+
+
+class TestCompareToBaseline:
+    def test_flags_relative_regressions_only_above_tolerance(self):
+        baseline = {"cases": {"e20_t3_a05": {"build_seconds": 1.0, "objective": 100.0}}}
+        result = {"cases": {"e20_t3_a05": {"build_seconds": 1.1, "objective": 150.0}}}
+        rows = {r["metric"]: r for r in compare_to_baseline(result, baseline, tolerance=0.2)}
+        assert rows["build_seconds"]["regression"] is False
+        assert rows["objective"]["regression"] is True
+        assert rows["objective"]["change"] == pytest.approx(0.5)
+
+    def test_lost_solution_is_a_regression(self):
+        baseline = {"cases": {"k": {"time_to_first_solution_seconds": 2.0}}}
+        result = {"cases": {"k": {"time_to_first_solution_seconds": None}}, "meta": {}}
+        (row,) = compare_to_baseline(result, baseline)
+        assert row["regression"] is True
+
+    def test_cases_missing_from_baseline_are_skipped(self):
+        assert compare_to_baseline({"cases": {"new": {"build_seconds": 1.0}}}, {"cases": {}}) == []
+
+
+def test_case_id_and_parse_site_round_trip():
+    assert case_id(*parse_site("60x4x0.10")) == "e60_t4_a10"
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_site("60-4")
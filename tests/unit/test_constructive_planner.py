@@ -0,0 +1,76 @@
+"""Unit tests for the constructive start plan (constructive_planner.py)."""
+
+import pytest
+from datetime import date, timedelta
+
+from constraints.constants import FORBIDDEN_SHIFT_TRANSITIONS
+from constructive_planner import ABSENT, OFF, build_constructive_plan, team_week_shifts
+from data_loader import generate_sample_data
+from entities import STANDARD_SHIFT_TYPES
+from model import create_shift_planning_model
+
+
+def _make_model(start=date(2026, 3, 1), end=date(2026, 3, 31)):
+    employees, teams, absences = generate_sample_data()[:3]
+    return create_shift_planning_model(
+        employees, teams, start, end, absences, shift_types=list(STANDARD_SHIFT_TYPES[:3])
+    )
+
+
+@pytest.mark.unit
+class TestBuildConstructivePlan:
+    def setup_method(self):
+        self.model = _make_model()
+        self.assignments, self.schedule = build_constructive_plan(self.model)
+
+    def test_schedule_covers_every_employee_and_day(self):
+        for emp in self.model.employees:
+            for d in self.model.dates:
+                assert (emp.id, d) in self.schedule
+
+    def test_absent_days_are_never_assigned(self):
+        index = self.model.index
+        for (emp_id, d), code in self.schedule.items():
+            assert (code == ABSENT) == index.has_absence(emp_id, d)
+
+    def test_assignments_match_working_days(self):
+        working = {key for key, code in self.schedule.items() if code not in (OFF, ABSENT)}
+        assert {(a.employee_id, a.date) for a in self.assignments} == working
+
+    def test_team_works_its_rotation_shift(self):
+        team_shift = team_week_shifts(self.model)
+        index = self.model.index
+        for (emp_id, d), code in self.schedule.items():
+            if code in (OFF, ABSENT):
+                continue
+            team = next(e.team_id for e in self.model.employees if e.id == emp_id)
+            assert code == team_shift[(team, index.week_index(d))]
+
+    def test_no_forbidden_transitions(self):
+        for emp in self.model.employees:
+            for d in self.model.dates[1:]:
+                pair = (self.schedule[(emp.id, d - timedelta(days=1))], self.schedule[(emp.id, d)])
+                assert pair not in FORBIDDEN_SHIFT_TRANSITIONS
+
+    def test_consecutive_day_limits(self):
+        limits = {st.code: st.max_consecutive_days for st in self.model.shift_types}
+        for emp in self.model.employees:
+            run_code, run_length = None, 0
+            for d in self.model.dates:
+                code = self.schedule[(emp.id, d)]
+                run_length = run_length + 1 if code == run_code else 1
+                run_code = code
+                if code in limits:
+                    assert run_length <= limits[code]
+
+
+@pytest.mark.unit
+def test_rotation_follows_iso_week_offset():
+    model = _make_model()
+    team_shift = team_week_shifts(model, {})
+    teams = sorted(model.teams, key=lambda t: t.id)
+    rotation = ["F", "N", "S"]
+    for team_idx, team in enumerate(teams):
+        for week_idx, week_dates in enumerate(model.weeks):
+            iso_week = week_dates[0].isocalendar()[1]
+            assert team_shift[(team.id, week_idx)] == rotation[(iso_week + team_idx) % 3]
@@ -108,3 +108,95 @@ class TestGenerateSampleData:
         if self.absences:
             ids = [a.id for a in self.absences]
             assert len(ids) == len(set(ids))
+
+
+class TestLoadPlanningWindow:
+    @pytest.fixture
+    def db_with_history(self, test_db):
+        import sqlite3
+
+        conn = sqlite3.connect(test_db)
+        emp_id = conn.execute(
+            "SELECT Id FROM Employees WHERE IsActive = 1 AND TeamId IS NOT NULL LIMIT 1"
+        ).fetchone()[0]
+        conn.execute("DELETE FROM Absences")
+        conn.execute("DELETE FROM VacationRequests")
+        conn.executemany(
+            "INSERT INTO Absences (EmployeeId, Type, StartDate, EndDate) VALUES (?, 1, ?, ?)",
+            [
+                (emp_id, "2022-03-01", "2022-03-05"),  # old history
+                (emp_id, "2025-02-25", "2025-03-03"),  # overlaps start
+                (emp_id, "2025-03-20", "2025-03-22"),  # inside
+                (emp_id, "2025-05-01", "2025-05-02"),  # after
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO VacationRequests (EmployeeId, StartDate, EndDate, Status) VALUES (?, ?, ?, ?)",
+            [
+                (emp_id, "2023-07-01", "2023-07-14", "Genehmigt"),
+                (emp_id, "2025-03-10", "2025-03-12", "Genehmigt"),
+                (emp_id, "2025-03-24", "2025-03-26", "InBearbeitung"),
+            ],
+        )
+        conn.commit()
+        conn.close()
+        return test_db
+
+    def test_only_overlapping_absences_are_loaded(self, db_with_history):
+        from data_loader import load_planning_window
+
+        _, _, absences, _ = load_planning_window(
+            db_with_history, date(2025, 3, 1), date(2025, 3, 31), lookback_days=0
+        )
+        assert sorted((a.start_date, a.end_date) for a in absences) == [
+            (date(2025, 2, 25), date(2025, 3, 3)),
+            (date(2025, 3, 10), date(2025, 3, 12)),
+            (date(2025, 3, 20), date(2025, 3, 22)),
+        ]
+
+    def test_lookback_extends_the_window(self, db_with_history):
+        from data_loader import load_planning_window
+
+        _, _, absences, _ = load_planning_window(
+            db_with_history, date(2022, 3, 10), date(2022, 3, 31), lookback_days=7
+        )
+        assert [(a.start_date, a.end_date) for a in absences] == [
+            (date(2022, 3, 1), date(2022, 3, 5)),
+        ]
+
+    def test_unscoped_load_returns_full_history(self, db_with_history):
+        from data_loader import load_from_database
+
+        _, _, absences, _ = load_from_database(db_with_history)
+        assert len(absences) == 6
+
+    def test_loaders_use_pooled_connections(self, db_with_history, monkeypatch):
+        import db_pool
+        from data_loader import (
+            get_existing_assignments, load_global_settings, load_planning_window, load_rotation_groups_from_db,
+        )
+
+        opened = []
+        open_connection = db_pool._open_sqlite_connection
+        monkeypatch.setattr(db_pool, "_open_sqlite_connection",
+                            lambda path: opened.append(path) or open_connection(path))
+        db_pool.close_connection_pools()
+        for _ in range(2):
+            load_planning_window(db_with_history, date(2025, 3, 1), date(2025, 3, 31))
+            load_global_settings(db_with_history)
+            load_rotation_groups_from_db(db_with_history)
+            get_existing_assignments(db_with_history, date(2025, 3, 1), date(2025, 3, 31))
+        # Each loader hands its connection back, so one connection serves all calls.
+        assert opened == [db_with_history]
+
+    def test_loads_without_web_stack(self):
+        import subprocess
+        import sys
+
+        # Solver processes import data_loader/solver; neither may pull in FastAPI & co.
+        code = (
+            "import sys, data_loader, solver; "
+            "print(sorted(m for m in ('fastapi', 'slowapi', 'bcrypt', 'api.shared') if m in sys.modules))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "[]"
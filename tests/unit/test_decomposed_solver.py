@@ -0,0 +1,89 @@
+"""Unit tests for the rotation-group decomposition (decomposed_solver.py)."""
+
+import pytest
+from datetime import date
+
+from constructive_planner import team_week_shifts
+from data_loader import generate_sample_data
+from decomposed_solver import (
+    _apportion,
+    _cluster_model_args,
+    cluster_shift_types,
+    hints_kept_percent,
+    rotation_group_clusters,
+)
+from entities import STANDARD_SHIFT_TYPES, Team
+from model import create_shift_planning_model
+
+
+def _make_model():
+    employees, teams, absences = generate_sample_data()[:3]
+    for team in teams:
+        team.rotation_group_id = 1 if team.id % 2 else 2
+    return create_shift_planning_model(
+        employees, teams, date(2026, 3, 1), date(2026, 3, 31), absences,
+        shift_types=list(STANDARD_SHIFT_TYPES[:3]),
+    )
+
+
+@pytest.mark.unit
+class TestRotationGroupClusters:
+    def test_groups_by_rotation_group_without_group_last(self):
+        teams = [Team(1, "A", rotation_group_id=2), Team(2, "B"), Team(3, "C", rotation_group_id=1),
+                 Team(4, "D", rotation_group_id=2)]
+        clusters = rotation_group_clusters(teams)
+        assert [[t.id for t in cluster] for cluster in clusters] == [[3], [1, 4], [2]]
+
+
+@pytest.mark.unit
+class TestApportion:
+    @pytest.mark.parametrize("total,weights,expected", [
+        (3, [1.0, 1.0], [2, 1]),
+        (4, [3.0, 1.0], [3, 1]),
+        (5, [1.0, 1.0, 1.0], [2, 2, 1]),
+        (3, [0.0, 2.0], [0, 3]),
+        (0, [1.0, 1.0], [0, 0]),
+        (3, [0.0, 0.0], [0, 0]),
+    ])
+    def test_shares_sum_to_total(self, total, weights, expected):
+        assert _apportion(total, weights) == expected
+
+
+@pytest.mark.unit
+class TestClusterShiftTypes:
+    def setup_method(self):
+        self.model = _make_model()
+        self.clusters = rotation_group_clusters(self.model.teams)
+        self.team_shift = team_week_shifts(self.model)
+
+    def test_cluster_minimums_add_up_to_site_minimum(self):
+        per_cluster = cluster_shift_types(self.model, self.clusters, self.team_shift)
+        for i, st in enumerate(self.model.shift_types):
+            assert sum(types[i].min_staff_weekday for types in per_cluster) == st.min_staff_weekday
+            assert sum(types[i].min_staff_weekend for types in per_cluster) == st.min_staff_weekend
+            for types in per_cluster:
+                assert types[i].max_staff_weekday >= types[i].min_staff_weekday
+
+    def test_cluster_model_pins_team_weeks_to_site_rotation(self):
+        per_cluster = cluster_shift_types(self.model, self.clusters, self.team_shift)
+        args = _cluster_model_args(self.model, self.clusters[0], per_cluster[0], self.team_shift)
+        team_ids = {team.id for team in self.clusters[0]}
+        assert {emp.team_id for emp in args["employees"]} <= team_ids
+        assert args["locked_team_shift"] == {
+            key: code for key, code in self.team_shift.items() if key[0] in team_ids
+        }
+        emp_ids = {emp.id for emp in args["employees"]}
+        assert all(a.employee_id in emp_ids for a in args["absences"])
+
+
+@pytest.mark.unit
+class TestHintsKeptPercent:
+    def test_share_of_unchanged_hints(self):
+        hints = {(1, date(2026, 3, 2)): "F", (1, date(2026, 3, 3)): "F",
+                 (2, date(2026, 3, 2)): "S", (2, date(2026, 3, 3)): "OFF"}
+        schedule = {(1, date(2026, 3, 2)): "F", (1, date(2026, 3, 3)): "N",
+                    (2, date(2026, 3, 2)): "S"}
+        assert hints_kept_percent(hints, schedule) == 50.0
+
+    def test_without_hints(self):
+        assert hints_kept_percent({}, {(1, date(2026, 3, 2)): "F"}) == 100.0
@@ -4,8 +4,8 @@ import pytest
 from datetime import date, timedelta
 
 
-from entities import STANDARD_SHIFT_TYPES
-from model import ShiftPlanningModel, create_shift_planning_model
+from entities import STANDARD_SHIFT_TYPES, Absence, AbsenceType
+from model import ConstraintGroups, PlanningIndex, ShiftPlanningModel, create_shift_planning_model
 from data_loader import generate_sample_data
 
 
@@ -144,3 +144,97 @@ class TestCreateShiftPlanningModelFunction:
                 absences=absences,
                 shift_types=None,
             )
+
+
+class TestPlanningIndex:
+    def test_model_exposes_index(self):
+        model = _make_model()
+        assert isinstance(model.index, PlanningIndex)
+
+    def test_team_lookups_match_input(self):
+        model = _make_model()
+        for emp in model.employees:
+            if emp.team_id:
+                assert model.index.team_of(emp).id == emp.team_id
+                assert model.index.team_by_employee_id[emp.id].id == emp.team_id
+        for team in model.teams:
+            expected = [e.id for e in model.employees if e.team_id == team.id]
+            assert [e.id for e in model.index.team_members[team.id]] == expected
+
+    def test_week_index_matches_weeks(self):
+        model = _make_model()
+        for week_idx, week_dates in enumerate(model.weeks):
+            for d in week_dates:
+                assert model.index.week_index(d) == week_idx
+                assert model.get_week_index(d) == week_idx
+        assert model.index.week_index(model.start_date - timedelta(days=1)) is None
+
+    def test_shift_type_lookup(self):
+        model = _make_model()
+        for st in STANDARD_SHIFT_TYPES:
+            assert model.index.shift_type_by_code[st.code] is model.get_shift_type_by_code(st.code)
+
+    def test_absence_lookup_inside_and_outside_window(self):
+        employees, teams, _ = generate_sample_data()
+        emp_id = employees[0].id
+        inside = Absence(id=1, employee_id=emp_id, absence_type=AbsenceType.U,
+                         start_date=date(2025, 1, 13), end_date=date(2025, 1, 14))
+        outside = Absence(id=2, employee_id=emp_id, absence_type=AbsenceType.AU,
+                          start_date=date(2025, 6, 1), end_date=date(2025, 6, 3))
+        model = _make_model(absences=[inside, outside])
+
+        assert model.index.absence_on(emp_id, date(2025, 1, 13)) is inside
+        assert model.index.has_absence(emp_id, date(2025, 1, 14))
+        assert not model.index.has_absence(emp_id, date(2025, 1, 15))
+        # Dates outside the planning weeks fall back to the per-employee list
+        assert model.index.absence_on(emp_id, date(2025, 6, 2)) is outside
+        assert not model.index.has_absence(employees[1].id, date(2025, 6, 2))
+
+
+class _Constraint:
+    def __init__(self, index):
+        self._index = index
+
+    def Index(self):
+        return self._index
+
+
+class TestConstraintGroups:
+    def test_add_records_index_under_key(self):
+        groups = ConstraintGroups()
+        first = _Constraint(4)
+        assert groups.add(("team_rotation", 1, 0), first) is first
+        groups.add(("team_rotation", 1, 0), _Constraint(7))
+        groups.add(("consecutive_days", 3), _Constraint(9))
+        assert groups.indices == {("team_rotation", 1, 0): [4, 7], ("consecutive_days", 3): [9]}
+        assert groups.keys() == [("team_rotation", 1, 0), ("consecutive_days", 3)]
+        assert len(groups) == 2
+
+    def test_model_records_locks_as_groups(self):
+        employees, teams, _ = generate_sample_data()
+        emp = next(e for e in employees if e.team_id)
+        locked_day = date(2025, 1, 7)
+        model = ShiftPlanningModel(
+            employees=employees, teams=teams, start_date=date(2025, 1, 5), end_date=date(2025, 1, 18),
+            absences=[], shift_types=list(STANDARD_SHIFT_TYPES[:3]),
+            locked_team_shift={(emp.team_id, 0): "F"},
+            locked_employee_shift={(emp.id, locked_day): "F"},
+        )
+        keys = model.constraint_groups.keys()
+        assert ("team_lock", emp.team_id, 0) in keys
+        assert ("employee_lock", emp.id, locked_day) in keys
+        proto = model.get_model().Proto()
+        assert all(i < len(proto.constraints) for ids in model.constraint_groups.indices.values() for i in ids)
+
+    def test_fixed_employee_days_record_locks_for_days_off(self):
+        employees, teams, _ = generate_sample_data()
+        emp = next(e for e in employees if e.team_id)
+        day_off, working_day = date(2025, 1, 7), date(2025, 1, 8)
+        model = ShiftPlanningModel(
+            employees=employees, teams=teams, start_date=date(2025, 1, 5), end_date=date(2025, 1, 18),
+            absences=[], shift_types=list(STANDARD_SHIFT_TYPES[:3]),
+            fixed_employee_days={(emp.id, day_off): None, (emp.id, working_day): "F"},
+        )
+        keys = model.constraint_groups.keys()
+        assert ("employee_lock", emp.id, day_off) in keys
+        assert ("employee_lock", emp.id, working_day) in keys
@@ -0,0 +1,216 @@
+"""Unit tests for the planning result cache (api/planning_cache.py)."""
+
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+from api.planning_cache import (
+    MAX_CACHED_RESULTS_PER_MONTH,
+    acquire_planning_result,
+    assignments_from_schedule,
+    cached_plan_matches_locks,
+    planning_fingerprint,
+    release_planning_result,
+    store_planning_result,
+)
+from data_loader import generate_sample_data
+from entities import STANDARD_SHIFT_TYPES
+
+
+class _Db:
+    """Minimal stand-in for api.shared.Database on a temporary file."""
+
+    def __init__(self, path):
+        self.db_path = str(path)
+        with self.connection() as conn:
+            conn.execute("CREATE TABLE PlanningJobs (id TEXT PRIMARY KEY, status TEXT NOT NULL)")
+            conn.execute(
+                "CREATE TABLE PlanningResultCache (fingerprint TEXT PRIMARY KEY, year INTEGER NOT NULL, "
+                "month INTEGER NOT NULL, job_id TEXT, created_at TEXT NOT NULL, schedule_json TEXT, "
+                "report_status TEXT, report_json TEXT, warm_start_json TEXT)"
+            )
+            conn.commit()
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def set_job(self, job_id, status):
+        with self.connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO PlanningJobs (id, status) VALUES (?, ?)", (job_id, status))
+            conn.commit()
+
+
+@pytest.fixture
+def db(tmp_path):
+    return _Db(tmp_path / "cache.db")
+
+
+SCHEDULE = {(1, date(2026, 3, 2)): "F", (1, date(2026, 3, 3)): "OFF", (2, date(2026, 3, 2)): "N"}
+
+
+def _fingerprint(employees=None, absences=None, **overrides):
+    sample_employees, teams, sample_absences = generate_sample_data()[:3]
+    args = dict(
+        period={'start': date(2026, 3, 1), 'end': date(2026, 3, 31)},
+        employees=sample_employees if employees is None else employees,
+        teams=teams,
+        absences=sample_absences if absences is None else absences,
+        shift_types=list(STANDARD_SHIFT_TYPES[:3]),
+        global_settings={'min_rest_hours': 11},
+        locked_team_shift={(1, 0): "F", (2, 0): "N"},
+        previous_employee_shifts={(1, date(2026, 2, 28)): "S"},
+        rotation_patterns=None,
+        solver_params={'workers': 8, 'lns': False},
+    )
+    args.update(overrides)
+    return planning_fingerprint(**args)
+
+
+def _store(db, fingerprint, job_id="job-1", schedule=SCHEDULE, month=3, status="OPTIMAL"):
+    store_planning_result(db, fingerprint, job_id, 2026, month, schedule, status, f'{{"status": "{status}"}}',
+                          {"shifts": []})
+
+
+@pytest.mark.unit
+class TestPlanningFingerprint:
+    def test_independent_of_entity_and_dict_order(self):
+        employees = generate_sample_data()[0]
+        reordered = _fingerprint(
+            employees=list(reversed(employees)),
+            locked_team_shift={(2, 0): "N", (1, 0): "F"},
+        )
+        assert reordered == _fingerprint()
+
+    def test_changes_with_absences_and_solver_params(self):
+        absences = generate_sample_data()[2]
+        base = _fingerprint()
+        assert _fingerprint(absences=absences[1:]) != base
+        assert _fingerprint(solver_params={'workers': 8, 'lns': True}) != base
+        assert _fingerprint(rotation_patterns={1: ["F", "S", "N"]}) != base
+
+    def test_changes_with_employee_attribute(self):
+        employees = generate_sample_data()[0]
+        changed = [replace(employees[0], team_id=None)] + employees[1:]
+        assert _fingerprint(employees=changed) != _fingerprint()
+
+
+@pytest.mark.unit
+def test_cached_plan_must_keep_every_lock():
+    assert cached_plan_matches_locks(SCHEDULE, {(1, date(2026, 3, 2)): "F"})
+    assert cached_plan_matches_locks(SCHEDULE, None)
+    assert not cached_plan_matches_locks(SCHEDULE, {(1, date(2026, 3, 2)): "S"})
+    assert not cached_plan_matches_locks(SCHEDULE, {(3, date(2026, 3, 2)): "F"})
+
+
+@pytest.mark.unit
+class TestAcquirePlanningResult:
+    def test_first_job_misses_and_stored_result_is_reused(self, db):
+        db.set_job("job-1", "running")
+        assert acquire_planning_result(db, "fp", "job-1", 2026, 3) == ("miss", None)
+        _store(db, "fp")
+        outcome, entry = acquire_planning_result(db, "fp", "job-2", 2026, 3)
+        assert outcome == "hit"
+        assert entry["schedule"] == SCHEDULE
+        assert entry["report_json"] == '{"status": "OPTIMAL"}'
+        assert entry["warm_start_state"] == {"shifts": []}
+        assert entry["job_id"] == "job-1"
+
+    def test_result_breaking_a_lock_is_not_reused(self, db):
+        _store(db, "fp")
+        locks = {(2, date(2026, 3, 2)): "F"}
+        assert acquire_planning_result(db, "fp", "job-2", 2026, 3, locks) == ("miss", None)
+
+    def test_waits_for_running_job_with_same_input(self, db):
+        db.set_job("job-1", "running")
+        acquire_planning_result(db, "fp", "job-1", 2026, 3)
+        waited_for = []
+        polls = []
+
+        def _should_stop():
+            polls.append(1)
+            if len(polls) == 2:
+                _store(db, "fp")
+            return False
+
+        outcome, _entry = acquire_planning_result(
+            db, "fp", "job-2", 2026, 3, should_stop=_should_stop, on_wait=waited_for.append, poll_interval=0,
+        )
+        assert outcome == "hit"
+        assert waited_for == ["job-1"]
+
+    def test_waiting_job_can_be_cancelled(self, db):
+        db.set_job("job-1", "running")
+        acquire_planning_result(db, "fp", "job-1", 2026, 3)
+        outcome = acquire_planning_result(db, "fp", "job-2", 2026, 3, should_stop=lambda: True, poll_interval=0)
+        assert outcome == ("cancelled", None)
+
+    def test_marker_of_finished_job_is_taken_over(self, db):
+        db.set_job("job-1", "error")
+        acquire_planning_result(db, "fp", "job-1", 2026, 3)
+        assert acquire_planning_result(db, "fp", "job-2", 2026, 3, poll_interval=0) == ("miss", None)
+        release_planning_result(db, "fp", "job-1")
+        with db.connection() as conn:
+            row = conn.execute("SELECT job_id FROM PlanningResultCache WHERE fingerprint='fp'").fetchone()
+        assert row["job_id"] == "job-2"
+
+    @pytest.mark.parametrize("status", ["EMERGENCY", "FALLBACK_L1", "FALLBACK_L2"])
+    def test_degraded_results_are_not_cached(self, db, status):
+        db.set_job("job-1", "running")
+        acquire_planning_result(db, "fp", "job-1", 2026, 3)
+        _store(db, "fp", status=status)
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM PlanningResultCache").fetchone()[0] == 0
+        assert acquire_planning_result(db, "fp", "job-2", 2026, 3, poll_interval=0) == ("miss", None)
+
+    def test_stored_emergency_result_is_solved_again(self, db):
+        with db.connection() as conn:
+            conn.execute(
+                "INSERT INTO PlanningResultCache (fingerprint, year, month, job_id, created_at, schedule_json, "
+                "report_status, report_json) VALUES ('fp', 2026, 3, 'job-1', '2026-03-01', '[]', 'EMERGENCY', '{}')"
+            )
+            conn.commit()
+        assert acquire_planning_result(db, "fp", "job-2", 2026, 3) == ("miss", None)
+        with db.connection() as conn:
+            row = conn.execute("SELECT job_id, schedule_json FROM PlanningResultCache").fetchone()
+        assert (row["job_id"], row["schedule_json"]) == ("job-2", None)
+
+    def test_release_keeps_stored_results(self, db):
+        acquire_planning_result(db, "fp", "job-1", 2026, 3)
+        release_planning_result(db, "fp", "job-1")
+        _store(db, "fp-2")
+        release_planning_result(db, "fp-2", "job-1")
+        with db.connection() as conn:
+            rows = conn.execute("SELECT fingerprint FROM PlanningResultCache").fetchall()
+        assert [row["fingerprint"] for row in rows] == ["fp-2"]
+
+
+@pytest.mark.unit
+def test_store_keeps_newest_results_per_month(db):
+    for i in range(MAX_CACHED_RESULTS_PER_MONTH + 2):
+        _store(db, f"march-{i}")
+    _store(db, "april", month=4)
+    with db.connection() as conn:
+        rows = conn.execute("SELECT fingerprint, month FROM PlanningResultCache").fetchall()
+    march = sorted(row["fingerprint"] for row in rows if row["month"] == 3)
+    assert march == [f"march-{i}" for i in range(2, MAX_CACHED_RESULTS_PER_MONTH + 2)]
+    assert [row["fingerprint"] for row in rows if row["month"] == 4] == ["april"]
+
+
+@pytest.mark.unit
+def test_assignments_from_schedule_skip_days_off():
+    shift_types = list(STANDARD_SHIFT_TYPES[:3])
+    ids = {st.code: st.id for st in shift_types}
+    assignments = assignments_from_schedule(SCHEDULE, shift_types)
+    assert [(a.employee_id, a.date, a.shift_type_id) for a in assignments] == [
+        (1, date(2026, 3, 2), ids["F"]),
+        (2, date(2026, 3, 2), ids["N"]),
+    ]
@@ -0,0 +1,155 @@
+"""Unit tests for the planning job progress stream in api.planning_job_events."""
+
+import asyncio
+import json
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+from api.planning_job_events import format_sse, job_events, stream_job_events
+
+
+class _Db:
+    """Minimal stand-in for api.shared.Database on a temporary file."""
+
+    def __init__(self, path):
+        self.db_path = str(path)
+        self.open_connections = 0
+        with self.connection() as conn:
+            conn.execute(
+                "CREATE TABLE PlanningJobs (id TEXT PRIMARY KEY, status TEXT NOT NULL DEFAULT 'pending', "
+                "message TEXT, started_at TEXT, finished_at TEXT, result_json TEXT, "
+                "priority INTEGER NOT NULL DEFAULT 0, queued_at TEXT)"
+            )
+            conn.commit()
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        self.open_connections += 1
+        try:
+            yield conn
+        finally:
+            self.open_connections -= 1
+            conn.close()
+
+    def set_job(self, status, message, data=None):
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO PlanningJobs (id, status, message, result_json) VALUES ('job-1', ?, ?, ?)",
+                (status, message, json.dumps(data) if data else None),
+            )
+            conn.commit()
+
+
+def _point(seq, objective, bound):
+    return {'seq': seq, 'stage': 1, 'solutionCount': seq, 'objective': objective,
+            'bestBound': bound, 'elapsedSeconds': float(seq)}
+
+
+async def _collect(stream):
+    return [message async for message in stream]
+
+
+def _parse(messages):
+    events = []
+    for message in messages:
+        lines = message.strip().split('\n')
+        if lines[0].startswith('event: '):
+            events.append((lines[0][len('event: '):], json.loads(lines[1][len('data: '):])))
+    return events
+
+
+@pytest.mark.unit
+class TestJobEvents:
+    def test_first_payload_emits_stage_solutions_and_progress(self):
+        current = {
+            'status': 'running', 'message': 'Optimierung läuft…',
+            'optimizationPhaseIndex': 1, 'optimizationTotalPhases': 4,
+            'optimizationPhaseLabel': 'Normaler Lösungsversuch',
+            'optimizationConvergence': [_point(1, 900, 100), _point(2, 500, 120)],
+        }
+        events = job_events(None, current)
+        assert [name for name, _ in events] == ['stage', 'solution', 'solution', 'progress']
+        assert events[0][1]['index'] == 1
+        assert events[2][1]['objective'] == 500
+        assert events[2][1]['bestBound'] == 120
+        assert 'optimizationConvergence' not in events[3][1]
+
+    def test_only_new_solutions_are_emitted(self):
+        previous = {'status': 'running', 'message': 'x', 'optimizationConvergence': [_point(1, 900, 100)]}
+        current = dict(previous, optimizationConvergence=[_point(1, 900, 100), _point(2, 500, 120)])
+        assert job_events(previous, current) == [('solution', _point(2, 500, 120))]
+
+    def test_next_batch_month_starts_a_new_curve(self):
+        previous = {'status': 'running', 'message': 'x', 'batchMonthIndex': 1,
+                    'optimizationConvergence': [_point(1, 900, 100), _point(2, 500, 120)]}
+        current = {'status': 'running', 'message': 'y', 'batchMonthIndex': 2,
+                   'optimizationConvergence': [_point(1, 800, 90)]}
+        assert job_events(previous, current)[0] == ('solution', _point(1, 800, 90))
+
+    def test_elapsed_time_alone_is_no_event(self):
+        previous = {'status': 'running', 'message': 'x', 'elapsedSeconds': 3}
+        assert job_events(previous, dict(previous, elapsedSeconds=4)) == []
+
+    def test_finished_job_emits_done(self):
+        previous = {'status': 'running', 'message': 'x'}
+        current = {'status': 'success', 'message': 'Erfolgreich!', 'assignmentsCount': 3}
+        assert job_events(previous, current) == [('done', current)]
+
+    def test_format_sse(self):
+        assert format_sse('done', {'status': 'success'}) == 'event: done\ndata: {"status": "success"}\n\n'
+
+
+@pytest.mark.unit
+class TestStreamJobEvents:
+    def test_streams_until_job_finished(self, tmp_path):
+        db = _Db(tmp_path / "jobs.db")
+        db.set_job('running', 'Optimierung läuft…', {'optimizationConvergence': [_point(1, 900, 100)]})
+
+        async def scenario():
+            stream = stream_job_events(db, 'job-1', poll_interval=0)
+            assert (await stream.__anext__()).startswith('retry: ')
+            first = _parse([await stream.__anext__(), await stream.__anext__()])
+            # No connection stays checked out while the stream waits.
+            assert db.open_connections == 0
+            db.set_job('success', 'Erfolgreich!', {'assignmentsCount': 3})
+            return first, _parse(await _collect(stream))
+
+        first, rest = asyncio.run(scenario())
+        assert first == [
+            ('solution', _point(1, 900, 100)),
+            ('progress', {'status': 'running', 'message': 'Optimierung läuft…'}),
+        ]
+        assert rest == [('done', {'status': 'success', 'message': 'Erfolgreich!', 'assignmentsCount': 3})]
+
+    def test_unknown_job_ends_stream(self, tmp_path):
+        db = _Db(tmp_path / "jobs.db")
+        events = _parse(asyncio.run(_collect(stream_job_events(db, 'missing', poll_interval=0))))
+        assert events == [('done', {'status': 'error', 'message': 'Job not found'})]
+
+    def test_idle_stream_sends_keepalive(self, tmp_path):
+        db = _Db(tmp_path / "jobs.db")
+        db.set_job('running', 'Optimierung läuft…')
+
+        async def scenario():
+            stream = stream_job_events(db, 'job-1', poll_interval=0, keepalive_seconds=0)
+            await stream.__anext__()
+            await stream.__anext__()  # progress
+            message = await stream.__anext__()
+            await stream.aclose()
+            return message
+
+        assert asyncio.run(scenario()) == ': keepalive\n\n'
+
+    def test_disconnected_client_ends_stream(self, tmp_path):
+        db = _Db(tmp_path / "jobs.db")
+        db.set_job('running', 'Optimierung läuft…')
+
+        async def disconnected():
+            return True
+
+        messages = asyncio.run(_collect(stream_job_events(db, 'job-1', poll_interval=0, is_disconnected=disconnected)))
+        assert len(messages) == 1 and messages[0].startswith('retry: ')
@@ -0,0 +1,259 @@
+"""Unit tests for the job queue and the coalescing progress writer in api.planning_job_store."""
+
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+import api.planning_worker as planning_worker
+from api.planning_job_store import (
+    MAX_JOB_ATTEMPTS,
+    JobProgressSink,
+    claim_next_job,
+    create_job,
+    enqueue_job,
+    find_queued_job,
+    get_job,
+    get_queue_position,
+    is_job_cancelled,
+    renew_job_lease,
+    update_job,
+)
+
+
+class _Db:
+    """Minimal stand-in for api.shared.Database on a temporary file."""
+
+    def __init__(self, path):
+        self.db_path = str(path)
+        self.writes = 0
+        with self.connection() as conn:
+            conn.execute(
+                "CREATE TABLE PlanningJobs (id TEXT PRIMARY KEY, status TEXT NOT NULL DEFAULT 'pending', "
+                "message TEXT, started_at TEXT, finished_at TEXT, result_json TEXT, "
+                "kind TEXT, params_json TEXT, priority INTEGER NOT NULL DEFAULT 0, queued_at TEXT, "
+                "lease_owner TEXT, lease_expires_at TEXT, attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.commit()
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.set_trace_callback(
+            lambda sql: setattr(self, "writes", self.writes + 1) if sql.startswith("UPDATE") else None
+        )
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = _Db(tmp_path / "jobs.db")
+    create_job(db, "job-1")
+    return db
+
+
+@pytest.mark.unit
+class TestJobProgressSink:
+    def test_burst_of_events_is_coalesced(self, db):
+        sink = JobProgressSink(db, "job-1", interval_seconds=10)
+        for i in range(200):
+            sink.push(f"Lösung {i}", {"solutionCount": i})
+        sink.close()
+        row = get_job(db, "job-1")
+        assert row["message"] == "Lösung 199"
+        assert json.loads(row["result_json"]) == {"solutionCount": 199}
+        assert db.writes <= 2
+
+    def test_merge_keeps_previous_keys(self, db):
+        sink = JobProgressSink(db, "job-1", interval_seconds=10)
+        sink.push("Phase 1", {"optimizationPhaseIndex": 1})
+        sink.push("Suche", {"optimizationSearchState": "started"}, merge=True)
+        sink.close()
+        assert json.loads(get_job(db, "job-1")["result_json"]) == {
+            "optimizationPhaseIndex": 1,
+            "optimizationSearchState": "started",
+        }
+
+    def test_push_writes_in_background(self, db):
+        sink = JobProgressSink(db, "job-1", interval_seconds=0.01)
+        sink.push("Daten werden geladen…", {"planningStep": 1})
+        deadline = time.monotonic() + 5
+        while get_job(db, "job-1")["message"] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert get_job(db, "job-1")["message"] == "Daten werden geladen…"
+        sink.close()
+
+    def test_does_not_overwrite_finished_job(self, db):
+        sink = JobProgressSink(db, "job-1", interval_seconds=10)
+        update_job(db, "job-1", "cancelled", "Planung wurde abgebrochen.")
+        sink.push("Optimierung läuft…", {"planningStep": 3})
+        sink.close()
+        row = get_job(db, "job-1")
+        assert row["status"] == "cancelled"
+        assert row["message"] == "Planung wurde abgebrochen."
+
+
+@pytest.fixture
+def queue_db(tmp_path):
+    return _Db(tmp_path / "queue.db")
+
+
+def _expire_lease(db, job_id):
+    past = (datetime.utcnow() - timedelta(seconds=1)).isoformat()
+    with db.connection() as conn:
+        conn.execute("UPDATE PlanningJobs SET lease_expires_at=? WHERE id=?", (past, job_id))
+        conn.commit()
+
+
+@pytest.mark.unit
+class TestPlanningJobQueue:
+    def test_claims_by_priority_then_fifo(self, queue_db):
+        enqueue_job(queue_db, "plan-1", "plan", {})
+        enqueue_job(queue_db, "plan-2", "plan", {})
+        enqueue_job(queue_db, "repair-1", "repair", {}, priority=10)
+
+        claimed = [claim_next_job(queue_db, "w", max_running=10)["id"] for _ in range(3)]
+        assert claimed == ["repair-1", "plan-1", "plan-2"]
+        assert claim_next_job(queue_db, "w", max_running=10) is None
+
+    def test_claim_sets_lease(self, queue_db):
+        enqueue_job(queue_db, "job-1", "plan", {"force": True})
+        job = claim_next_job(queue_db, "worker-a", max_running=1)
+        assert job["status"] == "running"
+        assert job["lease_owner"] == "worker-a"
+        assert job["attempts"] == 1
+        assert json.loads(job["params_json"]) == {"force": True}
+
+    def test_max_running_is_enforced_across_workers(self, queue_db):
+        enqueue_job(queue_db, "job-1", "plan", {})
+        enqueue_job(queue_db, "job-2", "plan", {})
+        assert claim_next_job(queue_db, "worker-a", max_running=1)["id"] == "job-1"
+        assert claim_next_job(queue_db, "worker-b", max_running=1) is None
+
+        update_job(queue_db, "job-1", "success", "fertig")
+        assert get_job(queue_db, "job-1")["lease_owner"] is None
+        assert claim_next_job(queue_db, "worker-b", max_running=1)["id"] == "job-2"
+
+    def test_queue_position(self, queue_db):
+        enqueue_job(queue_db, "job-1", "plan", {})
+        enqueue_job(queue_db, "job-2", "plan", {})
+        enqueue_job(queue_db, "job-3", "repair", {}, priority=10)
+        assert get_queue_position(queue_db, "job-3") == 1
+        assert get_queue_position(queue_db, "job-1") == 2
+        assert get_queue_position(queue_db, "job-2") == 3
+
+        claim_next_job(queue_db, "w", max_running=10)
+        assert get_queue_position(queue_db, "job-3") is None
+        assert get_queue_position(queue_db, "job-2") == 2
+
+    def test_find_queued_job_with_same_parameters(self, queue_db):
+        params = {"startDate": "2026-03-01", "endDate": "2026-03-31", "force": False}
+        enqueue_job(queue_db, "job-1", "plan", params)
+        enqueue_job(queue_db, "job-2", "plan", {**params, "force": True})
+        assert find_queued_job(queue_db, "plan", dict(reversed(list(params.items())))) == "job-1"
+        assert find_queued_job(queue_db, "repair", params) is None
+
+        claim_next_job(queue_db, "w", max_running=1)
+        assert find_queued_job(queue_db, "plan", params) is None
+
+    def test_expired_lease_is_requeued(self, queue_db):
+        enqueue_job(queue_db, "job-1", "plan", {})
+        claim_next_job(queue_db, "dead-worker", max_running=1)
+        _expire_lease(queue_db, "job-1")
+
+        assert not renew_job_lease(queue_db, "job-1", "other-worker")
+        job = claim_next_job(queue_db, "worker-b", max_running=1)
+        assert job["id"] == "job-1"
+        assert job["lease_owner"] == "worker-b"
+        assert job["attempts"] == 2
+        assert renew_job_lease(queue_db, "job-1", "worker-b")
+
+    def test_repeatedly_abandoned_job_fails(self, queue_db):
+        enqueue_job(queue_db, "job-1", "plan", {})
+        for _ in range(MAX_JOB_ATTEMPTS):
+            assert claim_next_job(queue_db, "dying-worker", max_running=1)["id"] == "job-1"
+            _expire_lease(queue_db, "job-1")
+
+        assert claim_next_job(queue_db, "worker-b", max_running=1) is None
+        job = get_job(queue_db, "job-1")
+        assert job["status"] == "error"
+        assert job["finished_at"] is not None
+
+
+def _finish_job(job_id, db_path):
+    update_job(planning_worker.Database(db_path), job_id, "success", "Planung abgeschlossen")
+
+
+def _crash_job(job_id, db_path):
+    raise RuntimeError("Solver abgestürzt")
+
+
+def _slow_job(job_id, db_path):
+    time.sleep(0.5)
+
+
+@pytest.mark.unit
+class TestPlanningWorker:
+    def _run_until_idle(self, worker):
+        worker.run_once()
+        deadline = time.monotonic() + 5
+        while worker._futures and time.monotonic() < deadline:
+            time.sleep(0.01)
+            worker._reap()
+
+    def test_runs_queued_job(self, queue_db, monkeypatch):
+        monkeypatch.setattr(planning_worker, "_job_call", lambda job: (_finish_job, ()))
+        enqueue_job(queue_db, "job-1", "plan", {})
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker = planning_worker.PlanningWorker(queue_db.db_path, executor, max_jobs=1)
+            self._run_until_idle(worker)
+        assert get_job(queue_db, "job-1")["status"] == "success"
+
+    def test_crashed_job_is_marked_as_error(self, queue_db, monkeypatch):
+        monkeypatch.setattr(planning_worker, "_job_call", lambda job: (_crash_job, ()))
+        enqueue_job(queue_db, "job-1", "plan", {})
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker = planning_worker.PlanningWorker(queue_db.db_path, executor, max_jobs=1)
+            self._run_until_idle(worker)
+        job = get_job(queue_db, "job-1")
+        assert job["status"] == "error"
+        assert "Solver abgestürzt" in json.loads(job["result_json"])["details"]
+
+    def test_stops_when_database_is_replaced_during_a_job(self, queue_db, monkeypatch):
+        monkeypatch.setattr(planning_worker, "_job_call", lambda job: (_slow_job, ()))
+        enqueue_job(queue_db, "job-1", "plan", {})
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker = planning_worker.PlanningWorker(queue_db.db_path, executor, max_jobs=1,
+                                                    lease_seconds=0, poll_interval=0.01)
+            assert worker.run_once() == 1
+            os.remove(queue_db.db_path)
+            sqlite3.connect(queue_db.db_path).close()
+            worker.start()
+            worker.join(5)
+            assert not worker.is_alive()
+
+    def test_unknown_kind_is_marked_as_error(self, queue_db):
+        enqueue_job(queue_db, "job-1", "export", {})
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker = planning_worker.PlanningWorker(queue_db.db_path, executor, max_jobs=1)
+            assert worker.run_once() == 1
+        assert get_job(queue_db, "job-1")["status"] == "error"
+
+
+@pytest.mark.unit
+def test_is_job_cancelled(queue_db):
+    enqueue_job(queue_db, "job-1", "plan", {})
+    claim_next_job(queue_db, "w", max_running=1)
+    assert not is_job_cancelled(queue_db, "job-1")
+    update_job(queue_db, "job-1", "cancelled", "Planung wurde abgebrochen.")
+    assert is_job_cancelled(queue_db, "job-1")
+    assert not is_job_cancelled(queue_db, "missing")
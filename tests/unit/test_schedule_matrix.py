@@ -0,0 +1,142 @@
+"""Unit tests for the schedule matrix interchange format (schedule_matrix.py)."""
+
+import sqlite3
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from entities import Absence, AbsenceType, ShiftAssignment, STANDARD_SHIFT_TYPES, Employee
+from schedule_matrix import ABSENT, EMPTY, OFF, ScheduleMatrix
+from validation import validate_shift_plan
+
+F_ID, S_ID, N_ID = 1, 2, 3
+START, END = date(2025, 3, 3), date(2025, 3, 16)
+TEAM_OF = {1: 10, 2: 20, 3: 10, 4: None, 5: 20}
+
+
+def _assignments():
+    assignments = []
+    for offset in range(14):
+        d = START + timedelta(days=offset)
+        for emp_id, shift_id in ((1, F_ID), (2, S_ID), (3, N_ID), (5, F_ID)):
+            if (emp_id + offset) % 4:
+                assignments.append(ShiftAssignment(
+                    id=len(assignments) + 1, employee_id=emp_id, shift_type_id=shift_id, date=d,
+                ))
+    return assignments
+
+
+def _absence(id, emp_id, start, end, absence_type=AbsenceType.U):
+    return Absence(id=id, employee_id=emp_id, absence_type=absence_type,
+                   start_date=start, end_date=end)
+
+
+def _matrix(**kwargs):
+    return ScheduleMatrix.from_assignments(
+        _assignments(), [1, 2, 3, 4, 5], START, END,
+        shift_types=list(STANDARD_SHIFT_TYPES), **kwargs,
+    )
+
+
+@pytest.mark.unit
+class TestScheduleMatrix:
+    def test_assignment_round_trip(self):
+        matrix = _matrix()
+        assert matrix.cells.dtype == np.int16
+        assert matrix.cells.shape == (5, 14)
+        expected = sorted((a.employee_id, a.date, a.shift_type_id) for a in _assignments())
+        assert [(a.employee_id, a.date, a.shift_type_id) for a in matrix.to_assignments()] == expected
+        assert [a.id for a in matrix.to_assignments(first_id=7)][:3] == [7, 8, 9]
+
+    def test_lookups(self):
+        matrix = _matrix()
+        assert matrix.code_at(1, START) == "F"
+        assert matrix.code_at(1, START + timedelta(days=3)) is None
+        assert matrix.code_at(4, START) is None
+        expected = Counter("FSN"[a.shift_type_id - 1] for a in _assignments())
+        assert matrix.code_counts() == dict(expected)
+        with pytest.raises(KeyError):
+            matrix.code_at(1, END + timedelta(days=1))
+
+    def test_views_share_memory(self):
+        matrix = _matrix(team_of=TEAM_OF)
+        assert matrix.employee_ids == [1, 3, 2, 5, 4]
+        assert matrix.team_employee_ids(20) == [2, 5]
+        for view in (matrix.employee(3), matrix.day(START), matrix.team(10)):
+            assert np.shares_memory(view, matrix.cells)
+        matrix.team(20)[:, 0] = EMPTY
+        assert matrix.code_at(2, START) is None
+        assert matrix.code_at(5, START) is None
+        with pytest.raises(KeyError):
+            _matrix().team(10)
+
+    def test_entries_outside_window_are_ignored(self):
+        assignments = _assignments() + [
+            ShiftAssignment(id=900, employee_id=99, shift_type_id=F_ID, date=START),
+            ShiftAssignment(id=901, employee_id=1, shift_type_id=F_ID, date=END + timedelta(days=1)),
+        ]
+        matrix = ScheduleMatrix.from_assignments(assignments, [1, 2, 3, 4, 5], START, END)
+        assert len(matrix.to_assignments()) == len(_assignments())
+
+    def test_absence_overlay_first_absence_wins(self):
+        absences = [
+            _absence(1, 1, START, START + timedelta(days=2), AbsenceType.AU),
+            _absence(2, 1, START + timedelta(days=1), START + timedelta(days=4)),
+            _absence(3, 4, START - timedelta(days=10), START),
+        ]
+        matrix = _matrix(absences=absences)
+        assert matrix.absence_at(1, START + timedelta(days=2)) == "AU"
+        assert matrix.absence_at(1, START + timedelta(days=4)) == "U"
+        assert matrix.absence_at(1, START + timedelta(days=5)) is None
+        assert matrix.absence_at(4, START) == "U"
+        # The overlay does not remove shifts
+        assert matrix.code_at(1, START) == "F"
+
+    def test_cell_labels(self):
+        matrix = _matrix(absences=[_absence(1, 1, START, START, AbsenceType.L)])
+        matrix.add(2, START, "N", N_ID)  # second shift on the same day
+        labels = matrix.cell_labels()
+        assert labels[matrix.row(1), 0] == "L"
+        assert labels[matrix.row(2), 0] == "S N"
+        assert labels[matrix.row(4), 0] == "-"
+        assert labels[matrix.row(1), 1] == "F"
+        assert matrix.codes_at(2, START) == ["S", "N"]
+        assert len(matrix.to_assignments()) == len(_assignments()) + 1
+
+    def test_complete_schedule_round_trip(self):
+        matrix = _matrix(absences=[_absence(1, 3, START, START + timedelta(days=1))])
+        schedule = matrix.to_complete_schedule()
+        assert len(schedule) == 5 * 14
+        assert schedule[(3, START)] == ABSENT
+        assert schedule[(4, START)] == OFF
+        assert schedule[(1, START)] == "F"
+        rebuilt = ScheduleMatrix.from_complete_schedule(
+            schedule, [1, 2, 3, 4, 5], START, END, shift_types=list(STANDARD_SHIFT_TYPES),
+        )
+        assert rebuilt.to_complete_schedule() == schedule
+
+    def test_from_sqlite_rows(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        conn.execute("CREATE TABLE ShiftAssignments (EmployeeId INTEGER, ShiftTypeId INTEGER, Date TEXT, Code TEXT)")
+        conn.executemany(
+            "INSERT INTO ShiftAssignments VALUES (?, ?, ?, ?)",
+            [(emp_id, shift_type_id, d, "FSN"[shift_type_id - 1])
+             for emp_id, shift_type_id, d in _matrix().to_rows()],
+        )
+        rows = conn.execute("SELECT * FROM ShiftAssignments").fetchall()
+        matrix = ScheduleMatrix.from_rows(rows, [1, 2, 3, 4, 5], START, END)
+        assert np.array_equal(matrix.cells, _matrix().cells)
+        assert matrix.to_rows() == _matrix().to_rows()
+
+    def test_validate_shift_plan_accepts_matrix(self):
+        employees = [Employee(id=i, vorname="", name=f"M{i}", personalnummer=f"P{i}") for i in range(1, 6)]
+        matrix = _matrix()
+        expected = validate_shift_plan(matrix.to_assignments(), employees, [], START, END,
+                                       shift_types=list(STANDARD_SHIFT_TYPES))
+        result = validate_shift_plan(matrix, employees, [], START, END,
+                                     shift_types=list(STANDARD_SHIFT_TYPES))
+        assert [v.message for v in result.violations] == [v.message for v in expected.violations]
+        assert [w.message for w in result.warnings] == [w.message for w in expected.warnings]
@@ -0,0 +1,94 @@
+"""Unit tests for persistence helpers of the planning worker."""
+
+import json
+import sqlite3
+from datetime import date
+
+import pytest
+
+from api.shifts_planning_core import _batch_month_ranges, _bulk_insert_assignments
+from entities import ShiftAssignment
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("""
+        CREATE TABLE ShiftAssignments (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            EmployeeId INTEGER NOT NULL,
+            ShiftTypeId INTEGER NOT NULL,
+            Date TEXT NOT NULL,
+            IsManual INTEGER NOT NULL DEFAULT 0,
+            IsFixed INTEGER NOT NULL DEFAULT 0,
+            CreatedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CreatedBy TEXT
+        )
+    """)
+    connection.execute(
+        "CREATE UNIQUE INDEX idx_shiftassignments_unique_employee_date "
+        "ON ShiftAssignments(EmployeeId, Date)"
+    )
+    yield connection
+    connection.close()
+
+
+@pytest.mark.unit
+class TestBulkInsertAssignments:
+    def test_inserts_all_new_rows(self, conn):
+        assignments = [ShiftAssignment(i, i, 1, date(2025, 3, 3)) for i in range(1, 51)]
+        inserted, skipped = _bulk_insert_assignments(conn.cursor(), assignments, "2025-01-01T00:00:00")
+        assert (inserted, skipped) == (50, 0)
+        assert conn.execute("SELECT COUNT(*) FROM ShiftAssignments").fetchone()[0] == 50
+
+    def test_existing_employee_day_is_skipped_not_overwritten(self, conn):
+        conn.execute(
+            "INSERT INTO ShiftAssignments (EmployeeId, ShiftTypeId, Date, IsFixed) VALUES (1, 3, '2025-03-03', 1)"
+        )
+        assignments = [
+            ShiftAssignment(1, 1, 1, date(2025, 3, 3)),
+            ShiftAssignment(2, 1, 2, date(2025, 3, 4)),
+        ]
+        inserted, skipped = _bulk_insert_assignments(conn.cursor(), assignments, "2025-01-01T00:00:00")
+        assert (inserted, skipped) == (1, 1)
+        row = conn.execute(
+            "SELECT ShiftTypeId, IsFixed FROM ShiftAssignments WHERE EmployeeId = 1"
+        ).fetchone()
+        assert row == (3, 1)
+
+    def test_empty_input_is_a_no_op(self, conn):
+        assert _bulk_insert_assignments(conn.cursor(), [], "2025-01-01T00:00:00") == (0, 0)
+
+
+@pytest.mark.unit
+class TestBatchMonthRanges:
+    def test_months_cross_the_year_boundary(self):
+        assert _batch_month_ranges(date(2025, 11, 1), 3) == [
+            (date(2025, 11, 1), date(2025, 11, 30)),
+            (date(2025, 12, 1), date(2025, 12, 31)),
+            (date(2026, 1, 1), date(2026, 1, 31)),
+        ]
+
+    def test_leap_february(self):
+        assert _batch_month_ranges(date(2028, 2, 1), 1) == [(date(2028, 2, 1), date(2028, 2, 29))]
+
+
+@pytest.mark.unit
+class TestBatchJobFailure:
+    def test_failure_before_progress_sink_marks_job_as_error(self, test_db, monkeypatch):
+        import api.shifts_planning_core as core
+        from api.planning_job_store import create_job, get_job
+        from api.shared import Database
+
+        def _broken_sink(db, job_id):
+            raise RuntimeError("sink unavailable")
+
+        monkeypatch.setattr(core, "JobProgressSink", _broken_sink)
+        db = Database(test_db)
+        create_job(db, "batch-job")
+        core._run_batch_planning_job("batch-job", date(2025, 4, 1), 2, False, 0, test_db)
+
+        job = get_job(db, "batch-job")
+        assert job["status"] == "error"
+        assert job["message"] == "Unbekannter Fehler"
+        assert json.loads(job["result_json"]) == {"details": "sink unavailable"}
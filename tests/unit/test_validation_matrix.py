@@ -0,0 +1,158 @@
+"""Parity tests: matrix validation engine (validation_matrix.py) vs. the reference engine."""
+
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+from entities import (
+    Employee, Team, Absence, AbsenceType, ShiftAssignment, STANDARD_SHIFT_TYPES,
+)
+from validation import validate_shift_plan
+
+F_ID, S_ID, N_ID, ZD_ID, BMT_ID, BSB_ID = 1, 2, 3, 4, 5, 6
+ROTATION = [F_ID, N_ID, S_ID]
+
+
+def _as_tuples(result):
+    return (
+        result.is_valid,
+        [(v.message, v.cause_type, v.cause) for v in result.violations],
+        [(w.message, w.cause_type, w.cause) for w in result.warnings],
+    )
+
+
+def _both_engines(*args, **kwargs):
+    reference = validate_shift_plan(*args, engine="reference", **kwargs)
+    matrix = validate_shift_plan(*args, engine="matrix", **kwargs)
+    return _as_tuples(reference), _as_tuples(matrix)
+
+
+def _site(rng, num_employees=18, num_teams=3):
+    teams = [Team(id=t + 1, name=f"Team {t + 1}") for t in range(num_teams)]
+    employees = []
+    for i in range(num_employees):
+        employees.append(Employee(
+            id=i + 1,
+            vorname=rng.choice(["Anna", "Ben", ""]),
+            name=f"Mitarbeiter{i + 1:02d}",
+            personalnummer=f"P{i + 1:04d}",
+            # a few employees without team (springers / special functions)
+            team_id=None if i % 7 == 6 else teams[i % num_teams].id,
+            is_brandmeldetechniker=rng.random() < 0.3,
+            is_brandschutzbeauftragter=rng.random() < 0.3,
+        ))
+    return employees, teams
+
+
+def _random_plan(seed, start, end, noise=0.25):
+    """Team rotation F → N → S per week, disturbed by random changes, gaps and absences."""
+    rng = random.Random(seed)
+    employees, teams = _site(rng)
+    absences = []
+    for emp in employees:
+        for _ in range(rng.randint(0, 2)):
+            a_start = start + timedelta(days=rng.randint(-10, (end - start).days))
+            absences.append(Absence(
+                id=len(absences) + 1,
+                employee_id=emp.id,
+                absence_type=rng.choice(list(AbsenceType)),
+                start_date=a_start,
+                end_date=a_start + timedelta(days=rng.randint(0, 9)),
+            ))
+
+    assignments = []
+    # Assignments a few days outside [start, end] like extended planning weeks
+    d = start - timedelta(days=3)
+    while d <= end + timedelta(days=3):
+        week = (d - start).days // 7
+        for emp in employees:
+            if rng.random() < 0.2:
+                continue  # day off
+            if emp.team_id:
+                shift_id = ROTATION[(week + emp.team_id) % 3]
+                if rng.random() < noise:
+                    shift_id = rng.choice([F_ID, S_ID, N_ID, ZD_ID])
+            else:
+                shift_id = rng.choice([ZD_ID, BMT_ID, BSB_ID, F_ID])
+            assignments.append(ShiftAssignment(
+                id=len(assignments) + 1, employee_id=emp.id, shift_type_id=shift_id, date=d,
+            ))
+        d += timedelta(days=1)
+    rng.shuffle(assignments)
+    return employees, teams, absences, assignments
+
+
+@pytest.mark.unit
+class TestMatrixEngineParity:
+    @pytest.mark.parametrize("seed", range(12))
+    def test_random_plans(self, seed):
+        start, end = date(2025, 3, 1), date(2025, 4, 13)
+        employees, teams, absences, assignments = _random_plan(seed, start, end)
+        reference, matrix = _both_engines(
+            assignments, employees, absences, start, end, teams,
+            shift_types=list(STANDARD_SHIFT_TYPES),
+        )
+        assert matrix == reference
+        assert reference[1] and reference[2]  # the plans do exercise the rules
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_clean_rotation_with_custom_limits(self, seed):
+        start, end = date(2025, 1, 1), date(2025, 3, 31)
+        employees, teams, absences, assignments = _random_plan(seed, start, end, noise=0.0)
+        shift_types = [
+            replace(st, max_consecutive_days=4, weekly_working_hours=40.0, max_staff_weekday=5)
+            for st in STANDARD_SHIFT_TYPES
+        ]
+        reference, matrix = _both_engines(
+            assignments, employees, absences, start, end, teams, shift_types=shift_types,
+        )
+        assert matrix == reference
+
+    def test_locked_assignments_and_complete_schedule(self):
+        start, end = date(2025, 3, 3), date(2025, 3, 30)
+        employees, teams, absences, assignments = _random_plan(7, start, end)
+        complete_schedule = {(a.employee_id, a.date): "X" for a in assignments}
+        reference, matrix = _both_engines(
+            assignments, employees, absences, start, end, teams,
+            complete_schedule=complete_schedule,
+            locked_team_shift={(1, 0): "S", (2, 1): "N"},
+            locked_employee_weekend={(1, date(2025, 3, 8)): True, (2, date(2025, 3, 9)): False},
+            shift_types=list(STANDARD_SHIFT_TYPES),
+        )
+        assert matrix == reference
+
+    def test_duplicate_assignments_fall_back_to_reference(self):
+        start, end = date(2025, 3, 3), date(2025, 3, 16)
+        employees, teams, absences, assignments = _random_plan(3, start, end)
+        assignments = assignments + [
+            ShiftAssignment(id=9001, employee_id=1, shift_type_id=S_ID, date=start),
+            ShiftAssignment(id=9002, employee_id=1, shift_type_id=N_ID, date=start),
+        ]
+        reference, matrix = _both_engines(
+            assignments, employees, absences, start, end, teams,
+            shift_types=list(STANDARD_SHIFT_TYPES),
+        )
+        assert matrix == reference
+        assert any("Mehrfachzuweisung" in message for message, _, _ in matrix[1])
+
+    def test_reference_engine_is_default(self, monkeypatch):
+        monkeypatch.delenv("DIENSTPLAN_VALIDATION_ENGINE", raising=False)
+        import validation_matrix
+        calls = []
+        monkeypatch.setattr(validation_matrix, "validate_shift_plan_matrix",
+                            lambda *args: calls.append(args))
+        validate_shift_plan([], [], [], date(2025, 1, 6), date(2025, 1, 12),
+                            shift_types=list(STANDARD_SHIFT_TYPES))
+        assert calls == []
+        monkeypatch.setenv("DIENSTPLAN_VALIDATION_ENGINE", "matrix")
+        validate_shift_plan([], [], [], date(2025, 1, 6), date(2025, 1, 12),
+                            shift_types=list(STANDARD_SHIFT_TYPES))
+        assert len(calls) == 1
+
+    def test_engine_from_environment(self, monkeypatch):
+        monkeypatch.setenv("DIENSTPLAN_VALIDATION_ENGINE", "unknown")
+        with pytest.raises(ValueError):
+            validate_shift_plan([], [], [], date(2025, 1, 6), date(2025, 1, 12),
+                                shift_types=list(STANDARD_SHIFT_TYPES))
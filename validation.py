@@ -4,16 +4,38 @@ Validates all rules and constraints after solving.
 """
 
 import math
+import os
 from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from collections import defaultdict
 from entities import Employee, ShiftAssignment, Absence, STANDARD_SHIFT_TYPES, get_shift_type_by_id
+from absence_calendar import AbsenceCalendar
+from schedule_matrix import ScheduleMatrix
 
 # Constants for validation
 MAIN_SHIFT_CODES = ["F", "S", "N"]  # Main shift types that require working hours validation
 DEFAULT_WEEKLY_HOURS = 40.0  # Default weekly working hours if not configured
 
+# validate_shift_plan() engines: "reference" runs the rule functions below one
+# by one, "matrix" evaluates the same rules on a NumPy employee × day matrix
+# (validation_matrix.py).  Both return the same ValidationResult; the matrix
+# engine is opt-in (DIENSTPLAN_VALIDATION_ENGINE=matrix) until it has run side
+# by side with the reference engine in production.
+VALIDATION_ENGINES = ("matrix", "reference")
+DEFAULT_VALIDATION_ENGINE = "reference"
+
+# Validators accept the plain absence list or a prebuilt AbsenceCalendar;
+# validate_shift_plan() builds the calendar once and passes it down.
+Absences = Union[List[Absence], AbsenceCalendar]
+
+
+def _absence_calendar(absences: Absences) -> AbsenceCalendar:
+    """Return absences as an AbsenceCalendar (building one for a plain list)."""
+    if isinstance(absences, AbsenceCalendar):
+        return absences
+    return AbsenceCalendar(absences or [])
+
 
 @dataclass
 class ViolationEntry:
@@ -25,7 +47,7 @@ class ViolationEntry:
 
 def _analyze_absence_cause(
     check_date: Optional[date],
-    absences: List[Absence],
+    absences: Absences,
     employees: List[Employee],
     shift_code: Optional[str] = None,
 ) -> Tuple[str, str]:
@@ -54,16 +76,16 @@ def _analyze_absence_cause(
     shift_label = _SHIFT_NAMES.get(shift_code, f"{shift_code}schicht") if shift_code else None
 
     # Find employees absent on check_date
+    absence_calendar = _absence_calendar(absences)
     absent_pairs: List[Tuple[Employee, Absence]] = []
     seen_emp_ids: set = set()
     for emp in employees:
         if emp.id in seen_emp_ids:
             continue
-        for absence in absences:
-            if absence.employee_id == emp.id and absence.overlaps_date(check_date):
-                absent_pairs.append((emp, absence))
-                seen_emp_ids.add(emp.id)
-                break
+        absence = absence_calendar.absence_on(emp.id, check_date)
+        if absence is not None:
+            absent_pairs.append((emp, absence))
+            seen_emp_ids.add(emp.id)
 
     total = len(employees)
     n = len(absent_pairs)
@@ -138,7 +160,7 @@ class ValidationResult:
 
 
 def validate_shift_plan(
-    assignments: List[ShiftAssignment],
+    assignments: Union[List[ShiftAssignment], ScheduleMatrix],
     employees: List[Employee],
     absences: List[Absence],
     start_date: date,
@@ -147,13 +169,14 @@ def validate_shift_plan(
     complete_schedule: Dict[Tuple[int, date], str] = None,
     locked_team_shift: Dict[Tuple[int, int], str] = None,
     locked_employee_weekend: Dict[Tuple[int, date], bool] = None,
-    shift_types: List = None
+    shift_types: List = None,
+    engine: Optional[str] = None,
 ) -> ValidationResult:
     """
     Validate the complete shift plan against all rules.
     
     Args:
-        assignments: List of shift assignments
+        assignments: List of shift assignments or a ScheduleMatrix
         employees: List of employees
         absences: List of absences
         start_date: Start date of planning period
@@ -163,10 +186,25 @@ def validate_shift_plan(
         locked_team_shift: Locked team shift assignments (optional, for checking manual overrides)
         locked_employee_weekend: Locked employee weekend assignments (optional)
         shift_types: List of shift types with staffing requirements (optional)
+        engine: "matrix" or "reference" (default: DIENSTPLAN_VALIDATION_ENGINE
+            environment variable, else DEFAULT_VALIDATION_ENGINE)
         
     Returns:
         ValidationResult with any violations or warnings
     """
+    if engine is None:
+        engine = os.environ.get("DIENSTPLAN_VALIDATION_ENGINE", "").strip().lower() or DEFAULT_VALIDATION_ENGINE
+    if engine not in VALIDATION_ENGINES:
+        raise ValueError(f"Unknown validation engine '{engine}', expected one of {VALIDATION_ENGINES}")
+    if isinstance(assignments, ScheduleMatrix):
+        assignments = assignments.to_assignments()
+    if engine == "matrix":
+        from validation_matrix import validate_shift_plan_matrix
+        return validate_shift_plan_matrix(
+            assignments, employees, absences, start_date, end_date, teams,
+            complete_schedule, locked_team_shift, locked_employee_weekend, shift_types,
+        )
+
     result = ValidationResult()
     
     # Create lookup structures
@@ -187,6 +225,9 @@ def validate_shift_plan(
             assignments_by_date[assignment.date] = []
         assignments_by_date[assignment.date].append(assignment)
     
+    # One interval index for all absence lookups of the validators below
+    absences = AbsenceCalendar(absences or [], window_start=start_date, window_end=end_date)
+
     # Validate each rule
     validate_one_shift_per_day(result, assignments_by_emp_date)
     validate_no_work_when_absent(result, assignments, absences, emp_dict)
@@ -236,10 +277,11 @@ def validate_one_shift_per_day(
 def validate_no_work_when_absent(
     result: ValidationResult,
     assignments: List[ShiftAssignment],
-    absences: List[Absence],
+    absences: Absences,
     emp_dict: Dict[int, Employee]
 ):
     """Validate that employees don't work when absent"""
+    absence_calendar = _absence_calendar(absences)
     for assignment in assignments:
         emp_id = assignment.employee_id
         d = assignment.date
@@ -255,24 +297,24 @@ def validate_no_work_when_absent(
             continue
         
         # Check if employee is absent
-        for absence in absences:
-            if absence.employee_id == emp_id and absence.overlaps_date(d):
-                shift_code = get_shift_type_by_id(assignment.shift_type_id).code
-                result.add_violation(
-                    f"{emp.full_name} ist am {d.strftime('%d.%m.%Y')} zur {shift_code}-Schicht eingeplant, ist aber abwesend ({absence.get_code()})",
-                    cause_type="ABSENCE",
-                    cause=(
-                        f"Ursache: {emp.full_name} ist am {d.strftime('%d.%m.')} "
-                        f"abwesend ({absence.get_code()}: {absence.start_date.strftime('%d.%m.')}–{absence.end_date.strftime('%d.%m.')})"
-                    ),
-                )
+        absence = absence_calendar.absence_on(emp_id, d)
+        if absence is not None:
+            shift_code = get_shift_type_by_id(assignment.shift_type_id).code
+            result.add_violation(
+                f"{emp.full_name} ist am {d.strftime('%d.%m.%Y')} zur {shift_code}-Schicht eingeplant, ist aber abwesend ({absence.get_code()})",
+                cause_type="ABSENCE",
+                cause=(
+                    f"Ursache: {emp.full_name} ist am {d.strftime('%d.%m.')} "
+                    f"abwesend ({absence.get_code()}: {absence.start_date.strftime('%d.%m.')}–{absence.end_date.strftime('%d.%m.')})"
+                ),
+            )
 
 
 def validate_rest_times(
     result: ValidationResult,
     assignments: List[ShiftAssignment],
     emp_dict: Dict[int, Employee],
-    absences: List[Absence],
+    absences: Absences,
     employees: List[Employee],
 ):
     """Validate 11-hour minimum rest time (forbidden transitions)"""
@@ -359,7 +401,7 @@ def validate_consecutive_shifts(
     result: ValidationResult,
     assignments: List[ShiftAssignment],
     emp_dict: Dict[int, Employee],
-    absences: List[Absence],
+    absences: Absences,
     employees: List[Employee],
     shift_types: List = None,
 ):
@@ -564,7 +606,7 @@ def validate_working_hours(
     start_date: date,
     end_date: date,
     shift_types: List,
-    absences: List[Absence],
+    absences: Absences,
     employees: List[Employee],
 ):
     """
@@ -675,7 +717,7 @@ def validate_staffing_requirements(
     assignments_by_date: Dict[date, List[ShiftAssignment]],
     emp_dict: Dict[int, Employee],
     shift_types: List,
-    absences: List[Absence],
+    absences: Absences,
     employees: List[Employee],
 ):
     """Validate minimum/maximum staffing per shift
@@ -750,7 +792,7 @@ def validate_special_functions(
     result: ValidationResult,
     assignments: List[ShiftAssignment],
     emp_dict: Dict[int, Employee],
-    absences: List[Absence],
+    absences: Absences,
     employees: List[Employee],
 ):
     """Validate special function assignments (BMT, BSB)"""
@@ -821,7 +863,7 @@ def validate_coverage_availability(
     result: ValidationResult,
     assignments: List[ShiftAssignment],
     employees: List[Employee],
-    absences: List[Absence],
+    absences: Absences,
 ):
     """Validate coverage availability.
 
@@ -0,0 +1,606 @@
+"""
+Matrix engine for validate_shift_plan().
+
+Encodes the plan as an employee × day matrix of shift codes (plus hours,
+input order and an absence mask) and evaluates the per-assignment rules
+with NumPy array operations instead of regrouping and sorting the
+assignment list once per rule.  Violations and warnings are emitted in
+exactly the order of the reference validators in validation.py, so both
+engines return the same ValidationResult.
+
+Plans the encoding cannot represent (several shifts of one employee on one
+day, unknown employee or shift type ids, missing shift_types) are handed to
+the reference engine, which reports them as before.
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from entities import Employee, ShiftAssignment, Absence, get_shift_type_by_id
+from absence_calendar import AbsenceCalendar
+from validation import (
+    MAIN_SHIFT_CODES,
+    DEFAULT_WEEKLY_HOURS,
+    ValidationResult,
+    _analyze_absence_cause,
+    validate_all_employees_present,
+    validate_locked_assignments,
+    validate_shift_plan,
+)
+
+EMPTY = -1  # Code index of a day without assignment
+_NO_CODE = -2  # Code index of a shift code that does not occur in the plan
+
+
+class _PlanMatrix:
+    """
+    Employee × day encoding of a list of shift assignments.
+
+    Rows are the assigned employees in order of their first assignment, the
+    columns cover every day from min(start_date, first assignment) to
+    max(end_date, last assignment) without gaps, so "consecutive days" are
+    neighbouring columns.
+    """
+
+    def __init__(
+        self,
+        assignments: List[ShiftAssignment],
+        employees: List[Employee],
+        calendar: AbsenceCalendar,
+        start_date: date,
+        end_date: date,
+    ):
+        self.calendar = calendar
+        self.employees = employees
+        self.start_date = start_date
+        self.end_date = end_date
+        self.codes: List[str] = []
+        self.type_ids: List[int] = []
+        self.ok = False
+
+        emp_dict = {emp.id: emp for emp in employees}
+        if len(emp_dict) != len(employees) or not assignments:
+            return
+
+        row_of: Dict[int, int] = {}
+        type_of: Dict[int, int] = {}
+        type_code: List[int] = []
+        type_hours: List[float] = []
+        rows, kinds, ords = [], [], []
+        for a in assignments:
+            row = row_of.get(a.employee_id)
+            if row is None:
+                if a.employee_id not in emp_dict:
+                    return
+                row = row_of[a.employee_id] = len(row_of)
+            kind = type_of.get(a.shift_type_id)
+            if kind is None:
+                shift_type = get_shift_type_by_id(a.shift_type_id)
+                if shift_type is None:
+                    return
+                if shift_type.code not in self.codes:
+                    self.codes.append(shift_type.code)
+                kind = type_of[a.shift_type_id] = len(self.type_ids)
+                self.type_ids.append(shift_type.id)
+                type_code.append(self.codes.index(shift_type.code))
+                type_hours.append(shift_type.hours)
+            rows.append(row)
+            kinds.append(kind)
+            ords.append(a.date.toordinal())
+
+        self.day0 = min(start_date.toordinal(), min(ords))
+        num_days = max(end_date.toordinal(), max(ords)) - self.day0 + 1
+        num_rows = len(row_of)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(ords, dtype=np.int64) - self.day0
+        if np.unique(rows * num_days + cols).size != rows.size:
+            return  # several shifts of one employee on one day
+
+        self.emps = [emp_dict[emp_id] for emp_id in row_of]
+        self.dates = [date.fromordinal(self.day0 + c) for c in range(num_days)]
+        self.weekday = (np.arange(self.day0, self.day0 + num_days) - 1) % 7
+        kinds = np.asarray(kinds, dtype=np.int64)
+
+        # kind: index into type_ids; code: index into codes; order: input position
+        self.kind = np.full((num_rows, num_days), EMPTY, dtype=np.int16)
+        self.kind[rows, cols] = kinds
+        self.code = np.full((num_rows, num_days), EMPTY, dtype=np.int16)
+        self.code[rows, cols] = np.asarray(type_code, dtype=np.int16)[kinds]
+        self.hours = np.zeros((num_rows, num_days), dtype=np.float64)
+        self.hours[rows, cols] = np.asarray(type_hours, dtype=np.float64)[kinds]
+        self.order = np.full((num_rows, num_days), np.iinfo(np.int64).max, dtype=np.int64)
+        self.order[rows, cols] = np.arange(rows.size)
+        self.worked = self.code != EMPTY
+
+        self.absent = np.zeros((num_rows, num_days), dtype=bool)
+        for row, emp in enumerate(self.emps):
+            for start, end in calendar.intervals(emp.id):
+                first = max(start.toordinal() - self.day0, 0)
+                last = min(end.toordinal() - self.day0, num_days - 1)
+                if first <= last:
+                    self.absent[row, first:last + 1] = True
+        self.ok = True
+
+    def code_index(self, code: str) -> int:
+        return self.codes.index(code) if code in self.codes else _NO_CODE
+
+    def col(self, d: date) -> int:
+        return d.toordinal() - self.day0
+
+
+class _CauseCache:
+    """_analyze_absence_cause() memoised per (date, shift code)."""
+
+    def __init__(self, calendar: AbsenceCalendar, employees: List[Employee]):
+        self.calendar = calendar
+        self.employees = employees
+        self._cache: Dict[Tuple[date, Optional[str]], Tuple[str, str]] = {}
+
+    def __call__(self, check_date: date, shift_code: Optional[str] = None) -> Tuple[str, str]:
+        key = (check_date, shift_code)
+        cause = self._cache.get(key)
+        if cause is None:
+            cause = self._cache[key] = _analyze_absence_cause(
+                check_date, self.calendar, self.employees, shift_code=shift_code
+            )
+        return cause
+
+
+def _run_lengths(mask: np.ndarray) -> np.ndarray:
+    """Length of the run of True cells ending at each cell along axis 1 (0 where False)."""
+    counts = np.cumsum(mask, axis=1)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=1)
+    return counts - resets
+
+
+def validate_shift_plan_matrix(
+    assignments: List[ShiftAssignment],
+    employees: List[Employee],
+    absences: List[Absence],
+    start_date: date,
+    end_date: date,
+    teams: List = None,
+    complete_schedule: Dict[Tuple[int, date], str] = None,
+    locked_team_shift: Dict[Tuple[int, int], str] = None,
+    locked_employee_weekend: Dict[Tuple[int, date], bool] = None,
+    shift_types: List = None
+) -> ValidationResult:
+    """
+    Validate the complete shift plan against all rules (matrix engine).
+
+    Same arguments and result as validate_shift_plan(engine="reference").
+    """
+    calendar = AbsenceCalendar(absences or [], window_start=start_date, window_end=end_date)
+    plan = _PlanMatrix(assignments, employees, calendar, start_date, end_date) if shift_types else None
+    if plan is None or not plan.ok:
+        return validate_shift_plan(
+            assignments, employees, absences, start_date, end_date, teams,
+            complete_schedule, locked_team_shift, locked_employee_weekend,
+            shift_types, engine="reference",
+        )
+
+    result = ValidationResult()
+    causes = _CauseCache(calendar, employees)
+
+    _check_no_work_when_absent(result, plan)
+    _check_rest_times(result, plan, causes)
+    _check_consecutive_shifts(result, plan, causes, shift_types)
+    _check_minimum_consecutive_weekday_shifts(result, plan)
+    _check_working_hours(result, plan, causes, shift_types)
+    _check_staffing_requirements(result, plan, causes, shift_types)
+    _check_special_functions(result, plan, causes)
+
+    if complete_schedule:
+        validate_all_employees_present(result, complete_schedule, employees, start_date, end_date)
+
+    if locked_team_shift or locked_employee_weekend:
+        validate_locked_assignments(result, assignments,
+                                    locked_team_shift, locked_employee_weekend,
+                                    employees, teams, start_date, end_date)
+
+    if teams:
+        _check_weekend_team_consistency(result, plan)
+
+    return result
+
+
+def _check_no_work_when_absent(result: ValidationResult, plan: _PlanMatrix):
+    """validate_no_work_when_absent(): absence mask AND worked cells, in input order."""
+    rows, cols = np.nonzero(plan.worked & plan.absent)
+    for i in np.argsort(plan.order[rows, cols], kind="stable"):
+        row, col = rows[i], cols[i]
+        emp, d = plan.emps[row], plan.dates[col]
+        absence = plan.calendar.absence_on(emp.id, d)
+        shift_code = plan.codes[plan.code[row, col]]
+        result.add_violation(
+            f"{emp.full_name} ist am {d.strftime('%d.%m.%Y')} zur {shift_code}-Schicht eingeplant, ist aber abwesend ({absence.get_code()})",
+            cause_type="ABSENCE",
+            cause=(
+                f"Ursache: {emp.full_name} ist am {d.strftime('%d.%m.')} "
+                f"abwesend ({absence.get_code()}: {absence.start_date.strftime('%d.%m.')}–{absence.end_date.strftime('%d.%m.')})"
+            ),
+        )
+
+
+def _check_rest_times(result: ValidationResult, plan: _PlanMatrix, causes: _CauseCache):
+    """validate_rest_times(): forbidden code pairs on neighbouring columns."""
+    early, late, night = plan.code_index("F"), plan.code_index("S"), plan.code_index("N")
+    # (from, to) -> (label, rest time text)
+    forbidden = {
+        (late, early): ("Spät→Früh", "nur 8h Ruhezeit"),
+        (night, early): ("Nacht→Früh", "0h Ruhezeit"),
+        (night, late): ("Nacht→Spät", "nur 8h Ruhezeit"),
+    }
+    current, following = plan.code[:, :-1], plan.code[:, 1:]
+    bad = np.zeros(current.shape, dtype=bool)
+    for first, second in forbidden:
+        bad |= (current == first) & (following == second)
+
+    for row, col in zip(*np.nonzero(bad)):
+        label, rest = forbidden[(current[row, col], following[row, col])]
+        d1, d2 = plan.dates[col], plan.dates[col + 1]
+        next_shift = plan.codes[following[row, col]]
+        cause_type, cause = causes(d2, next_shift)
+        if cause_type != "ABSENCE":
+            cause_type = "ROTATION_CONFLICT"
+            cause = (
+                f"Ursache: Verbotene Schichtfolge {label} am "
+                f"{d1.strftime('%d.%m.')}→{d2.strftime('%d.%m.')} "
+                f"durch Rotationszwänge ({rest})"
+            )
+        result.add_violation(
+            f"{plan.emps[row].full_name}: Unzulässiger Schichtwechsel {label} am {d1.strftime('%d.%m.%Y')}→{d2.strftime('%d.%m.%Y')} ({rest})",
+            cause_type=cause_type,
+            cause=cause,
+        )
+
+
+def _check_consecutive_shifts(
+    result: ValidationResult,
+    plan: _PlanMatrix,
+    causes: _CauseCache,
+    shift_types: List,
+):
+    """validate_consecutive_shifts(): run lengths of worked days and of night shifts."""
+    max_consecutive_any = max(
+        (st.max_consecutive_days for st in shift_types), default=6
+    ) or 6
+    max_consecutive_by_code = {st.code: st.max_consecutive_days for st in shift_types}
+    n_max_consec = max_consecutive_by_code.get("N", 3)
+
+    too_many_days = _run_lengths(plan.worked) > max_consecutive_any
+    too_many_nights = _run_lengths(plan.code == plan.code_index("N")) > n_max_consec
+
+    for row in np.nonzero(too_many_days.any(axis=1) | too_many_nights.any(axis=1))[0]:
+        emp_name = plan.emps[row].full_name
+        for col in np.nonzero(too_many_days[row])[0]:
+            d = plan.dates[col]
+            cause_type, cause = causes(d)
+            result.add_violation(
+                f"{emp_name}: Mehr als {max_consecutive_any} aufeinanderfolgende Arbeitstage (zuletzt am {d.strftime('%d.%m.%Y')})",
+                cause_type=cause_type,
+                cause=cause,
+            )
+        for col in np.nonzero(too_many_nights[row])[0]:
+            d = plan.dates[col]
+            cause_type, cause = causes(d, "N")
+            result.add_violation(
+                f"{emp_name}: Mehr als {n_max_consec} aufeinanderfolgende Nachtschichten (zuletzt am {d.strftime('%d.%m.%Y')})",
+                cause_type=cause_type,
+                cause=cause,
+            )
+
+
+def _check_minimum_consecutive_weekday_shifts(result: ValidationResult, plan: _PlanMatrix):
+    """validate_minimum_consecutive_weekday_shifts(): 3-day windows and pairs of weekdays."""
+    code, worked = plan.code, plan.worked
+    is_weekday = plan.weekday < 5
+
+    # Three consecutive worked weekdays, flagged at the middle day (column c + 1)
+    s1, s2, s3 = code[:, :-2], code[:, 1:-1], code[:, 2:]
+    triple = (
+        worked[:, :-2] & worked[:, 1:-1] & worked[:, 2:]
+        & is_weekday[:-2] & is_weekday[1:-1] & is_weekday[2:]
+    )
+    isolated_aba = triple & (s1 == s3) & (s1 != s2)
+    isolated_bac = triple & (s1 != s2) & (s2 != s3) & (s1 != s3)
+
+    # Shift change between two consecutive worked weekdays, flagged at the first day
+    change = (
+        worked[:, :-1] & worked[:, 1:] & is_weekday[:-1] & is_weekday[1:]
+        & (code[:, :-1] != code[:, 1:])
+    )
+    # Same shift on the weekday before the first / after the second day
+    same_before = np.zeros(change.shape, dtype=bool)
+    same_before[:, 1:] = is_weekday[:-2] & (code[:, :-2] == code[:, 1:-1])
+    same_after = np.zeros(change.shape, dtype=bool)
+    same_after[:, :-1] = is_weekday[2:] & (code[:, 2:] == code[:, 1:-1])
+    change &= ~(same_before & same_after)
+
+    flagged = isolated_aba.any(axis=1) | isolated_bac.any(axis=1) | change.any(axis=1)
+    for row in np.nonzero(flagged)[0]:
+        emp_name = plan.emps[row].full_name
+        for col in np.nonzero(isolated_aba[row] | isolated_bac[row])[0]:
+            shift1, shift2, shift3 = (plan.codes[c] for c in code[row, col:col + 3])
+            d2 = plan.dates[col + 1]
+            if isolated_aba[row, col]:
+                result.add_warning(
+                    f"{emp_name}: Einzelne {shift2}-Schicht am {d2.strftime('%a %d.%m')} zwischen {shift1}-Schichten (weniger als 2 aufeinanderfolgende Tage)",
+                    cause_type="ROTATION_CONFLICT",
+                    cause=(
+                        f"Ursache: Einzelne {shift2}-Schicht am {d2.strftime('%d.%m.')} "
+                        f"zwischen {shift1}-Schichten – Rotationszwänge verhindern 2-Tage-Minimum"
+                    ),
+                )
+            else:
+                result.add_warning(
+                    f"{emp_name}: Einzelne {shift2}-Schicht am {d2.strftime('%a %d.%m')} zwischen {shift1} und {shift3} (weniger als 2 aufeinanderfolgende Tage)",
+                    cause_type="ROTATION_CONFLICT",
+                    cause=(
+                        f"Ursache: Einzelne {shift2}-Schicht am {d2.strftime('%d.%m.')} "
+                        f"zwischen {shift1} und {shift3} – Rotationszwänge verhindern 2-Tage-Minimum"
+                    ),
+                )
+        for col in np.nonzero(change[row])[0]:
+            shift1, shift2 = plan.codes[code[row, col]], plan.codes[code[row, col + 1]]
+            d1, d2 = plan.dates[col], plan.dates[col + 1]
+            result.add_warning(
+                f"{emp_name}: Schichtwechsel {shift1}→{shift2} an aufeinanderfolgenden Werktagen"
+                f" ({d1.strftime('%a %d.%m')} → {d2.strftime('%a %d.%m')}) – weniger als 2 aufeinanderfolgende Tage",
+                cause_type="ROTATION_CONFLICT",
+                cause=(
+                    f"Ursache: Schichtwechsel {shift1}→{shift2} an aufeinanderfolgenden Werktagen "
+                    f"({d1.strftime('%d.%m.')}→{d2.strftime('%d.%m.')}) "
+                    f"durch Rotationszwänge"
+                ),
+            )
+
+
+def _check_working_hours(
+    result: ValidationResult,
+    plan: _PlanMatrix,
+    causes: _CauseCache,
+    shift_types: List,
+):
+    """
+    validate_working_hours(): hours per Monday-based week and per 30-day window.
+
+    Shift hours are multiples of 0.5, so the array sums are exact and equal
+    the reference engine's sequential sums.
+    """
+    shift_weekly_hours_map = {st.id: st.weekly_working_hours for st in shift_types}
+    num_rows, num_days = plan.code.shape
+
+    # Expected weekly hours from the most common main shift type (ties: first assigned)
+    best_count = np.zeros(num_rows, dtype=np.int64)
+    best_first = np.full(num_rows, np.iinfo(np.int64).max, dtype=np.int64)
+    best_kind = np.full(num_rows, EMPTY, dtype=np.int64)
+    for kind, type_id in enumerate(plan.type_ids):
+        if get_shift_type_by_id(type_id).code not in MAIN_SHIFT_CODES:
+            continue
+        cells = plan.kind == kind
+        count = cells.sum(axis=1)
+        first = np.where(cells, plan.order, np.iinfo(np.int64).max).min(axis=1)
+        better = (count > 0) & ((count > best_count) | ((count == best_count) & (first < best_first)))
+        best_count = np.where(better, count, best_count)
+        best_first = np.where(better, first, best_first)
+        best_kind = np.where(better, kind, best_kind)
+    expected_weekly = [
+        DEFAULT_WEEKLY_HOURS if kind == EMPTY
+        else shift_weekly_hours_map.get(plan.type_ids[kind], DEFAULT_WEEKLY_HOURS)
+        for kind in best_kind
+    ]
+    shift_hours = 8  # standard shift duration; all main shifts use 8h
+    expected_monthly = [
+        math.ceil(hours * 30 / 7 / shift_hours) * shift_hours for hours in expected_weekly
+    ]
+
+    # Monday-based weeks: week_starts are the first column of every week
+    week_starts = np.concatenate(([0], np.nonzero(plan.weekday[1:] == 0)[0] + 1))
+    first_monday = plan.dates[0] - timedelta(days=int(plan.weekday[0]))
+    week_hours = np.add.reduceat(plan.hours, week_starts, axis=1)
+    week_first = np.minimum.reduceat(plan.order, week_starts, axis=1)
+    week_worked = np.logical_or.reduceat(plan.worked, week_starts, axis=1)
+    too_many_week = week_worked & (week_hours > np.asarray(expected_weekly, dtype=np.float64)[:, None])
+
+    # 30-day windows every 7 days from start_date
+    window_cols = np.arange(
+        plan.col(plan.start_date), plan.col(plan.end_date - timedelta(days=29)) + 1, 7
+    )
+    prefix = np.concatenate((np.zeros((num_rows, 1)), np.cumsum(plan.hours, axis=1)), axis=1)
+    window_hours = prefix[:, window_cols + 30] - prefix[:, window_cols]
+    too_many_window = window_hours > np.asarray(expected_monthly, dtype=np.float64)[:, None]
+
+    for row in np.nonzero(too_many_week.any(axis=1) | too_many_window.any(axis=1))[0]:
+        emp_name = plan.emps[row].full_name
+        weeks = np.nonzero(too_many_week[row])[0]
+        for week in weeks[np.argsort(week_first[row, weeks], kind="stable")]:
+            hours = float(week_hours[row, week])
+            week_start = first_monday + timedelta(days=7 * int(week))
+            cause_type, cause = causes(week_start)
+            result.add_violation(
+                f"{emp_name}: {hours:.1f} Stunden in der Woche ab {week_start.strftime('%d.%m.%Y')} (max. {expected_weekly[row]}h laut Schichtkonfiguration)",
+                cause_type=cause_type,
+                cause=cause,
+            )
+        for i in np.nonzero(too_many_window[row])[0]:
+            current = plan.dates[window_cols[i]]
+            window_end = current + timedelta(days=29)
+            hours_in_window = float(window_hours[row, i])
+            cause_type, cause = causes(current)
+            result.add_violation(
+                f"{emp_name}: {hours_in_window:.1f} Stunden im 30-Tage-Zeitraum {current.strftime('%d.%m.%Y')} bis {window_end.strftime('%d.%m.%Y')} (max. {expected_monthly[row]}h laut Schichtkonfiguration)",
+                cause_type=cause_type,
+                cause=cause,
+            )
+
+
+def _days_in_first_assignment_order(plan: _PlanMatrix, days: np.ndarray) -> np.ndarray:
+    """Sort day columns by their first assignment in the input list."""
+    first = plan.order[:, days].min(axis=0)
+    return days[np.argsort(first, kind="stable")]
+
+
+def _check_staffing_requirements(
+    result: ValidationResult,
+    plan: _PlanMatrix,
+    causes: _CauseCache,
+    shift_types: List,
+):
+    """validate_staffing_requirements(): team member counts per day and main shift."""
+    staffing_weekday = {}
+    staffing_weekend = {}
+    for st in shift_types:
+        if st.code in ["F", "S", "N"]:
+            staffing_weekday[st.code] = {"min": st.min_staff_weekday, "max": st.max_staff_weekday}
+            staffing_weekend[st.code] = {"min": st.min_staff_weekend, "max": st.max_staff_weekend}
+
+    in_team = np.array([bool(emp.team_id) for emp in plan.emps])[:, None]
+    is_weekend = plan.weekday >= 5
+    counts = {}
+    flagged = np.zeros(len(plan.dates), dtype=bool)
+    for shift_code in ["F", "S", "N"]:
+        if shift_code not in staffing_weekday:
+            continue
+        counts[shift_code] = ((plan.code == plan.code_index(shift_code)) & in_team).sum(axis=0)
+        min_req = np.where(is_weekend, staffing_weekend[shift_code]["min"], staffing_weekday[shift_code]["min"])
+        max_req = np.where(is_weekend, staffing_weekend[shift_code]["max"], staffing_weekday[shift_code]["max"])
+        flagged |= (counts[shift_code] < min_req) | (counts[shift_code] > max_req)
+    flagged &= plan.worked.any(axis=0)
+
+    for col in _days_in_first_assignment_order(plan, np.nonzero(flagged)[0]):
+        d = plan.dates[col]
+        staffing = staffing_weekend if is_weekend[col] else staffing_weekday
+        for shift_code, day_counts in counts.items():
+            count = int(day_counts[col])
+            min_req = staffing[shift_code]["min"]
+            max_req = staffing[shift_code]["max"]
+            if count < min_req:
+                cause_type, cause = causes(d, shift_code)
+                result.add_violation(
+                    f"Unterbesetzung: {shift_code}-Schicht am {d.strftime('%d.%m.%Y')}: {count} Mitarbeiter (Minimum: {min_req})",
+                    cause_type=cause_type,
+                    cause=cause,
+                )
+            elif count > max_req:
+                result.add_violation(
+                    f"Überbesetzung: {shift_code}-Schicht am {d.strftime('%d.%m.%Y')}: {count} Mitarbeiter (Maximum: {max_req})",
+                    cause_type="UNKNOWN",
+                    cause=(
+                        f"Ursache: Überbesetzung in {shift_code}schicht am {d.strftime('%d.%m.')} "
+                        f"– {count} von max. {max_req} Mitarbeitern eingeplant"
+                    ),
+                )
+
+
+def _check_special_functions(result: ValidationResult, plan: _PlanMatrix, causes: _CauseCache):
+    """validate_special_functions(): BMT/BSB counts and qualifications on weekdays."""
+    bmt = plan.code == plan.code_index("BMT")
+    bsb = plan.code == plan.code_index("BSB")
+    unqualified = (
+        (bmt & ~np.array([bool(emp.is_brandmeldetechniker) for emp in plan.emps])[:, None])
+        | (bsb & ~np.array([bool(emp.is_brandschutzbeauftragter) for emp in plan.emps])[:, None])
+    )
+    days = np.nonzero(plan.worked.any(axis=0) & (plan.weekday < 5))[0]
+    bmt_counts = bmt.sum(axis=0)
+    bsb_counts = bsb.sum(axis=0)
+
+    for col in _days_in_first_assignment_order(plan, days):
+        d = plan.dates[col]
+        rows = np.nonzero(unqualified[:, col])[0]
+        for row in rows[np.argsort(plan.order[rows, col], kind="stable")]:
+            emp = plan.emps[row]
+            function = "BMT" if bmt[row, col] else "BSB"
+            result.add_violation(
+                f"{emp.full_name} ist am {d.strftime('%d.%m.%Y')} als {function} eingeplant, hat aber keine {function}-Qualifikation",
+                cause_type="UNKNOWN",
+                cause=(
+                    f"Ursache: {emp.full_name} ist am {d.strftime('%d.%m.')} "
+                    f"für {function} eingeplant, besitzt aber keine {function}-Qualifikation"
+                ),
+            )
+
+        for function, count in (("BMT", int(bmt_counts[col])), ("BSB", int(bsb_counts[col]))):
+            if count != 1:
+                cause_type, cause = causes(d, function)
+                result.add_warning(
+                    f"{function}-Besetzung am {d.strftime('%d.%m.%Y')}: {count} Mitarbeiter (erwartet: 1)",
+                    cause_type=cause_type,
+                    cause=cause,
+                )
+
+
+def _check_weekend_team_consistency(result: ValidationResult, plan: _PlanMatrix):
+    """validate_weekend_team_consistency(): shift code bit sets per Sunday-based week."""
+    first = plan.col(plan.start_date)
+    last = plan.col(plan.end_date)
+    if first > last:
+        return
+    in_range = np.zeros(len(plan.dates), dtype=bool)
+    in_range[first:last + 1] = True
+
+    # Weeks start on every Sunday after start_date (week 0 starts at start_date)
+    new_week = plan.weekday == 6
+    new_week[:first + 1] = False
+    week_of = np.cumsum(new_week)
+    num_weeks = int(week_of[last]) + 1
+
+    main_codes = ["F", "S", "N"]
+    bit_of_code = np.zeros(len(plan.codes) + 1, dtype=np.int8)  # index code + 1
+    for bit, shift_code in enumerate(main_codes):
+        if shift_code in plan.codes:
+            bit_of_code[plan.codes.index(shift_code) + 1] = 1 << bit
+    bits = bit_of_code[plan.code + 1]
+    in_team = np.array([bool(emp.team_id) for emp in plan.emps])[:, None]
+    counted = (bits != 0) & in_team & in_range
+
+    num_rows = len(plan.emps)
+    weekday_bits = np.zeros((num_rows, num_weeks), dtype=np.int8)
+    weekend_bits = np.zeros((num_rows, num_weeks), dtype=np.int8)
+    week_first = np.full((num_rows, num_weeks), np.iinfo(np.int64).max, dtype=np.int64)
+    rows, cols = np.nonzero(counted)
+    weeks = week_of[cols]
+    on_weekend = plan.weekday[cols] >= 5
+    np.bitwise_or.at(weekday_bits, (rows[~on_weekend], weeks[~on_weekend]), bits[rows, cols][~on_weekend])
+    np.bitwise_or.at(weekend_bits, (rows[on_weekend], weeks[on_weekend]), bits[rows, cols][on_weekend])
+    np.minimum.at(week_first, (rows, weeks), plan.order[rows, cols])
+
+    def _codes(mask: int) -> List[str]:
+        return sorted(code for bit, code in enumerate(main_codes) if mask & (1 << bit))
+
+    flagged = (weekend_bits != 0) & ((weekday_bits == 0) | ((weekend_bits & ~weekday_bits) != 0))
+    row_first = week_first.min(axis=1)
+    flagged_rows = np.nonzero(flagged.any(axis=1))[0]
+    for row in flagged_rows[np.argsort(row_first[flagged_rows], kind="stable")]:
+        emp = plan.emps[row]
+        week_idxs = np.nonzero(flagged[row])[0]
+        for week in week_idxs[np.argsort(week_first[row, week_idxs], kind="stable")]:
+            week_idx = int(week)
+            weekday_mask = int(weekday_bits[row, week_idx])
+            if not weekday_mask:
+                result.add_warning(
+                    f"{emp.full_name}: Wochenendarbeit in Woche {week_idx}, aber keine Wochentage eingeplant",
+                    cause_type="ROTATION_CONFLICT",
+                    cause=(
+                        f"Ursache: {emp.full_name} arbeitet am Wochenende in Woche {week_idx}, "
+                        f"hat aber keine Wochentags-Schichten – Rotationsfehler"
+                    ),
+                )
+                continue
+            weekday_shifts = _codes(weekday_mask)
+            weekend_shifts = _codes(int(weekend_bits[row, week_idx]))
+            result.add_violation(
+                f"Wochenend-Verstoß: {emp.full_name}, Woche {week_idx}: "
+                f"Wochentag-Schichten={weekday_shifts}, "
+                f"Wochenend-Schichten={weekend_shifts} – "
+                f"Wochenendschichten müssen mit der Teamschicht übereinstimmen",
+                cause_type="ROTATION_CONFLICT",
+                cause=(
+                    f"Ursache: {emp.full_name} in Woche {week_idx} – Wochenendschichten "
+                    f"{weekend_shifts} stimmen nicht mit Wochentags-Schichten "
+                    f"{weekday_shifts} überein (Rotationskonflikt)"
+                ),
+            )
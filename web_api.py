@@ -122,6 +122,11 @@ def create_app(db_path: str = "dienstplan.db") -> FastAPI:
     set_db(db)
     app.state.db = db
 
+    # Pick up planning jobs still queued from before a restart; otherwise the
+    # embedded worker starts with the first submitted job.
+    from api.planning_worker import resume_queued_jobs
+    resume_queued_jobs(db)
+
     # Compute asset versions for cache-busting
     static_folder = os.path.join(os.path.dirname(__file__), 'wwwroot')
     asset_versions = _compute_asset_versions(static_folder)
@@ -1283,6 +1283,20 @@ export function displayGlobalSettings(settings) {
     html += '<small>Standard: 11 Stunden (gesetzlich vorgeschrieben)</small>';
     html += '</div>';
 
+    html += '<div class="form-group">';
+    html += '<label for="solverGapLimitPercent">Optimierung beenden ab Optimalitätslücke (%):</label>';
+    html += `<input type="number" id="solverGapLimitPercent" name="solverGapLimitPercent" 
+             value="${settings.solverGapLimitPercent ?? ''}" min="0.1" max="50" step="0.1" ${readonly}>`;
+    html += '<small>Leer = aus. Die Optimierung endet, sobald die Lösung höchstens so weit von der bestmöglichen entfernt ist.</small>';
+    html += '</div>';
+
+    html += '<div class="form-group">';
+    html += '<label for="solverPlateauSeconds">Optimierung beenden nach Sekunden ohne Verbesserung:</label>';
+    html += `<input type="number" id="solverPlateauSeconds" name="solverPlateauSeconds" 
+             value="${settings.solverPlateauSeconds ?? ''}" min="10" max="3600" ${readonly}>`;
+    html += '<small>Leer = aus. Es gilt das Kriterium, das zuerst erreicht wird.</small>';
+    html += '</div>';
+
     if (settings.modifiedAt) {
         html += '<div class="form-group">';
         html += '<small class="text-muted">Zuletzt geändert: ' + new Date(settings.modifiedAt).toLocaleString('de-DE');
@@ -1317,7 +1331,9 @@ export async function saveGlobalSettings(event) {
     const formData = new FormData(form);
 
     const settings = {
-        minRestHoursBetweenShifts: parseInt(formData.get('minRestHoursBetweenShifts'))
+        minRestHoursBetweenShifts: parseInt(formData.get('minRestHoursBetweenShifts')),
+        solverGapLimitPercent: formData.get('solverGapLimitPercent') ? parseFloat(formData.get('solverGapLimitPercent')) : null,
+        solverPlateauSeconds: formData.get('solverPlateauSeconds') ? parseInt(formData.get('solverPlateauSeconds')) : null
     };
 
     try {
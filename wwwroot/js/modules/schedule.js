@@ -787,6 +787,73 @@ export async function executePlanShifts(event) {
             });
         };
 
+        const stopElapsedTimer = () => {
+            if (_planningElapsedTimer) {
+                clearInterval(_planningElapsedTimer);
+                _planningElapsedTimer = null;
+            }
+        };
+
+        const formatObjective = (value) => Math.round(value).toLocaleString('de-DE');
+
+        // Show a job status payload; returns true once the job has finished.
+        const applyJobState = (job) => {
+            const elapsed = job.elapsedSeconds || 0;
+
+            // Update status message
+            if (statusEl) statusEl.textContent = job.message || 'Schichten werden geplant…';
+            if (elapsedEl) {
+                if (elapsed > localElapsed) localElapsed = elapsed;
+                elapsedEl.textContent = formatElapsed(localElapsed);
+            }
+            if (optimizationPhaseEl) {
+                let phaseText = '';
+                if (job.optimizationSearchState === 'started') {
+                    const phaseIndex = job.optimizationSearchPhaseIndex || 1;
+                    const phaseTotal = job.optimizationSearchPhaseTotal || 3;
+                    const phaseLabel = job.optimizationSearchPhaseLabel ? ` – ${job.optimizationSearchPhaseLabel}` : '';
+                    phaseText = `Berechnungsphase ${phaseIndex}/${phaseTotal}${phaseLabel}`;
+                } else if (job.optimizationSearchState === 'finished') {
+                    phaseText = 'Berechnungsphase abgeschlossen';
+                } else if (job.optimizationPhaseIndex != null && job.optimizationTotalPhases != null) {
+                    const phaseName = job.optimizationPhaseLabel ? ` – ${job.optimizationPhaseLabel}` : '';
+                    phaseText = `Optimierungsphase ${job.optimizationPhaseIndex}/${job.optimizationTotalPhases}${phaseName}`;
+                }
+                if (phaseText && job.optimizationObjective != null && job.optimizationBestBound != null) {
+                    phaseText += ` (Zielwert ${formatObjective(job.optimizationObjective)}, Schranke ${formatObjective(job.optimizationBestBound)})`;
+                }
+                optimizationPhaseEl.textContent = phaseText;
+            }
+
+            // Update step progress indicators
+            if (job.planningStep) {
+                updatePlanningSteps(job.planningStep, job.planningTotalSteps || 4);
+            }
+
+            if (job.status === 'running' || job.status === 'queued') {
+                return false;
+            }
+
+            // Job finished
+            planningOverlay.classList.remove('active');
+            _currentPlanJobId = null;
+            stopElapsedTimer();
+
+            if (job.status === 'success') {
+                closePlanShiftsModal();
+                loadSchedule();
+                showPlanningResultModal(parseInt(year, 10), parseInt(month, 10), periodText);
+            } else {
+                // Error
+                if (job.details) {
+                    showToast(`Fehler beim Planen der Schichten: ${job.details}`, 'error');
+                } else {
+                    showToast(`Fehler beim Planen der Schichten: ${job.message || 'Unbekannter Fehler'}`, 'error');
+                }
+            }
+            return true;
+        };
+
         const poll = async () => {
             try {
                 const statusResponse = await fetch(
@@ -800,72 +867,41 @@ export async function executePlanShifts(event) {
                     return;
                 }
 
-                const job = await statusResponse.json();
-                const elapsed = job.elapsedSeconds || 0;
-
-                // Update status message
-                if (statusEl) statusEl.textContent = job.message || 'Schichten werden geplant…';
-                if (elapsedEl) {
-                    if (elapsed > localElapsed) localElapsed = elapsed;
-                    elapsedEl.textContent = formatElapsed(localElapsed);
-                }
-                if (optimizationPhaseEl) {
-                    if (job.optimizationSearchState === 'started') {
-                        const phaseIndex = job.optimizationSearchPhaseIndex || 1;
-                        const phaseTotal = job.optimizationSearchPhaseTotal || 3;
-                        const phaseLabel = job.optimizationSearchPhaseLabel ? ` – ${job.optimizationSearchPhaseLabel}` : '';
-                        optimizationPhaseEl.textContent = `Berechnungsphase ${phaseIndex}/${phaseTotal}${phaseLabel}`;
-                    } else if (job.optimizationSearchState === 'finished') {
-                        optimizationPhaseEl.textContent = 'Berechnungsphase abgeschlossen';
-                    } else if (job.optimizationPhaseIndex != null && job.optimizationTotalPhases != null) {
-                        const phaseName = job.optimizationPhaseLabel ? ` – ${job.optimizationPhaseLabel}` : '';
-                        optimizationPhaseEl.textContent = `Optimierungsphase ${job.optimizationPhaseIndex}/${job.optimizationTotalPhases}${phaseName}`;
-                    } else {
-                        optimizationPhaseEl.textContent = '';
-                    }
-                }
-
-                // Update step progress indicators
-                if (job.planningStep) {
-                    updatePlanningSteps(job.planningStep, job.planningTotalSteps || 4);
-                }
-
-                if (job.status === 'running') {
+                if (!applyJobState(await statusResponse.json())) {
                     setTimeout(poll, _pollDelay);
-                    return;
-                }
-
-                // Job finished
-                planningOverlay.classList.remove('active');
-                _currentPlanJobId = null;
-                if (_planningElapsedTimer) {
-                    clearInterval(_planningElapsedTimer);
-                    _planningElapsedTimer = null;
-                }
-
-                if (job.status === 'success') {
-                    closePlanShiftsModal();
-                    loadSchedule();
-                    showPlanningResultModal(parseInt(year, 10), parseInt(month, 10), periodText);
-                } else {
-                    // Error
-                    if (job.details) {
-                        showToast(`Fehler beim Planen der Schichten: ${job.details}`, 'error');
-                    } else {
-                        showToast(`Fehler beim Planen der Schichten: ${job.message || 'Unbekannter Fehler'}`, 'error');
-                    }
                 }
             } catch (err) {
                 planningOverlay.classList.remove('active');
-                if (_planningElapsedTimer) {
-                    clearInterval(_planningElapsedTimer);
-                    _planningElapsedTimer = null;
-                }
+                stopElapsedTimer();
                 showToast(`Fehler: ${err.message}`, 'error');
             }
         };
 
-        setTimeout(poll, _pollDelay);
+        // Progress is pushed via Server-Sent Events; polling is the fallback for
+        // browsers without EventSource or when the stream cannot be opened.
+        if (!window.EventSource) {
+            setTimeout(poll, _pollDelay);
+            return;
+        }
+
+        const stream = new EventSource(`${API_BASE}/shifts/plan/stream/${jobId}`, { withCredentials: true });
+        let streamOpened = false;
+        const onJobEvent = (event) => {
+            streamOpened = true;
+            if (applyJobState(JSON.parse(event.data))) {
+                stream.close();
+            }
+        };
+        stream.addEventListener('progress', onJobEvent);
+        stream.addEventListener('done', onJobEvent);
+        stream.addEventListener('error', () => {
+            // Dropped connections reconnect automatically; give up on SSE only if
+            // the stream never delivered an event (e.g. blocked by a proxy).
+            if (!streamOpened && _currentPlanJobId === jobId) {
+                stream.close();
+                setTimeout(poll, _pollDelay);
+            }
+        });
 
     } catch (error) {
         // Hide loading overlay on error